@@ -3,9 +3,20 @@
 This module configures the Django admin interface for all book-related models
 including books, authors, publishers, metadata, and scan operations. Provides
 comprehensive admin views with filtering, search, and bulk operations.
+
+Book-related lists are built for large libraries: list columns come from the
+changelist query (select_related or annotations, never a query per row),
+unfiltered lists use the table statistics for their row count, foreign keys
+to big tables use autocomplete widgets, and book searches go through the
+quick search word index rather than multi-join ``icontains`` lookups.
 """
 
+from django import forms
 from django.contrib import admin
+from django.contrib.admin import helpers
+from django.db.models import OuterRef, Q, Subquery
+from django.utils.html import format_html
+from django.utils.translation import gettext as _
 
 from .models import (
     Author,
@@ -27,6 +38,77 @@ from .models import (
     ScanStatus,
     Series,
 )
+from .utils.aggregates import EstimatedCountPaginator
+from .utils.quick_search import matching_book_ids
+
+
+def _active_title(book_ref):
+    """Subquery for the title ``Book.title`` shows, for the book referenced by ``book_ref``."""
+    return Subquery(BookTitle.objects.filter(book=OuterRef(book_ref), is_active=True).values("title")[:1])
+
+
+def _is_book_reference(term):
+    """Whether ``term`` names one book without the search index: ``#<id>`` or a file path."""
+    return (term.startswith("#") and term[1:].isdigit()) or "/" in term or "\\" in term
+
+
+def _book_search(search_term, bare_id=True):
+    """
+    Books matching ``search_term``: an id, an exact file path, or title/author words from the search index.
+
+    A bare number is an id only with ``bare_id``; otherwise it is matched as a title word, and ids need ``#``.
+    """
+    term = search_term.strip()
+    if (term.startswith("#") and term[1:].isdigit()) or (bare_id and term.isdigit()):
+        return Q(pk=int(term.lstrip("#")))
+    if "/" in term or "\\" in term:
+        return Q(files__file_path_hash=BookFile().generate_hash(term))
+    return Q(pk__in=matching_book_ids(term))
+
+
+class LargeTableAdminMixin:
+    """Changelist settings for tables that grow with the library."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def checkbox_label(self, obj):
+        return str(obj)
+
+    def action_checkbox(self, obj):
+        # The stock label renders str(obj); book models query their titles for that, once per row
+        attrs = {"class": "action-select", "aria-label": format_html(_("Select this object for an action - {}"), self.checkbox_label(obj))}
+        return forms.CheckboxInput(attrs, lambda value: False).render(helpers.ACTION_CHECKBOX_NAME, str(obj.pk))
+
+
+class BookColumnAdminMixin(LargeTableAdminMixin):
+    """
+    Admin for rows that belong to a book.
+
+    Shows the book by its title from the changelist query and adds indexed
+    book matches (``#<id>``, file path, title or author words) to the search.
+    Bare numbers are left to the admin's own fields, so a number in a message
+    or a metadata value does not also list every row of the book with that id.
+    """
+
+    autocomplete_fields = ("book",)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(book_title=_active_title("book_id"))
+
+    @admin.display(description="Book", ordering="book_title")
+    def book_display(self, obj):
+        return getattr(obj, "book_title", None) or f"Untitled Book #{obj.book_id}"
+
+    def checkbox_label(self, obj):
+        return self.book_display(obj)
+
+    def get_search_results(self, request, queryset, search_term):
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if search_term.strip():
+            results |= queryset.filter(book__in=Book.objects.filter(_book_search(search_term, bare_id=False)).values("pk"))
+        return results, may_have_duplicates
+
 
 # ----------------------
 # Inline Admin Classes
@@ -42,18 +124,21 @@ class BookTitleInline(admin.TabularInline):
 class BookAuthorInline(admin.TabularInline):
     model = BookAuthor
     extra = 0
+    autocomplete_fields = ("author",)
     readonly_fields = ("created_at",)
 
 
 class BookSeriesInline(admin.TabularInline):
     model = BookSeries
     extra = 0
+    autocomplete_fields = ("series",)
     readonly_fields = ("created_at",)
 
 
 class BookGenreInline(admin.TabularInline):
     model = BookGenre
     extra = 0
+    autocomplete_fields = ("genre",)
     readonly_fields = ("created_at",)
 
 
@@ -72,6 +157,7 @@ class BookCoverInline(admin.TabularInline):
 class BookPublisherInline(admin.TabularInline):
     model = BookPublisher
     extra = 0
+    autocomplete_fields = ("publisher",)
     readonly_fields = ("created_at",)
 
 
@@ -164,10 +250,13 @@ class ScanFolderAdmin(admin.ModelAdmin):
 
 
 @admin.register(Book)
-class BookAdmin(admin.ModelAdmin):
-    list_display = ("title", "content_type", "file_format", "file_size_mb", "is_placeholder", "is_duplicate", "is_corrupted", "deleted_status", "last_scanned")
+class BookAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ("display_title", "content_type", "file_format", "file_size_mb", "is_placeholder", "is_duplicate", "is_corrupted", "deleted_status", "last_scanned")
     list_filter = ("content_type", "is_placeholder", "is_duplicate", "is_corrupted", "last_scanned", "files__file_format", "deleted_at")
-    search_fields = ("titles__title", "author_relationships__author__name", "files__file_path")
+    # Autocomplete needs search_fields; searches run through get_search_results
+    search_fields = ("titles__title",)
+    # The search index leaves out soft-deleted and placeholder books; lists of those search these fields
+    unindexed_search_fields = ("titles__title", "author_relationships__author__name", "files__file_path")
     readonly_fields = ("first_scanned", "last_scanned", "file_format", "file_size_mb", "file_path_display", "deleted_at")
     actions = ["permanently_delete_books", "restore_deleted_books"]
 
@@ -213,21 +302,66 @@ class BookAdmin(admin.ModelAdmin):
 
     restore_deleted_books.short_description = "♻️ Restore soft-deleted books"
 
+    def get_queryset(self, request):
+        # Title and primary file columns come with the page rows
+        primary_file = BookFile.objects.filter(book=OuterRef("pk"))
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(
+                list_title=_active_title("pk"),
+                primary_file_format=Subquery(primary_file.values("file_format")[:1]),
+                primary_file_size=Subquery(primary_file.values("file_size")[:1]),
+            )
+        )
+
+    def _lists_unindexed_books(self, request):
+        """Whether the changelist filters include soft-deleted or placeholder books."""
+        params = request.GET
+        if params.get("is_placeholder__exact") == "1":
+            return True
+        return any(key.startswith("deleted_at") and not (key == "deleted_at__isnull" and value == "True") for key, value in params.items())
+
+    def get_search_fields(self, request):
+        if self._lists_unindexed_books(request):
+            return self.unindexed_search_fields
+        return super().get_search_fields(request)
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        if self._lists_unindexed_books(request) and not _is_book_reference(term) and not term.isdigit():
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(_book_search(term)), False
+
+    def checkbox_label(self, obj):
+        return self.display_title(obj)
+
+    @admin.display(description="Title", ordering="list_title")
+    def display_title(self, obj):
+        if not hasattr(obj, "list_title"):
+            return obj.title
+        return obj.list_title or f"Untitled Book #{obj.pk}"
+
+    def _primary_file_values(self, obj):
+        if hasattr(obj, "primary_file_format"):
+            return obj.primary_file_format, obj.primary_file_size
+        first_file = obj.files.first()
+        return (first_file.file_format, first_file.file_size) if first_file else (None, None)
+
     def file_format(self, obj):
         """Get file format from first BookFile"""
-        first_file = obj.files.first()
-        return first_file.file_format if first_file else "No files"
+        file_format, _size = self._primary_file_values(obj)
+        return file_format or "No files"
 
     file_format.short_description = "Format"
 
     def file_size_mb(self, obj):
         """Get file size in MB from first BookFile"""
-        first_file = obj.files.first()
-        if first_file and first_file.file_size:
-            if first_file.file_size >= 1024 * 1024:
-                return f"{first_file.file_size / (1024*1024):.2f} MB"
-            else:
-                return f"{first_file.file_size / (1024*1024):.2f} MB"
+        _format, file_size = self._primary_file_values(obj)
+        if file_size:
+            return f"{file_size / (1024*1024):.2f} MB"
         return "Unknown"
 
     file_size_mb.short_description = "File Size"
@@ -253,18 +387,21 @@ class BookAdmin(admin.ModelAdmin):
 
 
 @admin.register(BookTitle)
-class BookTitleAdmin(admin.ModelAdmin):
-    list_display = ("title", "book", "source", "confidence", "created_at")
+class BookTitleAdmin(BookColumnAdminMixin, admin.ModelAdmin):
+    list_display = ("title", "book_display", "source", "confidence", "created_at")
     list_filter = ("source", "confidence", "created_at")
-    search_fields = ("title", "book__id")
+    list_select_related = ("source",)
+    search_fields = ("title",)
     readonly_fields = ("created_at",)
 
 
 @admin.register(BookAuthor)
-class BookAuthorAdmin(admin.ModelAdmin):
-    list_display = ("author_full_name", "author_first_name", "author_last_name", "book", "source", "confidence", "is_main_author", "created_at")
+class BookAuthorAdmin(BookColumnAdminMixin, admin.ModelAdmin):
+    list_display = ("author_full_name", "author_first_name", "author_last_name", "book_display", "source", "confidence", "is_main_author", "created_at")
     list_filter = ("source", "confidence", "is_main_author", "created_at")
-    search_fields = ("author__name", "author__first_name", "author__last_name", "book__files__file_path")
+    list_select_related = ("author", "source")
+    search_fields = ("author__name", "author__first_name", "author__last_name")
+    autocomplete_fields = ("book", "author")
     readonly_fields = ("created_at",)
 
     def author_full_name(self, obj):
@@ -284,10 +421,11 @@ class BookAuthorAdmin(admin.ModelAdmin):
 
 
 @admin.register(BookCover)
-class BookCoverAdmin(admin.ModelAdmin):
-    list_display = ("book", "source", "confidence", "resolution_str", "is_high_resolution", "format", "created_at")
+class BookCoverAdmin(BookColumnAdminMixin, admin.ModelAdmin):
+    list_display = ("book_display", "source", "confidence", "resolution_str", "is_high_resolution", "format", "created_at")
     list_filter = ("source", "confidence", "is_high_resolution", "format", "created_at")
-    search_fields = ("book__files__file_path", "cover_path")
+    list_select_related = ("source",)
+    search_fields = ("cover_path",)
     readonly_fields = ("created_at", "aspect_ratio", "is_high_resolution", "resolution_str", "is_local_file")
 
     fieldsets = (
@@ -303,41 +441,48 @@ class BookCoverAdmin(admin.ModelAdmin):
 
 
 @admin.register(BookSeries)
-class BookSeriesAdmin(admin.ModelAdmin):
-    list_display = ("series", "book", "series_number", "source", "confidence", "created_at")
+class BookSeriesAdmin(BookColumnAdminMixin, admin.ModelAdmin):
+    list_display = ("series", "book_display", "series_number", "source", "confidence", "created_at")
     list_filter = ("source", "confidence", "created_at")
-    search_fields = ("series__name", "book__files__file_path")
+    list_select_related = ("series", "source")
+    search_fields = ("series__name",)
+    autocomplete_fields = ("book", "series")
     readonly_fields = ("created_at",)
 
 
 @admin.register(BookGenre)
-class BookGenreAdmin(admin.ModelAdmin):
-    list_display = ("genre", "book", "source", "confidence", "created_at")
+class BookGenreAdmin(BookColumnAdminMixin, admin.ModelAdmin):
+    list_display = ("genre", "book_display", "source", "confidence", "created_at")
     list_filter = ("source", "confidence", "created_at")
-    search_fields = ("genre__name", "book__files__file_path")
+    list_select_related = ("genre", "source")
+    search_fields = ("genre__name",)
+    autocomplete_fields = ("book", "genre")
     readonly_fields = ("created_at",)
 
 
 @admin.register(BookPublisher)
-class BookPublisherAdmin(admin.ModelAdmin):
-    list_display = ("book", "publisher", "source", "confidence", "created_at")
+class BookPublisherAdmin(BookColumnAdminMixin, admin.ModelAdmin):
+    list_display = ("book_display", "publisher", "source", "confidence", "created_at")
     list_filter = ("source", "confidence", "created_at")
-    search_fields = ("publisher__name", "book__files__file_path")
+    list_select_related = ("publisher", "source")
+    search_fields = ("publisher__name",)
+    autocomplete_fields = ("book", "publisher")
     readonly_fields = ("created_at",)
 
 
 @admin.register(BookMetadata)
-class BookMetadataAdmin(admin.ModelAdmin):
-    list_display = ("field_name", "book", "source", "confidence", "created_at")
+class BookMetadataAdmin(BookColumnAdminMixin, admin.ModelAdmin):
+    list_display = ("field_name", "book_display", "source", "confidence", "created_at")
     list_filter = ("field_name", "source", "confidence", "created_at")
-    search_fields = ("field_name", "field_value", "book__files__file_path")
+    list_select_related = ("source",)
+    search_fields = ("field_name", "field_value")
     readonly_fields = ("created_at",)
 
 
 @admin.register(FinalMetadata)
-class FinalMetadataAdmin(admin.ModelAdmin):
+class FinalMetadataAdmin(BookColumnAdminMixin, admin.ModelAdmin):
     list_display = (
-        "book",
+        "book_display",
         "final_title",
         "final_title_confidence",
         "final_author",
@@ -351,7 +496,7 @@ class FinalMetadataAdmin(admin.ModelAdmin):
         "has_cover",
     )
     list_filter = ("is_reviewed", "has_cover", "overall_confidence", "completeness_score", "language", "publication_year")
-    search_fields = ("final_title", "final_author", "book__files__file_path")
+    search_fields = ("final_title", "final_author")
     readonly_fields = ("overall_confidence", "completeness_score", "last_updated")
 
     fieldsets = (
@@ -368,9 +513,10 @@ class FinalMetadataAdmin(admin.ModelAdmin):
 
 
 @admin.register(ScanLog)
-class ScanLogAdmin(admin.ModelAdmin):
+class ScanLogAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = ("timestamp", "level", "message_preview", "file_path", "scan_folder")
     list_filter = ("level", "timestamp", "scan_folder")
+    list_select_related = ("scan_folder",)
     search_fields = ("message", "file_path")
     readonly_fields = ("timestamp",)
 
@@ -396,10 +542,10 @@ class ScanStatusAdmin(admin.ModelAdmin):
 
 
 @admin.register(BookFile)
-class BookFileAdmin(admin.ModelAdmin):
-    list_display = ("book", "file_path_short", "file_format", "file_size_display", "file_hash_short", "first_scanned")
+class BookFileAdmin(BookColumnAdminMixin, admin.ModelAdmin):
+    list_display = ("book_display", "file_path_short", "file_format", "file_size_display", "file_hash_short", "first_scanned")
     list_filter = ("file_format", "first_scanned")
-    search_fields = ("file_path", "book__titles__title", "file_path_hash")
+    search_fields = ("=file_path_hash",)
     readonly_fields = ("file_path_hash", "first_scanned", "file_size_display")
 
     fieldsets = (
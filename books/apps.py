@@ -17,6 +17,7 @@ class BooksConfig(AppConfig):
 
         from django.conf import settings
 
+        from books import signals  # noqa: F401
         from books.scanner.bootstrap import ensure_data_sources
 
         # Only run bootstrap during production migrations, not tests
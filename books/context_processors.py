@@ -3,33 +3,45 @@ Context processors for the books app.
 """
 
 from django.conf import settings
+from django.utils.functional import SimpleLazyObject
 
 from books.utils.language_manager import LanguageManager
+from books.utils.user_state import get_cached_profile
+
+
+def _safe_profile(request):
+    """Return the cached profile for the request user, or None on error."""
+    try:
+        return get_cached_profile(request)
+    except Exception:
+        return None
+
+
+def _profile_attr(request, name, default):
+    profile = _safe_profile(request)
+    return getattr(profile, name) if profile is not None else default
 
 
 def theme_context(request):
     """Add theme context to all templates"""
 
-    # Default theme
-    theme = getattr(settings, "DEFAULT_BOOTSWATCH_THEME", "flatly")
-
-    # If user is authenticated, get their theme preference
-    if request.user.is_authenticated:
-        try:
-            from books.models import UserProfile
+    def get_theme():
+        # Check for session override (for preview functionality)
+        if "preview_theme" in request.session:
+            return request.session["preview_theme"]
 
-            profile = UserProfile.get_or_create_for_user(request.user)
-            theme = profile.theme
-        except Exception:
-            # Fallback to default theme if profile doesn't exist or error occurs
-            pass
+        # If user is authenticated, get their theme preference
+        if request.user.is_authenticated:
+            profile = _safe_profile(request)
+            if profile is not None:
+                return profile.theme
 
-    # Check for session override (for preview functionality)
-    if "preview_theme" in request.session:
-        theme = request.session["preview_theme"]
+        # Fallback to default theme if profile doesn't exist or error occurs
+        return getattr(settings, "DEFAULT_BOOTSWATCH_THEME", "flatly")
 
     return {
-        "current_theme": theme,
+        # Lazy so templates that never reference the theme skip the profile lookup
+        "current_theme": SimpleLazyObject(get_theme),
         "bootswatch_themes": [
             {"value": "flatly", "name": "Flatly", "description": "Clean and modern"},
             {"value": "cosmo", "name": "Cosmo", "description": "Friendly and accessible"},
@@ -73,17 +85,12 @@ def language_context(request):
 def user_preferences(request):
     """Add user preferences to all templates"""
     if request.user.is_authenticated:
-        try:
-            from books.models import UserProfile
-
-            profile = UserProfile.get_or_create_for_user(request.user)
-            return {
-                "user_profile": profile,
-                "items_per_page": profile.items_per_page,
-                "default_view_mode": profile.default_view_mode,
-            }
-        except Exception:
-            pass
+        # Lazy so templates that never reference these skip the profile lookup
+        return {
+            "user_profile": SimpleLazyObject(lambda: _safe_profile(request)),
+            "items_per_page": SimpleLazyObject(lambda: _profile_attr(request, "items_per_page", 50)),
+            "default_view_mode": SimpleLazyObject(lambda: _profile_attr(request, "default_view_mode", "table")),
+        }
 
     # Return defaults for anonymous users
     return {
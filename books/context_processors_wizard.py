@@ -2,42 +2,60 @@
 Context processors for wizard functionality.
 """
 
-from books.models import Book, ScanFolder, SetupWizard
+from django.utils.functional import SimpleLazyObject
+
+from books.utils.user_state import get_cached_wizard_state, library_has_content
 
 
 def wizard_context(request):
     """Add wizard-related context to all templates."""
+    if not request.user.is_authenticated:
+        return {
+            "should_show_wizard_banner": False,
+            "wizard_required": False,
+        }
+
+    # Evaluated at most once per request, and only if a template reads the wizard keys
+    state = SimpleLazyObject(lambda: _safe_wizard_context(request))
+    return {
+        "should_show_wizard_banner": SimpleLazyObject(lambda: state["should_show_wizard_banner"]),
+        "wizard_required": SimpleLazyObject(lambda: state["wizard_required"]),
+        "wizard_step_url": SimpleLazyObject(lambda: state.get("wizard_step_url", "")),
+    }
+
+
+def _safe_wizard_context(request):
+    try:
+        return _build_wizard_context(request)
+    except Exception:
+        # Never break page rendering over the banner
+        return {"should_show_wizard_banner": False, "wizard_required": False}
+
+
+def _build_wizard_context(request):
     context = {
         "should_show_wizard_banner": False,
         "wizard_required": False,
     }
 
-    if request.user.is_authenticated:
-        # Check if wizard should be shown
-        should_show = _should_show_wizard()
+    # Check if wizard should be shown
+    should_show = _should_show_wizard()
 
-        if should_show:
-            wizard, created = SetupWizard.get_or_create_for_user(request.user)
+    if should_show:
+        wizard = get_cached_wizard_state(request.user)
 
-            # Show banner if wizard is not completed/skipped and we're not already in wizard
-            if not wizard.is_completed and not wizard.is_skipped:
-                is_wizard_url = "wizard" in request.path
-                if not is_wizard_url:
-                    context["should_show_wizard_banner"] = True
-                    context["wizard_required"] = True
-                    context["wizard_step_url"] = f"/wizard/{wizard.current_step}/"
+        # Show banner if wizard is not completed/skipped and we're not already in wizard
+        if not wizard["is_completed"] and not wizard["is_skipped"]:
+            is_wizard_url = "wizard" in request.path
+            if not is_wizard_url:
+                context["should_show_wizard_banner"] = True
+                context["wizard_required"] = True
+                context["wizard_step_url"] = f"/wizard/{wizard['current_step']}/"
 
     return context
 
 
 def _should_show_wizard():
     """Determine if wizard should be shown based on system state."""
-    # Don't show wizard if there are scan folders configured
-    if ScanFolder.objects.exists():
-        return False
-
-    # Don't show wizard if there are books already imported
-    if Book.objects.filter(is_placeholder=False).exists():
-        return False
-
-    return True
+    # Don't show wizard if there are scan folders configured or books already imported
+    return not library_has_content()
@@ -0,0 +1,59 @@
+"""Management command to benchmark full scans and report JSON.
+
+Scans an existing or freshly generated synthetic library into a throwaway
+database with external APIs answered by a local stub, and prints (or writes)
+files/sec, queries per file, peak RSS and per-stage figures as JSON; see
+books.utils.scan_benchmark.
+"""
+
+import json
+import shutil
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+
+from books.utils.scan_benchmark import run_scan_benchmark
+from books.utils.synthetic_library import generate_library
+
+
+class Command(BaseCommand):
+    help = "Time a full library scan end to end and per stage, and report the results as JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--library", help="Library to scan (default: generate a synthetic library in a temporary directory)")
+        parser.add_argument("--ebooks", type=int, default=100, help="Ebooks in the generated library (default: 100)")
+        parser.add_argument("--comics", type=int, default=20, help="Comic issues in the generated library (default: 20)")
+        parser.add_argument("--audiobooks", type=int, default=5, help="Audiobooks in the generated library (default: 5)")
+        parser.add_argument("--seed", type=int, default=0, help="Seed for the generated library (default: 0)")
+        parser.add_argument("--rescan", action="store_true", help="Also time a rescan of the scanned library")
+        parser.add_argument("--no-external", action="store_true", help="Skip the external metadata stage instead of querying the local API stub")
+        parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+
+    def handle(self, *args, **options):
+        library = options["library"]
+        generated = None
+        if not library:
+            generated = library = tempfile.mkdtemp(prefix="scan-benchmark-library-")
+            generate_library(library, ebooks=options["ebooks"], comics=options["comics"], audiobooks=options["audiobooks"], seed=options["seed"])
+
+        try:
+            report = run_scan_benchmark(library, include_rescan=options["rescan"], external=not options["no_external"])
+        except Exception as e:
+            raise CommandError(f"Benchmark failed: {e}")
+        finally:
+            if generated:
+                shutil.rmtree(generated, ignore_errors=True)
+
+        if generated:
+            report["generated"] = {key: options[key] for key in ("ebooks", "comics", "audiobooks", "seed")}
+
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                f.write(output + "\n")
+            initial = report["runs"][0]
+            self.stdout.write(
+                self.style.SUCCESS(f"{initial['files']} files in {initial['seconds']}s ({initial['files_per_second']} files/s); report written to {options['output']}")
+            )
+        else:
+            self.stdout.write(output)
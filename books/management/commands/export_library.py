@@ -0,0 +1,37 @@
+"""Management command to export the library metadata.
+
+Writes the same CSV, JSON Lines or OPF collection as the streaming download,
+a chunk at a time, to a file or standard output.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from books.utils.library_export import DEFAULT_CHUNK_SIZE, EXPORT_FORMATS, stream_library_export, write_library_export
+
+
+class Command(BaseCommand):
+    help = "Export curated library metadata as CSV, JSON Lines or an OPF collection"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="csv", help="Output format (default: csv)")
+        parser.add_argument("--output", "-o", help="Output file (default: standard output)")
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f"Books read from the database per batch (default: {DEFAULT_CHUNK_SIZE})",
+        )
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be at least 1")
+
+        if not options["output"]:
+            for piece in stream_library_export(options["format"], chunk_size=options["chunk_size"]):
+                self.stdout.write(piece.decode("utf-8"), ending="")
+            return
+
+        with open(options["output"], "wb") as output:
+            written = write_library_export(output, options["format"], chunk_size=options["chunk_size"])
+
+        self.stderr.write(self.style.SUCCESS(f"Wrote {written} bytes to {options['output']}"))
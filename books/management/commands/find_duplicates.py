@@ -0,0 +1,72 @@
+"""Management command to report duplicate books across the library.
+
+Exact duplicates are grouped by file content hash; near-duplicates by
+similar title and author (see books.utils.duplicate_index).
+"""
+
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from books.models import BookFile
+from books.utils.duplicate_index import find_duplicate_groups, refresh_content_hash
+
+
+class Command(BaseCommand):
+    help = "Report exact and near-duplicate books"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hash-missing",
+            action="store_true",
+            help="Compute content hashes for files that don't have one yet (e.g. scanned before hashing existed)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of files saved per database update when hashing (default: 500)",
+        )
+        parser.add_argument("--json", action="store_true", help="Print the full report as JSON")
+
+    def handle(self, *args, **options):
+        if options["hash_missing"]:
+            self.hash_missing_files(options["batch_size"])
+
+        started = time.perf_counter()
+        report = find_duplicate_groups()
+        elapsed = time.perf_counter() - started
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(f"Exact duplicate groups: {len(report['exact'])}")
+        for group in report["exact"]:
+            self.stdout.write(f"  {group['content_hash'][:12]}: books {', '.join(map(str, group['book_ids']))}")
+
+        self.stdout.write(f"Near-duplicate groups: {len(report['similar'])}")
+        for group in report["similar"]:
+            self.stdout.write(f"  {group['similarity']:.0%}: books {', '.join(map(str, group['book_ids']))}")
+
+        self.stdout.write(self.style.SUCCESS(f"Duplicate report built in {elapsed:.2f}s"))
+
+    def hash_missing_files(self, batch_size):
+        """Hash files without a content hash, saving them in batches."""
+        files = BookFile.objects.filter(content_hash="").only("id", "file_path", "file_size", "content_hash", "content_hash_mtime")
+        pending, hashed = [], 0
+
+        for book_file in files.iterator(chunk_size=batch_size):
+            if refresh_content_hash(book_file):
+                pending.append(book_file)
+            if len(pending) >= batch_size:
+                BookFile.objects.bulk_update(pending, ["content_hash", "content_hash_mtime", "file_size"])
+                hashed += len(pending)
+                pending = []
+
+        if pending:
+            BookFile.objects.bulk_update(pending, ["content_hash", "content_hash_mtime", "file_size"])
+            hashed += len(pending)
+
+        self.stdout.write(f"Hashed {hashed} file(s)")
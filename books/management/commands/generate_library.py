@@ -0,0 +1,43 @@
+"""Management command to write a synthetic library for scan benchmarks.
+
+See books.utils.synthetic_library for the generated layout and formats.
+"""
+
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from books.utils.synthetic_library import generate_library
+
+
+class Command(BaseCommand):
+    help = "Generate a reproducible synthetic library (EPUB, PDF, MOBI, CBZ and MP3) for benchmarking scans"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Directory to write the library into; must be empty or missing")
+        parser.add_argument("--ebooks", type=int, default=100, help="Number of EPUB/PDF/MOBI books (default: 100)")
+        parser.add_argument("--comics", type=int, default=20, help="Number of CBZ comic issues (default: 20)")
+        parser.add_argument("--audiobooks", type=int, default=5, help="Number of MP3 audiobooks (default: 5)")
+        parser.add_argument("--tracks", type=int, default=3, help="MP3 tracks per audiobook (default: 3)")
+        parser.add_argument("--series-ratio", type=float, default=0.3, help="Share of ebooks placed in series folders (default: 0.3)")
+        parser.add_argument("--sidecar-ratio", type=float, default=0.3, help="Share of ebooks with cover.jpg and metadata.opf sidecars (default: 0.3)")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed; the same seed generates the same library (default: 0)")
+
+    def handle(self, *args, **options):
+        path = os.path.abspath(options["path"])
+        if os.path.exists(path) and (not os.path.isdir(path) or os.listdir(path)):
+            raise CommandError(f"{path} exists and is not an empty directory")
+
+        summary = generate_library(
+            path,
+            ebooks=options["ebooks"],
+            comics=options["comics"],
+            audiobooks=options["audiobooks"],
+            tracks_per_audiobook=options["tracks"],
+            series_ratio=options["series_ratio"],
+            sidecar_ratio=options["sidecar_ratio"],
+            seed=options["seed"],
+        )
+
+        counts = ", ".join(f"{summary[key]} {key}" for key in ("epub", "pdf", "mobi", "cbz", "mp3", "covers", "opf"))
+        self.stdout.write(self.style.SUCCESS(f"Generated {counts} ({summary['bytes'] / (1024 * 1024):.1f} MB) in {path}"))
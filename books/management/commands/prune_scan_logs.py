@@ -0,0 +1,56 @@
+"""Management command to delete old scan log entries.
+
+Entries older than SCAN_LOG_RETENTION_DAYS are removed, and each scan folder
+keeps at most SCAN_LOG_MAX_PER_FOLDER of its newest entries. Expired external
+API responses are deleted in the same run. Deletion runs in small primary-key
+chunks so a running scan isn't blocked on the database.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from books.scanner.api_cache import prune_expired_responses
+from books.scanner.logging_helpers import prune_scan_logs
+
+
+class Command(BaseCommand):
+    help = "Delete scan log entries past the retention age or per-folder limit, and expired API responses"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=getattr(settings, "SCAN_LOG_RETENTION_DAYS", 30),
+            help="Delete entries older than this many days (default: SCAN_LOG_RETENTION_DAYS)",
+        )
+        parser.add_argument(
+            "--keep-per-folder",
+            type=int,
+            default=getattr(settings, "SCAN_LOG_MAX_PER_FOLDER", 10000),
+            help="Newest entries kept per scan folder (default: SCAN_LOG_MAX_PER_FOLDER)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of rows deleted per statement (default: 1000)",
+        )
+        parser.add_argument("--keep-api-cache", action="store_true", help="Do not delete expired external API responses")
+        parser.add_argument("--dry-run", action="store_true", help="Report how many entries would be deleted without deleting them")
+
+    def handle(self, *args, **options):
+        result = prune_scan_logs(
+            older_than_days=options["days"],
+            keep_per_folder=options["keep_per_folder"],
+            chunk_size=options["chunk_size"],
+            dry_run=options["dry_run"],
+        )
+
+        verb = "Would delete" if options["dry_run"] else "Deleted"
+        self.stdout.write(
+            self.style.SUCCESS(f"{verb} {result['by_age']} entries older than {options['days']} days and {result['by_count']} over the per-folder limit")
+        )
+
+        if not options["keep_api_cache"]:
+            expired = prune_expired_responses(chunk_size=options["chunk_size"], dry_run=options["dry_run"])
+            self.stdout.write(self.style.SUCCESS(f"{verb} {expired} expired external API responses"))
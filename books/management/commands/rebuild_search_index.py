@@ -0,0 +1,21 @@
+"""Management command to rebuild the quick search word index.
+
+Signals keep SearchToken current as titles and names change; run this after
+bulk database changes (imports, raw SQL updates) that bypass them.
+"""
+
+from django.core.management.base import BaseCommand
+
+from books.utils.quick_search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the quick search index from book titles and author, series and genre names"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Tokens written per insert (default: 1000)")
+
+    def handle(self, *args, **options):
+        written = rebuild_search_index(batch_size=options["batch_size"])
+
+        self.stdout.write(self.style.SUCCESS(f"Indexed {written} search tokens"))
@@ -0,0 +1,34 @@
+"""Management command to recount scan folder progress counters.
+
+The scanner, the watcher and book signals keep ScanFolder.file_count and
+book_count current; run this from a scheduler to correct anything they
+missed (files added while nothing was watching, bulk database changes).
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from books.models import ScanFolder
+from books.utils.folder_counts import reconcile_folder_counts
+
+
+class Command(BaseCommand):
+    help = "Recount files on disk and books for scan folders"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--folder", type=int, action="append", dest="folder_ids", help="Scan folder id to recount (repeatable; default: all active folders)")
+        parser.add_argument(
+            "--stale-only",
+            action="store_true",
+            help="Only recount folders whose counts are missing or older than FOLDER_COUNTS_MAX_AGE",
+        )
+
+    def handle(self, *args, **options):
+        folders = ScanFolder.objects.filter(is_active=True)
+        if options["folder_ids"]:
+            folders = ScanFolder.objects.filter(pk__in=options["folder_ids"])
+
+        max_age = getattr(settings, "FOLDER_COUNTS_MAX_AGE", 24 * 3600) if options["stale_only"] else None
+        reconciled = reconcile_folder_counts(folders, max_age=max_age)
+
+        self.stdout.write(self.style.SUCCESS(f"Recounted {reconciled} scan folder(s)"))
@@ -5,11 +5,13 @@ to find ISBN numbers that might not be in the metadata.
 """
 
 import logging
+import os
 
 from django.core.management.base import BaseCommand, CommandError
 
 from books.models import Book, BookMetadata
 from books.scanner.extractors.content_isbn import (
+    DEFAULT_TIME_BUDGET,
     bulk_scan_content_isbns,
     save_content_isbns,
 )
@@ -49,6 +51,18 @@ class Command(BaseCommand):
             choices=["epub", "pdf", "mobi"],
             help="Only scan specific file types",
         )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=min(4, os.cpu_count() or 1),
+            help="Number of files scanned in parallel worker processes (default: up to 4)",
+        )
+        parser.add_argument(
+            "--time-budget",
+            type=float,
+            default=DEFAULT_TIME_BUDGET,
+            help=f"Seconds to spend on one file before skipping its remaining pages (default: {DEFAULT_TIME_BUDGET})",
+        )
 
     def handle(self, *args, **options):
         # Set up logging
@@ -113,7 +127,12 @@ class Command(BaseCommand):
 
         else:
             # Bulk scan
-            stats = bulk_scan_content_isbns(books_queryset=queryset, page_limit=options["pages"])
+            stats = bulk_scan_content_isbns(
+                books_queryset=queryset,
+                page_limit=options["pages"],
+                workers=options["workers"],
+                time_budget=options["time_budget"],
+            )
 
             # Report results
             self.stdout.write(
@@ -14,7 +14,7 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument(
             "--action",
-            choices=["train", "retrain", "status", "test"],
+            choices=["train", "retrain", "incremental", "rollback", "status", "test"],
             default="train",
             help="Action to perform (default: train)",
         )
@@ -38,6 +38,12 @@ class Command(BaseCommand):
             help="Include user feedback data in training",
         )
 
+        parser.add_argument(
+            "--model-version",
+            type=str,
+            help="Model version to restore (use with --action rollback; default: most recent)",
+        )
+
         parser.add_argument(
             "--min-feedback",
             type=int,
@@ -56,6 +62,10 @@ class Command(BaseCommand):
             )
         elif action == "retrain":
             self.retrain_models(options.get("use_feedback", False), options.get("min_feedback", 5))
+        elif action == "incremental":
+            self.incremental_update(options.get("min_feedback", 5))
+        elif action == "rollback":
+            self.rollback_models(options.get("model_version"))
         elif action == "status":
             self.show_status()
         elif action == "test":
@@ -149,6 +159,56 @@ class Command(BaseCommand):
         except Exception as e:
             self.stdout.write(self.style.ERROR(f"❌ Retraining error: {e}"))
 
+    def incremental_update(self, min_feedback=5):
+        """Fold pending user feedback into the existing models without a full retrain."""
+        self.stdout.write("⚡ Updating models incrementally from user feedback...")
+
+        try:
+            from books.models import AIFeedback
+
+            pending_feedback = AIFeedback.objects.filter(needs_retraining=True).count()
+            if pending_feedback < min_feedback:
+                self.stdout.write(self.style.WARNING(f"⚠️  Insufficient feedback data: {pending_feedback} entries " f"(minimum {min_feedback} required)"))
+                return
+
+            recognizer = FilenamePatternRecognizer()
+            feedback_ids = []
+
+            def feedback_records():
+                for record in recognizer.iter_feedback_records():
+                    feedback_ids.append(record["feedback_id"])
+                    yield record
+
+            results = recognizer.train_incremental(feedback_records())
+            if not results:
+                self.stdout.write(self.style.WARNING("⚠️  No usable corrections found in the pending feedback"))
+                return
+
+            AIFeedback.objects.filter(id__in=feedback_ids).update(needs_retraining=False, processed_for_training=True)
+
+            if results["mode"] == "bootstrap":
+                self.stdout.write("🧱 Built incremental models from reviewed books and feedback")
+            self.stdout.write(self.style.SUCCESS(f"✅ Folded {results['samples']} samples into the models"))
+            if results.get("previous_version"):
+                self.stdout.write(f"↩️  Previous models saved as version {results['previous_version']} " "(undo with --action rollback)")
+
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"❌ Incremental update error: {e}"))
+
+    def rollback_models(self, version=None):
+        """Restore a previously saved model version."""
+        try:
+            recognizer = FilenamePatternRecognizer()
+            restored = recognizer.rollback_models(version)
+
+            if restored:
+                self.stdout.write(self.style.SUCCESS(f"✅ Restored models from version {restored}"))
+            else:
+                self.stdout.write(self.style.WARNING(f"⚠️  No saved model version {version or 'available'} to roll back to"))
+
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f"❌ Rollback error: {e}"))
+
     def show_status(self):
         """Show current AI system status."""
         self.stdout.write("📊 AI Filename Recognition System Status\n")
@@ -181,6 +241,12 @@ class Command(BaseCommand):
             else:
                 self.stdout.write("❌ No trained models found")
 
+            versions = recognizer.list_model_versions()
+            if versions:
+                self.stdout.write("\n🗂️  Saved model versions (newest first):")
+                for version in versions:
+                    self.stdout.write(f"  • {version['version']} ({version['mode']}, {version['training_samples'] or 'unknown'} samples)")
+
             # Check training data availability
             reviewed_books = Book.objects.filter(finalmetadata__is_reviewed=True).count()
             self.stdout.write(f"\n📚 Available training data: {reviewed_books} reviewed books")
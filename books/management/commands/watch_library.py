@@ -0,0 +1,65 @@
+"""Management command that keeps the library in sync with the filesystem.
+
+Watches every active scan folder (inotify on Linux, directory mtime polling
+elsewhere) and feeds created, modified, moved and deleted files into the
+scanner as they change; see books.scanner.watcher.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from books.scanner.watcher import LibraryWatcher
+
+
+class Command(BaseCommand):
+    help = "Watch active scan folders and ingest changed files incrementally"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--debounce",
+            type=float,
+            default=2.0,
+            help="Seconds without new events before a burst of changes is applied (default: 2)",
+        )
+        parser.add_argument(
+            "--max-delay",
+            type=float,
+            default=30.0,
+            help="Apply pending changes after this many seconds even while events keep arriving (default: 30)",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=30.0,
+            help="Seconds between directory checks when polling (default: 30)",
+        )
+        parser.add_argument(
+            "--folder-refresh",
+            type=float,
+            default=300.0,
+            help="Seconds between checks for added or removed scan folders (default: 300)",
+        )
+        backend = parser.add_mutually_exclusive_group()
+        backend.add_argument("--polling", action="store_true", help="Poll directory modification times instead of using inotify")
+        backend.add_argument("--inotify", action="store_true", help="Require inotify; fail instead of falling back to polling")
+
+    def handle(self, *args, **options):
+        use_inotify = True if options["inotify"] else False if options["polling"] else None
+        watcher = LibraryWatcher(
+            debounce=options["debounce"],
+            max_delay=options["max_delay"],
+            poll_interval=options["poll_interval"],
+            folder_refresh=options["folder_refresh"],
+            use_inotify=use_inotify,
+        )
+
+        def report(stats):
+            if options["verbosity"] >= 1:
+                self.stdout.write(", ".join(f"{count} {name}" for name, count in stats.items()))
+
+        self.stdout.write("Watching active scan folders (Ctrl+C to stop)...")
+        try:
+            watcher.run(on_apply=report)
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.SUCCESS("Stopped watching"))
+        except OSError as e:
+            raise CommandError(f"Could not watch scan folders: {e}")
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="bookfile",
+            name="content_hash",
+            field=models.CharField(blank=True, db_index=True, default="", help_text="SHA-256 of the file contents", max_length=64),
+        ),
+        migrations.AddField(
+            model_name="bookfile",
+            name="content_hash_mtime",
+            field=models.FloatField(blank=True, help_text="File modification time when content_hash was computed", null=True),
+        ),
+    ]
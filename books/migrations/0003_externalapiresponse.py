@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-18 12:00
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0002_bookfile_content_hash"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExternalAPIResponse",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("provider", models.CharField(help_text="API client name, e.g. google_books", max_length=50)),
+                ("lookup_key", models.CharField(help_text="Normalized ISBN, title/author or request key", max_length=255)),
+                ("response", models.JSONField(blank=True, null=True)),
+                ("is_negative", models.BooleanField(default=False, help_text="The lookup found nothing")),
+                ("fetched_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("expires_at", models.DateTimeField()),
+            ],
+            options={
+                "indexes": [models.Index(fields=["expires_at"], name="books_exter_expires_9b0593_idx")],
+                "unique_together": {("provider", "lookup_key")},
+            },
+        ),
+    ]
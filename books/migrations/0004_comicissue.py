@@ -0,0 +1,110 @@
+# Generated by Django 5.2.6 on 2026-10-18 22:32
+
+import re
+from decimal import Decimal, InvalidOperation
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen copy of books.utils.comic_index as of this migration, so later changes
+# to the live module don't alter the historical backfill
+INDEXED_FIELDS = ("series", "issue_number", "issue_type", "volume_number", "volume", "publisher")
+NON_WORD_RE = re.compile(r"[\W_]+")
+NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def normalize_series_key(name):
+    key = " ".join(NON_WORD_RE.split((name or "").lower())).strip()
+    if key.startswith("the "):
+        key = key[4:]
+    return key[:200]
+
+
+def parse_issue_number(value):
+    if value is None:
+        return None
+    match = NUMBER_RE.search(str(value))
+    if not match:
+        return None
+    try:
+        number = Decimal(match.group())
+    except InvalidOperation:
+        return None
+    if abs(number) >= Decimal("100000000"):
+        return None
+    return number.quantize(Decimal("0.01"))
+
+
+def build_issue(book_id, metadata, final, ComicIssue):
+    series_name = (final.get("final_series") or metadata.get("series") or "").strip()
+    series_key = normalize_series_key(series_name)
+    if not series_key:
+        return None
+
+    issue_number = parse_issue_number(metadata.get("issue_number") or final.get("final_series_number"))
+    volume = parse_issue_number(metadata.get("volume_number") or metadata.get("volume"))
+    return ComicIssue(
+        book_id=book_id,
+        series_key=series_key,
+        series_name=series_name[:200],
+        publisher=(final.get("final_publisher") or metadata.get("publisher") or "").strip()[:200],
+        issue_type=(metadata.get("issue_type") or "main_series")[:30],
+        issue_number=issue_number,
+        whole_number=int(issue_number) if issue_number is not None and issue_number == int(issue_number) else None,
+        volume=int(volume) if volume is not None and volume == int(volume) else None,
+    )
+
+
+def build_comic_index(apps, schema_editor):
+    Book = apps.get_model("books", "Book")
+    BookMetadata = apps.get_model("books", "BookMetadata")
+    ComicIssue = apps.get_model("books", "ComicIssue")
+    FinalMetadata = apps.get_model("books", "FinalMetadata")
+
+    book_ids = list(Book.objects.filter(content_type="comic").order_by("id").values_list("id", flat=True))
+    for start in range(0, len(book_ids), 1000):
+        batch = book_ids[start : start + 1000]
+
+        metadata = {}
+        rows = (
+            BookMetadata.objects.filter(book_id__in=batch, field_name__in=INDEXED_FIELDS, is_active=True)
+            .order_by("book_id", "field_name", "-confidence")
+            .values_list("book_id", "field_name", "field_value")
+        )
+        for book_id, field_name, field_value in rows:
+            metadata.setdefault(book_id, {}).setdefault(field_name, field_value)
+        finals = {
+            row["book_id"]: row
+            for row in FinalMetadata.objects.filter(book_id__in=batch).values("book_id", "final_series", "final_series_number", "final_publisher")
+        }
+
+        issues = [issue for book_id in batch if (issue := build_issue(book_id, metadata.get(book_id, {}), finals.get(book_id, {}), ComicIssue)) is not None]
+        ComicIssue.objects.bulk_create(issues)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0003_externalapiresponse"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ComicIssue",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("series_key", models.CharField(help_text="Normalized series name used for grouping", max_length=200)),
+                ("series_name", models.CharField(max_length=200)),
+                ("publisher", models.CharField(blank=True, default="", max_length=200)),
+                ("issue_type", models.CharField(default="main_series", max_length=30)),
+                ("issue_number", models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ("whole_number", models.IntegerField(blank=True, help_text="Issue number when it is a whole number; used for gap analysis", null=True)),
+                ("volume", models.IntegerField(blank=True, null=True)),
+                ("book", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name="comic_issue", to="books.book")),
+            ],
+            options={
+                "indexes": [models.Index(fields=["series_key", "issue_type", "whole_number"], name="books_comic_series__8a1dcb_idx")],
+            },
+        ),
+        migrations.RunPython(build_comic_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.6 on 2026-10-18 23:10
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_books(apps, schema_editor):
+    ScanFolder = apps.get_model("books", "ScanFolder")
+    Book = apps.get_model("books", "Book")
+
+    # File counts need a walk of each folder and are left to the background reconciliation
+    books = Book.objects.filter(scan_folder=OuterRef("pk")).order_by().values("scan_folder").annotate(count=Count("pk")).values("count")
+    ScanFolder.objects.update(book_count=Coalesce(Subquery(books), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0004_comicissue"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="scanfolder",
+            name="book_count",
+            field=models.PositiveIntegerField(default=0, help_text="Books scanned from this folder"),
+        ),
+        migrations.AddField(
+            model_name="scanfolder",
+            name="counts_updated_at",
+            field=models.DateTimeField(blank=True, help_text="When file_count was last counted on disk", null=True),
+        ),
+        migrations.AddField(
+            model_name="scanfolder",
+            name="file_count",
+            field=models.PositiveIntegerField(blank=True, help_text="Matching files on disk; empty until first counted", null=True),
+        ),
+        migrations.RunPython(count_books, migrations.RunPython.noop),
+    ]
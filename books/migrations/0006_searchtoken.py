@@ -0,0 +1,64 @@
+# Generated by Django 5.2.6 on 2026-10-19 00:32
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+# Frozen copy of books.utils.quick_search.tokenize so later changes to it cannot alter this migration
+NON_WORD_RE = re.compile(r"[\W_]+")
+
+
+def tokenize(value):
+    decomposed = unicodedata.normalize("NFKD", (value or "").lower())
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return list(dict.fromkeys(word[:50] for word in NON_WORD_RE.split(stripped) if word))
+
+
+def build_search_index(apps, schema_editor):
+    SearchToken = apps.get_model("books", "SearchToken")
+    FinalMetadata = apps.get_model("books", "FinalMetadata")
+    Author = apps.get_model("books", "Author")
+    Series = apps.get_model("books", "Series")
+    Genre = apps.get_model("books", "Genre")
+
+    sources = [
+        ("book", FinalMetadata.objects.filter(book__deleted_at__isnull=True, book__is_placeholder=False).values_list("book_id", "final_title")),
+        ("author", Author.objects.values_list("id", "name")),
+        ("series", Series.objects.values_list("id", "name")),
+        ("genre", Genre.objects.values_list("id", "name")),
+    ]
+    for kind, rows in sources:
+        batch = []
+        for object_id, label in rows.iterator(chunk_size=1000):
+            batch.extend(SearchToken(kind=kind, object_id=object_id, token=token) for token in tokenize(label))
+            if len(batch) >= 1000:
+                SearchToken.objects.bulk_create(batch)
+                batch = []
+        SearchToken.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("books", "0005_scanfolder_counts"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchToken",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("kind", models.CharField(choices=[("book", "Book"), ("author", "Author"), ("series", "Series"), ("genre", "Genre")], max_length=10)),
+                ("object_id", models.PositiveIntegerField(help_text="Book id for titles, otherwise the Author/Series/Genre id")),
+                ("token", models.CharField(help_text="Lowercased, accent-free word; matched by prefix range", max_length=50)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["kind", "token"], name="books_searc_kind_69ebd5_idx"),
+                    models.Index(fields=["kind", "object_id", "token"], name="books_searc_kind_c1d58d_idx"),
+                ],
+            },
+        ),
+        migrations.RunPython(build_search_index, migrations.RunPython.noop),
+    ]
@@ -12,6 +12,8 @@ from pathlib import Path
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models, transaction
+from django.db.models.functions import Greatest
+from django.dispatch import Signal
 from django.utils import timezone
 
 from books.utils.language import normalize_language
@@ -164,6 +166,11 @@ class DataSource(models.Model):
         ordering = ["-trust_level", "name"]
 
 
+# Sent with ``folder_id`` after commit when a folder's counters were updated in the database
+# (queryset updates send no model signals); books.signals publishes the folder's progress
+folder_counts_changed = Signal()
+
+
 class ScanFolder(HashFieldMixin, models.Model):
     CONTENT_TYPE_CHOICES = [
         ("ebooks", "Ebooks"),
@@ -191,6 +198,14 @@ class ScanFolder(HashFieldMixin, models.Model):
     last_scanned = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Progress counters kept current by the scanner, the watcher and book signals,
+    # and reconciled in the background (see books.utils.folder_counts)
+    file_count = models.PositiveIntegerField(null=True, blank=True, help_text="Matching files on disk; empty until first counted")
+    book_count = models.PositiveIntegerField(default=0, help_text="Books scanned from this folder")
+    counts_updated_at = models.DateTimeField(null=True, blank=True, help_text="When file_count was last counted on disk")
+
+    COUNTER_FIELDS = ("file_count", "book_count", "counts_updated_at")
+
     def clean(self):
         """Validate path exists and is accessible"""
         if self.path:
@@ -217,6 +232,10 @@ class ScanFolder(HashFieldMixin, models.Model):
         if self.path:
             self.path_hash = self.generate_hash(self.path)
 
+        if not self._state.adding and kwargs.get("update_fields") is None and not kwargs.get("force_insert") and not args:
+            # Counters are written with queryset updates; don't overwrite them from a stale instance
+            kwargs["update_fields"] = [field.name for field in self._meta.concrete_fields if not field.primary_key and field.name not in self.COUNTER_FIELDS]
+
         if not skip_validation:
             self.full_clean()
         super().save(*args, **kwargs)
@@ -224,7 +243,7 @@ class ScanFolder(HashFieldMixin, models.Model):
     def __str__(self):
         return f"{self.name} ({self.get_content_type_display()})"
 
-    def count_files_on_disk(self):
+    def count_files_on_disk(self, use_cache=True):
         """Count ebook files recursively using os.walk (faster than glob)"""
         from django.core.cache import cache
 
@@ -238,7 +257,7 @@ class ScanFolder(HashFieldMixin, models.Model):
             last_modified = timezone.now().timestamp()
 
         cache_key = f"folder_file_count_{self.id}_{self.content_type}_{int(last_modified)}"
-        cached_count = cache.get(cache_key)
+        cached_count = cache.get(cache_key) if use_cache else None
         if cached_count is not None:
             return cached_count
 
@@ -259,6 +278,41 @@ class ScanFolder(HashFieldMixin, models.Model):
         cache.set(cache_key, file_count, 300)
         return file_count
 
+    def refresh_counts(self, file_count=None):
+        """
+        Recount books and store the progress counters.
+
+        Args:
+            file_count: Files already counted by the caller (e.g. the scanner's
+                file collection); walks the folder when None
+        """
+        if file_count is None:
+            file_count = self.count_files_on_disk(use_cache=False)
+
+        self.file_count = file_count
+        self.book_count = Book.objects.filter(scan_folder=self).count()
+        self.counts_updated_at = timezone.now()
+        # Queryset update: no validation walk, no change signals for a counter write
+        ScanFolder.objects.filter(pk=self.pk).update(file_count=self.file_count, book_count=self.book_count, counts_updated_at=self.counts_updated_at)
+        transaction.on_commit(lambda: folder_counts_changed.send(sender=ScanFolder, folder_id=self.pk))
+
+    @classmethod
+    def adjust_counts(cls, folder_id, files=0, books=0):
+        """Apply file and book deltas to a folder's counters in the database."""
+        updates = {}
+        if files:
+            updates["file_count"] = Greatest(models.F("file_count") + files, 0)
+        if books:
+            updates["book_count"] = Greatest(models.F("book_count") + books, 0)
+        if updates:
+            cls.objects.filter(pk=folder_id).update(**updates)
+            # Sent once the new counts are visible to other connections' queries
+            transaction.on_commit(lambda: folder_counts_changed.send(sender=cls, folder_id=folder_id))
+
+    def counts_are_stale(self, max_age):
+        """True if the file count is missing or older than ``max_age`` seconds."""
+        return self.counts_updated_at is None or (timezone.now() - self.counts_updated_at).total_seconds() > max_age
+
     def get_extensions(self):
         """Get file extensions for this scan folder based on content type"""
         if self.content_type == "comics":
@@ -271,9 +325,13 @@ class ScanFolder(HashFieldMixin, models.Model):
             return [".epub", ".pdf", ".mobi", ".azw", ".azw3", ".fb2"]
 
     def get_scan_progress_info(self):
-        """Get information about scan progress"""
-        scanned_count = self.book_set.count()
-        total_files = self.count_files_on_disk()
+        """Get information about scan progress from the stored counters (no queries, no disk access)"""
+        scanned_count = self.book_count
+        total_files = self.file_count
+
+        if total_files is None:
+            # Not counted yet; the background reconciliation fills it in
+            return {"scanned": scanned_count, "total_files": None, "percentage": None, "needs_scan": None, "counting": True}
 
         if total_files == 0:
             percentage = 100 if scanned_count == 0 else 0
@@ -527,6 +585,10 @@ class BookFile(HashFieldMixin, models.Model):
     file_format = models.CharField(max_length=20)
     file_size = models.BigIntegerField(null=True, blank=True)
 
+    # Content fingerprint for duplicate detection (see books.utils.duplicate_index)
+    content_hash = models.CharField(max_length=64, blank=True, default="", db_index=True, help_text="SHA-256 of the file contents")
+    content_hash_mtime = models.FloatField(null=True, blank=True, help_text="File modification time when content_hash was computed")
+
     # Audiobook file properties
     duration_seconds = models.IntegerField(null=True, blank=True)
     chapter_number = models.IntegerField(null=True, blank=True)
@@ -2322,7 +2384,12 @@ class ScanSession(HashFieldMixin, models.Model):
 
     def remove_book_from_resume_queue(self, book_id):
         """Remove a book from the resumption queue"""
-        self.resume_queue = [item for item in self.resume_queue if item["book_id"] != book_id]
+        self.remove_books_from_resume_queue([book_id])
+
+    def remove_books_from_resume_queue(self, book_ids):
+        """Remove several books from the resumption queue with a single save"""
+        book_ids = set(book_ids)
+        self.resume_queue = [item for item in self.resume_queue if item["book_id"] not in book_ids]
         self.can_resume = len(self.resume_queue) > 0
         self.save(update_fields=["resume_queue", "can_resume"])
 
@@ -2462,3 +2529,69 @@ class BookAPICompleteness(models.Model):
             self.missing_sources.append(source_name)
             self.needs_external_scan = True
             self.save(update_fields=["missing_sources", "needs_external_scan"])
+
+
+class ExternalAPIResponse(models.Model):
+    """Persistent cache of external metadata API responses, shared by every book with the same lookup"""
+
+    provider = models.CharField(max_length=50, help_text="API client name, e.g. google_books")
+    lookup_key = models.CharField(max_length=255, help_text="Normalized ISBN, title/author or request key")
+    response = models.JSONField(null=True, blank=True)
+    is_negative = models.BooleanField(default=False, help_text="The lookup found nothing")
+
+    fetched_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ["provider", "lookup_key"]
+        indexes = [
+            models.Index(fields=["expires_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.provider} {self.lookup_key}{' (not found)' if self.is_negative else ''}"
+
+
+class ComicIssue(models.Model):
+    """Series/issue index for comic books, maintained at scan time so series analysis can aggregate in SQL"""
+
+    book = models.OneToOneField(Book, on_delete=models.CASCADE, related_name="comic_issue")
+    series_key = models.CharField(max_length=200, help_text="Normalized series name used for grouping")
+    series_name = models.CharField(max_length=200)
+    publisher = models.CharField(max_length=200, blank=True, default="")
+    issue_type = models.CharField(max_length=30, default="main_series")
+    issue_number = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    whole_number = models.IntegerField(null=True, blank=True, help_text="Issue number when it is a whole number; used for gap analysis")
+    volume = models.IntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["series_key", "issue_type", "whole_number"]),
+        ]
+
+    def __str__(self):
+        number = f" #{self.issue_number.normalize():f}" if self.issue_number is not None else ""
+        return f"{self.series_name}{number} ({self.issue_type})"
+
+
+class SearchToken(models.Model):
+    """Word index for the quick search box: one row per normalized word of each searchable name"""
+
+    BOOK = "book"
+    AUTHOR = "author"
+    SERIES = "series"
+    GENRE = "genre"
+    KIND_CHOICES = [(BOOK, "Book"), (AUTHOR, "Author"), (SERIES, "Series"), (GENRE, "Genre")]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.PositiveIntegerField(help_text="Book id for titles, otherwise the Author/Series/Genre id")
+    token = models.CharField(max_length=50, help_text="Lowercased, accent-free word; matched by prefix range")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["kind", "token"]),
+            models.Index(fields=["kind", "object_id", "token"]),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}:{self.object_id} {self.token}"
@@ -1,8 +1,25 @@
-"""AI-powered filename pattern recognition module."""
+"""AI-powered filename pattern recognition module.
 
-from .filename_recognizer import FilenamePatternRecognizer, initialize_ai_system
+The recognizer depends on scikit-learn, scipy and pandas, so it is imported on
+first attribute access instead of with the package. Scanning code should go
+through ``get_ai_recognizer`` / ``get_model_loader``, which load the models in
+the background.
+"""
+
+from .loader import get_ai_recognizer, get_model_loader, models_available
 
 # Flag indicating if AI module is available
 ai_module_available = True
 
-__all__ = ["FilenamePatternRecognizer", "initialize_ai_system", "ai_module_available"]
+_LAZY_EXPORTS = {"FilenamePatternRecognizer", "initialize_ai_system"}
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        from . import filename_recognizer
+
+        return getattr(filename_recognizer, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["FilenamePatternRecognizer", "initialize_ai_system", "ai_module_available", "get_ai_recognizer", "get_model_loader", "models_available"]
@@ -2,30 +2,91 @@
 
 import json
 import logging
-import pickle
+import os
 import re
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
 from datetime import datetime
+from itertools import chain, islice
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
+import joblib
+import numpy as np
 import pandas as pd
-from django.conf import settings
+from django.db.models import OuterRef, Subquery
+from scipy.sparse import csr_matrix, hstack
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics import accuracy_score
 from sklearn.model_selection import train_test_split
 from sklearn.pipeline import Pipeline
 
-from books.models import Book
+from books.models import BookFile, FinalMetadata
+from books.scanner.ai.incremental import IncrementalFieldClassifier, build_hashing_vectorizer
+from books.scanner.ai.loader import MODEL_FILENAMES, existing_model_path, get_model_dir
 
 logger = logging.getLogger("books.scanner")
 
+PREDICTION_FIELDS = ["title", "author", "series", "volume"]
+
+# Number of earlier model sets kept under models/versions for rollback
+MODEL_VERSIONS_TO_KEEP = 5
+
+# Order of the engineered feature columns; must match _extract_features
+ENGINEERED_FEATURES = [
+    "filename_length",
+    "word_count",
+    "has_numbers",
+    "has_year",
+    "has_volume_indicator",
+    "has_series_indicator",
+    "dash_count",
+    "colon_count",
+    "comma_count",
+    "first_word_length",
+    "last_word_length",
+    "first_word_capitalized",
+]
+
+NOISE_WORDS = [
+    "ebook",
+    "epub",
+    "pdf",
+    "mobi",
+    "azw3",
+    "azw",
+    "djvu",
+    "retail",
+    "published",
+    "release",
+    "edition",
+    "repack",
+    "scan",
+    "ocr",
+    "fixed",
+    "converted",
+    "calibre",
+]
+
+_BRACKETS_RE = re.compile(r"\[.*?\]")
+_PARENS_RE = re.compile(r"\(.*?\)")
+_SEPARATORS_RE = re.compile(r"[_\.]")
+_NOISE_RE = re.compile(r"\b(?:" + "|".join(re.escape(word) for word in NOISE_WORDS) + r")\b", re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r"\s+")
+_DIGIT_RE = re.compile(r"\d")
+_YEAR_RE = re.compile(r"\b(19|20)\d{2}\b")
+_VOLUME_RE = re.compile(r"\b(vol|volume|book|#)\s*\d+\b", re.IGNORECASE)
+_SERIES_RE = re.compile(r"\b(series|saga|chronicles|tales)\b", re.IGNORECASE)
+
 
 class FilenamePatternRecognizer:
     """AI-powered filename pattern recognition for metadata extraction."""
 
-    def __init__(self):
-        self.model_dir = Path(settings.BASE_DIR) / "books" / "scanner" / "ai" / "models"
+    def __init__(self, model_dir: Optional[Path] = None):
+        self.model_dir = Path(model_dir) if model_dir else get_model_dir()
         self.model_dir.mkdir(parents=True, exist_ok=True)
 
         self.title_model = None
@@ -34,49 +95,71 @@ class FilenamePatternRecognizer:
         self.volume_model = None
         self.vectorizer = None
 
-        self.model_paths = {
-            "title": self.model_dir / "title_classifier.pkl",
-            "author": self.model_dir / "author_classifier.pkl",
-            "series": self.model_dir / "series_classifier.pkl",
-            "volume": self.model_dir / "volume_classifier.pkl",
-            "vectorizer": self.model_dir / "filename_vectorizer.pkl",
-            "metadata": self.model_dir / "model_metadata.json",
-        }
+        # Models are stored uncompressed with joblib so their arrays can be memory-mapped on load
+        self.model_paths = {key: self.model_dir / filename for key, filename in MODEL_FILENAMES.items()}
 
         self.confidence_threshold = 0.7
 
-    def collect_training_data(self) -> pd.DataFrame:
-        """Collect training data from reviewed books with corrected metadata."""
-        logger.info("Collecting training data from reviewed books...")
-
-        # Get all books that have been reviewed (approved metadata)
-        reviewed_books = Book.objects.filter(finalmetadata__is_reviewed=True).select_related("finalmetadata")
+        # LRU cache of predictions keyed by cleaned filename
+        self.prediction_cache_size = 10000
+        self.prediction_batch_size = 5000
+        self._prediction_cache = OrderedDict()
+        self._prediction_cache_lock = threading.Lock()
+
+    def iter_training_records(self) -> Iterator[Dict[str, Any]]:
+        """Stream training records for reviewed books in a single query."""
+        primary_file = BookFile.objects.filter(book=OuterRef("book")).order_by("pk")
+        rows = (
+            FinalMetadata.objects.filter(is_reviewed=True)
+            .annotate(primary_file_path=Subquery(primary_file.values("file_path")[:1]), primary_file_format=Subquery(primary_file.values("file_format")[:1]))
+            .values_list("book_id", "final_title", "final_author", "final_series", "final_series_number", "primary_file_path", "primary_file_format")
+            .order_by("book_id")
+        )
+
+        for book_id, title, author, series, series_number, file_path, file_format in rows.iterator(chunk_size=2000):
+            # Extract filename without extension
+            filename = Path(file_path or "").stem
 
-        training_data = []
+            yield {
+                "filename": self._clean_filename(filename),
+                "original_filename": filename,
+                "title": title or "",
+                "author": author or "",
+                "series": series or "",
+                "volume": str(series_number or ""),
+                "file_format": file_format or "",
+                "book_id": book_id,
+            }
 
-        for book in reviewed_books:
-            metadata = book.finalmetadata
+    def iter_feedback_records(self, pending_only: bool = True) -> Iterator[Dict[str, Any]]:
+        """Stream training records built from user corrections in AIFeedback."""
+        from books.models import AIFeedback
 
-            # Extract filename without extension
-            filename = Path(book.file_path).stem
+        feedback_entries = AIFeedback.objects.only("id", "original_filename", "user_corrections")
+        if pending_only:
+            feedback_entries = feedback_entries.filter(needs_retraining=True)
 
-            # Clean and prepare the filename for processing
-            cleaned_filename = self._clean_filename(filename)
+        for feedback in feedback_entries.order_by("id").iterator(chunk_size=2000):
+            corrections = feedback.get_user_corrections_dict()
+            if not isinstance(corrections, dict) or not (corrections.get("title") or corrections.get("author")):
+                continue
 
-            training_record = {
-                "filename": cleaned_filename,
+            filename = Path(feedback.original_filename).stem
+            yield {
+                "filename": self._clean_filename(filename),
                 "original_filename": filename,
-                "title": metadata.final_title or "",
-                "author": metadata.final_author or "",
-                "series": metadata.final_series or "",
-                "volume": str(metadata.final_series_number or ""),  # Fixed field name
-                "file_format": book.file_format,
-                "book_id": book.id,
+                "title": str(corrections.get("title") or ""),
+                "author": str(corrections.get("author") or ""),
+                "series": str(corrections.get("series") or ""),
+                "volume": str(corrections.get("volume") or ""),
+                "feedback_id": feedback.id,
             }
 
-            training_data.append(training_record)
+    def collect_training_data(self) -> pd.DataFrame:
+        """Collect training data from reviewed books with corrected metadata."""
+        logger.info("Collecting training data from reviewed books...")
 
-        df = pd.DataFrame(training_data)
+        df = pd.DataFrame(list(self.iter_training_records()))
         logger.info(f"Collected {len(df)} training records from reviewed books")
 
         # Save training data for analysis
@@ -88,44 +171,18 @@ class FilenamePatternRecognizer:
 
     def _clean_filename(self, filename: str) -> str:
         """Clean filename for better pattern recognition."""
-        # Remove common file naming artifacts
-        cleaned = filename
-
         # Remove brackets and their contents (often contains release info)
-        cleaned = re.sub(r"\[.*?\]", " ", cleaned)
-        cleaned = re.sub(r"\(.*?\)", " ", cleaned)
+        cleaned = _BRACKETS_RE.sub(" ", filename)
+        cleaned = _PARENS_RE.sub(" ", cleaned)
 
         # Replace underscores and dots with spaces
-        cleaned = re.sub(r"[_\.]", " ", cleaned)
+        cleaned = _SEPARATORS_RE.sub(" ", cleaned)
 
         # Remove common keywords that don't help with metadata
-        noise_words = [
-            "ebook",
-            "epub",
-            "pdf",
-            "mobi",
-            "azw3",
-            "azw",
-            "djvu",
-            "retail",
-            "published",
-            "release",
-            "edition",
-            "repack",
-            "scan",
-            "ocr",
-            "fixed",
-            "converted",
-            "calibre",
-        ]
-
-        for noise_word in noise_words:
-            cleaned = re.sub(r"\b" + re.escape(noise_word) + r"\b", " ", cleaned, flags=re.IGNORECASE)
+        cleaned = _NOISE_RE.sub(" ", cleaned)
 
         # Clean up multiple spaces
-        cleaned = re.sub(r"\s+", " ", cleaned).strip()
-
-        return cleaned
+        return _WHITESPACE_RE.sub(" ", cleaned).strip()
 
     def _extract_features(self, filename: str) -> Dict[str, Any]:
         """Extract engineered features from filename."""
@@ -136,10 +193,10 @@ class FilenamePatternRecognizer:
         features["word_count"] = len(filename.split())
 
         # Pattern features
-        features["has_numbers"] = bool(re.search(r"\d", filename))
-        features["has_year"] = bool(re.search(r"\b(19|20)\d{2}\b", filename))
-        features["has_volume_indicator"] = bool(re.search(r"\b(vol|volume|book|#)\s*\d+\b", filename, re.IGNORECASE))
-        features["has_series_indicator"] = bool(re.search(r"\b(series|saga|chronicles|tales)\b", filename, re.IGNORECASE))
+        features["has_numbers"] = bool(_DIGIT_RE.search(filename))
+        features["has_year"] = bool(_YEAR_RE.search(filename))
+        features["has_volume_indicator"] = bool(_VOLUME_RE.search(filename))
+        features["has_series_indicator"] = bool(_SERIES_RE.search(filename))
 
         # Punctuation features
         features["dash_count"] = filename.count("-")
@@ -155,6 +212,23 @@ class FilenamePatternRecognizer:
 
         return features
 
+    def _build_feature_matrix(self, cleaned_filenames: List[str]):
+        """Vectorize cleaned filenames into the combined text + engineered feature matrix."""
+        X_text = self.vectorizer.transform(cleaned_filenames)
+
+        # Fixed column order, with 0 for features absent on empty filenames
+        X_engineered = np.array(
+            [[float(features.get(name, 0)) for name in ENGINEERED_FEATURES] for features in map(self._extract_features, cleaned_filenames)],
+            dtype=np.float64,
+        ).reshape(len(cleaned_filenames), len(ENGINEERED_FEATURES))
+
+        return hstack([X_text, csr_matrix(X_engineered)]).tocsr()
+
+    def clear_prediction_cache(self):
+        """Forget cached predictions, e.g. after the models change."""
+        with self._prediction_cache_lock:
+            self._prediction_cache.clear()
+
     def train_models(self, df: pd.DataFrame) -> Dict[str, float]:
         """Train ML models for metadata extraction."""
         logger.info("Training AI models for filename pattern recognition...")
@@ -169,19 +243,12 @@ class FilenamePatternRecognizer:
         # Create TF-IDF vectorizer for text features
         self.vectorizer = TfidfVectorizer(max_features=5000, ngram_range=(1, 3), stop_words="english", lowercase=True)
 
-        X_text_features = self.vectorizer.fit_transform(X_text)
-
-        # Extract engineered features
-        feature_rows = []
-        for filename in df["filename"]:
-            feature_rows.append(list(self._extract_features(filename).values()))
-
-        X_engineered = pd.DataFrame(feature_rows).values
+        self.vectorizer.fit(X_text)
 
         # Combine text and engineered features
-        from scipy.sparse import hstack
-
-        X_combined = hstack([X_text_features, X_engineered])
+        X_combined = self._build_feature_matrix(list(X_text))
+        self.clear_prediction_cache()
+        self.snapshot_models()
 
         results = {}
 
@@ -214,8 +281,7 @@ class FilenamePatternRecognizer:
 
                 # Save model
                 setattr(self, f"{field}_model", model)
-                with open(self.model_paths[field], "wb") as f:
-                    pickle.dump(model, f)
+                self._save_model(model, self.model_paths[field])
 
                 results[field] = accuracy
                 logger.info(f"Trained {field} model with accuracy: {accuracy:.3f}")
@@ -224,8 +290,7 @@ class FilenamePatternRecognizer:
                 logger.error(f"Failed to train {field} model: {e}")
 
         # Save vectorizer
-        with open(self.model_paths["vectorizer"], "wb") as f:
-            pickle.dump(self.vectorizer, f)
+        self._save_model(self.vectorizer, self.model_paths["vectorizer"])
 
         # Save model metadata
         metadata = {
@@ -233,38 +298,240 @@ class FilenamePatternRecognizer:
             "training_samples": len(df),
             "model_accuracies": results,
             "confidence_threshold": self.confidence_threshold,
+            "format": "joblib",
+            "mode": "full",
         }
+        self._write_metadata(metadata)
+
+        logger.info(f"AI models trained successfully. Results: {results}")
+        return results
+
+    def is_incremental(self) -> bool:
+        """True if the loaded models can be updated with ``train_incremental``."""
+        return self.vectorizer is not None and all(isinstance(getattr(self, f"{field}_model"), IncrementalFieldClassifier) for field in PREDICTION_FIELDS)
+
+    def train_incremental(self, records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Fold new training records into the existing models without refitting them.
+
+        The first incremental update (or one on top of fully trained models)
+        bootstraps hashing-based models from all reviewed books plus
+        ``records``; later updates only process ``records``. The previous
+        models are snapshotted first so the update can be rolled back.
+
+        Returns:
+            Dict with the update ``mode``, the number of ``samples`` folded in
+            and the ``previous_version`` snapshot id (empty dict if there was nothing to train on)
+        """
+        if self.vectorizer is None:
+            self.load_models()
+
+        bootstrap = not self.is_incremental()
+        if bootstrap:
+            logger.info("Bootstrapping incremental AI models from reviewed books...")
+            vectorizer = build_hashing_vectorizer()
+            models = {field: IncrementalFieldClassifier(vectorizer.n_features) for field in PREDICTION_FIELDS}
+            records = chain(self.iter_training_records(), records)
+        else:
+            vectorizer = self.vectorizer
+            models = {field: getattr(self, f"{field}_model") for field in PREDICTION_FIELDS}
+
+        previous_vectorizer, self.vectorizer = self.vectorizer, vectorizer
+        samples = 0
+        try:
+            records = iter(records)
+            while batch := list(islice(records, self.prediction_batch_size)):
+                cleaned = [self._clean_filename(record.get("filename") or "") for record in batch]
+                X_combined = self._build_feature_matrix(cleaned)
+                for field, model in models.items():
+                    model.partial_fit(X_combined, [str(record.get(field) or "") for record in batch], keys=cleaned)
+                samples += len(batch)
+        except Exception:
+            self.vectorizer = previous_vectorizer
+            raise
+
+        if not samples:
+            self.vectorizer = previous_vectorizer
+            logger.info("No new training records for incremental update")
+            return {}
 
+        previous_version = self.snapshot_models()
+        for field, model in models.items():
+            setattr(self, f"{field}_model", model)
+            self._save_model(model, self.model_paths[field])
+        self._save_model(self.vectorizer, self.model_paths["vectorizer"])
+        self.clear_prediction_cache()
+
+        previous_metadata = {} if bootstrap else self._read_metadata()
+        total_samples = samples + int(previous_metadata.get("training_samples") or 0)
+        self._write_metadata(
+            {
+                "training_date": datetime.now().isoformat(),
+                "training_samples": total_samples,
+                "confidence_threshold": self.confidence_threshold,
+                "format": "joblib",
+                "mode": "incremental",
+                "previous_version": previous_version,
+            }
+        )
+
+        mode = "bootstrap" if bootstrap else "incremental"
+        logger.info(f"Incremental AI update ({mode}) folded in {samples} samples")
+        return {"mode": mode, "samples": samples, "previous_version": previous_version}
+
+    def _read_metadata(self) -> Dict[str, Any]:
+        try:
+            with open(self.model_paths["metadata"], "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_metadata(self, metadata: Dict[str, Any]):
+        # Written last: running processes reload their models when this file changes
         with open(self.model_paths["metadata"], "w") as f:
             json.dump(metadata, f, indent=2)
 
-        logger.info(f"AI models trained successfully. Results: {results}")
-        return results
+    @property
+    def versions_dir(self) -> Path:
+        return self.model_dir / "versions"
 
-    def load_models(self) -> bool:
-        """Load trained models from disk."""
+    def snapshot_models(self) -> Optional[str]:
+        """
+        Keep a copy of the current model files under ``versions/`` before they are replaced.
+
+        Files are hard-linked where possible; new models are written to fresh
+        files and renamed into place, so the snapshot is never modified.
+
+        Returns:
+            The snapshot's version id, or None if there were no models to keep
+        """
+        current_files = [path for path in (existing_model_path(path) for path in self.model_paths.values()) if path]
+        if not any(path.suffix != ".json" for path in current_files):
+            return None
+
+        version = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        version_dir = self.versions_dir / version
+        version_dir.mkdir(parents=True)
+        for path in current_files:
+            try:
+                os.link(path, version_dir / path.name)
+            except OSError:
+                shutil.copy2(path, version_dir / path.name)
+
+        for stale_version in self.list_model_versions()[MODEL_VERSIONS_TO_KEEP:]:
+            shutil.rmtree(self.versions_dir / stale_version["version"], ignore_errors=True)
+
+        logger.info(f"Snapshotted AI models as version {version}")
+        return version
+
+    def list_model_versions(self) -> List[Dict[str, Any]]:
+        """Return the saved model versions, newest first."""
+        if not self.versions_dir.exists():
+            return []
+
+        versions = []
+        for version_dir in sorted(self.versions_dir.iterdir(), reverse=True):
+            if not version_dir.is_dir():
+                continue
+            metadata = {}
+            metadata_path = version_dir / self.model_paths["metadata"].name
+            if metadata_path.exists():
+                try:
+                    metadata = json.loads(metadata_path.read_text())
+                except ValueError:
+                    pass
+            versions.append(
+                {
+                    "version": version_dir.name,
+                    "training_date": metadata.get("training_date"),
+                    "training_samples": metadata.get("training_samples"),
+                    "mode": metadata.get("mode", "full"),
+                }
+            )
+        return versions
+
+    def rollback_models(self, version: Optional[str] = None) -> Optional[str]:
+        """
+        Restore a snapshotted model version (the most recent one by default).
+
+        The restored version is removed from the version list; the models it
+        replaces are not kept.
+
+        Returns:
+            The restored version id, or None if there is nothing to roll back to
+        """
+        versions = self.list_model_versions()
+        if version is None:
+            if not versions:
+                return None
+            version = versions[0]["version"]
+        version_dir = self.versions_dir / version
+        if not version_dir.is_dir():
+            return None
+
+        for key, path in self.model_paths.items():
+            if key == "metadata":
+                continue
+            snapshot_path = existing_model_path(version_dir / path.name)
+            current_path = existing_model_path(path)
+            if snapshot_path:
+                target = path.with_suffix(snapshot_path.suffix)
+                fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+                os.close(fd)
+                shutil.copy2(snapshot_path, temp_path)
+                os.replace(temp_path, target)
+                if current_path and current_path != target:
+                    current_path.unlink()
+            elif current_path:
+                current_path.unlink()
+
+        metadata_path = version_dir / self.model_paths["metadata"].name
+        metadata = json.loads(metadata_path.read_text()) if metadata_path.exists() else {}
+        metadata["restored_from_version"] = version
+        metadata["restored_date"] = datetime.now().isoformat()
+        self._write_metadata(metadata)
+
+        shutil.rmtree(version_dir, ignore_errors=True)
+        self.vectorizer = None
+        for field in PREDICTION_FIELDS:
+            setattr(self, f"{field}_model", None)
+        self.load_models()
+
+        logger.info(f"Rolled AI models back to version {version}")
+        return version
+
+    def _save_model(self, obj, path: Path):
+        """Write a model atomically so concurrent loaders never see a partial file."""
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        os.close(fd)
         try:
-            # Check if all required files exist
-            required_files = ["vectorizer"]
-            for field in ["title", "author", "series", "volume"]:
-                if self.model_paths[field].exists():
-                    required_files.append(field)
+            joblib.dump(obj, temp_path)
+            os.replace(temp_path, path)
+        except Exception:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
 
-            if not required_files:
+        legacy_path = path.with_suffix(".pkl")
+        if path.suffix != ".pkl" and legacy_path.exists():
+            legacy_path.unlink()
+
+    def load_models(self) -> bool:
+        """Load trained models from disk, memory-mapping their arrays read-only."""
+        try:
+            vectorizer_path = existing_model_path(self.model_paths["vectorizer"])
+            if not vectorizer_path:
                 logger.info("No trained models found")
                 return False
 
-            # Load vectorizer
-            with open(self.model_paths["vectorizer"], "rb") as f:
-                self.vectorizer = pickle.load(f)
+            # Plain pickles from older installs load through joblib too
+            self.vectorizer = joblib.load(vectorizer_path, mmap_mode="r")
 
-            # Load models
-            for field in ["title", "author", "series", "volume"]:
-                if self.model_paths[field].exists():
-                    with open(self.model_paths[field], "rb") as f:
-                        model = pickle.load(f)
-                        setattr(self, f"{field}_model", model)
+            for field in PREDICTION_FIELDS:
+                model_path = existing_model_path(self.model_paths[field])
+                if model_path:
+                    setattr(self, f"{field}_model", joblib.load(model_path, mmap_mode="r"))
 
+            self.clear_prediction_cache()
             logger.info("AI models loaded successfully")
             return True
 
@@ -274,45 +541,79 @@ class FilenamePatternRecognizer:
 
     def predict_metadata(self, filename: str) -> Dict[str, Tuple[str, float]]:
         """Predict metadata from filename using trained models."""
+        return self.predict_many([filename])[0]
+
+    def predict_many(self, filenames: List[str]) -> List[Dict[str, Tuple[str, float]]]:
+        """Predict metadata for a batch of filenames.
+
+        Filenames are cleaned and de-duplicated, cached predictions are reused,
+        and the remaining ones are vectorized and classified in one matrix pass
+        per model (chunked by ``prediction_batch_size``).
+
+        Returns:
+            One ``{field: (value, confidence)}`` dict per input filename, in order
+        """
         if not self.vectorizer:
             logger.warning("Models not loaded, cannot predict metadata")
-            return {}
+            return [{} for _ in filenames]
 
-        # Clean filename
-        cleaned_filename = self._clean_filename(filename)
+        cleaned_filenames = [self._clean_filename(filename) for filename in filenames]
 
-        # Prepare features
-        X_text = self.vectorizer.transform([cleaned_filename])
-        X_engineered = pd.DataFrame([list(self._extract_features(cleaned_filename).values())]).values
+        known = {}
+        with self._prediction_cache_lock:
+            for cleaned in cleaned_filenames:
+                if cleaned not in known and cleaned in self._prediction_cache:
+                    self._prediction_cache.move_to_end(cleaned)
+                    known[cleaned] = self._prediction_cache[cleaned]
 
-        from scipy.sparse import hstack
+        missing = [cleaned for cleaned in dict.fromkeys(cleaned_filenames) if cleaned not in known]
+        for start in range(0, len(missing), self.prediction_batch_size):
+            chunk = missing[start : start + self.prediction_batch_size]
+            chunk_predictions = self._predict_uncached(chunk)
+            known.update(zip(chunk, chunk_predictions))
+            self._remember_predictions(zip(chunk, chunk_predictions))
 
-        X_combined = hstack([X_text, X_engineered])
+        # Hand out copies so callers can't mutate cached entries
+        return [dict(known[cleaned]) for cleaned in cleaned_filenames]
 
-        predictions = {}
+    def _predict_uncached(self, cleaned_filenames: List[str]) -> List[Dict[str, Tuple[str, float]]]:
+        """Run every field model once over a batch of cleaned filenames."""
+        predictions = [{} for _ in cleaned_filenames]
+        X_combined = self._build_feature_matrix(cleaned_filenames)
 
-        # Get predictions from each model
-        for field in ["title", "author", "series", "volume"]:
+        for field in PREDICTION_FIELDS:
             model = getattr(self, f"{field}_model", None)
-            if model:
-                try:
-                    # Get prediction and confidence
-                    prediction = model.predict(X_combined)[0]
-
-                    # Get prediction probabilities for confidence
-                    if hasattr(model.named_steps["classifier"], "predict_proba"):
-                        probabilities = model.named_steps["classifier"].predict_proba(X_combined)[0]
-                        confidence = max(probabilities)
-                    else:
-                        confidence = 0.5  # Default confidence for non-probabilistic models
-
-                    predictions[field] = (prediction, confidence)
+            if not model:
+                continue
+            try:
+                if isinstance(model, IncrementalFieldClassifier):
+                    values, confidences = model.predict_with_confidence(X_combined)
+                elif hasattr(model.named_steps["classifier"], "predict_proba"):
+                    # The predicted class is the argmax of the probabilities, so one pass yields both
+                    probabilities = model.predict_proba(X_combined)
+                    best = probabilities.argmax(axis=1)
+                    values = model.classes_[best]
+                    confidences = probabilities[np.arange(len(best)), best]
+                else:
+                    values = model.predict(X_combined)
+                    confidences = np.full(len(values), 0.5)  # Default confidence for non-probabilistic models
+
+                for row, value, confidence in zip(predictions, values, confidences):
+                    row[field] = (str(value), float(confidence))
 
-                except Exception as e:
-                    logger.error(f"Error predicting {field}: {e}")
+            except Exception as e:
+                logger.error(f"Error predicting {field}: {e}")
 
         return predictions
 
+    def _remember_predictions(self, items):
+        with self._prediction_cache_lock:
+            for cleaned, prediction in items:
+                self._prediction_cache[cleaned] = prediction
+                self._prediction_cache.move_to_end(cleaned)
+            while len(self._prediction_cache) > self.prediction_cache_size:
+                self._prediction_cache.popitem(last=False)
+
     def is_prediction_confident(self, predictions: Dict[str, Tuple[str, float]]) -> bool:
         """Check if predictions meet confidence threshold."""
         if not predictions:
@@ -323,36 +624,15 @@ class FilenamePatternRecognizer:
 
         return len(confident_predictions) > 0
 
-    def retrain_with_feedback(self, feedback_data: List[Dict[str, str]]) -> Dict[str, float]:
-        """Retrain models with user feedback corrections."""
-        logger.info(f"Retraining models with {len(feedback_data)} feedback samples...")
-
-        # Load existing training data
-        training_data_path = self.model_dir / "training_data.csv"
-        if training_data_path.exists():
-            existing_df = pd.read_csv(training_data_path)
-        else:
-            existing_df = pd.DataFrame()
-
-        # Convert feedback to DataFrame
-        feedback_df = pd.DataFrame(feedback_data)
-
-        # Combine with existing data
-        combined_df = pd.concat([existing_df, feedback_df], ignore_index=True)
-
-        # Remove duplicates based on filename
-        combined_df = combined_df.drop_duplicates(subset=["filename"], keep="last")
-
-        # Save updated training data
-        combined_df.to_csv(training_data_path, index=False)
-
-        # Retrain models
-        return self.train_models(combined_df)
+    def retrain_with_feedback(self, feedback_data: List[Dict[str, str]]) -> Dict[str, Any]:
+        """Fold user feedback corrections into the models incrementally (see ``train_incremental``)."""
+        logger.info(f"Updating models with {len(feedback_data)} feedback samples...")
+        return self.train_incremental(feedback_data)
 
     def models_exist(self) -> bool:
         """Check if all required AI models exist."""
         required_paths = ["vectorizer", "title", "author", "series", "volume"]
-        return all(self.model_paths[path].exists() for path in required_paths)
+        return all(existing_model_path(self.model_paths[path]) for path in required_paths)
 
     def get_training_data_stats(self) -> Dict[str, Any]:
         """Get statistics about the training data."""
@@ -376,26 +656,20 @@ class FilenamePatternRecognizer:
 
 
 def initialize_ai_system() -> Optional[FilenamePatternRecognizer]:
-    """Initialize the AI filename recognition system."""
+    """
+    Load the AI filename recognition system synchronously.
+
+    Models are only loaded, never trained; use the ``train_ai_models``
+    management command to create them. Returns None when no models exist.
+    """
     try:
         recognizer = FilenamePatternRecognizer()
 
-        # Try to load existing models
         if recognizer.load_models():
             logger.info("AI system initialized with existing models")
             return recognizer
 
-        # If no models exist, collect data and train new ones
-        logger.info("No existing models found, training new ones...")
-        training_data = recognizer.collect_training_data()
-
-        if len(training_data) >= 10:
-            results = recognizer.train_models(training_data)
-            if results:
-                logger.info("AI system initialized with new models")
-                return recognizer
-
-        logger.warning("Insufficient data to train AI models")
+        logger.info("No trained AI models found; run 'manage.py train_ai_models' to create them")
         return None
 
     except Exception as e:
@@ -0,0 +1,112 @@
+"""
+Incrementally trainable models for filename pattern recognition.
+
+The full training path fits a TF-IDF vocabulary and RandomForest models from
+scratch. Feedback updates use these instead: a stateless hashing vectorizer
+(no vocabulary to refit) and a nearest-neighbour classifier whose
+``partial_fit`` simply adds or relabels rows, so new labels from user
+corrections can be folded in without revisiting the rest of the training data.
+"""
+
+from typing import Iterable, Optional
+
+import numpy as np
+from scipy.sparse import csr_matrix, vstack
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+HASHING_FEATURES = 2**18
+
+# Training rows kept per field; the oldest rows are dropped beyond this
+MAX_TRAINING_ROWS = 50000
+
+
+def build_hashing_vectorizer() -> HashingVectorizer:
+    """Vectorizer used by incrementally trained models; mirrors the TF-IDF settings."""
+    return HashingVectorizer(n_features=HASHING_FEATURES, ngram_range=(1, 3), stop_words="english", lowercase=True, alternate_sign=False)
+
+
+class IncrementalFieldClassifier:
+    """
+    Nearest-neighbour classifier over hashed filename text.
+
+    Only the first ``n_text_features`` columns (the hashed text) are used;
+    the engineered columns that follow them in the feature matrix are on a
+    different scale and would dominate the cosine similarity. Rows are keyed
+    by cleaned filename, so a later correction for the same file replaces the
+    earlier label instead of competing with it.
+
+    At most ``max_rows`` rows are kept: once feedback pushes the matrix past
+    that, the oldest rows are dropped, which bounds both memory and the cost
+    of each prediction.
+    """
+
+    def __init__(self, n_text_features: int = HASHING_FEATURES, max_rows: int = MAX_TRAINING_ROWS):
+        self.n_text_features = n_text_features
+        self.max_rows = max_rows
+        self.rows_ = csr_matrix((0, n_text_features), dtype=np.float64)
+        self.labels_ = np.empty(0, dtype=object)
+        self.row_keys_ = {}
+
+    @property
+    def classes_(self):
+        return np.unique(self.labels_.astype(str)) if len(self.labels_) else np.empty(0, dtype=object)
+
+    def _text_rows(self, X) -> csr_matrix:
+        return normalize(csr_matrix(X)[:, : self.n_text_features])
+
+    def partial_fit(self, X, y: Iterable[str], keys: Optional[Iterable[str]] = None):
+        """Add training rows, relabelling rows whose key was seen before."""
+        X_text = self._text_rows(X)
+        labels = list(y)
+        keys = list(keys) if keys is not None else [None] * len(labels)
+
+        new_rows, new_labels = [], []
+        pending_keys = {}
+        for index, (label, key) in enumerate(zip(labels, keys)):
+            if X_text.indptr[index] == X_text.indptr[index + 1]:
+                continue  # Nothing to match against later
+            if key is not None and key in self.row_keys_:
+                self.labels_[self.row_keys_[key]] = label
+                continue
+            if key is not None and key in pending_keys:
+                new_labels[pending_keys[key]] = label
+                continue
+            if key is not None:
+                pending_keys[key] = len(new_rows)
+            new_rows.append(index)
+            new_labels.append(label)
+
+        if new_rows:
+            offset = self.rows_.shape[0]
+            self.rows_ = vstack([self.rows_, X_text[new_rows]]).tocsr()
+            self.labels_ = np.concatenate([self.labels_, np.array(new_labels, dtype=object)])
+            for key, position in pending_keys.items():
+                self.row_keys_[key] = offset + position
+            self._trim()
+        return self
+
+    def _trim(self):
+        """Drop the oldest rows beyond ``max_rows``."""
+        # Models pickled before the cap existed have no max_rows attribute
+        max_rows = getattr(self, "max_rows", MAX_TRAINING_ROWS)
+        excess = self.rows_.shape[0] - max_rows
+        if excess <= 0:
+            return
+        self.rows_ = self.rows_[excess:]
+        self.labels_ = self.labels_[excess:]
+        self.row_keys_ = {key: position - excess for key, position in self.row_keys_.items() if position >= excess}
+
+    def predict_with_confidence(self, X):
+        """Return the label of the most similar training row and its cosine similarity for each row of ``X``."""
+        n_samples = X.shape[0]
+        if not len(self.labels_):
+            return np.full(n_samples, "", dtype=object), np.zeros(n_samples)
+
+        similarities = (self._text_rows(X) @ self.rows_.T).tocsr()
+        best = np.asarray(similarities.argmax(axis=1)).ravel()
+        confidences = similarities.max(axis=1).toarray().ravel()
+        return self.labels_[best], confidences
+
+    def predict(self, X):
+        return self.predict_with_confidence(X)[0]
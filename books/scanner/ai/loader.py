@@ -0,0 +1,178 @@
+"""
+Lazy, background loading of the filename recognition models.
+
+Importing the recognizer pulls in scikit-learn, scipy and pandas, and loading
+the fitted models reads them from disk, so neither happens at import time or
+on the scanner's critical path. The first caller starts a daemon thread that
+loads the saved models; until it finishes ``get()`` returns None and the
+scanner falls back to regex-only filename parsing.
+
+Models are never trained here - training only happens through the
+``train_ai_models`` management command. A running process picks up newly
+trained models the next time ``refresh()`` notices the metadata file changed.
+"""
+
+import logging
+import threading
+from pathlib import Path
+from typing import Optional
+
+from django.conf import settings
+
+logger = logging.getLogger("books.scanner")
+
+MODEL_FILENAMES = {
+    "title": "title_classifier.joblib",
+    "author": "author_classifier.joblib",
+    "series": "series_classifier.joblib",
+    "volume": "volume_classifier.joblib",
+    "vectorizer": "filename_vectorizer.joblib",
+    "metadata": "model_metadata.json",
+}
+
+
+def get_model_dir() -> Path:
+    """Directory the filename recognition models are stored in."""
+    return Path(settings.BASE_DIR) / "books" / "scanner" / "ai" / "models"
+
+
+def existing_model_path(path: Path) -> Optional[Path]:
+    """Return ``path`` if it exists, else a legacy ``.pkl`` file with the same stem, else None."""
+    if path.exists():
+        return path
+    legacy_path = path.with_suffix(".pkl")
+    if legacy_path.exists():
+        return legacy_path
+    return None
+
+
+def models_available(model_dir: Optional[Path] = None) -> bool:
+    """Check for a saved vectorizer without importing any of the ML stack."""
+    model_dir = Path(model_dir) if model_dir else get_model_dir()
+    return existing_model_path(model_dir / MODEL_FILENAMES["vectorizer"]) is not None
+
+
+class AIModelLoader:
+    """Loads a FilenamePatternRecognizer once, in the background."""
+
+    def __init__(self, model_dir: Optional[Path] = None):
+        self.model_dir = Path(model_dir) if model_dir else None
+        self._recognizer = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._generation = 0
+        self._loaded_mtime = None
+
+    def start(self) -> bool:
+        """
+        Start loading in a background thread if it hasn't been started yet.
+
+        Returns:
+            True if a load is running or finished, False if there are no models to load
+        """
+        with self._lock:
+            if self._thread is not None:
+                return True
+            if not models_available(self._get_model_dir()):
+                return False
+
+            self._ready.clear()
+            generation = self._generation
+            self._thread = threading.Thread(target=self._load, args=(generation,), name="ai-model-loader", daemon=True)
+            self._thread.start()
+            return True
+
+    def get(self):
+        """Return the loaded recognizer, or None while it is still loading (or unavailable)."""
+        self.start()
+        if not self._ready.is_set():
+            return None
+        return self._recognizer
+
+    def wait(self, timeout: Optional[float] = None):
+        """Block until the models are loaded (or ``timeout`` expires) and return the recognizer."""
+        if not self.start():
+            return None
+        self._ready.wait(timeout)
+        return self.get()
+
+    def is_ready(self) -> bool:
+        return self._ready.is_set() and self._recognizer is not None
+
+    def reload(self):
+        """Discard the loaded recognizer and load the models again in the background."""
+        with self._lock:
+            self._generation += 1
+            self._recognizer = None
+            self._thread = None
+            self._loaded_mtime = None
+            self._ready.clear()
+        self.start()
+
+    def refresh(self):
+        """Reload if the models on disk were retrained since they were loaded."""
+        mtime = self._metadata_mtime()
+        if self._ready.is_set() and mtime != self._loaded_mtime:
+            logger.info("[AI LOADER] Model files changed on disk, reloading")
+            self.reload()
+        else:
+            self.start()
+
+    def _get_model_dir(self) -> Path:
+        return self.model_dir or get_model_dir()
+
+    def _metadata_mtime(self) -> Optional[float]:
+        try:
+            return (self._get_model_dir() / MODEL_FILENAMES["metadata"]).stat().st_mtime
+        except OSError:
+            return None
+
+    def _load(self, generation: int):
+        recognizer = None
+        mtime = self._metadata_mtime()
+        try:
+            from books.scanner.ai.filename_recognizer import FilenamePatternRecognizer
+
+            candidate = FilenamePatternRecognizer(model_dir=self.model_dir)
+            if candidate.load_models():
+                recognizer = candidate
+                logger.info("[AI LOADER] Filename recognition models ready")
+            else:
+                logger.info("[AI LOADER] No usable models found, using regex-only parsing")
+        except Exception as e:
+            logger.error(f"[AI LOADER] Failed to load AI models: {e}")
+
+        with self._lock:
+            if generation != self._generation:
+                return  # A reload was requested while we were loading
+            self._recognizer = recognizer
+            self._loaded_mtime = mtime
+            self._ready.set()
+
+
+_loader = None
+_loader_lock = threading.Lock()
+
+
+def get_model_loader() -> AIModelLoader:
+    """Return the process-wide model loader."""
+    global _loader
+    with _loader_lock:
+        if _loader is None:
+            _loader = AIModelLoader()
+        return _loader
+
+
+def get_ai_recognizer(wait: bool = False, timeout: Optional[float] = None):
+    """
+    Return the loaded recognizer, starting the background load if needed.
+
+    Args:
+        wait: Block until loading finishes instead of returning None while it runs
+        timeout: Maximum seconds to block when ``wait`` is True
+    """
+    loader = get_model_loader()
+    if wait:
+        return loader.wait(timeout)
+    return loader.get()
@@ -0,0 +1,207 @@
+"""Persistent cache of external metadata API responses.
+
+Responses are stored in the database keyed by provider plus a normalized
+lookup - the ISBN-13 when there is one, otherwise the normalized title and
+author - rather than by book. Two editions sharing an ISBN, or a rescan of a
+book we already looked up, are answered from the table without spending any
+of the provider's request quota.
+
+Lookups that found nothing are cached too ("negative" entries), with a
+shorter lifetime so that a book missing from a catalogue today is retried
+eventually, but not on every scan. Transient failures (timeouts, server
+errors, rate limiting) are never stored. Expired rows are deleted by
+``prune_expired_responses`` (run from the ``prune_scan_logs`` command).
+"""
+
+import logging
+import re
+from datetime import timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.utils import timezone
+
+from books.models import ExternalAPIResponse
+from books.utils.cache_key import make_cache_key
+from books.utils.isbn import normalize_isbn
+
+logger = logging.getLogger("books.scanner")
+
+DAY = 86400
+
+# Provider -> (seconds to keep a result, seconds to keep a "not found")
+DEFAULT_CACHE_TTLS = {
+    "google_books": (30 * DAY, 3 * DAY),
+    "open_library": (30 * DAY, 3 * DAY),
+    "comic_vine": (14 * DAY, 1 * DAY),
+    "goodreads": (30 * DAY, 7 * DAY),
+}
+FALLBACK_CACHE_TTLS = (7 * DAY, 1 * DAY)
+
+# Key holding the result list in each provider's response
+RESULTS_KEYS = {
+    "google_books": "items",
+    "open_library": "docs",
+    "comic_vine": "results",
+}
+
+COMICVINE_OK = 1
+COMICVINE_NOT_FOUND = 101
+
+# Returned by get_cached_response() when nothing usable is stored
+MISS = object()
+
+_NON_WORD_RE = re.compile(r"[\W_]+")
+_ISBN_JUNK_RE = re.compile(r"[^0-9Xx]")
+
+
+def get_cache_ttls(provider: str) -> Tuple[int, int]:
+    """Return ``(positive_ttl, negative_ttl)`` in seconds, honouring ``settings.EXTERNAL_API_CACHE_TTLS``."""
+    overrides = getattr(settings, "EXTERNAL_API_CACHE_TTLS", {}) or {}
+    return tuple(overrides.get(provider, DEFAULT_CACHE_TTLS.get(provider, FALLBACK_CACHE_TTLS)))
+
+
+def _normalize_text(value: Optional[str]) -> str:
+    return " ".join(_NON_WORD_RE.split((value or "").lower())).strip()
+
+
+def lookup_key(isbn: Optional[str] = None, title: Optional[str] = None, author: Optional[str] = None) -> Optional[str]:
+    """
+    Build the provider-independent part of a cache key for a book lookup.
+
+    ISBN-10 and ISBN-13 forms of the same number produce the same key; an
+    ISBN that doesn't validate is keyed on its digits. Returns None if there
+    is nothing to look up.
+    """
+    if isbn:
+        normalized_isbn = normalize_isbn(isbn) or _ISBN_JUNK_RE.sub("", isbn).upper()
+        if normalized_isbn:
+            return f"isbn:{normalized_isbn}"
+
+    title, author = _normalize_text(title), _normalize_text(author)
+    if not (title or author):
+        return None
+    return f"query:{make_cache_key(title, author)}"
+
+
+def comicvine_key(resource: str, query: Optional[str], limit: int) -> Optional[str]:
+    """
+    Key for a Comic Vine search by name.
+
+    Comic Vine has no ISBN lookup, so searches are keyed on the normalized
+    query text like any other title lookup, prefixed with the resource type
+    because a volume search and an issue search for the same text return
+    different results, and with the result limit because a smaller response
+    can't answer a larger request.
+    """
+    key = lookup_key(title=query)
+    return f"{resource}:{limit}:{key}" if key else None
+
+
+def request_key(endpoint: str, params: Dict[str, Any]) -> str:
+    """Cache key for a raw API request, ignoring credentials and output format."""
+    relevant = sorted((str(name), str(value)) for name, value in params.items() if name not in {"api_key", "key", "format"})
+    return f"{endpoint}:{make_cache_key(*(f'{name}={value}' for name, value in relevant))}"
+
+
+def classify_response(provider: str, data: Any) -> Optional[bool]:
+    """
+    Decide how a response should be cached.
+
+    Returns:
+        False for a usable result, True for a definite "not found",
+        None if the response should not be cached at all
+    """
+    if data is None:
+        return None
+
+    if provider == "comic_vine":
+        status_code = data.get("status_code")
+        if status_code == COMICVINE_NOT_FOUND:
+            return True
+        if status_code != COMICVINE_OK:
+            return None  # Invalid key, rate limited, etc.
+
+    results_key = RESULTS_KEYS.get(provider)
+    if results_key is None:
+        return not data
+    return not data.get(results_key)
+
+
+def get_cached_response(provider: str, key: Optional[str]):
+    """Return the stored response for ``provider``/``key``, or ``MISS`` if there is no unexpired entry."""
+    if not key:
+        return MISS
+
+    try:
+        entry = ExternalAPIResponse.objects.only("response", "is_negative").get(provider=provider, lookup_key=key, expires_at__gt=timezone.now())
+    except ExternalAPIResponse.DoesNotExist:
+        return MISS
+    except Exception as e:
+        logger.warning(f"[API CACHE] Lookup failed for {provider} {key}: {e}")
+        return MISS
+
+    logger.debug(f"[API CACHE] {'Negative' if entry.is_negative else 'Cached'} hit for {provider} {key}")
+    return entry.response
+
+
+def has_cached_response(provider: str, key: Optional[str]) -> bool:
+    """Whether an unexpired response (positive or negative) is stored for ``provider``/``key``."""
+    if not key:
+        return False
+    return ExternalAPIResponse.objects.filter(provider=provider, lookup_key=key, expires_at__gt=timezone.now()).exists()
+
+
+def store_response(provider: str, key: Optional[str], data: Any, negative: Optional[bool] = None) -> bool:
+    """
+    Store a response, classifying it with ``classify_response`` unless ``negative`` is given.
+
+    Returns:
+        True if the response was stored
+    """
+    if not key:
+        return False
+
+    if negative is None:
+        negative = classify_response(provider, data)
+        if negative is None:
+            return False
+
+    positive_ttl, negative_ttl = get_cache_ttls(provider)
+    now = timezone.now()
+
+    try:
+        ExternalAPIResponse.objects.update_or_create(
+            provider=provider,
+            lookup_key=key,
+            defaults={
+                "response": data,
+                "is_negative": negative,
+                "fetched_at": now,
+                "expires_at": now + timedelta(seconds=negative_ttl if negative else positive_ttl),
+            },
+        )
+    except Exception as e:
+        logger.warning(f"[API CACHE] Could not store {provider} {key}: {e}")
+        return False
+    return True
+
+
+def prune_expired_responses(chunk_size: int = 1000, dry_run: bool = False) -> int:
+    """
+    Delete expired responses in primary-key chunks selected through the ``expires_at`` index.
+
+    Returns:
+        Number of rows deleted (or that would be deleted with ``dry_run``)
+    """
+    expired = ExternalAPIResponse.objects.filter(expires_at__lte=timezone.now())
+    if dry_run:
+        return expired.count()
+
+    deleted = 0
+    while True:
+        ids = list(expired.order_by("expires_at").values_list("pk", flat=True)[:chunk_size])
+        if not ids:
+            return deleted
+        deleted += ExternalAPIResponse.objects.filter(pk__in=ids).delete()[0]
+
@@ -16,17 +16,23 @@ from django.core.cache import cache
 
 from books.models import Book, ScanFolder, ScanSession
 from books.scanner import folder as folder_scanner
-from books.scanner.intelligent import IntelligentAPIScanner
+from books.scanner.events import SCAN_PROGRESS, publish_event
+from books.scanner.intelligent import IntelligentAPIScanner, invalidate_completeness_stats
+from books.scanner.status import ACTIVE_JOBS_CACHE_KEY, active_jobs, progress_cache_key
+from books.utils.folder_analysis import format_file_count, get_cached_analysis
 
 logger = logging.getLogger("books.scanner")
 
+# Job ID of the running API retry; one runs at a time
+API_RETRY_JOB_CACHE_KEY = "api_retry_running_job"
+
 
 class ScanProgress:
     """Track scanning progress and provide status updates."""
 
     def __init__(self, job_id: str):
         self.job_id = job_id
-        self.cache_key = f"scan_progress_{job_id}"
+        self.cache_key = progress_cache_key(job_id)
         self.start_time = time.time()
 
     def update(self, current: int, total: int, status: str, details: str = ""):
@@ -53,6 +59,7 @@ class ScanProgress:
             progress_data["eta_seconds"] = None
 
         cache.set(self.cache_key, progress_data, timeout=3600)  # 1 hour
+        publish_event(SCAN_PROGRESS, progress_data)
         logger.info(f"[SCAN PROGRESS] {status}: {current}/{total} ({progress_data['percentage']}%)")
 
     def complete(self, success: bool, message: str = "", error: str = ""):
@@ -70,10 +77,11 @@ class ScanProgress:
         cache.set(self.cache_key, final_data, timeout=86400)  # 24 hours
 
         # Remove from active scans list
-        job_ids = cache.get("active_scan_job_ids", [])
+        job_ids = cache.get(ACTIVE_JOBS_CACHE_KEY, [])
         if self.job_id in job_ids:
             job_ids.remove(self.job_id)
-            cache.set("active_scan_job_ids", job_ids, timeout=3600)
+            cache.set(ACTIVE_JOBS_CACHE_KEY, job_ids, timeout=3600)
+        publish_event(SCAN_PROGRESS, final_data)
 
     def get_status(self) -> Dict:
         """Get current progress status."""
@@ -149,8 +157,14 @@ class BackgroundScanner:
                     scan_folder.content_type = content_type
                     scan_folder.save()
 
-            # Use proper folder scanning with content-type support
-            self.progress.update(10, 100, "Scanning folder", "Processing files by content type...")
+            # Use proper folder scanning with content-type support; the setup wizard's
+            # analysis of the folder tells how many files to expect while it is current
+            analysis = get_cached_analysis(folder_path)
+            if analysis and analysis["complete"]:
+                details = f"Processing {format_file_count(analysis)} media files by content type..."
+            else:
+                details = "Processing files by content type..."
+            self.progress.update(10, 100, "Scanning folder", details)
 
             try:
                 # Use the folder scanner directly which supports content-type processing
@@ -333,6 +347,31 @@ class BackgroundScanner:
             self.progress.complete(False, "", str(e))
             return {"success": False, "error": str(e)}
 
+    def retry_api_calls(self, book_ids: List[int], session_id: str = None) -> Dict:
+        """Retry the external APIs for books in batches, e.g. a whole scan priority or a session's resume queue."""
+        try:
+            total_books = len(book_ids)
+            logger.info(f"[BACKGROUND API RETRY] Starting API retry of {total_books} books")
+            self.progress.update(0, total_books, "Initializing", f"Retrying APIs for {total_books} books")
+
+            self.intelligent_scanner = IntelligentAPIScanner(session_id=session_id)
+            counts = self.intelligent_scanner.retry_books(
+                book_ids,
+                on_progress=lambda done, total: self.progress.update(done, total, "Retrying APIs", f"Retried {done} of {total} books"),
+            )
+            if not session_id:
+                self.intelligent_scanner.complete_session()
+            invalidate_completeness_stats()
+
+            success_message = f"Processed {counts['processed']} books. {counts['successful']} had successful API calls."
+            self.progress.complete(True, success_message, f"{counts['errors']} books could not be retried" if counts["errors"] else "")
+            return {"success": True, "message": success_message, **counts}
+
+        except Exception as e:
+            logger.error(f"[BACKGROUND API RETRY] Fatal error: {e}")
+            self.progress.complete(False, "", str(e))
+            return {"success": False, "error": str(e)}
+
 
 # Background job functions for Django-RQ
 def background_scan_folder(
@@ -366,6 +405,53 @@ def background_rescan_books(job_id: str, book_ids: List[int], enable_external_ap
     return scanner.rescan_existing_books(book_ids, enable_external_apis)
 
 
+def background_retry_api_calls(job_id: str, book_ids: List[int], session_id: str = None):
+    """Background job for retrying the external APIs of many books."""
+    try:
+        scanner = BackgroundScanner(job_id)
+        return scanner.retry_api_calls(book_ids, session_id)
+    finally:
+        if cache.get(API_RETRY_JOB_CACHE_KEY) == job_id:
+            cache.delete(API_RETRY_JOB_CACHE_KEY)
+
+
+def get_running_api_retry() -> Optional[str]:
+    """Job ID of the API retry that is running, if any."""
+    job_id = cache.get(API_RETRY_JOB_CACHE_KEY)
+    if job_id and ScanProgress(job_id).get_status().get("completed"):
+        # The job finished without releasing its key
+        cache.delete(API_RETRY_JOB_CACHE_KEY)
+        return None
+    return job_id
+
+
+def retry_api_calls_in_background(book_ids: List[int], session_id: str = None) -> str:
+    """
+    Queue an API retry of ``book_ids`` as a background job; returns its job ID.
+
+    Only one retry runs at a time, since every retry shares the same API rate
+    limits. While one is running, its job ID is returned instead of starting
+    another.
+    """
+    import threading
+    import uuid
+
+    job_id = str(uuid.uuid4())
+    running_job_id = get_running_api_retry()
+    if running_job_id or not cache.add(API_RETRY_JOB_CACHE_KEY, job_id, timeout=3600):
+        running_job_id = running_job_id or cache.get(API_RETRY_JOB_CACHE_KEY)
+        logger.info(f"[BACKGROUND API RETRY] Job {running_job_id} is already running; not starting another")
+        return running_job_id
+
+    add_active_scan(job_id)
+    ScanProgress(job_id).update(0, len(book_ids), "Queued", f"Retrying APIs for {len(book_ids)} books")
+
+    thread = threading.Thread(target=background_retry_api_calls, args=(job_id, book_ids, session_id), daemon=True, name="background_retry_api_calls")
+    thread.start()
+    logger.info(f"[THREAD STARTED] API retry of {len(book_ids)} books started for job {job_id}")
+    return job_id
+
+
 def get_scan_progress(job_id: str) -> Dict:
     """Get the progress of a background scan job."""
     progress = ScanProgress(job_id)
@@ -374,10 +460,10 @@ def get_scan_progress(job_id: str) -> Dict:
 
 def add_active_scan(job_id: str):
     """Add a job ID to the active scans list."""
-    job_ids = cache.get("active_scan_job_ids", [])
+    job_ids = cache.get(ACTIVE_JOBS_CACHE_KEY, [])
     if job_id not in job_ids:
         job_ids.append(job_id)
-        cache.set("active_scan_job_ids", job_ids, timeout=3600)
+        cache.set(ACTIVE_JOBS_CACHE_KEY, job_ids, timeout=3600)
 
 
 def scan_folder_in_background(
@@ -434,21 +520,12 @@ def scan_folder_in_background(
 
 def get_all_active_scans() -> List[Dict]:
     """Get all currently active scan jobs."""
-    job_ids = cache.get("active_scan_job_ids", [])
-    active_scans = []
-
-    for job_id in job_ids:
-        progress_data = cache.get(f"scan_progress_{job_id}")
-        if progress_data and not progress_data.get("completed", False):
-            active_scans.append(progress_data)
-
-    return active_scans
+    return active_jobs(cache.get(ACTIVE_JOBS_CACHE_KEY, []))
 
 
 def cancel_scan(job_id: str) -> bool:
     """Cancel a background scan job."""
     # This would need to be implemented with a proper job queue
     # For now, just clear the progress
-    cache_key = f"scan_progress_{job_id}"
-    cache.delete(cache_key)
+    cache.delete(progress_cache_key(job_id))
     return True
@@ -17,8 +17,10 @@ from books.models import (
     DataSource,
     ScanFolder,
 )
+from books.scanner.extractors.audio import extract_durations
 from books.scanner.file_ops import get_file_format
 from books.scanner.grouping import AudiobookFileGrouper, ComicFileGrouper
+from books.utils.comic_index import refresh_comic_issue
 from books.utils.cover_cache import CoverCache
 from books.utils.cover_extractor import (
     ArchiveCoverExtractor,
@@ -144,8 +146,9 @@ def _process_comic_issue(
         book_file.save()
         logger.info(f"Updated BookFile for: {issue_title}")
 
-    # Store comic-specific metadata
-    _store_comic_metadata(book, issue_info)
+    # Store comic-specific metadata and keep the series index current
+    _store_comic_metadata(book, dict(issue_info, series=series_name))
+    refresh_comic_issue(book)
 
     # Detect and extract cover (external or internal from archive)
     from books.scanner.file_ops import find_cover_file
@@ -182,6 +185,18 @@ def _store_comic_metadata(book: Book, issue_info: dict):
     """Store comic-specific metadata using the BookMetadata system"""
     from books.models import STANDARD_METADATA_FIELDS, BookMetadata
 
+    # Store series (grouped from filenames)
+    if issue_info.get("series"):
+        BookMetadata.objects.update_or_create(
+            book=book,
+            field_name="series",
+            source=_get_file_scanner_source(),
+            defaults={
+                "field_value": issue_info["series"],
+                "confidence": 0.8,
+            },
+        )
+
     # Store issue number
     if issue_info.get("issue_number"):
         BookMetadata.objects.update_or_create(
@@ -254,13 +269,12 @@ def _process_audiobook_files(
         else:
             logger.info(f"Found existing audiobook: {book_key}")
 
-        # Process each audio file
-        total_duration = 0
-        total_size = 0
-        for audio_file in audio_files:
-            duration, size = _process_audiobook_file(audio_file, book, audiobook_grouper, cover_files, opf_files, rescan)
-            total_duration += duration or 0
-            total_size += size or 0
+        # Process each audio file, then read all durations at once
+        book_files = [_process_audiobook_file(audio_file, book, audiobook_grouper, cover_files, opf_files, rescan) for audio_file in audio_files]
+        _update_audiobook_durations(book_files, rescan)
+
+        total_duration = sum(book_file.duration_seconds or 0 for book_file in book_files)
+        total_size = sum(book_file.file_size or 0 for book_file in book_files)
 
         # Store total duration and size as metadata
         _store_audiobook_totals(book, total_duration, total_size)
@@ -278,8 +292,8 @@ def _process_audiobook_file(
     cover_files: List[str],
     opf_files: List[str],
     rescan: bool,
-) -> tuple:
-    """Process a single audiobook file using unified BookFile architecture, returns (duration_seconds, file_size_bytes)"""
+) -> BookFile:
+    """Get or create the BookFile for one audiobook track; rescan changes are saved by _update_audiobook_durations"""
 
     # Extract file information
     file_info = audiobook_grouper.extract_file_info(file_path, book.title)
@@ -304,19 +318,26 @@ def _process_audiobook_file(
         # Update file info on rescan
         book_file.file_size = os.path.getsize(file_path)
         book_file.file_format = get_file_format(file_path)
-        book_file.save()
         logger.info(f"Updated audiobook file: {book.title} - Chapter {file_info.get('chapter_number', 'Unknown')}")
 
-    # Try to extract duration from audio metadata
-    try:
-        duration = _extract_audio_duration(file_path)
-        if duration:
+    return book_file
+
+
+def _update_audiobook_durations(book_files: List[BookFile], rescan: bool):
+    """Read track durations concurrently from file headers and save all changed tracks in one bulk_update"""
+    durations = extract_durations([book_file.file_path for book_file in book_files])
+
+    changed = []
+    for book_file in book_files:
+        duration = durations.get(book_file.file_path)
+        if duration and duration != book_file.duration_seconds:
             book_file.duration_seconds = duration
-            book_file.save()
-    except Exception as e:
-        logger.warning(f"Could not extract duration from {file_path}: {e}")
+            changed.append(book_file)
+        elif rescan:
+            changed.append(book_file)  # File size/format refreshed by _process_audiobook_file
 
-    return book_file.duration_seconds or 0, book_file.file_size or 0
+    if changed:
+        BookFile.objects.bulk_update(changed, ["file_size", "file_format", "duration_seconds"])
 
 
 def _store_audiobook_totals(book: Book, total_duration: int, total_size: int):
@@ -346,23 +367,6 @@ def _store_audiobook_totals(book: Book, total_duration: int, total_size: int):
     )
 
 
-def _extract_audio_duration(file_path: str) -> int:
-    """Extract duration from audio file metadata (in seconds)"""
-    try:
-        # Try using mutagen for audio metadata
-        from mutagen import File
-
-        audio_file = File(file_path)
-        if audio_file and hasattr(audio_file, "info"):
-            return int(audio_file.info.length)
-    except ImportError:
-        logger.warning("Mutagen not available for audio duration extraction")
-    except Exception as e:
-        logger.warning(f"Error extracting duration from {file_path}: {e}")
-
-    return 0
-
-
 def _process_individual_ebook(
     file_path: str,
     scan_folder: ScanFolder,
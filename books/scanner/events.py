@@ -0,0 +1,230 @@
+"""
+In-process fan-out of scan, folder and batch progress events.
+
+The scanner's progress reporter (``ScanProgress``), the folder counters and
+the batch renamer publish events to the process-wide ``ProgressEventHub``.
+Every stream reads the same bounded buffer of recent events, so publishing
+costs the same whatever the number of open tabs. Stream threads wait on one
+condition variable that a publish wakes up.
+
+Event IDs are ``<hub id>-<sequence>``. A client reconnecting with a
+``Last-Event-ID`` gets the events it missed while they are still buffered,
+and a ``snapshot`` of the whole state when they are not (or when the ID is
+from another process or before a restart).
+
+Folder counters change once per book during a scan. Changed folders are
+only recorded when a counter changes, and their progress is read in one
+query and published at most every ``folder_interval`` seconds, by whichever
+stream gets to it first.
+
+Scans started by the ``scan_books`` and ``watch_library`` commands run in
+other processes and publish to their own hub. Every ``sync_interval``
+seconds one stream of this process reads the scanning state and the folder
+counters from the database instead; a changed state is published as a
+``snapshot`` and changed folders as ``folder_progress``.
+
+At most ``max_streams`` streams are open per process, since each one holds
+a worker thread for its whole life; clients beyond that poll instead.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+logger = logging.getLogger("books.scanner")
+
+SCAN_PROGRESS = "scan_progress"
+FOLDER_PROGRESS = "folder_progress"
+BATCH_PROGRESS = "batch_progress"
+SNAPSHOT = "snapshot"
+
+
+class ProgressEventHub:
+    """Bounded buffer of recent progress events shared by every stream of the process."""
+
+    def __init__(self, buffer_size: int = 1000, folder_interval: float = 1.0, sync_interval: float = 5.0, max_streams: int = 8):
+        self.hub_id = uuid.uuid4().hex[:8]
+        self.folder_interval = folder_interval
+        self.sync_interval = sync_interval
+        self.max_streams = max_streams
+        self._events = deque(maxlen=buffer_size)
+        self._sequence = 0
+        self._condition = threading.Condition()
+        self._changed_folders = set()
+        self._folders_published_at = 0.0
+        self._synced_at = 0.0
+        self._status_version = None
+        self._folder_counts = None
+        self._streams = 0
+
+    def open_stream(self) -> bool:
+        """Take a stream slot; False when ``max_streams`` streams are already open."""
+        with self._condition:
+            if self._streams >= self.max_streams:
+                return False
+            self._streams += 1
+            return True
+
+    def close_stream(self) -> None:
+        with self._condition:
+            self._streams -= 1
+
+    def publish(self, event_type: str, data: Dict) -> str:
+        """Buffer an event and wake up every waiting stream; returns its ID."""
+        with self._condition:
+            self._sequence += 1
+            event = (self._sequence, event_type, data)
+            self._events.append(event)
+            self._condition.notify_all()
+        return self.format_id(self._sequence)
+
+    def format_id(self, sequence: int) -> str:
+        return f"{self.hub_id}-{sequence}"
+
+    def last_event_id(self) -> str:
+        with self._condition:
+            return self.format_id(self._sequence)
+
+    def _parse_id(self, event_id: Optional[str]) -> Optional[int]:
+        hub_id, _, sequence = (event_id or "").partition("-")
+        if hub_id != self.hub_id or not sequence.isdigit():
+            return None
+        return int(sequence)
+
+    def events_after(self, event_id: Optional[str]) -> Tuple[List[Dict], bool]:
+        """
+        Buffered events after ``event_id``.
+
+        Returns:
+            ``(events, complete)``; ``complete`` is False when events after
+            ``event_id`` may have been missed and the client needs a snapshot
+        """
+        sequence = self._parse_id(event_id)
+        with self._condition:
+            if sequence is None or sequence > self._sequence:
+                return [], False
+            oldest = self._events[0][0] if self._events else self._sequence + 1
+            complete = sequence >= oldest - 1
+            events = [self._as_dict(event) for event in self._events if event[0] > sequence]
+        return events, complete
+
+    def wait(self, event_id: Optional[str], timeout: float) -> None:
+        """Block until there are events after ``event_id`` or ``timeout`` seconds have passed."""
+        self.publish_pending()
+        sequence = self._parse_id(event_id) or 0
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while self._sequence <= sequence:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                # Wake up for the next folder progress batch or database sync as well
+                due = self._seconds_until_due()
+                self._condition.wait(min(remaining, due))
+                if self._seconds_until_due() <= 0:
+                    break
+        self.publish_pending()
+
+    def _seconds_until_due(self) -> float:
+        """Seconds until a folder progress batch or a database sync is due; called holding the lock."""
+        now = time.monotonic()
+        due = float("inf")
+        if self._changed_folders:
+            due = self.folder_interval - (now - self._folders_published_at)
+        if self.sync_interval > 0:
+            due = min(due, self.sync_interval - (now - self._synced_at))
+        return max(due, 0)
+
+    def publish_pending(self) -> None:
+        """Publish the changes other processes made and the progress of changed folders, when due."""
+        self.sync_from_database()
+        self.publish_folder_progress()
+
+    def folder_changed(self, folder_id: int) -> None:
+        """Record that a folder's counters changed; its progress is published with the next batch."""
+        with self._condition:
+            self._changed_folders.add(folder_id)
+
+    def publish_folder_progress(self, force: bool = False) -> int:
+        """Publish the progress of changed folders, at most every ``folder_interval`` seconds."""
+        from books.models import ScanFolder
+
+        with self._condition:
+            if not self._changed_folders or (not force and time.monotonic() - self._folders_published_at < self.folder_interval):
+                return 0
+            folder_ids, self._changed_folders = self._changed_folders, set()
+            self._folders_published_at = time.monotonic()
+
+        folders = ScanFolder.objects.filter(pk__in=folder_ids).only("id", "file_count", "book_count")
+        published = 0
+        for folder in folders:
+            self.publish(FOLDER_PROGRESS, {"folder_id": folder.id, "progress": folder.get_scan_progress_info()})
+            published += 1
+        return published
+
+    def sync_from_database(self, force: bool = False) -> bool:
+        """
+        Pick up scanning state and folder counters changed by other processes.
+
+        Runs at most every ``sync_interval`` seconds. The first run only
+        records the current state. Returns whether a snapshot was published.
+        """
+        from books.models import ScanFolder
+        from books.scanner.status import scan_status_snapshot
+
+        with self._condition:
+            if self.sync_interval <= 0 or (not force and time.monotonic() - self._synced_at < self.sync_interval):
+                return False
+            self._synced_at = time.monotonic()
+
+        snapshot = scan_status_snapshot()
+        folder_counts = {pk: (files, books) for pk, files, books in ScanFolder.objects.filter(is_active=True).values_list("id", "file_count", "book_count")}
+
+        with self._condition:
+            previous_version, self._status_version = self._status_version, snapshot["version"]
+            previous_counts, self._folder_counts = self._folder_counts, folder_counts
+            if previous_counts is not None:
+                self._changed_folders.update(pk for pk, counts in folder_counts.items() if previous_counts.get(pk) != counts)
+        if previous_version is None or previous_version == snapshot["version"]:
+            return False
+        self.publish(SNAPSHOT, snapshot)
+        return True
+
+    def _as_dict(self, event) -> Dict:
+        sequence, event_type, data = event
+        return {"id": self.format_id(sequence), "event": event_type, "data": data}
+
+
+_hub = None
+_hub_lock = threading.Lock()
+
+
+def get_event_hub() -> ProgressEventHub:
+    """Return the process-wide progress event hub."""
+    global _hub
+    with _hub_lock:
+        if _hub is None:
+            _hub = ProgressEventHub(
+                buffer_size=getattr(settings, "SCAN_EVENTS_BUFFER_SIZE", 1000),
+                folder_interval=getattr(settings, "SCAN_EVENTS_FOLDER_INTERVAL", 1.0),
+                sync_interval=getattr(settings, "SCAN_EVENTS_SYNC_SECONDS", 5.0),
+                max_streams=getattr(settings, "SCAN_EVENTS_MAX_STREAMS", 8),
+            )
+        return _hub
+
+
+def publish_event(event_type: str, data: Dict) -> None:
+    """Publish a progress event; progress reporting never fails because of it."""
+    try:
+        get_event_hub().publish(event_type, data)
+    except Exception as e:
+        logger.debug(f"Could not publish {event_type} event: {e}")
+
+
+def folder_changed(folder_id: int) -> None:
+    get_event_hub().folder_changed(folder_id)
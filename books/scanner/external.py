@@ -9,12 +9,10 @@ import logging
 import re
 import traceback
 from difflib import SequenceMatcher
-from io import BytesIO
 
 import requests
 from django.conf import settings
 from django.core.cache import cache
-from PIL import Image
 
 from books.models import (
     BookAuthor,
@@ -27,9 +25,12 @@ from books.models import (
     Genre,
     Publisher,
 )
+from books.scanner import api_cache
 from books.scanner.rate_limiting import get_api_client
 from books.utils.author import attach_authors
 from books.utils.cache_key import make_cache_key
+from books.utils.cover_prefetch import prefetch_covers
+from books.utils.image_utils import probe_remote_image
 from books.utils.isbn import normalize_isbn
 from books.utils.language import normalize_language
 
@@ -203,31 +204,27 @@ def _safe_google_request(url, cache_key=None, retries=3):
     return google_client.make_request(base_url, params=params, cache_key=cache_key, cache_timeout=10800)  # 3 hours
 
 
-def _safe_apify_request(actor_name, input_payload, cache_key, token, timeout=3600):
+def _safe_apify_request(actor_name, input_payload, cache_key, token, timeout=3600, lookup_key=None):
     cached = cache.get(cache_key)
     if cached:
         return cached
 
+    stored = api_cache.get_cached_response("goodreads", lookup_key)
+    if stored is not api_cache.MISS:
+        return stored
+
     url = f"https://api.apify.com/v2/acts/{actor_name}/run-sync-get-dataset-items?token={token}"
     response = requests.post(url, json=input_payload, timeout=30)
     response.raise_for_status()
     data = response.json()
     cache.set(cache_key, data, timeout=timeout)
+    api_cache.store_response("goodreads", lookup_key, data)
     return data
 
 
 def get_image_metadata(url):
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        image = Image.open(BytesIO(response.content))
-        width, height = image.size
-        file_size = len(response.content)
-        format = image.format.lower()
-        return width, height, file_size, format
-    except Exception as e:
-        logger.warning(f"Metadata fetch failed for {url}: {str(e)}")
-        return None, None, None, None
+    """Return ``(width, height, file_size, format)`` for a remote cover, reading only its header."""
+    return probe_remote_image(url)
 
 
 def _query_open_library_combined(book, title, author, isbn=None):
@@ -237,6 +234,8 @@ def _query_open_library_combined(book, title, author, isbn=None):
         cover_source, _ = DataSource.objects.get_or_create(name=DataSource.OPEN_LIBRARY_COVERS, defaults={"trust_level": 0.7})
 
         # Build query - prefer ISBN if available
+        isbn = normalize_isbn(isbn) or isbn
+        lookup_key = api_cache.lookup_key(isbn=isbn, title=title, author=author)
         if isbn:
             qstring = f"isbn:{isbn}"
             cache_key = f"openlib_combined_isbn:{make_cache_key(isbn)}"
@@ -262,7 +261,7 @@ def _query_open_library_combined(book, title, author, isbn=None):
             logger.error("Open Library API client not available")
             return
 
-        data = open_library_client.make_request(url, params=params, cache_key=cache_key, cache_timeout=3600)  # 1 hour
+        data = open_library_client.make_request(url, params=params, cache_key=cache_key, cache_timeout=3600, lookup_key=lookup_key)  # 1 hour
 
         if not data:
             logger.info(f"[OPEN LIBRARY] No response for query: {qstring}")
@@ -318,6 +317,8 @@ def _query_google_books_combined(book, title, author, isbn=None):
         cover_source, _ = DataSource.objects.get_or_create(name=DataSource.GOOGLE_BOOKS_COVERS, defaults={"trust_level": 0.8})
 
         # Build query - prefer ISBN if available, otherwise use title/author
+        isbn = normalize_isbn(isbn) or isbn
+        lookup_key = api_cache.lookup_key(isbn=isbn, title=title, author=author)
         if isbn:
             query = f"isbn:{isbn}"
             cache_key = f"gbooks_combined_isbn:{make_cache_key(isbn)}"
@@ -336,7 +337,7 @@ def _query_google_books_combined(book, title, author, isbn=None):
             logger.error("Google Books API client not available")
             return
 
-        data = google_client.make_request(url, params=params, cache_key=cache_key, cache_timeout=10800)  # 3 hours
+        data = google_client.make_request(url, params=params, cache_key=cache_key, cache_timeout=10800, lookup_key=lookup_key)  # 3 hours
 
         if not data:
             logger.info(f"[GOOGLE BOOKS] No response for query: {query}")
@@ -402,7 +403,7 @@ def _query_goodreads_combined(book, title, author):
             "proxy": {"useApifyProxy": True},
         }
 
-        data = _safe_apify_request("epctex/goodreads-scraper", input_payload, cache_key, token)
+        data = _safe_apify_request("epctex/goodreads-scraper", input_payload, cache_key, token, lookup_key=api_cache.lookup_key(title=title, author=author))
 
         if not data:
             return
@@ -666,77 +667,47 @@ def _process_goodreads_metadata(book, source, result, confidence):
 
 
 # Cover processing functions
+def _store_remote_cover(book, source, image_url, confidence, label):
+    """Record a remote cover candidate and queue it for background download."""
+    width, height, file_size, format = get_image_metadata(image_url)
+
+    if format:  # Only proceed if we got valid image metadata
+        try:
+            BookCover.objects.update_or_create(
+                book=book,
+                cover_path=image_url,
+                source=source,
+                defaults={
+                    "confidence": confidence,
+                    "width": width,
+                    "height": height,
+                    "file_size": file_size,
+                    "format": format,
+                    "is_active": True,
+                },
+            )
+            prefetch_covers([image_url])
+        except Exception as e:
+            logger.warning(f"Failed to store {label} cover: {image_url}, error: {str(e)}")
+
+
 def _process_open_library_cover(book, source, doc, confidence):
     if doc.get("cover_i"):
         image_url = f"https://covers.openlibrary.org/b/id/{doc['cover_i']}-L.jpg"
-        width, height, file_size, format = get_image_metadata(image_url)
-
-        if format:  # Only proceed if we got valid image metadata
-            try:
-                BookCover.objects.update_or_create(
-                    book=book,
-                    cover_path=image_url,
-                    source=source,
-                    defaults={
-                        "confidence": confidence,
-                        "width": width,
-                        "height": height,
-                        "file_size": file_size,
-                        "format": format,
-                        "is_active": True,
-                    },
-                )
-            except Exception as e:
-                logger.warning(f"Failed to store Open Library cover: {image_url}, error: {str(e)}")
+        _store_remote_cover(book, source, image_url, confidence, "Open Library")
 
 
 def _process_google_books_cover(book, source, info, confidence):
     image_links = info.get("imageLinks", {})
     if image_links.get("thumbnail"):
         image_url = image_links["thumbnail"].replace("http://", "https://")
-        width, height, file_size, format = get_image_metadata(image_url)
-
-        if format:  # Only proceed if we got valid image metadata
-            try:
-                BookCover.objects.update_or_create(
-                    book=book,
-                    cover_path=image_url,
-                    source=source,
-                    defaults={
-                        "confidence": confidence,
-                        "width": width,
-                        "height": height,
-                        "file_size": file_size,
-                        "format": format,
-                        "is_active": True,
-                    },
-                )
-            except Exception as e:
-                logger.warning(f"Failed to store Google Books cover: {image_url}, error: {str(e)}")
+        _store_remote_cover(book, source, image_url, confidence, "Google Books")
 
 
 def _process_goodreads_cover(book, source, item, confidence):
     image_url = item.get("image")
     if image_url:
-        width, height, file_size, format = get_image_metadata(image_url)
-
-        if format:  # Only proceed if we got valid image metadata
-            try:
-                BookCover.objects.update_or_create(
-                    book=book,
-                    cover_path=image_url,
-                    source=source,
-                    defaults={
-                        "confidence": confidence,
-                        "width": width,
-                        "height": height,
-                        "file_size": file_size,
-                        "format": format,
-                        "is_active": True,
-                    },
-                )
-            except Exception as e:
-                logger.warning(f"Failed to store Goodreads cover: {image_url}, error: {str(e)}")
+        _store_remote_cover(book, source, image_url, confidence, "Goodreads")
 
 
 # Mock API client for testing
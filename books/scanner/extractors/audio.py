@@ -0,0 +1,247 @@
+"""Audio duration extraction from container headers.
+
+Reading a track's duration through mutagen parses all of its tags, which
+includes embedded cover art, and for VBR MP3s without a header it may scan
+the stream. Over a network share that is the bulk of an audiobook scan. The
+duration is already recorded in the headers of most files:
+
+- MP3: the Xing/Info or VBRI header in the first audio frame gives the frame
+  count; without one the file is CBR and size / bitrate is exact enough.
+- MP4 (M4B/M4A): the ``mvhd`` box inside ``moov`` holds timescale and
+  duration. ``moov`` is found by seeking from box header to box header, so
+  the media data is never read even when ``moov`` sits at the end.
+
+Other formats, and files whose headers can't be parsed, fall back to mutagen.
+"""
+
+import logging
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger("books.scanner")
+
+# Concurrent probes per audiobook; the work is waiting on file I/O
+DEFAULT_WORKERS = 8
+
+# How far past the ID3 tag to look for the first MPEG frame
+MP3_SYNC_WINDOW = 64 * 1024
+
+_MPEG_BITRATES = {
+    # (MPEG-1?, layer) -> kbps by bitrate index
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_MPEG_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),  # MPEG-1
+    2: (22050, 24000, 16000),  # MPEG-2
+    0: (11025, 12000, 8000),  # MPEG-2.5
+}
+_MP4_EXTENSIONS = {".m4a", ".m4b", ".mp4", ".aac"}
+
+
+def _parse_mpeg_frame_header(header: bytes) -> Optional[dict]:
+    """Decode a 4-byte MPEG audio frame header, or return None if it isn't one."""
+    if len(header) < 4 or header[0] != 0xFF or (header[1] & 0xE0) != 0xE0:
+        return None
+
+    version = (header[1] >> 3) & 0x03
+    layer = 4 - ((header[1] >> 1) & 0x03)
+    bitrate_index = header[2] >> 4
+    sample_rate_index = (header[2] >> 2) & 0x03
+    if version == 1 or layer == 4 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    mpeg1 = version == 3
+    bitrate = _MPEG_BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+    sample_rate = _MPEG_SAMPLE_RATES[version][sample_rate_index]
+    padding = (header[2] >> 1) & 0x01
+
+    if layer == 1:
+        samples_per_frame = 384
+        frame_length = (12 * bitrate // sample_rate + padding) * 4
+    else:
+        samples_per_frame = 1152 if (layer == 2 or mpeg1) else 576
+        frame_length = samples_per_frame // 8 * bitrate // sample_rate + padding
+
+    return {
+        "mpeg1": mpeg1,
+        "layer": layer,
+        "bitrate": bitrate,
+        "sample_rate": sample_rate,
+        "samples_per_frame": samples_per_frame,
+        "frame_length": frame_length,
+        "mono": (header[3] >> 6) == 3,
+    }
+
+
+def _mp3_duration(f, file_size: int) -> Optional[float]:
+    """Duration of an MP3 from its Xing/VBRI header, or from the bitrate for CBR files."""
+    start = 0
+    header = f.read(10)
+    if header[:3] == b"ID3" and len(header) == 10:
+        tag_size = (header[6] & 0x7F) << 21 | (header[7] & 0x7F) << 14 | (header[8] & 0x7F) << 7 | (header[9] & 0x7F)
+        start = 10 + tag_size + (10 if header[5] & 0x10 else 0)
+
+    f.seek(start)
+    data = f.read(MP3_SYNC_WINDOW)
+
+    frame = None
+    offset = data.find(b"\xff")
+    while 0 <= offset < len(data) - 4:
+        frame = _parse_mpeg_frame_header(data[offset : offset + 4])
+        if frame:
+            # A real frame is followed by another one (unless it ends the window)
+            following = offset + frame["frame_length"]
+            if following + 4 > len(data) or _parse_mpeg_frame_header(data[following : following + 4]):
+                break
+            frame = None
+        offset = data.find(b"\xff", offset + 1)
+
+    if not frame:
+        return None
+
+    samples = frame["samples_per_frame"]
+    side_info = (32 if not frame["mono"] else 17) if frame["mpeg1"] else (17 if not frame["mono"] else 9)
+    xing = offset + 4 + side_info
+    if data[xing : xing + 4] in (b"Xing", b"Info"):
+        (flags,) = struct.unpack(">I", data[xing + 4 : xing + 8])
+        if flags & 0x01:
+            (frames,) = struct.unpack(">I", data[xing + 8 : xing + 12])
+            return frames * samples / frame["sample_rate"]
+
+    vbri = offset + 4 + 32
+    if data[vbri : vbri + 4] == b"VBRI":
+        (frames,) = struct.unpack(">I", data[vbri + 14 : vbri + 18])
+        return frames * samples / frame["sample_rate"]
+
+    # No VBR header: constant bitrate
+    audio_end = file_size
+    if file_size >= 128:
+        f.seek(file_size - 128)
+        if f.read(3) == b"TAG":
+            audio_end -= 128
+    return max(0, audio_end - start - offset) * 8 / frame["bitrate"]
+
+
+def _read_box_header(f, position: int, end: int):
+    """Return ``(box_type, header_size, box_size)`` for the MP4 box at ``position``, or None past ``end``."""
+    if position + 8 > end:
+        return None
+    f.seek(position)
+    header = f.read(8)
+    if len(header) < 8:
+        return None
+
+    size, box_type = struct.unpack(">I4s", header)
+    header_size = 8
+    if size == 1:
+        (size,) = struct.unpack(">Q", f.read(8))
+        header_size = 16
+    elif size == 0:
+        size = end - position
+    if size < header_size:
+        return None
+    return box_type, header_size, size
+
+
+def _find_box(f, box_type: bytes, start: int, end: int):
+    """Position and size of the payload of the first ``box_type`` box between ``start`` and ``end``."""
+    position = start
+    while True:
+        box = _read_box_header(f, position, end)
+        if box is None:
+            return None
+        found_type, header_size, size = box
+        if found_type == box_type:
+            return position + header_size, size - header_size
+        position += size
+
+
+def _mp4_duration(f, file_size: int) -> Optional[float]:
+    """Duration of an MP4/M4B from the movie header (``moov/mvhd``)."""
+    moov = _find_box(f, b"moov", 0, file_size)
+    if moov is None:
+        return None
+    mvhd = _find_box(f, b"mvhd", moov[0], moov[0] + moov[1])
+    if mvhd is None:
+        return None
+
+    f.seek(mvhd[0])
+    data = f.read(32)
+    if data[:1] == b"\x01":
+        timescale, duration = struct.unpack(">IQ", data[20:32])
+    else:
+        timescale, duration = struct.unpack(">II", data[12:20])
+
+    if not timescale or not duration:
+        return None
+    return duration / timescale
+
+
+def probe_header_duration(file_path: str) -> Optional[float]:
+    """
+    Read a track's duration from its container headers only.
+
+    Returns:
+        Duration in seconds, or None if the format isn't supported or the
+        headers don't give a duration
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension != ".mp3" and extension not in _MP4_EXTENSIONS:
+        return None
+
+    try:
+        file_size = os.path.getsize(file_path)
+        with open(file_path, "rb") as f:
+            if extension == ".mp3":
+                return _mp3_duration(f, file_size)
+
+            # .aac may be raw ADTS rather than MP4; check for an ftyp box first
+            f.seek(4)
+            if extension == ".aac" and f.read(4) != b"ftyp":
+                return None
+            return _mp4_duration(f, file_size)
+    except (OSError, struct.error) as e:
+        logger.debug(f"Could not read audio headers of {file_path}: {e}")
+        return None
+
+
+def extract_duration(file_path: str) -> int:
+    """Extract the duration of an audio file in seconds, falling back to mutagen."""
+    duration = probe_header_duration(file_path)
+    if duration:
+        return int(duration)
+
+    try:
+        from mutagen import File
+
+        audio_file = File(file_path)
+        if audio_file and hasattr(audio_file, "info"):
+            return int(audio_file.info.length)
+    except ImportError:
+        logger.warning("Mutagen not available for audio duration extraction")
+    except Exception as e:
+        logger.warning(f"Error extracting duration from {file_path}: {e}")
+
+    return 0
+
+
+def extract_durations(file_paths: Iterable[str], workers: int = DEFAULT_WORKERS) -> Dict[str, int]:
+    """
+    Extract durations for several files concurrently.
+
+    Returns:
+        Mapping of file path to duration in seconds (0 when unknown)
+    """
+    file_paths = list(file_paths)
+    if workers <= 1 or len(file_paths) <= 1:
+        return {path: extract_duration(path) for path in file_paths}
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(file_paths)), thread_name_prefix="audio-duration") as executor:
+        return dict(zip(file_paths, executor.map(extract_duration, file_paths)))
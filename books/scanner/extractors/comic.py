@@ -23,7 +23,6 @@ from django.conf import settings
 from PIL import Image
 
 from books.models import (
-    Book,
     BookCover,
     BookMetadata,
     BookPublisher,
@@ -31,6 +30,13 @@ from books.models import (
     DataSource,
     Publisher,
 )
+from books.utils.comic_index import (
+    SPECIAL_ISSUE_TYPES,
+    normalize_series_key,
+    refresh_comic_issue,
+    series_gaps,
+    series_summaries,
+)
 
 logger = logging.getLogger("books.scanner")
 
@@ -583,6 +589,7 @@ def _save_comic_metadata(book, extracted_data, filename_metadata, source):
         metadata_fields = {
             "series": "series",
             "issue": "issue_number",
+            "issue_type": "issue_type",
             "volume": "volume_number",
             "year": "publication_year",
             "summary": "description",
@@ -604,29 +611,36 @@ def _save_comic_metadata(book, extracted_data, filename_metadata, source):
                     },
                 )
 
+        refresh_comic_issue(book)
+
     except Exception as e:
         logger.warning(f"Failed to save comic metadata: {e}")
 
 
 def analyze_comic_series(series_name, publisher=None):
-    """Analyze completeness of a comic series"""
-    from django.db.models import Q
+    """Analyze completeness of a comic series using the comic issue index"""
+    from django.db.models import Prefetch
+
+    from books.models import BookFile, ComicIssue
 
     try:
-        # Find all books in the series
-        series_filter = Q(metadata__field_name="series", metadata__field_value__iexact=series_name)
+        series_key = normalize_series_key(series_name)
+        issues = ComicIssue.objects.filter(series_key=series_key)
         if publisher:
-            series_filter &= Q(finalmetadata__final_publisher__iexact=publisher)
-
-        series_books = Book.objects.filter(series_filter).distinct()
+            issues = issues.filter(publisher__iexact=publisher)
 
-        if not series_books.exists():
+        issues = list(
+            issues.select_related("book__finalmetadata")
+            .prefetch_related(Prefetch("book__files", queryset=BookFile.objects.order_by("id"), to_attr="prefetched_files"))
+            .order_by("issue_number", "book_id")
+        )
+        if not issues:
             return None
 
         analysis = {
             "series_name": series_name,
             "publisher": publisher,
-            "total_books": series_books.count(),
+            "total_books": len(issues),
             "main_series_issues": [],
             "annuals": [],
             "specials": [],
@@ -637,18 +651,15 @@ def analyze_comic_series(series_name, publisher=None):
         }
 
         # Categorize issues by type
-        for book in series_books:
-            issue_info = _get_comic_issue_info(book)
+        extras = _get_comic_issue_extras([issue.book_id for issue in issues])
+        for issue in issues:
+            issue_info = _get_comic_issue_info(issue, extras.get(issue.book_id, {}))
 
             if issue_info["issue_type"] == "main_series":
                 analysis["main_series_issues"].append(issue_info)
             elif issue_info["issue_type"] == "annual":
                 analysis["annuals"].append(issue_info)
-            elif issue_info["issue_type"] in [
-                "special",
-                "holiday_special",
-                "giant_size",
-            ]:
+            elif issue_info["issue_type"] in SPECIAL_ISSUE_TYPES:
                 analysis["specials"].append(issue_info)
             elif issue_info["issue_type"] == "collection":
                 analysis["collections"].append(issue_info)
@@ -659,7 +670,7 @@ def analyze_comic_series(series_name, publisher=None):
 
         # Analyze main series completeness
         if analysis["main_series_issues"]:
-            analysis["completeness_analysis"] = _analyze_main_series_completeness(analysis["main_series_issues"])
+            analysis["completeness_analysis"] = _analyze_main_series_completeness(series_key, publisher, analysis["main_series_issues"])
 
         return analysis
 
@@ -668,152 +679,73 @@ def analyze_comic_series(series_name, publisher=None):
         return None
 
 
-def _get_comic_issue_info(book):
-    """Extract issue information from a comic book"""
-    info = {
-        "book_id": book.id,
-        "file_path": book.file_path,
-        "issue_type": "unknown",
-        "issue_number": None,
-        "annual_number": None,
-        "volume": None,
-        "year": None,
-        "is_variant": False,
-        "story_arc": None,
-        "title": (book.finalmetadata.final_title if hasattr(book, "finalmetadata") else ""),
-    }
+def _get_comic_issue_extras(book_ids):
+    """Load the non-indexed issue details of several books in one query"""
+    extras = {}
+    rows = (
+        BookMetadata.objects.filter(book_id__in=book_ids, field_name__in=["annual_number", "publication_year", "is_variant", "story_arc"], is_active=True)
+        .order_by("book_id", "field_name", "-confidence")
+        .values_list("book_id", "field_name", "field_value")
+    )
+    for book_id, field_name, field_value in rows:
+        extras.setdefault(book_id, {}).setdefault(field_name, field_value)
+    return extras
 
-    # Get metadata from database
-    metadata_fields = {
-        "issue_type": book.metadata.filter(field_name="issue_type").first(),
-        "issue_number": book.metadata.filter(field_name="issue_number").first(),
-        "annual_number": book.metadata.filter(field_name="annual_number").first(),
-        "volume_number": book.metadata.filter(field_name="volume_number").first(),
-        "publication_year": book.metadata.filter(field_name="publication_year").first(),
-        "is_variant": book.metadata.filter(field_name="is_variant").first(),
-        "story_arc": book.metadata.filter(field_name="story_arc").first(),
-    }
 
-    # Extract values
-    for field, metadata in metadata_fields.items():
-        if metadata:
-            value = metadata.field_value
-            if field in [
-                "issue_number",
-                "annual_number",
-                "volume_number",
-                "publication_year",
-            ]:
-                try:
-                    info[field] = float(value) if "." in value else int(value)
-                except (ValueError, TypeError):
-                    info[field] = value
-            elif field == "is_variant":
-                info[field] = value.lower() in ["true", "1", "yes"]
-            else:
-                info[field] = value
+def _number_or_value(value):
+    try:
+        return float(value) if "." in value else int(value)
+    except (ValueError, TypeError):
+        return value
 
-    return info
 
+def _get_comic_issue_info(issue, extras):
+    """Build issue information from an index row and its extra metadata"""
+    book = issue.book
+    number = issue.issue_number
+    final_metadata = getattr(book, "finalmetadata", None)
 
-def _analyze_main_series_completeness(main_series_issues):
-    """Analyze completeness of main series issues"""
-    if not main_series_issues:
-        return {"is_complete": False, "missing_issues": [], "gap_analysis": []}
+    return {
+        "book_id": book.id,
+        "file_path": book.file_path,
+        "issue_type": issue.issue_type,
+        "issue_number": (int(number) if number == int(number) else float(number)) if number is not None else None,
+        "annual_number": _number_or_value(extras["annual_number"]) if "annual_number" in extras else None,
+        "volume": issue.volume,
+        "year": _number_or_value(extras["publication_year"]) if "publication_year" in extras else None,
+        "is_variant": extras.get("is_variant", "").lower() in ["true", "1", "yes"],
+        "story_arc": extras.get("story_arc"),
+        "title": final_metadata.final_title if final_metadata else "",
+    }
 
-    # Sort by issue number
-    sorted_issues = sorted(
-        [issue for issue in main_series_issues if issue["issue_number"] is not None],
-        key=lambda x: float(x["issue_number"]),
-    )
 
-    if not sorted_issues:
-        return {"is_complete": False, "missing_issues": [], "gap_analysis": []}
+def _analyze_main_series_completeness(series_key, publisher, main_series_issues):
+    """Analyze completeness of main series issues; gaps come from the database"""
+    summaries = series_summaries([series_key], publisher)
+    summary = summaries[0] if summaries else None
 
-    # Analyze gaps
-    issue_numbers = [float(issue["issue_number"]) for issue in sorted_issues]
-    min_issue = min(issue_numbers)
-    max_issue = max(issue_numbers)
+    if not summary or summary["first_issue"] is None:
+        return {"is_complete": False, "missing_issues": [], "gap_analysis": []}
 
     missing_issues = []
     gap_analysis = []
-
-    # Check for gaps in sequence (assuming integer issue numbers mostly)
-    if min_issue == int(min_issue) and max_issue == int(max_issue):
-        expected_range = range(int(min_issue), int(max_issue) + 1)
-        present_issues = set(int(num) for num in issue_numbers if num == int(num))
-        missing_issues = [num for num in expected_range if num not in present_issues]
-
-        # Group consecutive missing issues into ranges
-        if missing_issues:
-            gap_start = missing_issues[0]
-            gap_end = missing_issues[0]
-
-            for i in range(1, len(missing_issues)):
-                if missing_issues[i] == missing_issues[i - 1] + 1:
-                    gap_end = missing_issues[i]
-                else:
-                    # End of current gap
-                    if gap_start == gap_end:
-                        gap_analysis.append(f"#{gap_start}")
-                    else:
-                        gap_analysis.append(f"#{gap_start}-#{gap_end}")
-                    gap_start = gap_end = missing_issues[i]
-
-            # Add final gap
-            if gap_start == gap_end:
-                gap_analysis.append(f"#{gap_start}")
-            else:
-                gap_analysis.append(f"#{gap_start}-#{gap_end}")
-
-    completeness_percentage = len(sorted_issues) / (max_issue - min_issue + 1) * 100 if max_issue > min_issue else 100
+    for gap_start, gap_end in series_gaps(series_key, publisher):
+        missing_issues.extend(range(gap_start, gap_end + 1))
+        gap_analysis.append(f"#{gap_start}" if gap_start == gap_end else f"#{gap_start}-#{gap_end}")
 
     return {
-        "is_complete": len(missing_issues) == 0,
-        "total_issues": len(sorted_issues),
-        "issue_range": f"#{int(min_issue)}-#{int(max_issue)}",
+        "is_complete": summary["is_complete"],
+        "total_issues": sum(1 for issue in main_series_issues if issue["issue_number"] is not None),
+        "issue_range": f"#{summary['first_issue']}-#{summary['last_issue']}",
         "missing_issues": missing_issues,
         "gap_analysis": gap_analysis,
-        "completeness_percentage": round(completeness_percentage, 1),
+        "completeness_percentage": summary["completeness_percentage"],
     }
 
 
 def get_comic_series_list():
-    """Get a list of all comic series with their basic info"""
-    from django.db.models import Count
-
-    from books.models import BookMetadata
-
-    # Get all series from comics
-    comic_series = (
-        BookMetadata.objects.filter(field_name="series", book__files__file_path__iregex=r"\.(cbr|cbz)$")
-        .values("field_value")
-        .annotate(book_count=Count("book", distinct=True))
-        .order_by("field_value")
-    )
-
-    series_list = []
-    for series_data in comic_series:
-        series_name = series_data["field_value"]
-
-        # Get publisher if available
-        publisher = BookMetadata.objects.filter(
-            field_name="publisher",
-            book__metadata__field_name="series",
-            book__metadata__field_value=series_name,
-        ).first()
-
-        publisher_name = publisher.field_value if publisher else None
-
-        series_list.append(
-            {
-                "name": series_name,
-                "publisher": publisher_name,
-                "book_count": series_data["book_count"],
-            }
-        )
-
-    return series_list
+    """Get a list of all comic series with their counts and completeness"""
+    return [dict(summary, publisher=summary["publisher"] or None) for summary in series_summaries()]
 
 
 def _enrich_with_comicvine(book, extracted_data):
@@ -27,6 +27,7 @@ from books.models import (
     DataSource,
     Publisher,
 )
+from books.scanner import api_cache
 from books.scanner.rate_limiting import get_api_client
 
 logger = logging.getLogger("books.scanner")
@@ -41,8 +42,13 @@ class ComicVineAPI:
         self.api_key = getattr(settings, "COMICVINE_API_KEY", None)
         self.client = get_api_client("comic_vine")
 
-    def _make_request(self, endpoint: str, params: Dict) -> Optional[Dict]:
-        """Make a request to the Comic Vine API using centralized rate limiting."""
+    def _make_request(self, endpoint: str, params: Dict, lookup_key: Optional[str] = None) -> Optional[Dict]:
+        """Make a request to the Comic Vine API using centralized rate limiting.
+
+        Searches pass a ``lookup_key`` from ``api_cache.comicvine_key`` so the
+        stored response is shared by every book with the same normalized
+        query; requests for a Comic Vine id are keyed on the request itself.
+        """
         if not self.api_key:
             logger.warning("[COMICVINE] API key not configured")
             return None
@@ -54,7 +60,8 @@ class ComicVineAPI:
         params.update({"api_key": self.api_key, "format": "json"})
 
         url = f"{self.BASE_URL}/{endpoint}/"
-        cache_key = f"comicvine_{endpoint}_{hash(str(sorted(params.items())))}"
+        lookup_key = lookup_key or api_cache.request_key(endpoint, params)
+        cache_key = f"comicvine_{lookup_key}"
 
         try:
             logger.debug(f"[COMICVINE REQUEST] {endpoint} with params: {params}")
@@ -64,6 +71,7 @@ class ComicVineAPI:
                 params=params,
                 cache_key=cache_key,
                 cache_timeout=3600,  # 1 hour cache for Comic Vine data
+                lookup_key=lookup_key,
             )
 
             if not data:
@@ -88,7 +96,7 @@ class ComicVineAPI:
             "field_list": "id,name,publisher,start_year,count_of_issues,deck,image",
         }
 
-        result = self._make_request("search", params)
+        result = self._make_request("search", params, lookup_key=api_cache.comicvine_key("volume", series_name, limit))
         if result and result.get("results"):
             return result["results"]
         return []
@@ -136,7 +144,7 @@ class ComicVineAPI:
             "field_list": "id,name,issue_number,cover_date,store_date,deck,description,image,person_credits,volume",
         }
 
-        result = self._make_request("search", params)
+        result = self._make_request("search", params, lookup_key=api_cache.comicvine_key("issue", query, limit))
         if result and result.get("results"):
             # Return the first (best match) issue
             return result["results"][0] if result["results"] else None
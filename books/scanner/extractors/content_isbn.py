@@ -6,79 +6,159 @@ copyright pages, or back cover sections.
 """
 
 import logging
+import posixpath
 import re
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from html import unescape
 from pathlib import Path
+from xml.etree import ElementTree
 
-from books.models import BookMetadata, DataSource
+import django
+from django.db.models import Prefetch
+
+from books.models import Book, BookFile, BookMetadata, DataSource
 from books.utils.isbn import is_valid_isbn10, is_valid_isbn13, normalize_isbn
 
 logger = logging.getLogger("books.scanner")
 
+CONTENT_EXTENSIONS = {".epub", ".pdf", ".mobi", ".azw", ".azw3"}
+DEFAULT_TIME_BUDGET = 20  # Seconds per file before giving up on the remaining pages
+
+# Spine items named like these hold the ISBN far more often than chapters do
+_LIKELY_ISBN_ITEM_RE = re.compile(r"(?i)copyright|colophon|imprint|legal|rights|isbn|titlepage|title[-_]?page|front[-_]?matter")
+
+_ISBN_PREFIX_RE = re.compile(r"(?i)(?:ISBN(?:-?1[03])?|International\s+Standard\s+Book\s+Number)[-:\s]*([0-9-\s]+[0-9Xx])")
+_ISBN13_RE = re.compile(r"\b(97[89][0-9]{10})\b")
+_COPYRIGHT_CONTEXT_RE = re.compile(r"(?i)(?:copyright|published|edition|print).*?([0-9]{10,13})")
+_SEPARATOR_RE = re.compile(r"[-\s]")
+_ISBN_SHAPE_RE = re.compile(r"^[0-9]{9}[0-9Xx]$|^[0-9]{13}$")
+_NON_ISBN_CHAR_RE = re.compile(r"[^0-9Xx]")
 
-def extract_isbn_from_content(book, page_limit=10):
+_SCRIPT_STYLE_RE = re.compile(r"(?is)<(script|style)\b.*?</\1\s*>")
+_TAG_RE = re.compile(r"<[^>]+>")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def extract_isbn_from_content(book, page_limit=10, time_budget=DEFAULT_TIME_BUDGET):
     """
-    Extract ISBN numbers from ebook content by scanning the first and last pages.
+    Extract ISBN numbers from ebook content by scanning the pages most likely to hold them.
 
     Args:
         book: Book model instance
         page_limit: Number of pages to scan from beginning and end (default: 10)
+        time_budget: Seconds to spend on the file before giving up (None for no limit)
 
     Returns:
         list: List of valid ISBN numbers found
     """
     try:
-        file_path = Path(book.file_path)
-        file_extension = file_path.suffix.lower()
-
-        # Route to appropriate extractor based on file type
-        if file_extension == ".epub":
-            return _extract_from_epub(book, page_limit)
-        elif file_extension == ".pdf":
-            return _extract_from_pdf(book, page_limit)
-        elif file_extension in [".mobi", ".azw", ".azw3"]:
-            return _extract_from_mobi(book, page_limit)
-        else:
-            logger.warning(f"Unsupported file type for content ISBN extraction: {file_extension}")
-            return []
-
+        return scan_content_isbn(book.file_path, page_limit, time_budget)
     except Exception as e:
         logger.error(f"Content ISBN extraction failed for {book.file_path}: {e}")
         return []
 
 
-def _extract_from_epub(book, page_limit):
-    """Extract ISBNs from EPUB content."""
+def scan_content_isbn(file_path, page_limit=10, time_budget=DEFAULT_TIME_BUDGET):
+    """
+    Scan one file for ISBNs without touching the database, so it can run in a worker process.
+
+    Likely pages are read first - copyright/colophon items, then the first and
+    last ``page_limit`` pages - and scanning stops after the first page that
+    yields a valid ISBN or when ``time_budget`` seconds have passed.
+
+    Returns:
+        list: Valid ISBN-13 numbers found on that page
+    """
+    file_extension = Path(file_path).suffix.lower()
+    deadline = time.monotonic() + time_budget if time_budget else None
+
+    # Route to appropriate extractor based on file type
+    if file_extension == ".epub":
+        return _extract_from_epub(file_path, page_limit, deadline)
+    elif file_extension == ".pdf":
+        return _extract_from_pdf(file_path, page_limit, deadline)
+    elif file_extension in [".mobi", ".azw", ".azw3"]:
+        return _extract_from_mobi(file_path, page_limit)
+    else:
+        logger.warning(f"Unsupported file type for content ISBN extraction: {file_extension}")
+        return []
+
+
+def _likely_page_order(total, page_limit):
+    """Indexes of the first and last ``page_limit`` pages: front to back, then the back matter from the end."""
+    front = list(range(min(page_limit, total)))
+    back = [index for index in range(total - 1, max(total - page_limit, page_limit) - 1, -1)]
+    return front + back
+
+
+def _scan_pages(pages, describe, deadline):
+    """
+    Run the ISBN patterns over ``(name, get_text)`` pairs until one yields a valid ISBN.
+
+    Returns:
+        list: The valid ISBNs from the first page that had any
+    """
+    for name, get_text in pages:
+        if deadline is not None and time.monotonic() > deadline:
+            logger.info(f"Content ISBN scan of {describe} stopped: time budget exhausted")
+            break
+        try:
+            isbns = _validate_and_dedupe_isbns(_find_isbn_patterns(get_text()))
+        except Exception as e:
+            logger.debug(f"Failed to process {name} of {describe}: {e}")
+            continue
+        if isbns:
+            return isbns
+    return []
+
+
+def _epub_spine(epub_zip):
+    """Return the spine's document paths, in reading order, from the package's OPF."""
+    container = ElementTree.fromstring(epub_zip.read("META-INF/container.xml"))
+    rootfile = container.find(".//{*}rootfile")
+    opf_path = rootfile.get("full-path")
+    opf = ElementTree.fromstring(epub_zip.read(opf_path))
+
+    opf_dir = posixpath.dirname(opf_path)
+    manifest = {item.get("id"): posixpath.normpath(posixpath.join(opf_dir, item.get("href", ""))) for item in opf.iterfind(".//{*}manifest/{*}item")}
+    return [manifest[ref.get("idref")] for ref in opf.iterfind(".//{*}spine/{*}itemref") if ref.get("idref") in manifest]
+
+
+def _prioritize_items(names, page_limit):
+    """Likely-named items first, then the first and last ``page_limit`` items."""
+    likely = [index for index, name in enumerate(names) if _LIKELY_ISBN_ITEM_RE.search(posixpath.basename(name))]
+    ordered = likely + [index for index in _likely_page_order(len(names), page_limit) if index not in likely]
+    return ordered
+
+
+def _extract_from_epub(file_path, page_limit, deadline=None):
+    """Extract ISBNs from EPUB content, reading only the candidate spine items from the archive."""
+    try:
+        with zipfile.ZipFile(file_path) as epub_zip:
+            names = _epub_spine(epub_zip)
+            pages = ((names[index], lambda name=names[index]: _extract_text_from_html(epub_zip.read(name).decode("utf-8", errors="ignore"))) for index in _prioritize_items(names, page_limit))
+            return _scan_pages(pages, file_path, deadline)
+    except (OSError, KeyError, AttributeError, zipfile.BadZipFile, ElementTree.ParseError) as e:
+        logger.debug(f"Could not read EPUB spine of {file_path} ({e}), falling back to ebooklib")
+        return _extract_from_epub_with_ebooklib(file_path, page_limit, deadline)
+
+
+def _extract_from_epub_with_ebooklib(file_path, page_limit, deadline=None):
+    """Slower path for packages whose container or OPF can't be parsed directly."""
     try:
         from ebooklib import epub
 
-        epub_book = epub.read_epub(book.file_path)
-        isbn_candidates = []
+        epub_book = epub.read_epub(file_path)
 
         # Get all text items (chapters, pages)
         items = [item for item in epub_book.get_items() if item.get_type() == 9]  # ITEM_DOCUMENT
+        names = [getattr(item, "file_name", "") or "" for item in items]
+        names = [name if isinstance(name, str) else "" for name in names]
 
-        # Scan first few items (usually contain title/copyright pages)
-        for i, item in enumerate(items[:page_limit]):
-            try:
-                content = item.get_content().decode("utf-8", errors="ignore")
-                text = _extract_text_from_html(content)
-                isbn_candidates.extend(_find_isbn_patterns(text))
-            except Exception as e:
-                logger.debug(f"Failed to process EPUB item {i}: {e}")
-                continue
-
-        # Scan last few items (might contain back cover info)
-        if len(items) > page_limit:
-            for i, item in enumerate(items[-page_limit:]):
-                try:
-                    content = item.get_content().decode("utf-8", errors="ignore")
-                    text = _extract_text_from_html(content)
-                    isbn_candidates.extend(_find_isbn_patterns(text))
-                except Exception as e:
-                    logger.debug(f"Failed to process EPUB item {len(items)-page_limit+i}: {e}")
-                    continue
-
-        return _validate_and_dedupe_isbns(isbn_candidates)
+        pages = ((f"item {index}", lambda item=items[index]: _extract_text_from_html(item.get_content().decode("utf-8", errors="ignore"))) for index in _prioritize_items(names, page_limit))
+        return _scan_pages(pages, file_path, deadline)
 
     except ImportError:
         logger.warning("ebooklib not available for EPUB content scanning")
@@ -88,37 +168,16 @@ def _extract_from_epub(book, page_limit):
         return []
 
 
-def _extract_from_pdf(book, page_limit):
-    """Extract ISBNs from PDF content."""
+def _extract_from_pdf(file_path, page_limit, deadline=None):
+    """Extract ISBNs from PDF content, front pages first and then back pages from the end."""
     try:
         from PyPDF2 import PdfReader
 
-        reader = PdfReader(book.file_path)
-        isbn_candidates = []
+        reader = PdfReader(file_path)
         total_pages = len(reader.pages)
 
-        # Scan first pages
-        for i in range(min(page_limit, total_pages)):
-            try:
-                page = reader.pages[i]
-                text = page.extract_text()
-                isbn_candidates.extend(_find_isbn_patterns(text))
-            except Exception as e:
-                logger.debug(f"Failed to extract text from PDF page {i}: {e}")
-                continue
-
-        # Scan last pages
-        start_page = max(total_pages - page_limit, page_limit)  # Avoid double-scanning
-        for i in range(start_page, total_pages):
-            try:
-                page = reader.pages[i]
-                text = page.extract_text()
-                isbn_candidates.extend(_find_isbn_patterns(text))
-            except Exception as e:
-                logger.debug(f"Failed to extract text from PDF page {i}: {e}")
-                continue
-
-        return _validate_and_dedupe_isbns(isbn_candidates)
+        pages = ((f"page {index}", lambda index=index: reader.pages[index].extract_text()) for index in _likely_page_order(total_pages, page_limit))
+        return _scan_pages(pages, file_path, deadline)
 
     except ImportError:
         logger.warning("PyPDF2 not available for PDF content scanning")
@@ -128,12 +187,12 @@ def _extract_from_pdf(book, page_limit):
         return []
 
 
-def _extract_from_mobi(book, page_limit):
+def _extract_from_mobi(file_path, page_limit):
     """Extract ISBNs from MOBI content."""
     try:
         # Try to use mobidedrm or similar library if available
         # For now, return empty list as MOBI parsing is complex
-        logger.info(f"MOBI content ISBN extraction not yet implemented for {book.file_path}")
+        logger.info(f"MOBI content ISBN extraction not yet implemented for {file_path}")
         return []
 
     except Exception as e:
@@ -142,31 +201,10 @@ def _extract_from_mobi(book, page_limit):
 
 
 def _extract_text_from_html(html_content):
-    """Extract plain text from HTML content."""
-    try:
-        from bs4 import BeautifulSoup
-
-        soup = BeautifulSoup(html_content, "html.parser")
-
-        # Remove script and style elements
-        for script in soup(["script", "style"]):
-            script.decompose()
-
-        # Get text and clean it up
-        text = soup.get_text()
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        return " ".join(chunk for chunk in chunks if chunk)
-
-    except ImportError:
-        # Fallback: simple HTML tag removal
-        import re
-
-        text = re.sub("<[^<]+?>", "", html_content)
-        return text
-    except Exception as e:
-        logger.debug(f"HTML text extraction failed: {e}")
-        return html_content
+    """Extract plain text from HTML content (tags, scripts and styles removed)."""
+    text = _SCRIPT_STYLE_RE.sub(" ", html_content)
+    text = _TAG_RE.sub(" ", text)
+    return _WHITESPACE_RE.sub(" ", unescape(text)).strip()
 
 
 def _find_isbn_patterns(text):
@@ -174,9 +212,9 @@ def _find_isbn_patterns(text):
     Find potential ISBN patterns in text.
 
     Looks for:
-    - "ISBN" followed by 10 or 13 digits
+    - "ISBN" (or "International Standard Book Number") followed by 10 or 13 digits
     - 13-digit numbers starting with 978 or 979
-    - 10-digit numbers in common ISBN formats
+    - 10 to 13 digit numbers near copyright or publication info
     """
     isbn_candidates = []
 
@@ -185,34 +223,18 @@ def _find_isbn_patterns(text):
 
     # Pattern 1: ISBN prefix followed by number (with or without hyphens)
     # Matches ISBN: 9780134685991 or ISBN-13: 978-0-13-468599-1
-    isbn_pattern = r"(?i)ISBN(?:-?1[03])?[-:\s]*([0-9-\s]+[0-9Xx])"
-    matches = re.finditer(isbn_pattern, text)
-    for match in matches:
+    for match in _ISBN_PREFIX_RE.finditer(text):
         # Remove hyphens and spaces for consistent format
-        clean_isbn = re.sub(r"[-\s]", "", match.group(1))
+        clean_isbn = _SEPARATOR_RE.sub("", match.group(1))
         # Only keep if it's 10 or 13 digits (plus optional X)
-        if re.match(r"^[0-9]{9}[0-9Xx]$|^[0-9]{13}$", clean_isbn):
+        if _ISBN_SHAPE_RE.match(clean_isbn):
             isbn_candidates.append(clean_isbn)
 
     # Pattern 2: 13-digit numbers starting with 978 or 979 (standard ISBN-13 prefixes)
-    isbn13_pattern = r"\b(97[89][0-9]{10})\b"
-    matches = re.finditer(isbn13_pattern, text)
-    for match in matches:
-        isbn_candidates.append(match.group(1))
-
-    # Pattern 3: 10-digit ISBN patterns (more restrictive to avoid false positives)
-    # Look for 10-digit numbers with specific formatting or context
-    isbn10_context_pattern = r"(?i)(?:ISBN|International\s+Standard\s+Book\s+Number)[-:\s]*([0-9-\s]+[0-9Xx])"
-    matches = re.finditer(isbn10_context_pattern, text)
-    for match in matches:
-        clean_isbn = re.sub(r"[-\s]", "", match.group(1))
-        if re.match(r"^[0-9]{9}[0-9Xx]$|^[0-9]{13}$", clean_isbn):
-            isbn_candidates.append(clean_isbn)
+    isbn_candidates.extend(match.group(1) for match in _ISBN13_RE.finditer(text))
 
-    # Pattern 4: Look for numbers near copyright or publication info
-    copyright_context = r"(?i)(?:copyright|published|edition|print).*?([0-9]{10,13})"
-    matches = re.finditer(copyright_context, text)
-    for match in matches:
+    # Pattern 3: Look for numbers near copyright or publication info
+    for match in _COPYRIGHT_CONTEXT_RE.finditer(text):
         candidate = match.group(1)
         # Only consider if it looks like an ISBN (10 or 13 digits)
         if len(candidate) in [10, 13]:
@@ -238,7 +260,7 @@ def _validate_and_dedupe_isbns(candidates):
             continue
 
         # Clean the candidate
-        cleaned = re.sub(r"[^0-9Xx]", "", candidate)
+        cleaned = _NON_ISBN_CHAR_RE.sub("", candidate)
 
         if len(cleaned) == 10:
             if is_valid_isbn10(cleaned):
@@ -253,6 +275,53 @@ def _validate_and_dedupe_isbns(candidates):
     return list(valid_isbns)
 
 
+def _get_content_scan_source():
+    source, created = DataSource.objects.get_or_create(
+        name=DataSource.CONTENT_SCAN,
+        defaults={
+            "trust_level": 0.85,  # Will be overridden by bootstrap if already exists
+        },
+    )
+    return source
+
+
+def _store_content_isbns(book, isbns, source=None):
+    """
+    Save extracted ISBNs as content-scan metadata for a book.
+
+    Returns:
+        int: Number of ISBNs that weren't stored before
+    """
+    if not isbns:
+        logger.info(f"No ISBNs found in content for {book.file_path}")
+        return 0
+
+    source = source or _get_content_scan_source()
+
+    # Save each unique ISBN as metadata
+    saved_count = 0
+    for isbn in isbns:
+        try:
+            metadata, created = BookMetadata.objects.get_or_create(
+                book=book,
+                field_name="isbn",
+                field_value=isbn,
+                source=source,
+                defaults={"confidence": source.trust_level},  # Use source's trust level
+            )
+            if created:
+                saved_count += 1
+                logger.info(f"Found ISBN in content: {isbn} for {book.file_path}")
+        except Exception as e:
+            logger.warning(f"Failed to save content ISBN {isbn}: {e}")
+
+    if saved_count > 0:
+        logger.info(f"Saved {saved_count} ISBNs from content scan for {book.file_path}")
+    else:
+        logger.info(f"All content ISBNs already existed for {book.file_path}")
+    return saved_count
+
+
 def save_content_isbns(book):
     """
     Extract ISBNs from book content and save them as metadata.
@@ -262,59 +331,33 @@ def save_content_isbns(book):
     """
     try:
         # Get the data source for content-extracted ISBNs
-        source, created = DataSource.objects.get_or_create(
-            name=DataSource.CONTENT_SCAN,
-            defaults={
-                "trust_level": 0.85,  # Will be overridden by bootstrap if already exists
-            },
-        )
+        source = _get_content_scan_source()
 
         # Extract ISBNs from content
         isbns = extract_isbn_from_content(book, page_limit=10)
 
-        if not isbns:
-            logger.info(f"No ISBNs found in content for {book.file_path}")
-            return
-
-        # Save each unique ISBN as metadata
-        saved_count = 0
-        for isbn in isbns:
-            try:
-                metadata, created = BookMetadata.objects.get_or_create(
-                    book=book,
-                    field_name="isbn",
-                    field_value=isbn,
-                    source=source,
-                    defaults={"confidence": source.trust_level},  # Use source's trust level
-                )
-                if created:
-                    saved_count += 1
-                    logger.info(f"Found ISBN in content: {isbn} for {book.file_path}")
-            except Exception as e:
-                logger.warning(f"Failed to save content ISBN {isbn}: {e}")
-
-        if saved_count > 0:
-            logger.info(f"Saved {saved_count} ISBNs from content scan for {book.file_path}")
-        else:
-            logger.info(f"All content ISBNs already existed for {book.file_path}")
+        _store_content_isbns(book, isbns, source)
 
     except Exception as e:
         logger.error(f"Failed to save content ISBNs for {book.file_path}: {e}")
 
 
-def bulk_scan_content_isbns(books_queryset=None, page_limit=10):
+def bulk_scan_content_isbns(books_queryset=None, page_limit=10, workers=1, time_budget=DEFAULT_TIME_BUDGET):
     """
     Bulk scan multiple books for content ISBNs.
 
+    With ``workers`` > 1 the files are scanned in a process pool, each with its
+    own ``time_budget``; results are saved from this process as they arrive.
+
     Args:
         books_queryset: QuerySet of books to scan (default: all books)
         page_limit: Number of pages to scan per book
+        workers: Number of worker processes (1 scans in this process)
+        time_budget: Seconds each file may take before its remaining pages are skipped
 
     Returns:
         dict: Statistics about the scanning process
     """
-    from books.models import Book
-
     if books_queryset is None:
         books_queryset = Book.objects.all()
 
@@ -325,31 +368,44 @@ def bulk_scan_content_isbns(books_queryset=None, page_limit=10):
         "errors": 0,
     }
 
-    for book in books_queryset:
-        try:
-            stats["total_books"] += 1
+    # Books that already have content-scanned ISBNs, in one query
+    already_scanned = set(BookMetadata.objects.filter(field_name="isbn", source__name=DataSource.CONTENT_SCAN).values_list("book_id", flat=True))
 
-            # Check if we already have content-scanned ISBNs for this book
-            existing_content_isbns = BookMetadata.objects.filter(book=book, field_name="isbn", source__name=DataSource.CONTENT_SCAN).count()
-
-            if existing_content_isbns > 0:
-                logger.debug(f"Skipping {book.file_path}, already has content-scanned ISBNs")
-                continue
-
-            # Extract and save ISBNs
-            initial_count = BookMetadata.objects.filter(book=book, field_name="isbn", source__name=DataSource.CONTENT_SCAN).count()
+    pending = []
+    for book in books_queryset.prefetch_related(Prefetch("files", queryset=BookFile.objects.order_by("id"), to_attr="prefetched_files")):
+        stats["total_books"] += 1
+        if book.id in already_scanned:
+            logger.debug(f"Skipping {book.file_path}, already has content-scanned ISBNs")
+            continue
+        pending.append(book)
 
-            save_content_isbns(book)
+    source = _get_content_scan_source()
 
-            final_count = BookMetadata.objects.filter(book=book, field_name="isbn", source__name=DataSource.CONTENT_SCAN).count()
+    if workers <= 1 or len(pending) <= 1:
+        for book in pending:
+            if not book.file_path:
+                continue
+            try:
+                _record_new_isbns(stats, _store_content_isbns(book, scan_content_isbn(book.file_path, page_limit, time_budget), source))
+            except Exception as e:
+                stats["errors"] += 1
+                logger.error(f"Error scanning {book.file_path}: {e}")
+        return stats
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as pool:
+        futures = {pool.submit(scan_content_isbn, book.file_path, page_limit, time_budget): book for book in pending if book.file_path}
+        for future in as_completed(futures):
+            book = futures[future]
+            try:
+                _record_new_isbns(stats, _store_content_isbns(book, future.result(), source))
+            except Exception as e:
+                stats["errors"] += 1
+                logger.error(f"Error scanning {book.file_path}: {e}")
 
-            new_isbns = final_count - initial_count
-            if new_isbns > 0:
-                stats["books_with_isbns"] += 1
-                stats["total_isbns_found"] += new_isbns
+    return stats
 
-        except Exception as e:
-            stats["errors"] += 1
-            logger.error(f"Error scanning {book.file_path}: {e}")
 
-    return stats
+def _record_new_isbns(stats, new_isbns):
+    if new_isbns > 0:
+        stats["books_with_isbns"] += 1
+        stats["total_isbns_found"] += new_isbns
@@ -27,8 +27,8 @@ from books.models import (
 from books.scanner.external import query_metadata_and_covers
 from books.scanner.extractors import comic, epub, mobi, opf, pdf
 from books.scanner.file_ops import find_cover_file, find_opf_file, get_file_format
-from books.scanner.logging_helpers import log_scan_error, update_scan_progress
-from books.scanner.parsing import parse_path_metadata
+from books.scanner.logging_helpers import flush_scan_logs, log_scan_error, update_scan_progress
+from books.scanner.parsing import DirectoryPredictionBatcher, parse_path_metadata, parse_path_metadata_with_ai
 from books.scanner.resolver import resolve_final_metadata
 from books.utils.author import attach_authors
 from books.utils.cover_cache import CoverCache
@@ -38,6 +38,7 @@ from books.utils.cover_extractor import (
     EPUBCoverExtractor,
     PDFCoverExtractor,
 )
+from books.utils.duplicate_index import refresh_content_hash
 
 logger = logging.getLogger("books.scanner")
 
@@ -198,6 +199,7 @@ def scan_directory(
     cover_extensions=None,
     scan_status=None,
     resume_from=None,
+    ai_recognizer=None,
 ):
     if not scan_status:
         scan_status, _ = ScanStatus.objects.get_or_create(id=1)
@@ -210,6 +212,7 @@ def scan_directory(
     scan_status.save()
 
     ebook_files, cover_files, opf_files = _collect_files(directory, ebook_extensions, cover_extensions)
+    collected_count = len(ebook_files)
 
     # Handle resume logic
     if resume_from:
@@ -276,6 +279,7 @@ def scan_directory(
                 rescan,
                 scan_status,
                 total_files,
+                ai_recognizer=ai_recognizer,
             )
 
     except ImportError:
@@ -288,6 +292,7 @@ def scan_directory(
             rescan,
             scan_status,
             total_files,
+            ai_recognizer=ai_recognizer,
         )
 
     # Handle orphaned files at the end
@@ -297,6 +302,12 @@ def scan_directory(
     if rescan:
         _cleanup_missing_books(directory, scan_folder, ebook_files)
 
+    # The collected files are the folder's file count when the whole folder was walked
+    if os.path.normpath(directory) == os.path.normpath(scan_folder.path):
+        scan_folder.refresh_counts(file_count=collected_count)
+
+    flush_scan_logs()
+
 
 def _should_use_content_type_processing(ebook_files):
     """Determine if content-type specific processing should be used based on file types"""
@@ -312,11 +323,14 @@ def _should_use_content_type_processing(ebook_files):
     return (comic_count > total_files * 0.5) or (audio_count > total_files * 0.5)
 
 
-def _process_files_individually(ebook_files, scan_folder, cover_files, opf_files, rescan, scan_status, total_files):
+def _process_files_individually(ebook_files, scan_folder, cover_files, opf_files, rescan, scan_status, total_files, ai_recognizer=None):
     """Process files using the original individual approach"""
+    # AI filename predictions are computed per directory rather than per file
+    ai_batcher = DirectoryPredictionBatcher(ai_recognizer, ebook_files) if ai_recognizer else None
+
     for i, ebook_path in enumerate(ebook_files, 1):
         try:
-            _process_book(ebook_path, scan_folder, cover_files, opf_files, rescan)
+            _process_book(ebook_path, scan_folder, cover_files, opf_files, rescan, ai_batcher=ai_batcher)
 
             # Update global progress tracking
             scan_status.processed_files += 1
@@ -435,7 +449,7 @@ def _collect_files(directory, ebook_exts, cover_exts):
     return ebook_files, cover_files, opf_files
 
 
-def _process_book(file_path, scan_folder, cover_files, opf_files, rescan=False):
+def _process_book(file_path, scan_folder, cover_files, opf_files, rescan=False, ai_batcher=None):
     book, created = _get_or_create_book_by_path(
         file_path=file_path,
         scan_folder=scan_folder,
@@ -457,10 +471,13 @@ def _process_book(file_path, scan_folder, cover_files, opf_files, rescan=False):
         primary_file.has_internal_cover = has_internal_cover
 
         primary_file.opf_path = find_opf_file(file_path, opf_files) or ""
+
+        # Content hash for duplicate detection; reused while the file is unchanged
+        refresh_content_hash(primary_file)
         primary_file.save()
 
     logger.info(f"[FILENAME PARSE] Path: {file_path}")
-    _extract_filename_metadata(book)
+    _extract_filename_metadata(book, ai_batcher=ai_batcher)
 
     try:
         _extract_internal_metadata(book)
@@ -513,7 +530,7 @@ def _process_book(file_path, scan_folder, cover_files, opf_files, rescan=False):
     logger.info(f"Processed: {Path(file_path).name}")
 
 
-def _extract_filename_metadata(book):
+def _extract_filename_metadata(book, ai_batcher=None):
     source = _get_initial_scan_source()
 
     # Use comic-specific parsing for comic books
@@ -522,6 +539,9 @@ def _extract_filename_metadata(book):
         from books.scanner.parsing import parse_comic_metadata
 
         parsed = parse_comic_metadata(book.primary_file.file_path)
+    elif ai_batcher and book.primary_file:
+        file_path = book.primary_file.file_path
+        parsed = parse_path_metadata_with_ai(file_path, ai_batcher.ai_recognizer, ai_predictions=ai_batcher.get(file_path))
     else:
         parsed = parse_path_metadata(book.primary_file.file_path if book.primary_file else "")
 
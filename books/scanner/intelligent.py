@@ -3,20 +3,30 @@ Intelligent API Scanner with Graceful Degradation
 
 This module provides enhanced scanning capabilities that can gracefully handle
 API failures, track API access success per book, and automatically resume
-scanning when APIs become available again.
+scanning when APIs become available again. Lookups already answered by the
+persistent response cache (books.scanner.api_cache) are served even while an
+API is unavailable.
 """
 
 import logging
 import uuid
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterable, List, Optional
 
+from django.core.cache import cache
+from django.db.models import Count, Q
 from django.utils import timezone
 
 from books.models import APIAccessLog, Book, BookAPICompleteness, DataSource, ScanSession
+from books.scanner import api_cache
 from books.scanner.rate_limiting import check_api_health, get_api_status
 
 logger = logging.getLogger("books.scanner")
 
+# Books loaded, with the relations the scan reads, per query of a batch retry
+API_RETRY_BATCH_SIZE = 200
+COMPLETENESS_STATS_CACHE_KEY = "api_completeness_stats"
+COMPLETENESS_STATS_TIMEOUT = 60
+
 
 class IntelligentAPIScanner:
     """
@@ -37,6 +47,7 @@ class IntelligentAPIScanner:
             "Open Library": "Open Library",
             "Goodreads": "Goodreads",
         }
+        self._data_sources = {}
 
         # Initialize session tracking
         self._initialize_session()
@@ -128,14 +139,17 @@ class IntelligentAPIScanner:
         }
 
         try:
-            # Get or create API completeness record
-            completeness, _ = BookAPICompleteness.objects.get_or_create(
-                book=book,
-                defaults={
-                    "missing_sources": list(self.api_sources.keys()),
-                    "needs_external_scan": True,
-                },
-            )
+            # Get or create API completeness record; batch retries load it with the book
+            try:
+                completeness = book.api_completeness
+            except BookAPICompleteness.DoesNotExist:
+                completeness, _ = BookAPICompleteness.objects.get_or_create(
+                    book=book,
+                    defaults={
+                        "missing_sources": list(self.api_sources.keys()),
+                        "needs_external_scan": True,
+                    },
+                )
 
             # Check current API availability
             api_availability = self.check_api_availability()
@@ -198,10 +212,12 @@ class IntelligentAPIScanner:
         apis_to_attempt = []
 
         for api_name in self.api_sources.keys():
-            # Skip if API is not available and not forcing
+            # Skip if API is not available and not forcing, unless the answer is already stored
             if not force_all and not api_availability.get(api_name, False):
-                logger.debug(f"[API SELECTION] Skipping {api_name} - not available")
-                continue
+                if not self._has_stored_response(book, api_name):
+                    logger.debug(f"[API SELECTION] Skipping {api_name} - not available")
+                    continue
+                logger.debug(f"[API SELECTION] {api_name} not available, using stored response")
 
             # Check if we've already got data from this source recently
             source_complete_field = f"{api_name.lower().replace(' ', '_')}_complete"
@@ -212,12 +228,8 @@ class IntelligentAPIScanner:
 
             # Check API access log for this book/source
             try:
-                data_source = DataSource.objects.get(name=api_name)
-                access_log, _ = APIAccessLog.objects.get_or_create(
-                    book=book,
-                    data_source=data_source,
-                    defaults={"status": APIAccessLog.NOT_ATTEMPTED},
-                )
+                data_source = self._get_data_source(api_name)
+                access_log = self._get_access_log(book, data_source)
 
                 # Skip if API is unhealthy for this book and not forcing
                 if not force_all and not access_log.is_healthy:
@@ -237,6 +249,94 @@ class IntelligentAPIScanner:
 
         return apis_to_attempt
 
+    def _get_data_source(self, api_name: str) -> DataSource:
+        """Data source of an API, read once per scanner"""
+        if api_name not in self._data_sources:
+            self._data_sources[api_name] = DataSource.objects.get(name=api_name)
+        return self._data_sources[api_name]
+
+    def _get_access_log(self, book: Book, data_source: DataSource) -> APIAccessLog:
+        """Access log of a book for a source, from the prefetched logs when the book has them"""
+        if "api_access_logs" in getattr(book, "_prefetched_objects_cache", {}):
+            for access_log in book.api_access_logs.all():
+                if access_log.data_source_id == data_source.id:
+                    return access_log
+
+        access_log, _ = APIAccessLog.objects.get_or_create(
+            book=book,
+            data_source=data_source,
+            defaults={"status": APIAccessLog.NOT_ATTEMPTED},
+        )
+        return access_log
+
+    def retry_books(
+        self,
+        book_ids: Iterable[int],
+        batch_size: int = API_RETRY_BATCH_SIZE,
+        force_all_apis: bool = False,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ) -> Dict[str, int]:
+        """
+        Retry the external APIs for many books, a batch at a time.
+
+        Each batch loads its books with their completeness record, final
+        metadata and API access logs in two queries. Books that got data, and
+        books that no longer exist, leave the session's resume queue with one
+        save per batch.
+
+        A book whose retry raises is logged, counted in ``errors`` and left in
+        the resume queue; the other books are still retried.
+
+        Returns:
+            Counts of books ``processed``, ``successful``, ``failed``, ``missing`` and ``errors``
+        """
+        book_ids = list(book_ids)
+        counts = {"processed": 0, "successful": 0, "failed": 0, "missing": 0, "errors": 0}
+
+        for start in range(0, len(book_ids), batch_size):
+            batch = book_ids[start : start + batch_size]
+            books = Book.objects.filter(pk__in=batch).select_related("api_completeness", "finalmetadata").prefetch_related("api_access_logs").in_bulk()
+            done = [book_id for book_id in batch if book_id not in books]
+            counts["missing"] += len(done)
+
+            for book_id in batch:
+                book = books.get(book_id)
+                if book is None:
+                    continue
+                try:
+                    result = self.scan_book_with_intelligence(book, force_all_apis=force_all_apis)
+                except Exception as e:
+                    logger.error(f"[API RETRY] Retry of book {book_id} failed: {e}")
+                    counts["errors"] += 1
+                    continue
+                counts["processed"] += 1
+                if result["apis_succeeded"]:
+                    counts["successful"] += 1
+                    done.append(book_id)
+                else:
+                    counts["failed"] += 1
+
+            queued = {item["book_id"] for item in self.session.resume_queue} if self.session else set()
+            if queued.intersection(done):
+                self.session.remove_books_from_resume_queue(done)
+            if on_progress:
+                on_progress(min(start + batch_size, len(book_ids)), len(book_ids))
+
+        return counts
+
+    def _get_book_isbn(self, book: Book) -> Optional[str]:
+        if hasattr(book, "finalmetadata") and book.finalmetadata:
+            return book.finalmetadata.isbn
+        return None
+
+    def _has_stored_response(self, book: Book, api_name: str) -> bool:
+        """Check whether the persistent response cache already answers this book's lookup for an API"""
+        from books.scanner.external import _get_best_author, _get_best_title
+
+        isbn = None if api_name == "Goodreads" else self._get_book_isbn(book)  # Goodreads is searched by title/author only
+        key = api_cache.lookup_key(isbn=isbn, title=_get_best_title(book), author=_get_best_author(book))
+        return api_cache.has_cached_response(api_name.lower().replace(" ", "_"), key)
+
     def _attempt_api_for_book(self, book: Book, api_name: str) -> Dict[str, any]:
         """Attempt to get data from a specific API for a book"""
         result = {
@@ -250,12 +350,8 @@ class IntelligentAPIScanner:
 
         try:
             # Get data source and access log
-            data_source = DataSource.objects.get(name=api_name)
-            access_log, _ = APIAccessLog.objects.get_or_create(
-                book=book,
-                data_source=data_source,
-                defaults={"status": APIAccessLog.NOT_ATTEMPTED},
-            )
+            data_source = self._get_data_source(api_name)
+            access_log = self._get_access_log(book, data_source)
 
             # Count existing metadata before API call
             existing_metadata_count = self._count_book_metadata(book, data_source)
@@ -356,9 +452,7 @@ class IntelligentAPIScanner:
             author = _get_best_author(book)
 
             # Get ISBN if available
-            isbn = None
-            if hasattr(book, "finalmetadata") and book.finalmetadata:
-                isbn = book.finalmetadata.isbn
+            isbn = self._get_book_isbn(book)
 
             logger.info(f"[API CALL] {api_name} for book {book.id} - Title: {title}, Author: {author}, ISBN: {isbn}")
 
@@ -567,6 +661,24 @@ class IntelligentAPIScanner:
             logger.info(f"[SESSION] Completed session {self.session_id}")
 
 
+def get_completeness_stats() -> Dict[str, int]:
+    """Books per scan priority, counted with one conditional aggregate and cached briefly."""
+    stats = cache.get(COMPLETENESS_STATS_CACHE_KEY)
+    if stats is None:
+        stats = BookAPICompleteness.objects.aggregate(
+            high_priority=Count("pk", filter=Q(scan_priority="high")),
+            medium_priority=Count("pk", filter=Q(scan_priority="medium")),
+            low_priority=Count("pk", filter=Q(scan_priority="low")),
+            complete=Count("pk", filter=Q(scan_priority="complete")),
+        )
+        cache.set(COMPLETENESS_STATS_CACHE_KEY, stats, COMPLETENESS_STATS_TIMEOUT)
+    return stats
+
+
+def invalidate_completeness_stats():
+    cache.delete(COMPLETENESS_STATS_CACHE_KEY)
+
+
 # Convenience functions for backward compatibility and easy usage
 
 
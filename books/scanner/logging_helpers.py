@@ -2,14 +2,202 @@
 
 This module provides functions for logging scan errors and operations
 to the database for tracking and debugging purposes.
+
+ScanLog rows are buffered and written with ``bulk_create`` every
+``SCAN_LOG_BATCH_SIZE`` records or ``SCAN_LOG_FLUSH_INTERVAL`` seconds,
+whichever comes first, and at the end of each scanned directory. With
+``SCAN_LOG_BACKGROUND_FLUSH`` the shared buffer is written by its own flusher
+thread on that timer, so a lone warning logged by a web request or a
+prefetch daemon is persisted within the interval and the logging thread
+never touches the database. Records below ``SCAN_LOG_LEVEL`` are not
+persisted. ``ScanLogHandler`` exposes the
+same buffer to the logging framework (see ``LOGGING`` in settings); old rows
+are removed with the ``prune_scan_logs`` management command.
+
+Models are imported lazily because the handler is created while logging is
+configured, before the app registry is ready.
 """
 
-from books.models import ScanLog
+import atexit
+import logging
+import threading
+import time
+from typing import List, Optional
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger("books.scanner")
+
+# ScanLog only knows three levels
+_SCAN_LOG_LEVELS = ((logging.ERROR, "ERROR"), (logging.WARNING, "WARNING"), (logging.NOTSET, "INFO"))
+
+
+def _scan_log_level(levelno: int) -> str:
+    return next(name for threshold, name in _SCAN_LOG_LEVELS if levelno >= threshold)
+
+
+class ScanLogBuffer:
+    """
+    Collects ScanLog rows and writes them in batches.
+
+    By default a full batch or an elapsed interval is written by the thread
+    calling ``add()``. With ``background=True`` those writes happen on a
+    daemon flusher thread instead, which also flushes every
+    ``flush_interval`` seconds when nothing else is being logged.
+    """
+
+    def __init__(self, batch_size: int = 100, flush_interval: float = 5.0, min_level: int = logging.WARNING, background: bool = False):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.min_level = min_level
+        self.background = background
+        self._entries: List[dict] = []
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._flusher = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, levelno: int, message: str, file_path: str = "", scan_folder=None) -> bool:
+        """Queue one entry; returns False if it is below the persisted level."""
+        if levelno < self.min_level:
+            return False
+
+        scan_folder_id = getattr(scan_folder, "pk", scan_folder)
+        with self._lock:
+            self._entries.append({"level": _scan_log_level(levelno), "message": message, "file_path": (file_path or "")[:1000], "scan_folder_id": scan_folder_id})
+            due = len(self._entries) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_interval
+            if self.background:
+                self._ensure_flusher()
+        if due:
+            if self.background:
+                self._wakeup.set()
+            else:
+                self.flush()
+        return True
+
+    def close(self) -> int:
+        """Stop the flusher thread and write whatever is still queued."""
+        self._stopped = True
+        self._wakeup.set()
+        return self.flush()
+
+    def _ensure_flusher(self):
+        if self._flusher is None or not self._flusher.is_alive():
+            self._stopped = False
+            self._flusher = threading.Thread(target=self._run, name="scan-log-flusher", daemon=True)
+            self._flusher.start()
+
+    def _run(self):
+        while not self._stopped:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            if self._stopped:
+                return
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+    def flush(self) -> int:
+        """
+        Write all queued entries in one ``bulk_create``; returns the number written.
+
+        The queue is swapped out under the lock and written outside it, so
+        threads that log never wait for the database.
+        """
+        from django.apps import apps
+
+        with self._lock:
+            if not apps.ready:
+                return 0
+            entries, self._entries = self._entries, []
+            self._last_flush = time.monotonic()
+        if not entries:
+            return 0
+
+        from django.db import IntegrityError, transaction
+
+        from books.models import ScanLog
+
+        try:
+            with transaction.atomic():
+                ScanLog.objects.bulk_create([ScanLog(**entry) for entry in entries], batch_size=self.batch_size)
+            return len(entries)
+        except IntegrityError:
+            # A row points at a scan folder deleted since it was logged; keep the others
+            return self._write_one_by_one(entries)
+        except Exception as e:
+            # Never let log persistence break a scan; the records still reached the file log
+            logger.debug(f"Dropped {len(entries)} scan log entries: {e}")
+            return 0
+
+    def _write_one_by_one(self, entries: List[dict]) -> int:
+        from django.db import transaction
+
+        from books.models import ScanLog
+
+        written = 0
+        for entry in entries:
+            try:
+                with transaction.atomic():
+                    ScanLog.objects.create(**entry)
+                written += 1
+            except Exception as e:
+                logger.debug(f"Dropped scan log entry for scan folder {entry['scan_folder_id']}: {e}")
+        return written
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_scan_log_buffer() -> ScanLogBuffer:
+    """Return the process-wide ScanLog buffer."""
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = ScanLogBuffer(
+                batch_size=getattr(settings, "SCAN_LOG_BATCH_SIZE", 100),
+                flush_interval=getattr(settings, "SCAN_LOG_FLUSH_INTERVAL", 5.0),
+                min_level=logging.getLevelName(getattr(settings, "SCAN_LOG_LEVEL", "WARNING")),
+                background=getattr(settings, "SCAN_LOG_BACKGROUND_FLUSH", False),
+            )
+            atexit.register(_buffer.close)
+        return _buffer
+
+
+def flush_scan_logs() -> int:
+    """Write any buffered ScanLog entries now."""
+    return get_scan_log_buffer().flush()
+
+
+class ScanLogHandler(logging.Handler):
+    """
+    Logging handler that persists records as ScanLog rows through the shared buffer.
+
+    ``file_path`` and ``scan_folder`` are taken from the record's ``extra`` values, e.g.
+    ``logger.warning("Unreadable cover", extra={"file_path": path, "scan_folder": folder})``.
+    """
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            get_scan_log_buffer().add(record.levelno, self.format(record), getattr(record, "file_path", ""), getattr(record, "scan_folder", None))
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        if _buffer is not None:
+            _buffer.flush()
 
 
 def log_scan_error(message: str, file_path: str, scan_folder) -> None:
     """Log a scanning error to the database"""
-    ScanLog.objects.create(level="ERROR", message=message, file_path=file_path, scan_folder=scan_folder)
+    get_scan_log_buffer().add(logging.ERROR, message, file_path, scan_folder)
 
 
 def update_scan_progress(status, current: int, total: int, filename: str) -> None:
@@ -21,3 +209,54 @@ def update_scan_progress(status, current: int, total: int, filename: str) -> Non
     status.progress = percent
     status.message = f"Scanning: {filename}"
     status.save()
+
+
+def prune_scan_logs(older_than_days: Optional[int] = None, keep_per_folder: Optional[int] = None, chunk_size: int = 1000, dry_run: bool = False) -> dict:
+    """
+    Delete old ScanLog rows in primary-key chunks.
+
+    Each chunk selects ids through an index (timestamp, or scan folder + id)
+    and deletes them by primary key, so no single statement holds the
+    database lock for long.
+
+    Args:
+        older_than_days: Delete entries older than this many days
+        keep_per_folder: Keep only this many newest entries per scan folder
+        chunk_size: Rows deleted per statement
+        dry_run: Count what would be deleted without deleting
+
+    Returns:
+        Number of rows deleted (or matched) by age and by per-folder count
+    """
+    from datetime import timedelta
+
+    from django.utils import timezone
+
+    from books.models import ScanLog
+
+    def delete_in_chunks(queryset, order_by):
+        if dry_run:
+            return queryset.count()
+        deleted = 0
+        while True:
+            ids = list(queryset.order_by(order_by).values_list("pk", flat=True)[:chunk_size])
+            if not ids:
+                return deleted
+            deleted += ScanLog.objects.filter(pk__in=ids).delete()[0]
+
+    result = {"by_age": 0, "by_count": 0}
+
+    if older_than_days is not None:
+        cutoff = timezone.now() - timedelta(days=older_than_days)
+        result["by_age"] = delete_in_chunks(ScanLog.objects.filter(timestamp__lt=cutoff), "timestamp")
+
+    if keep_per_folder is not None:
+        folder_ids = ScanLog.objects.order_by().values_list("scan_folder_id", flat=True).distinct()
+        for folder_id in list(folder_ids):
+            folder_logs = ScanLog.objects.filter(scan_folder_id=folder_id) if folder_id is not None else ScanLog.objects.filter(scan_folder__isnull=True)
+            # Ids grow with insertion time, so everything at or below the first id past the limit goes
+            boundary = list(folder_logs.order_by("-pk").values_list("pk", flat=True)[keep_per_folder : keep_per_folder + 1])
+            if boundary:
+                result["by_count"] += delete_in_chunks(folder_logs.filter(pk__lte=boundary[0]), "pk")
+
+    return result
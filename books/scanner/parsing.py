@@ -5,7 +5,9 @@ metadata like titles, authors, series information, and publication data.
 Enhanced with AI-powered pattern recognition.
 """
 
+import os
 import re
+from collections import defaultdict
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
@@ -243,8 +245,45 @@ def _extract_comic_author_from_folders(path: Path) -> List[str]:
     return []
 
 
-def parse_path_metadata_with_ai(file_path: str, ai_recognizer=None) -> Dict[str, Optional[str]]:
-    """Enhanced parsing that combines traditional pattern matching with AI predictions."""
+class DirectoryPredictionBatcher:
+    """Serve AI filename predictions for a scan, predicting one directory per batch.
+
+    The first lookup for a file in a directory runs ``predict_many`` over every
+    scanned file in that directory, so the models see whole directories at once
+    and directories whose files are all skipped are never predicted.
+    """
+
+    def __init__(self, ai_recognizer, file_paths: List[str]):
+        self.ai_recognizer = ai_recognizer
+        self._files_by_directory = defaultdict(list)
+        for file_path in file_paths:
+            self._files_by_directory[os.path.dirname(file_path)].append(file_path)
+        self._directory = None
+        self._predictions = {}
+
+    def get(self, file_path: str) -> Optional[Dict[str, Tuple[str, float]]]:
+        """Return the predictions for ``file_path``, or None if unavailable."""
+        directory = os.path.dirname(file_path)
+        if directory != self._directory:
+            paths = self._files_by_directory.get(directory) or [file_path]
+            try:
+                predictions = self.ai_recognizer.predict_many([Path(path).stem for path in paths])
+            except Exception as e:
+                import logging
+
+                logging.getLogger("books.scanner").warning(f"AI batch prediction failed for '{directory}': {e}")
+                predictions = [None] * len(paths)
+            self._directory = directory
+            self._predictions = dict(zip(paths, predictions))
+        return self._predictions.get(file_path)
+
+
+def parse_path_metadata_with_ai(file_path: str, ai_recognizer=None, ai_predictions=None) -> Dict[str, Optional[str]]:
+    """Enhanced parsing that combines traditional pattern matching with AI predictions.
+
+    ``ai_predictions`` may carry predictions computed ahead of time in a batch
+    (see ``DirectoryPredictionBatcher``); otherwise the recognizer is asked for this file alone.
+    """
     # Get traditional parsing results
     traditional_metadata = parse_path_metadata(file_path)
 
@@ -254,8 +293,9 @@ def parse_path_metadata_with_ai(file_path: str, ai_recognizer=None) -> Dict[str,
 
     try:
         # Get AI predictions
-        filename = Path(file_path).stem
-        ai_predictions = ai_recognizer.predict_metadata(filename)
+        if ai_predictions is None:
+            filename = Path(file_path).stem
+            ai_predictions = ai_recognizer.predict_metadata(filename)
 
         # Combine traditional and AI results with confidence-based selection
         enhanced_metadata = traditional_metadata.copy()
@@ -3,6 +3,7 @@
 This module provides sophisticated rate limiting for various external APIs with:
 - Per-API rate limits (daily, hourly, per-minute)
 - Persistent rate limit tracking using Django cache
+- Persistent, cross-book response caching (see books.scanner.api_cache)
 - Automatic backoff and retry logic
 - Circuit breaker pattern for failing APIs
 - Request prioritization and queuing
@@ -22,6 +23,8 @@ from typing import Any, Dict, Optional
 import requests
 from django.core.cache import cache
 
+from books.scanner import api_cache
+
 logger = logging.getLogger("books.scanner")
 
 
@@ -256,9 +259,10 @@ class CircuitBreaker:
 class RateLimitedAPIClient:
     """Rate-limited HTTP client for external APIs."""
 
-    def __init__(self, api_name: str, config: Dict):
+    def __init__(self, api_name: str, config: Dict, provider: Optional[str] = None):
         self.api_name = api_name
         self.config = config
+        self.provider = provider or api_name.lower().replace(" ", "_")
         self.rate_tracker = RateLimitTracker(api_name, config)
         self.circuit_breaker = CircuitBreaker(
             api_name,
@@ -288,8 +292,20 @@ class RateLimitedAPIClient:
         timeout: int = 30,
         cache_key: str = None,
         cache_timeout: int = 3600,
+        lookup_key: str = None,
     ) -> Optional[Dict]:
-        """Make a rate-limited request to the API."""
+        """Make a rate-limited request to the API.
+
+        If ``lookup_key`` is given (see ``api_cache.lookup_key``), a stored
+        response for it is returned without touching the API, even while the
+        circuit breaker is open or the quota is used up, and the response to
+        a new request is stored for other books with the same lookup.
+        """
+
+        if lookup_key:
+            stored = api_cache.get_cached_response(self.provider, lookup_key)
+            if stored is not api_cache.MISS:
+                return stored
 
         # Check circuit breaker
         if self.circuit_breaker.is_open():
@@ -327,7 +343,14 @@ class RateLimitedAPIClient:
                 retry_after = int(response.headers.get("Retry-After", 60))
                 logger.warning(f"[{self.api_name}] 429 rate limit, waiting {retry_after}s")
                 time.sleep(retry_after)
-                return self.make_request(url, params, headers, timeout, cache_key, cache_timeout)
+                return self.make_request(url, params, headers, timeout, cache_key, cache_timeout, lookup_key)
+
+            if response.status_code == 404 and lookup_key:
+                self.rate_tracker.record_request()
+                self.circuit_breaker.record_success()
+                api_cache.store_response(self.provider, lookup_key, None, negative=True)
+                logger.debug(f"[{self.api_name}] Not found, cached negative result for {lookup_key}")
+                return None
 
             response.raise_for_status()
             data = response.json()
@@ -341,6 +364,9 @@ class RateLimitedAPIClient:
                 cache.set(cache_key, data, cache_timeout)
                 logger.debug(f"[{self.api_name}] Cached result for {cache_key}")
 
+            if lookup_key:
+                api_cache.store_response(self.provider, lookup_key, data)
+
             return data
 
         except requests.exceptions.RequestException as e:
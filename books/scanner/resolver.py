@@ -8,6 +8,7 @@ import logging
 import re
 
 from books.models import FinalMetadata
+from books.utils.cover_prefetch import prefetch_covers
 
 logger = logging.getLogger("books.scanner")
 
@@ -41,6 +42,8 @@ def resolve_final_metadata(book):
         final_metadata.final_cover_path = best_cover.cover_path
         final_metadata.final_cover_confidence = best_cover.confidence
         final_metadata.has_cover = True
+        # Make sure the chosen remote cover is local before any page renders it
+        prefetch_covers([best_cover.cover_path])
     else:
         final_metadata.has_cover = False
 
@@ -11,7 +11,7 @@ from books.models import (
     ScanFolder,
     ScanStatus,
 )
-from books.scanner.ai import initialize_ai_system
+from books.scanner.ai.loader import get_model_loader
 from books.scanner.folder import scan_directory
 
 logger = logging.getLogger("books.scanner")
@@ -32,10 +32,21 @@ class EbookScanner:
         for fmt in AUDIOBOOK_FORMATS:
             self.ebook_extensions.add(f".{fmt}")
 
-        # Initialize AI filename recognition system
-        self.ai_recognizer = None
+        # AI filename recognition loads in the background; scans use regex-only parsing until it is ready
+        self._ai_recognizer = None
         self._initialize_ai_system()
 
+    @property
+    def ai_recognizer(self):
+        """The explicitly assigned recognizer, else the background-loaded one once it is ready."""
+        if self._ai_recognizer is not None:
+            return self._ai_recognizer
+        return get_model_loader().get()
+
+    @ai_recognizer.setter
+    def ai_recognizer(self, recognizer):
+        self._ai_recognizer = recognizer
+
     def scan_folder(self, folder_path):
         """Scan a folder and return results in expected format."""
         try:
@@ -127,6 +138,7 @@ class EbookScanner:
                     ebook_extensions=content_specific_extensions,
                     cover_extensions=self.cover_extensions,
                     scan_status=status,  # Pass status for progress tracking
+                    ai_recognizer=self.ai_recognizer,
                 )
                 logger.info(f"Completed scan of folder: {path}")
             except Exception as e:
@@ -200,6 +212,7 @@ class EbookScanner:
                     cover_extensions=self.cover_extensions,
                     scan_status=status,
                     resume_from=status.last_processed_file,  # Resume from last processed file
+                    ai_recognizer=self.ai_recognizer,
                 )
                 logger.info(f"Completed scan of folder: {path}")
             except Exception as e:
@@ -295,16 +308,16 @@ class EbookScanner:
             logger.info("No incomplete metadata books found")
 
     def _initialize_ai_system(self):
-        """Initialize the AI filename recognition system."""
+        """Start loading the AI filename recognition models without blocking the scan."""
         try:
-            self.ai_recognizer = initialize_ai_system()
-            if self.ai_recognizer:
-                logger.info("AI filename recognition system initialized successfully")
-            else:
-                logger.info("AI system not available (insufficient training data)")
+            loader = get_model_loader()
+            loader.refresh()
+            if not loader.start():
+                logger.info("No trained AI models found; filename parsing is regex-only")
+            elif not loader.is_ready():
+                logger.info("AI models are loading in the background; filename parsing is regex-only until they are ready")
         except Exception as e:
-            logger.error(f"Failed to initialize AI system: {e}")
-            self.ai_recognizer = None
+            logger.error(f"Failed to start AI model loading: {e}")
 
     def predict_metadata_with_ai(self, filename: str) -> dict:
         """Use AI to predict metadata from filename."""
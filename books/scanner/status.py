@@ -0,0 +1,97 @@
+"""
+Read model of the scanning state for dashboards that poll it.
+
+``scan_status_snapshot`` returns every active job, the scan queue depth and
+``ScanStatus`` rows per status, and the scan history of the last day. The
+database part is one ``UNION ALL`` of grouped counts; the active job list and
+the progress of every job are two cache reads whatever the number of jobs.
+
+The snapshot's ``version`` is a hash of its own content, and the status
+endpoint uses it as its ETag. It is read from the database on every request,
+so changes made by other processes (the ``scan_books`` and ``watch_library``
+commands) and history rows leaving the 24 hour window change it too; a
+poller whose state is current still gets an empty 304 answer.
+"""
+
+import hashlib
+import json
+from datetime import timedelta
+from typing import Dict, List
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import CharField, Count, DateTimeField, Max, Value
+from django.utils import timezone
+
+ACTIVE_JOBS_CACHE_KEY = "active_scan_job_ids"
+RECENT_HISTORY_HOURS = 24
+
+
+def progress_cache_key(job_id: str) -> str:
+    return f"scan_progress_{job_id}"
+
+
+def active_jobs(job_ids: List[str]) -> List[Dict]:
+    """Progress of the unfinished jobs among ``job_ids``, read with one ``get_many``."""
+    progress = cache.get_many([progress_cache_key(job_id) for job_id in job_ids])
+    jobs = [progress.get(progress_cache_key(job_id)) for job_id in job_ids]
+    return [job for job in jobs if job and not job.get("completed", False)]
+
+
+def _grouped(queryset, source: str, latest: str):
+    return (
+        queryset.order_by()
+        .annotate(source=Value(source, output_field=CharField()))
+        .values("source", "status")
+        .annotate(total=Count("pk"), latest=Max(latest, output_field=DateTimeField()))
+        .values_list("source", "status", "total", "latest")
+    )
+
+
+def status_counts() -> Dict[str, Dict[str, int]]:
+    """
+    Queue items, status rows and recent history entries per status, in one query.
+
+    Returns:
+        ``{"queue": {...}, "scan_status": {...}, "history": {...}}`` with a
+        count for every status choice, plus ``last_completed_at`` in history
+    """
+    from books.models import ScanHistory, ScanQueue, ScanStatus
+
+    since = timezone.now() - timedelta(hours=RECENT_HISTORY_HOURS)
+    counts = {
+        "queue": dict.fromkeys((status for status, _label in ScanQueue.QUEUE_STATUS_CHOICES), 0),
+        "scan_status": dict.fromkeys((status for status, _label in ScanStatus.STATUS_CHOICES), 0),
+        "history": dict.fromkeys((status for status, _label in ScanHistory.STATUS_CHOICES), 0),
+    }
+    last_completed_at = None
+
+    queue = _grouped(ScanQueue.objects.all(), "queue", "updated_at")
+    rows = queue.union(
+        _grouped(ScanStatus.objects.all(), "scan_status", "updated"),
+        _grouped(ScanHistory.objects.filter(completed_at__gte=since), "history", "completed_at"),
+        all=True,
+    )
+    for source, status, total, latest in rows:
+        counts[source][status] = total
+        if source == "history" and latest and (last_completed_at is None or latest > last_completed_at):
+            last_completed_at = latest
+
+    counts["queue"]["total"] = sum(counts["queue"].values())
+    counts["history"]["last_completed_at"] = last_completed_at.isoformat() if last_completed_at else None
+    return counts
+
+
+def status_version(state: Dict) -> str:
+    """Hash of a scanning state; equal states from any process have the same version."""
+    content = json.dumps(state, cls=DjangoJSONEncoder, sort_keys=True)
+    return hashlib.sha256(content.encode()).hexdigest()[:16]
+
+
+def scan_status_snapshot() -> Dict:
+    """Everything the scanning dashboards poll for, with the ``version`` of that state."""
+    state = {
+        "active_jobs": active_jobs(cache.get(ACTIVE_JOBS_CACHE_KEY, [])),
+        **status_counts(),
+    }
+    return {"version": status_version(state), **state}
@@ -0,0 +1,703 @@
+"""Filesystem watcher for incremental library ingest.
+
+Instead of walking every scan folder, the watcher subscribes to changes and
+feeds only the affected paths into the scanner:
+
+- On Linux, inotify watches every directory of every active ScanFolder; the
+  process sleeps in the kernel until something changes.
+- Elsewhere (or when inotify is unavailable or out of watches), directories
+  are polled by modification time. Only directories whose mtime changed are
+  listed again, so an idle library costs one ``stat`` per directory per poll.
+  In-place rewrites that don't touch the directory are not seen this way.
+
+Bursts of events are debounced and coalesced into one ``ChangeSet`` before
+being applied. Moves and renames update ``BookFile`` paths in place, keeping
+the book's metadata, covers and review state.
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import close_old_connections
+
+from books.models import BookFile, ScanFolder
+from books.scanner.logging_helpers import flush_scan_logs
+
+logger = logging.getLogger("books.scanner")
+
+CREATED = "created"
+MODIFIED = "modified"
+DELETED = "deleted"
+
+COVER_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp"}
+UPDATE_BATCH_SIZE = 500
+
+# inotify(7) event masks
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class ChangeSet:
+    """
+    File changes collected during one debounce window.
+
+    Later events are folded into earlier ones, so a file that is created,
+    written and renamed within the window is processed once, under its final
+    name, and a file created and deleted again is never processed at all.
+    """
+
+    def __init__(self):
+        self.changes: Dict[str, str] = {}  # path -> CREATED / MODIFIED / DELETED
+        self.moves: Dict[str, str] = {}  # destination -> original path (files)
+        self.dir_moves: List[Tuple[str, str]] = []
+        self.deleted_dirs: List[str] = []
+        self.overflowed = False
+
+    def __bool__(self):
+        return bool(self.changes or self.moves or self.dir_moves or self.deleted_dirs or self.overflowed)
+
+    def __len__(self):
+        return len(self.changes) + len(self.moves) + len(self.dir_moves) + len(self.deleted_dirs)
+
+    def created(self, path: str):
+        self.changes[path] = MODIFIED if self.changes.get(path) == DELETED else CREATED
+
+    def modified(self, path: str):
+        if path not in self.moves and self.changes.get(path) != CREATED:
+            self.changes[path] = MODIFIED
+
+    def deleted(self, path: str):
+        if path in self.moves:
+            self.changes[self.moves.pop(path)] = DELETED
+            self.changes.pop(path, None)
+        elif self.changes.get(path) == CREATED:
+            del self.changes[path]
+        else:
+            self.changes[path] = DELETED
+
+    def moved(self, source: str, destination: str):
+        pending = self.changes.pop(source, None)
+        if pending == CREATED:
+            self.changes[destination] = CREATED
+            return
+
+        self.moves[destination] = self.moves.pop(source, source)
+        if pending == MODIFIED:
+            self.changes[destination] = MODIFIED
+
+    def dir_moved(self, source: str, destination: str):
+        self.dir_moves.append((source, destination))
+
+    def dir_deleted(self, path: str):
+        self.deleted_dirs.append(path)
+
+
+def _has_prefix(path: str, directory: str) -> bool:
+    return path == directory or path.startswith(directory.rstrip(os.sep) + os.sep)
+
+
+def _replace_prefix(path: str, source: str, destination: str) -> str:
+    if path and _has_prefix(path, source):
+        return destination + path[len(source) :]
+    return path
+
+
+class InotifyBackend:
+    """Recursive directory watches on top of the Linux inotify API (via ctypes, no extra dependency)."""
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name or not hasattr(os, "O_NONBLOCK"):
+            raise OSError("inotify is not available on this platform")
+
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify is not available on this platform")
+
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self._paths: Dict[int, str] = {}  # watch descriptor -> directory
+        self._watches: Dict[str, int] = {}
+        self._writing = set()  # Created files not closed yet
+
+    def _add_watch(self, directory: str) -> None:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            # ENOSPC: fs.inotify.max_user_watches exhausted; the caller falls back to polling
+            raise OSError(errno, f"Cannot watch {directory}: {os.strerror(errno)}")
+        self._paths[wd] = directory
+        self._watches[directory] = wd
+
+    def add_tree(self, root: str) -> List[str]:
+        """Watch ``root`` and every directory below it; returns the files already present."""
+        files = []
+        for directory, _, names in os.walk(root):
+            self._add_watch(directory)
+            files.extend(os.path.join(directory, name) for name in names)
+        return files
+
+    def remove_tree(self, root: str) -> None:
+        for directory in [path for path in self._watches if _has_prefix(path, root)]:
+            wd = self._watches.pop(directory)
+            self._paths.pop(wd, None)
+            self._libc.inotify_rm_watch(self.fd, wd)
+
+    def _rename_tree(self, source: str, destination: str) -> None:
+        for directory in [path for path in self._watches if _has_prefix(path, source)]:
+            wd = self._watches.pop(directory)
+            new_path = _replace_prefix(directory, source, destination)
+            self._watches[new_path] = wd
+            self._paths[wd] = new_path
+
+    def _read_events(self, timeout: float) -> List[Tuple[int, int, int, str]]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 256 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+                offset += length
+                events.append((wd, mask, cookie, name))
+        return events
+
+    def poll(self, changes: ChangeSet, timeout: float) -> None:
+        """Wait up to ``timeout`` seconds for events and record them in ``changes``."""
+        pending_moves: Dict[int, Tuple[str, bool]] = {}
+
+        for wd, mask, cookie, name in self._read_events(timeout):
+            if mask & IN_Q_OVERFLOW:
+                logger.warning("[WATCHER] inotify queue overflowed; events were lost")
+                changes.overflowed = True
+                continue
+
+            directory = self._paths.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                self._paths.pop(wd, None)
+                if self._watches.get(directory) == wd:
+                    del self._watches[directory]
+                continue
+            if not name:
+                continue  # IN_DELETE_SELF / IN_MOVE_SELF: reported by the parent as well
+
+            path = os.path.join(directory, name)
+            is_dir = bool(mask & IN_ISDIR)
+
+            if mask & IN_MOVED_FROM:
+                pending_moves[cookie] = (path, is_dir)
+            elif mask & IN_MOVED_TO:
+                source = pending_moves.pop(cookie, None)
+                if source is None:
+                    self._arrived(changes, path, is_dir)
+                elif is_dir:
+                    self._rename_tree(source[0], path)
+                    changes.dir_moved(source[0], path)
+                else:
+                    changes.moved(source[0], path)
+            elif mask & IN_CREATE:
+                if is_dir:
+                    self._arrived(changes, path, True)
+                else:
+                    # Reported once the writer closes it, so half-copied files are never scanned
+                    self._writing.add(path)
+            elif mask & IN_CLOSE_WRITE:
+                if path in self._writing:
+                    self._writing.discard(path)
+                    changes.created(path)
+                else:
+                    changes.modified(path)
+            elif mask & IN_DELETE:
+                self._writing.discard(path)
+                if is_dir:
+                    changes.dir_deleted(path)
+                else:
+                    changes.deleted(path)
+
+        # Moved out of the watched tree: the kernel reports both halves of a move together
+        for path, is_dir in pending_moves.values():
+            if is_dir:
+                self.remove_tree(path)
+                changes.dir_deleted(path)
+            else:
+                changes.deleted(path)
+
+    def _arrived(self, changes: ChangeSet, path: str, is_dir: bool) -> None:
+        if is_dir:
+            try:
+                for file_path in self.add_tree(path):
+                    changes.created(file_path)
+            except FileNotFoundError:
+                pass
+        else:
+            changes.created(path)
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class PollingBackend:
+    """Portable fallback that re-lists only directories whose mtime changed."""
+
+    def __init__(self, interval: float = 30.0):
+        self.interval = interval
+        self._dirs: Dict[str, Tuple[int, Dict[str, tuple]]] = {}  # directory -> (mtime_ns, {name: entry})
+
+    @staticmethod
+    def _list(directory: str) -> Tuple[int, Dict[str, tuple]]:
+        entries = {}
+        with os.scandir(directory) as scanner:
+            for entry in scanner:
+                try:
+                    stat = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                is_dir = entry.is_dir(follow_symlinks=False)
+                entries[entry.name] = (stat.st_ino, is_dir, 0 if is_dir else stat.st_size, 0 if is_dir else stat.st_mtime_ns)
+        return os.stat(directory).st_mtime_ns, entries
+
+    def add_tree(self, root: str) -> List[str]:
+        files = []
+        pending = [root]
+        while pending:
+            directory = pending.pop()
+            try:
+                self._dirs[directory] = listing = self._list(directory)
+            except OSError:
+                continue
+            for name, (_, is_dir, _, _) in listing[1].items():
+                (pending if is_dir else files).append(os.path.join(directory, name))
+        return files
+
+    def remove_tree(self, root: str) -> None:
+        for directory in [path for path in self._dirs if _has_prefix(path, root)]:
+            del self._dirs[directory]
+
+    def poll(self, changes: ChangeSet, timeout: float) -> None:
+        time.sleep(min(timeout, self.interval))
+
+        removed: Dict[int, Tuple[str, tuple]] = {}
+        added: Dict[int, Tuple[str, tuple]] = {}
+
+        for directory, (mtime, entries) in list(self._dirs.items()):
+            if directory not in self._dirs:
+                continue  # Dropped while handling a removed parent
+            try:
+                if os.stat(directory).st_mtime_ns == mtime:
+                    continue
+                self._dirs[directory] = (new_mtime, new_entries) = self._list(directory)
+            except OSError:
+                continue  # Removed; its parent's listing reports it
+
+            for name, entry in entries.items():
+                new_entry = new_entries.get(name)
+                path = os.path.join(directory, name)
+                if new_entry is None or new_entry[0] != entry[0]:
+                    removed[entry[0]] = (path, entry)
+                elif not entry[1] and new_entry[2:] != entry[2:]:
+                    changes.modified(path)
+            for name, entry in new_entries.items():
+                old_entry = entries.get(name)
+                if old_entry is None or old_entry[0] != entry[0]:
+                    added[entry[0]] = (os.path.join(directory, name), entry)
+
+        # The same inode disappearing in one place and appearing in another is a move, unless
+        # the file's size or mtime changed too (a freed inode reused by a new file)
+        for inode in list(removed):
+            if inode in added and removed[inode][1][1:] == added[inode][1][1:]:
+                (source, entry), (destination, _) = removed.pop(inode), added.pop(inode)
+                if entry[1]:
+                    self._move_tree(source, destination)
+                    changes.dir_moved(source, destination)
+                else:
+                    changes.moved(source, destination)
+
+        for path, entry in removed.values():
+            if entry[1]:
+                self.remove_tree(path)
+                changes.dir_deleted(path)
+            else:
+                changes.deleted(path)
+        for path, entry in added.values():
+            if entry[1]:
+                for file_path in self.add_tree(path):
+                    changes.created(file_path)
+            else:
+                changes.created(path)
+
+    def _move_tree(self, source: str, destination: str) -> None:
+        for directory in [path for path in self._dirs if _has_prefix(path, source)]:
+            self._dirs[_replace_prefix(directory, source, destination)] = self._dirs.pop(directory)
+
+    def close(self) -> None:
+        self._dirs.clear()
+
+
+def create_backend(use_inotify: Optional[bool] = None, poll_interval: float = 30.0):
+    """inotify where available (unless ``use_inotify`` is False), otherwise polling."""
+    if use_inotify is not False:
+        try:
+            return InotifyBackend()
+        except OSError as e:
+            if use_inotify:
+                raise
+            logger.info(f"[WATCHER] inotify unavailable ({e}); polling every {poll_interval:g}s")
+    return PollingBackend(poll_interval)
+
+
+def _folder_for(path: str, folders: Iterable[ScanFolder]) -> Optional[ScanFolder]:
+    """The most specific active scan folder containing ``path``."""
+    matches = [folder for folder in folders if _has_prefix(path, os.path.normpath(folder.path))]
+    return max(matches, key=lambda folder: len(folder.path), default=None)
+
+
+def _companion_files(directories: Iterable[str]) -> Tuple[List[str], List[str]]:
+    """Cover images and OPF files next to the changed books, as the full scan would find them."""
+    cover_files, opf_files = [], []
+    for directory in directories:
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            continue
+        for name in names:
+            extension = Path(name).suffix.lower()
+            if extension in COVER_EXTENSIONS and "cover" in name.lower():
+                cover_files.append(os.path.join(directory, name))
+            elif extension == ".opf":
+                opf_files.append(os.path.join(directory, name))
+    return cover_files, opf_files
+
+
+def _retire_files(book_files: Iterable[BookFile]) -> int:
+    """Handle book files whose path is gone: drop a missing track, soft-delete a book with no files left."""
+    book_files = list(book_files)
+    retired_ids = {book_file.pk for book_file in book_files}
+    books = {book_file.book_id: book_file.book for book_file in book_files}
+
+    # Other files of the affected books, read once for the whole event
+    live_book_ids = set()
+    book_ids = list(books)
+    for start in range(0, len(book_ids), UPDATE_BATCH_SIZE):
+        others = BookFile.objects.filter(book_id__in=book_ids[start : start + UPDATE_BATCH_SIZE]).exclude(pk__in=retired_ids).values_list("book_id", "file_path")
+        live_book_ids.update(book_id for book_id, file_path in others if book_id not in live_book_ids and os.path.exists(file_path))
+
+    dropped = [book_file.pk for book_file in book_files if book_file.book_id in live_book_ids]
+    for start in range(0, len(dropped), UPDATE_BATCH_SIZE):
+        BookFile.objects.filter(pk__in=dropped[start : start + UPDATE_BATCH_SIZE]).delete()
+
+    for book_id, book in books.items():
+        if book_id not in live_book_ids and book.deleted_at is None:
+            book.soft_delete()
+    return len(book_files)
+
+
+def _move_book_files(book_files: Iterable[BookFile], source: str, destination: str, folders) -> Tuple[int, List[BookFile]]:
+    """Rewrite paths under ``source`` to ``destination`` in place; returns (moved, left the library)."""
+    moved, orphaned, batch = 0, [], []
+
+    def flush():
+        BookFile.objects.bulk_update(batch, ["file_path", "file_path_hash", "cover_path", "opf_path"])
+        batch.clear()
+
+    for book_file in book_files:
+        new_path = _replace_prefix(book_file.file_path, source, destination)
+        folder = _folder_for(new_path, folders)
+        if folder is None:
+            orphaned.append(book_file)
+            continue
+
+        book_file.file_path = new_path
+        book_file.file_path_hash = book_file.generate_hash(new_path)
+        book_file.cover_path = _replace_prefix(book_file.cover_path, source, destination)
+        book_file.opf_path = _replace_prefix(book_file.opf_path, source, destination)
+        if book_file.book.scan_folder_id != folder.pk:
+            if book_file.book.scan_folder_id:
+                ScanFolder.adjust_counts(book_file.book.scan_folder_id, books=-1)
+            ScanFolder.adjust_counts(folder.pk, books=1)
+            book_file.book.scan_folder = folder
+            book_file.book.save(update_fields=["scan_folder"])
+
+        batch.append(book_file)
+        moved += 1
+        if len(batch) >= UPDATE_BATCH_SIZE:
+            flush()
+
+    if batch:
+        flush()
+    return moved, orphaned
+
+
+def _update_file_counts(changes: ChangeSet, folders: List[ScanFolder]):
+    """Keep the folders' file counters current: per-file deltas, and a recount where whole directories changed."""
+    recount = {}
+    for source, destination in changes.dir_moves:
+        for path in (source, destination):
+            folder = _folder_for(path, folders)
+            if folder is not None:
+                recount[folder.pk] = folder
+    for directory in changes.deleted_dirs:
+        folder = _folder_for(directory, folders)
+        if folder is not None:
+            recount[folder.pk] = folder
+
+    deltas: Dict[int, int] = {}
+
+    def count(path, delta):
+        folder = _folder_for(path, folders)
+        if folder is not None and folder.pk not in recount and Path(path).suffix.lower() in folder.get_extensions():
+            deltas[folder.pk] = deltas.get(folder.pk, 0) + delta
+
+    for path, kind in changes.changes.items():
+        if kind == CREATED:
+            count(path, 1)
+        elif kind == DELETED:
+            count(path, -1)
+    for destination, source in changes.moves.items():
+        count(source, -1)
+        count(destination, 1)
+
+    for folder_id, delta in deltas.items():
+        ScanFolder.adjust_counts(folder_id, files=delta)
+    for folder in recount.values():
+        folder.refresh_counts()
+
+
+def apply_changes(changes: ChangeSet, folders: Optional[List[ScanFolder]] = None) -> Dict[str, int]:
+    """
+    Apply a debounced change set to the library.
+
+    Moves are applied first, as path updates, so that the scanner never sees
+    a moved book as new. Deleted paths retire their books; created and
+    modified paths go through the scanner's per-file processing.
+
+    Returns:
+        Counts of moved, deleted and processed paths
+    """
+    from books.scanner.content_processing import process_files_by_type
+    from books.scanner.folder import _process_book
+
+    if folders is None:
+        folders = list(ScanFolder.objects.filter(is_active=True))
+    stats = {"moved": 0, "deleted": 0, "processed": 0}
+    to_process = dict(changes.changes)
+
+    for source, destination in changes.dir_moves:
+        book_files = BookFile.objects.filter(file_path__startswith=source.rstrip(os.sep) + os.sep).select_related("book")
+        moved, orphaned = _move_book_files(book_files.iterator(chunk_size=UPDATE_BATCH_SIZE), source, destination, folders)
+        stats["moved"] += moved
+        stats["deleted"] += _retire_files(orphaned)
+
+    for destination, source in changes.moves.items():
+        book_files = list(BookFile.objects.filter(file_path=source).select_related("book"))
+        if not book_files:
+            to_process.setdefault(destination, CREATED)  # Not in the library yet
+            continue
+        moved, orphaned = _move_book_files(book_files, source, destination, folders)
+        stats["moved"] += moved
+        stats["deleted"] += _retire_files(orphaned)
+
+    for directory in changes.deleted_dirs:
+        prefix = directory.rstrip(os.sep) + os.sep
+        stats["deleted"] += _retire_files(BookFile.objects.filter(file_path__startswith=prefix).select_related("book"))
+
+    deleted = [path for path, kind in to_process.items() if kind == DELETED]
+    if deleted:
+        stats["deleted"] += _retire_files(BookFile.objects.filter(file_path__in=deleted).select_related("book"))
+
+    # Group what needs (re)processing by scan folder
+    by_folder: Dict[int, Tuple[ScanFolder, Dict[str, str]]] = {}
+    for path, kind in to_process.items():
+        if kind == DELETED:
+            continue
+        folder = _folder_for(path, folders)
+        if folder is None:
+            continue
+
+        extension = Path(path).suffix.lower()
+        if extension == ".opf" or extension in COVER_EXTENSIONS:
+            # A changed companion file refreshes the books beside it
+            directory = os.path.dirname(path)
+            for book_path in BookFile.objects.filter(file_path__startswith=directory + os.sep, book__deleted_at__isnull=True).values_list("file_path", flat=True):
+                if os.path.dirname(book_path) == directory:
+                    by_folder.setdefault(folder.pk, (folder, {}))[1].setdefault(book_path, MODIFIED)
+        elif extension in folder.get_extensions() and os.path.isfile(path):
+            by_folder.setdefault(folder.pk, (folder, {}))[1][path] = kind
+
+    for folder, paths in by_folder.values():
+        directories = {os.path.dirname(path) for path in paths}
+        cover_files, opf_files = _companion_files(directories)
+
+        if folder.content_type in ("comics", "audiobooks"):
+            # Grouped content needs its siblings (e.g. every track of an audiobook)
+            extensions = folder.get_extensions()
+            siblings = []
+            for directory in directories:
+                try:
+                    names = os.listdir(directory)
+                except OSError as e:
+                    # Removed or unreadable before the batch was applied
+                    logger.warning(f"[WATCHER] Cannot list {directory}: {e}")
+                    continue
+                siblings.extend(os.path.join(directory, name) for name in names if Path(name).suffix.lower() in extensions)
+            if not siblings:
+                continue
+            siblings.sort()
+            try:
+                process_files_by_type(siblings, folder, cover_files, opf_files, rescan=True)
+                stats["processed"] += len(paths)
+            except Exception as e:
+                logger.error(f"[WATCHER] Failed to process changes in {', '.join(sorted(directories))}: {e}")
+            continue
+
+        for path, kind in sorted(paths.items()):
+            try:
+                _process_book(path, folder, cover_files, opf_files, rescan=kind == MODIFIED)
+                stats["processed"] += 1
+            except Exception as e:
+                logger.error(f"[WATCHER] Failed to process {path}: {e}")
+
+    _update_file_counts(changes, folders)
+    return stats
+
+
+class LibraryWatcher:
+    """Watch all active scan folders and apply debounced changes until stopped."""
+
+    def __init__(
+        self,
+        debounce: float = 2.0,
+        max_delay: float = 30.0,
+        poll_interval: float = 30.0,
+        folder_refresh: float = 300.0,
+        use_inotify: Optional[bool] = None,
+    ):
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.folder_refresh = folder_refresh
+        self.use_inotify = use_inotify
+        self.backend = None
+        self.folders: Dict[str, ScanFolder] = {}
+
+    def _start_backend(self) -> None:
+        self.backend = create_backend(self.use_inotify, self.poll_interval)
+        self.folders = {}
+        self.sync_folders()
+
+    def sync_folders(self) -> None:
+        """Start watching newly active scan folders and stop watching removed ones."""
+        active = {os.path.normpath(folder.path): folder for folder in ScanFolder.objects.filter(is_active=True)}
+
+        for root in set(self.folders) - set(active):
+            self.backend.remove_tree(root)
+            logger.info(f"[WATCHER] Stopped watching {root}")
+
+        for root, folder in active.items():
+            if root in self.folders or not os.path.isdir(root):
+                continue
+            try:
+                self.backend.add_tree(root)
+            except OSError as e:
+                if not isinstance(self.backend, InotifyBackend) or self.use_inotify:
+                    raise
+                # Typically out of inotify watches; watch everything by polling instead
+                logger.warning(f"[WATCHER] {e}; falling back to polling")
+                self.backend.close()
+                self.use_inotify = False
+                self._start_backend()
+                return
+            logger.info(f"[WATCHER] Watching {root}")
+
+        self.folders = {root: active[root] for root in active if os.path.isdir(root)}
+
+    def run(self, stop_event=None, on_apply=None) -> None:
+        """
+        Watch until ``stop_event`` is set (or forever).
+
+        Args:
+            stop_event: Optional ``threading.Event`` that ends the loop
+            on_apply: Optional callback receiving the stats of each applied batch
+        """
+        self._start_backend()
+        changes = ChangeSet()
+        first_change = last_change = None
+        last_refresh = time.monotonic()
+
+        try:
+            while stop_event is None or not stop_event.is_set():
+                before = len(changes)
+                self.backend.poll(changes, timeout=self.debounce)
+                now = time.monotonic()
+
+                if changes and (len(changes) != before or first_change is None):
+                    first_change = first_change or now
+                    last_change = now
+
+                if changes and (now - last_change >= self.debounce or now - first_change >= self.max_delay):
+                    try:
+                        stats = self._apply(changes)
+                        if on_apply:
+                            on_apply(stats)
+                    except Exception as e:
+                        # Keep watching; the next full scan or reconcile picks up what this batch missed
+                        logger.error(f"[WATCHER] Failed to apply {len(changes)} change(s): {e}", exc_info=True)
+                    changes = ChangeSet()
+                    first_change = last_change = None
+
+                if now - last_refresh >= self.folder_refresh:
+                    try:
+                        close_old_connections()
+                        self.sync_folders()
+                    except Exception as e:
+                        logger.error(f"[WATCHER] Failed to refresh scan folders: {e}", exc_info=True)
+                    last_refresh = now
+        finally:
+            self.backend.close()
+
+    def _apply(self, changes: ChangeSet) -> Dict[str, int]:
+        close_old_connections()
+
+        if changes.overflowed:
+            # Events were dropped: reconcile every folder with a full rescan
+            from books.scanner.folder import scan_directory
+
+            for root, folder in self.folders.items():
+                scan_directory(root, folder, rescan=True)
+            return {"moved": 0, "deleted": 0, "processed": 0, "rescanned": len(self.folders)}
+
+        stats = apply_changes(changes, list(self.folders.values()))
+        flush_scan_logs()
+        logger.info(f"[WATCHER] Applied {len(changes)} change(s): {stats['moved']} moved, {stats['deleted']} deleted, {stats['processed']} processed")
+        return stats
+
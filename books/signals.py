@@ -0,0 +1,155 @@
+"""Signal handlers for the books app.
+
+Keeps the cached per-user UI state used by the context processors, the
+near-duplicate index, the comic series index, the scan folder book
+counters and the quick search word index in sync with the models they are
+derived from, and publishes folder counter changes to the progress streams.
+"""
+
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from books.models import Author, Book, FinalMetadata, Genre, ScanFolder, SearchToken, Series, SetupWizard, UserProfile, folder_counts_changed
+from books.scanner.events import folder_changed
+from books.utils.comic_index import refresh_comic_issue
+from books.utils.duplicate_index import invalidate_duplicate_index
+from books.utils.quick_search import schedule_index
+from books.utils.user_state import invalidate_library_state, invalidate_user_profile, invalidate_wizard_state
+
+
+def _owner(instance):
+    try:
+        return instance.user
+    except User.DoesNotExist:
+        return None
+
+
+@receiver([post_save, post_delete], sender=UserProfile)
+def clear_cached_user_profile(sender, instance, **kwargs):
+    user = _owner(instance)
+    if user is not None:
+        invalidate_user_profile(user)
+
+
+@receiver([post_save, post_delete], sender=SetupWizard)
+def clear_cached_wizard_state(sender, instance, **kwargs):
+    user = _owner(instance)
+    if user is not None:
+        invalidate_wizard_state(user)
+
+
+@receiver(post_delete, sender=User)
+def clear_cached_user_state(sender, instance, **kwargs):
+    invalidate_user_profile(instance)
+    invalidate_wizard_state(instance)
+
+
+@receiver([post_save, post_delete], sender=ScanFolder)
+def clear_cached_library_state_for_folder(sender, instance, **kwargs):
+    invalidate_library_state()
+
+
+@receiver(post_save, sender=Book)
+def clear_cached_library_state_for_book(sender, instance, **kwargs):
+    # Only real books change the answer; placeholders are ignored by the wizard check
+    if not instance.is_placeholder:
+        invalidate_library_state()
+
+
+@receiver(post_delete, sender=Book)
+def clear_cached_library_state_for_deleted_book(sender, instance, **kwargs):
+    invalidate_library_state()
+
+
+@receiver([post_save, post_delete], sender=FinalMetadata)
+def clear_duplicate_index_for_metadata(sender, instance, **kwargs):
+    invalidate_duplicate_index()
+
+
+# Reviewed series, number and publisher override what the scanner indexed
+COMIC_INDEX_FIELDS = ("final_series", "final_series_number", "final_publisher")
+
+
+def _comic_index_values(instance):
+    # Read from __dict__ so deferred fields aren't loaded
+    return tuple(instance.__dict__.get(field) for field in COMIC_INDEX_FIELDS)
+
+
+@receiver(post_init, sender=FinalMetadata)
+def remember_comic_index_values(sender, instance, **kwargs):
+    instance._comic_index_values = _comic_index_values(instance)
+
+
+@receiver(post_save, sender=FinalMetadata)
+def refresh_comic_index_for_metadata(sender, instance, created=False, update_fields=None, **kwargs):
+    if update_fields is not None and not set(COMIC_INDEX_FIELDS) & set(update_fields):
+        return
+    values = _comic_index_values(instance)
+    if not created and values == getattr(instance, "_comic_index_values", None):
+        return
+    instance._comic_index_values = values
+
+    if FinalMetadata.book.is_cached(instance):
+        content_type = instance.book.content_type
+    else:
+        content_type = Book.objects.filter(pk=instance.book_id).values_list("content_type", flat=True).first()
+    if content_type == "comic":
+        refresh_comic_issue(Book(pk=instance.book_id))
+
+
+@receiver([post_save, post_delete], sender=Book)
+def clear_duplicate_index_for_book(sender, instance, **kwargs):
+    # Placeholder and soft-delete flags decide whether a book is indexed
+    invalidate_duplicate_index()
+
+
+@receiver(post_save, sender=Book)
+def count_created_book(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and instance.scan_folder_id:
+        ScanFolder.adjust_counts(instance.scan_folder_id, books=1)
+
+
+@receiver(post_delete, sender=Book)
+def count_deleted_book(sender, instance, **kwargs):
+    if instance.scan_folder_id:
+        ScanFolder.adjust_counts(instance.scan_folder_id, books=-1)
+
+
+@receiver(folder_counts_changed)
+def publish_folder_progress(sender, folder_id, **kwargs):
+    # Open progress streams read the new counts with the next folder batch
+    folder_changed(folder_id)
+
+
+@receiver(post_save, sender=FinalMetadata)
+def index_title_for_search(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and "final_title" not in update_fields:
+        return
+    schedule_index(SearchToken.BOOK, instance.book_id, instance.final_title)
+
+
+@receiver(post_delete, sender=FinalMetadata)
+def unindex_title_for_search(sender, instance, **kwargs):
+    schedule_index(SearchToken.BOOK, instance.book_id, None)
+
+
+@receiver(post_save, sender=Book)
+def index_book_visibility_for_search(sender, instance, update_fields=None, **kwargs):
+    # Soft deletes and restores go through update_fields; results also hide deleted books at query time
+    if update_fields is None or not {"deleted_at", "is_placeholder"} & set(update_fields):
+        return
+    if instance.deleted_at or instance.is_placeholder:
+        schedule_index(SearchToken.BOOK, instance.pk, None)
+    else:
+        title = FinalMetadata.objects.filter(book=instance).values_list("final_title", flat=True).first()
+        schedule_index(SearchToken.BOOK, instance.pk, title)
+
+
+@receiver([post_save, post_delete], sender=Author)
+@receiver([post_save, post_delete], sender=Series)
+@receiver([post_save, post_delete], sender=Genre)
+def index_name_for_search(sender, instance, **kwargs):
+    kind = {Author: SearchToken.AUTHOR, Series: SearchToken.SERIES, Genre: SearchToken.GENRE}[sender]
+    deleted = kwargs.get("signal") is post_delete
+    schedule_index(kind, instance.pk, None if deleted else instance.name)
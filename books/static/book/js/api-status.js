@@ -39,7 +39,7 @@ function retryBook(bookId) {
  * Retry all high priority books
  */
 function retryAllHigh() {
-    if (!confirm('Retry all high priority books? This may take a while.')) {
+    if (!confirm('Retry all high priority books? They are retried in the background.')) {
         return;
     }
 
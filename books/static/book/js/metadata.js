@@ -364,6 +364,8 @@ function getConfidenceBadgeClass(confidence) {
  * Multi-Cover Selector Functions (Feature 2)
  */
 let selectedInternalCoverPath = null;
+let multiCoverBookId = null;
+let multiCoverNextPage = 1;
 
 /**
  * Open the multi-cover selector modal
@@ -378,13 +380,30 @@ function openMultiCoverSelector(bookId) {
     loadingDiv.classList.remove('d-none');
     errorDiv.classList.add('d-none');
     gridDiv.classList.add('d-none');
+    document.getElementById('multiCoverContainer').innerHTML = '';
     selectedInternalCoverPath = null;
+    multiCoverBookId = bookId;
+    multiCoverNextPage = 1;
     document.getElementById('confirmCoverSelection').disabled = true;
 
     modal.show();
 
+    loadMultiCoverPage();
+}
+
+/**
+ * Fetch the next page of internal cover candidates and append it to the grid
+ */
+function loadMultiCoverPage() {
+    const loadingDiv = document.getElementById('multiCoverLoading');
+    const gridDiv = document.getElementById('multiCoverGrid');
+    const loadMoreButton = document.getElementById('multiCoverLoadMore');
+    const firstPage = multiCoverNextPage === 1;
+
+    loadMoreButton.disabled = true;
+
     // Fetch internal covers via AJAX
-    fetch(`/books/ajax/book/${bookId}/list_internal_covers/`, {
+    fetch(`/books/ajax/book/${multiCoverBookId}/list_internal_covers/?page=${multiCoverNextPage}`, {
         method: 'GET',
         headers: {
             'X-CSRFToken': getCsrfToken(),
@@ -393,13 +412,14 @@ function openMultiCoverSelector(bookId) {
         .then((response) => response.json())
         .then((data) => {
             loadingDiv.classList.add('d-none');
+            loadMoreButton.disabled = false;
 
             if (!data.success) {
                 showMultiCoverError(data.error || 'Failed to load covers');
                 return;
             }
 
-            if (!data.covers || data.covers.length === 0) {
+            if (firstPage && (!data.covers || data.covers.length === 0)) {
                 showMultiCoverError('No images found in EPUB');
                 return;
             }
@@ -408,11 +428,14 @@ function openMultiCoverSelector(bookId) {
             populateMultiCoverGrid(data.covers, data.current_cover);
             gridDiv.classList.remove('d-none');
 
-            // Update count
+            // Update count and paging
             document.getElementById('multiCoverCount').textContent = data.total_count;
+            multiCoverNextPage = data.page + 1;
+            loadMoreButton.classList.toggle('d-none', !data.has_more);
         })
         .catch((error) => {
             loadingDiv.classList.add('d-none');
+            loadMoreButton.disabled = false;
             showMultiCoverError('Network error: ' + error.message);
         });
 }
@@ -427,16 +450,17 @@ function showMultiCoverError(message) {
 }
 
 /**
- * Populate the cover grid with covers data
+ * Append a page of covers to the cover grid
  */
 function populateMultiCoverGrid(covers, currentCoverPath) {
     const container = document.getElementById('multiCoverContainer');
     const template = document.getElementById('coverCardTemplate');
+    const showOnlyLarge = document.getElementById('showOnlyLargeImages').checked;
+    const firstIndex = container.querySelectorAll('.cover-card-wrapper').length;
 
-    // Clear existing content
-    container.innerHTML = '';
+    covers.forEach((cover, pageIndex) => {
+        const index = firstIndex + pageIndex;
 
-    covers.forEach((cover, index) => {
         // Clone template
         const clone = template.content.cloneNode(true);
         const wrapper = clone.querySelector('.cover-card-wrapper');
@@ -448,6 +472,9 @@ function populateMultiCoverGrid(covers, currentCoverPath) {
         wrapper.dataset.coverIndex = index;
         wrapper.dataset.minDimension = Math.min(cover.width, cover.height);
         card.dataset.internalPath = cover.internal_path;
+        if (showOnlyLarge && Math.min(cover.width, cover.height) < 800) {
+            wrapper.classList.add('filtered-out');
+        }
 
         // Set image
         if (cover.preview_url) {
@@ -455,6 +482,7 @@ function populateMultiCoverGrid(covers, currentCoverPath) {
         } else {
             img.src = '/static/images/placeholder-cover.png';
         }
+        img.loading = 'lazy';
 
         // Set radio button
         radio.value = cover.internal_path;
@@ -523,8 +551,9 @@ function formatFileSize(bytes) {
  * Initialize multi-cover selection event handlers
  */
 function initializeMultiCoverSelection() {
-    // Card click to select
-    document.querySelectorAll('.cover-card').forEach((card) => {
+    // Card click to select (cards from earlier pages are already bound)
+    document.querySelectorAll('.cover-card:not([data-bound])').forEach((card) => {
+        card.dataset.bound = 'true';
         card.addEventListener('click', function (e) {
             if (e.target.classList.contains('btn')) return; // Skip button clicks
 
@@ -532,15 +561,18 @@ function initializeMultiCoverSelection() {
             radio.checked = true;
             handleCoverSelection(radio);
         });
-    });
 
-    // Radio change
-    document.querySelectorAll('.cover-radio').forEach((radio) => {
-        radio.addEventListener('change', function () {
+        // Radio change
+        card.querySelector('.cover-radio').addEventListener('change', function () {
             handleCoverSelection(this);
         });
     });
 
+    // Modal-level controls are bound once
+    const modal = document.getElementById('multiCoverSelectorModal');
+    if (modal.dataset.bound) return;
+    modal.dataset.bound = 'true';
+
     // Filter checkbox
     document.getElementById('showOnlyLargeImages').addEventListener('change', function () {
         const showOnlyLarge = this.checked;
@@ -554,6 +586,9 @@ function initializeMultiCoverSelection() {
         });
     });
 
+    // Next page of candidates
+    document.getElementById('multiCoverLoadMore').addEventListener('click', loadMultiCoverPage);
+
     // Confirm selection
     document.getElementById('confirmCoverSelection').addEventListener('click', function () {
         if (selectedInternalCoverPath) {
@@ -0,0 +1,115 @@
+/**
+ * Quick Search - navigation bar search box
+ * Debounces keystrokes, cancels superseded requests and remembers answers per query
+ */
+
+(function () {
+    'use strict';
+
+    const DEBOUNCE_MS = 200;
+    const MIN_LENGTH = 2;
+    const MAX_CACHED = 50;
+
+    const GROUPS = [
+        { key: 'books', label: 'Books', icon: 'fa-book' },
+        { key: 'authors', label: 'Authors', icon: 'fa-user' },
+        { key: 'series', label: 'Series', icon: 'fa-layer-group' },
+        { key: 'genres', label: 'Genres', icon: 'fa-tags' }
+    ];
+
+    function escapeHtml(value) {
+        const div = document.createElement('div');
+        div.textContent = value == null ? '' : String(value);
+        return div.innerHTML;
+    }
+
+    function init() {
+        const input = document.getElementById('quickSearchInput');
+        const menu = document.getElementById('quickSearchResults');
+        if (!input || !menu) return;
+
+        const cache = new Map();
+        let timer = null;
+        let controller = null;
+
+        function itemUrl(group, item) {
+            if (group === 'books') {
+                return input.dataset.bookUrl.replace(/0\/$/, `${item.id}/`);
+            }
+            return `${input.dataset.listUrl}?search_query=${encodeURIComponent(item.name)}`;
+        }
+
+        function render(results) {
+            const sections = GROUPS
+                .filter(group => (results[group.key] || []).length)
+                .map(group => {
+                    const items = results[group.key].map(item => `
+                        <a class="dropdown-item text-truncate" role="option" href="${itemUrl(group.key, item)}">
+                            <i class="fas ${group.icon} me-2 text-muted"></i>${escapeHtml(item.title || item.name)}
+                        </a>`).join('');
+                    return `<h6 class="dropdown-header">${group.label}</h6>${items}`;
+                });
+
+            menu.innerHTML = sections.length
+                ? sections.join('')
+                : '<span class="dropdown-item-text text-muted">No matches</span>';
+            menu.classList.add('show');
+        }
+
+        function hide() {
+            menu.classList.remove('show');
+        }
+
+        function remember(query, results) {
+            if (cache.size >= MAX_CACHED) {
+                cache.delete(cache.keys().next().value);
+            }
+            cache.set(query, results);
+        }
+
+        function search(query) {
+            if (cache.has(query)) {
+                render(cache.get(query));
+                return;
+            }
+
+            if (controller) controller.abort();
+            controller = new AbortController();
+
+            fetch(`${input.dataset.searchUrl}?q=${encodeURIComponent(query)}`, {
+                signal: controller.signal,
+                headers: { 'X-Requested-With': 'XMLHttpRequest' }
+            })
+                .then(response => response.json())
+                .then(data => {
+                    if (!data.success) return;
+                    remember(query, data.results);
+                    if (input.value.trim().toLowerCase() === query) render(data.results);
+                })
+                .catch(error => {
+                    if (error.name !== 'AbortError') console.error('Quick search failed:', error);
+                });
+        }
+
+        input.addEventListener('input', () => {
+            clearTimeout(timer);
+            const query = input.value.trim().toLowerCase();
+            if (query.length < MIN_LENGTH) {
+                if (controller) controller.abort();
+                hide();
+                return;
+            }
+            timer = setTimeout(() => search(query), DEBOUNCE_MS);
+        });
+
+        input.addEventListener('keydown', event => {
+            if (event.key === 'Escape') hide();
+        });
+
+        document.addEventListener('click', event => {
+            if (event.target !== input && !menu.contains(event.target)) hide();
+        });
+    }
+
+    document.addEventListener('DOMContentLoaded', init);
+})();
@@ -772,6 +772,8 @@ class EbookRenamer {
         }
 
         this.showLoading();
+        const progressId = this.generateProgressId();
+        const progressSubscription = dryRun ? null : this.subscribeToBatchProgress(progressId);
 
         try {
             const response = await $.post('/renamer/execute-batch/', {
@@ -780,6 +782,7 @@ class EbookRenamer {
                 book_ids: Array.from(this.selectedBooks),
                 dry_run: dryRun,
                 embed_metadata: embedMetadata,
+                progress_id: progressId,
                 csrfmiddlewaretoken: $('[name=csrfmiddlewaretoken]').val(),
             });
 
@@ -799,10 +802,39 @@ class EbookRenamer {
             console.error('Execute error:', error);
             this.showAlert('Failed to execute rename operation. Please try again.', 'danger');
         } finally {
+            if (progressSubscription) {
+                progressSubscription.close();
+            }
             this.hideLoading();
         }
     }
 
+    generateProgressId() {
+        if (window.crypto && window.crypto.randomUUID) {
+            return window.crypto.randomUUID().replace(/-/g, '');
+        }
+        return `${Date.now().toString(16)}${Math.random().toString(16).slice(2)}`;
+    }
+
+    /**
+     * Show the running batch's progress in the loading overlay
+     */
+    subscribeToBatchProgress(progressId) {
+        const config = window.renamerEventsConfig;
+        if (!config || !window.ScanEvents) return null;
+
+        return window.ScanEvents.subscribe({
+            streamUrl: config.eventsUrl,
+            pollUrl: config.eventsPollUrl,
+            handlers: {
+                batch_progress: (data) => {
+                    if (data.batch !== progressId) return;
+                    $('#loading-overlay .mt-2').text(`Renamed ${data.done} of ${data.total} books...`);
+                },
+            },
+        });
+    }
+
     displayExecuteResults(response) {
         const summary = response.summary;
         const results = response.results;
@@ -930,6 +962,7 @@ class EbookRenamer {
 
     hideLoading() {
         $('#loading-overlay').addClass('d-none');
+        $('#loading-overlay .mt-2').text('Processing...');
     }
 
     showAlert(message, type = 'info') {
@@ -0,0 +1,107 @@
+/**
+ * Scan Events - subscribes to the scan, folder and batch progress event stream
+ * Uses server-sent events; falls back to polling where EventSource is missing or blocked
+ */
+
+(function () {
+    'use strict';
+
+    const POLL_INTERVAL_MS = 5000;
+
+    /**
+     * Subscribe to progress events.
+     *
+     * options.streamUrl - server-sent event stream URL
+     * options.pollUrl   - JSON polling fallback URL
+     * options.handlers  - { snapshot, scan_progress, folder_progress, batch_progress } callbacks
+     *
+     * Returns an object with close().
+     */
+    function subscribe(options) {
+        const handlers = options.handlers || {};
+        let lastEventId = null;
+        let source = null;
+        let pollTimer = null;
+        let polling = false;
+        let closed = false;
+
+        function dispatch(type, data) {
+            const handler = handlers[type];
+            if (!handler) return;
+            try {
+                handler(data);
+            } catch (error) {
+                console.error(`Error handling ${type} event:`, error);
+            }
+        }
+
+        async function poll() {
+            if (closed) return;
+            try {
+                const url = new URL(options.pollUrl, window.location.origin);
+                if (lastEventId) {
+                    url.searchParams.set('last_event_id', lastEventId);
+                }
+                const response = await fetch(url, {
+                    credentials: 'same-origin',
+                    headers: { 'X-Requested-With': 'XMLHttpRequest' },
+                });
+                if (response.ok) {
+                    const data = await response.json();
+                    data.events.forEach((event) => dispatch(event.event, event.data));
+                    lastEventId = data.last_event_id || lastEventId;
+                }
+            } catch (error) {
+                console.error('Failed to poll progress events:', error);
+            }
+            if (!closed) {
+                pollTimer = setTimeout(poll, POLL_INTERVAL_MS);
+            }
+        }
+
+        function startPolling() {
+            if (source) {
+                source.close();
+                source = null;
+            }
+            if (options.pollUrl && !polling) {
+                polling = true;
+                poll();
+            }
+        }
+
+        if (options.streamUrl && window.EventSource) {
+            let opened = false;
+            source = new EventSource(options.streamUrl);
+            source.onopen = () => {
+                opened = true;
+            };
+            source.onerror = () => {
+                // The browser reconnects a stream that was open (sending Last-Event-ID);
+                // one that never opened is blocked, and one the server refused (e.g. 503
+                // when too many streams are open) is given up, so poll instead
+                if (!opened || source.readyState === EventSource.CLOSED) {
+                    startPolling();
+                }
+            };
+            ['snapshot', 'scan_progress', 'folder_progress', 'batch_progress'].forEach((type) => {
+                source.addEventListener(type, (event) => {
+                    lastEventId = event.lastEventId;
+                    dispatch(type, JSON.parse(event.data));
+                });
+            });
+        } else {
+            startPolling();
+        }
+
+        return {
+            close() {
+                closed = true;
+                if (source) source.close();
+                if (pollTimer) clearTimeout(pollTimer);
+            },
+        };
+    }
+
+    window.ScanEvents = { subscribe };
+})();
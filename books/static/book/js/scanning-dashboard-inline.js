@@ -53,15 +53,24 @@ window.scanningDashboardInline = {
             const data = await response.json();
             
             if (data.success && data.progress_data) {
+                let stillCounting = false;
+
                 // Update each container with its progress data
                 Object.entries(data.progress_data).forEach(([folderId, progress]) => {
                     const container = containerMap.get(folderId);
-                    if (container && !progress.error) {
+                    if (container && progress.counting) {
+                        // Files are being counted in the background; keep the spinner
+                        stillCounting = true;
+                    } else if (container && !progress.error) {
                         this.updateProgressContainer(container, progress);
                     } else if (container && progress.error) {
                         this.showProgressError(container, 'Failed to load progress');
                     }
                 });
+
+                if (stillCounting) {
+                    setTimeout(() => this.loadFolderProgressAsync(), 5000);
+                }
             } else {
                 // Show error for all containers
                 containerMap.forEach(container => {
@@ -599,53 +599,59 @@ class ScanningDashboard {
             const url = baseUrl.replace('PLACEHOLDER', jobId);
             const response = await fetch(url);
             const data = await response.json();
+            this.renderScanProgress(jobId, data);
+        } catch (error) {
+            console.error('Error updating scan progress:', error);
+        }
+    }
+
+    /**
+     * Show a job's progress data on its scan card
+     */
+    renderScanProgress(jobId, data) {
+        const scanCard = document.querySelector(`[data-job-id="${jobId}"]`);
+        if (!scanCard) return;
 
-            const scanCard = document.querySelector(`[data-job-id="${jobId}"]`);
-            if (!scanCard) return;
+        // Update progress bar
+        const progressBar = scanCard.querySelector('.scan-progress-bar');
+        if (progressBar) {
+            progressBar.style.width = `${data.percentage || 0}%`;
+            progressBar.textContent = `${data.percentage || 0}%`;
+        }
 
-            // Update progress bar
-            const progressBar = scanCard.querySelector('.scan-progress-bar');
-            if (progressBar) {
-                progressBar.style.width = `${data.percentage || 0}%`;
-                progressBar.textContent = `${data.percentage || 0}%`;
-            }
+        // Update status and details
+        const titleElement = scanCard.querySelector('.card-title');
+        const detailsElement = scanCard.querySelector('.scan-details');
 
-            // Update status and details
-            const titleElement = scanCard.querySelector('.card-title');
-            const detailsElement = scanCard.querySelector('.scan-details');
+        if (titleElement) {
+            titleElement.textContent = data.status || 'Scanning';
+        }
 
-            if (titleElement) {
-                titleElement.textContent = data.status || 'Scanning';
+        if (detailsElement) {
+            detailsElement.textContent = data.details || 'Processing...';
+        }
+
+        // Handle completion
+        if (data.completed) {
+            scanCard.classList.add(data.success ? 'completed' : 'error');
+
+            // Remove cancel button
+            const cancelBtn = scanCard.querySelector('.cancel-scan-btn');
+            if (cancelBtn) {
+                cancelBtn.remove();
             }
 
+            // Show completion message
             if (detailsElement) {
-                detailsElement.textContent = data.details || 'Processing...';
+                detailsElement.textContent = data.success ? data.message : data.error;
             }
 
-            // Handle completion
-            if (data.completed) {
-                scanCard.classList.add(data.success ? 'completed' : 'error');
-
-                // Remove cancel button
-                const cancelBtn = scanCard.querySelector('.cancel-scan-btn');
-                if (cancelBtn) {
-                    cancelBtn.remove();
-                }
-
-                // Show completion message
-                if (detailsElement) {
-                    detailsElement.textContent = data.success ? data.message : data.error;
+            // Auto-remove completed scans after 30 seconds
+            setTimeout(() => {
+                if (scanCard.parentElement) {
+                    scanCard.remove();
                 }
-
-                // Auto-remove completed scans after 30 seconds
-                setTimeout(() => {
-                    if (scanCard.parentElement) {
-                        scanCard.remove();
-                    }
-                }, 30000);
-            }
-        } catch (error) {
-            console.error('Error updating scan progress:', error);
+            }, 30000);
         }
     }
 
@@ -871,10 +877,15 @@ class ScanningDashboard {
     }
 
     startAutoRefresh() {
-        // Auto-refresh active scans every 5 seconds
-        this.refreshIntervals.activeScans = setInterval(() => {
-            this.updateActiveScans();
-        }, 5000);
+        if (this.config.eventsUrl && window.ScanEvents) {
+            // Scan and folder progress are pushed by the event stream
+            this.subscribeToEvents();
+        } else {
+            // Auto-refresh active scans every 5 seconds
+            this.refreshIntervals.activeScans = setInterval(() => {
+                this.updateActiveScans();
+            }, 5000);
+        }
 
         // Auto-refresh API status every 30 seconds
         this.refreshIntervals.apiStatus = setInterval(() => {
@@ -882,7 +893,44 @@ class ScanningDashboard {
         }, 30000);
     }
 
+    subscribeToEvents() {
+        this.eventSubscription = window.ScanEvents.subscribe({
+            streamUrl: this.config.eventsUrl,
+            pollUrl: this.config.eventsPollUrl,
+            handlers: {
+                snapshot: (data) => data.active_jobs.forEach((scan) => this.handleScanProgressEvent(scan)),
+                scan_progress: (data) => this.handleScanProgressEvent(data),
+                folder_progress: (data) => {
+                    const container = document.querySelector(`.folder-progress-container[data-folder-id="${data.folder_id}"]`);
+                    if (container) {
+                        this.updateFolderProgressUI(container, data.progress);
+                    }
+                },
+            },
+        });
+    }
+
+    handleScanProgressEvent(scan) {
+        const activeScanContainer = document.querySelector('#active-scans-container');
+        if (!activeScanContainer) return;
+
+        if (document.querySelector(`[data-job-id="${scan.job_id}"]`)) {
+            this.renderScanProgress(scan.job_id, scan);
+        } else if (!scan.completed) {
+            const noScansAlert = activeScanContainer.querySelector('.alert-info');
+            if (noScansAlert) {
+                noScansAlert.style.display = 'none';
+            }
+            this.createScanCard(scan, activeScanContainer);
+        }
+    }
+
     stopAutoRefresh() {
+        if (this.eventSubscription) {
+            this.eventSubscription.close();
+            this.eventSubscription = null;
+        }
+
         if (this.refreshIntervals.activeScans) {
             clearInterval(this.refreshIntervals.activeScans);
             this.refreshIntervals.activeScans = null;
@@ -952,6 +1000,10 @@ class ScanningDashboard {
      * Update the UI for a folder's progress information
      */
     updateFolderProgressUI(container, progressInfo) {
+        if (progressInfo.counting) {
+            return; // Not counted yet; leave the loading state in place
+        }
+
         const numbersElement = container.querySelector('.progress-numbers');
         const progressBar = container.querySelector('.progress-bar');
         const progressPercent = container.querySelector('.progress-percent');
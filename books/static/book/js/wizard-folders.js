@@ -17,6 +17,7 @@ Wizard.Folders = {
         this.setupEventListeners();
         this.setupFormValidation();
         this.initializeExistingInputs();
+        this.pollPendingAnalyses();
     },
 
     /**
@@ -227,11 +228,22 @@ Wizard.Folders = {
             
             if (data.valid) {
                 Wizard.Utils.setValidationState(input, true);
-                const fileMessage = data.file_count === 0 ? 'no media files found' : 
-                                  `${data.file_count} media files found`;
-                const message = `<i class="fas fa-check-circle text-success me-1"></i>Valid folder: <strong>${data.name}</strong> 
-                               <span class="badge bg-success ms-2">${fileMessage}</span>`;
-                Wizard.Utils.showSuccess(feedback, message);
+                const showResult = (result) => {
+                    const fileMessage = result.complete ? (result.file_count === 0 ? 'no media files found' : `${result.file_count} media files found`) :
+                                      `${result.file_count} media files found so far...`;
+                    const message = `<i class="fas fa-check-circle text-success me-1"></i>Valid folder: <strong>${result.name}</strong> 
+                                   <span class="badge bg-success ms-2">${fileMessage}</span>`;
+                    Wizard.Utils.showSuccess(feedback, message);
+                };
+                showResult(data);
+                if (!data.complete) {
+                    // Large folders keep being analysed in the background
+                    this.pollAnalysis(path, (result) => {
+                        if (input.value.trim() === path) {
+                            showResult(result);
+                        }
+                    });
+                }
             } else {
                 Wizard.Utils.setValidationState(input, false);
                 Wizard.Utils.showError(feedback, `<i class="fas fa-exclamation-triangle me-1"></i>${data.error}`);
@@ -248,6 +260,49 @@ Wizard.Folders = {
         this.updateAddFolderButtonState();
     },
 
+    /**
+     * Poll the background analysis of a folder until it completes
+     */
+    async pollAnalysis(path, onUpdate, interval = 1000, maxAttempts = 60) {
+        const analysisUrl = window.wizardFoldersConfig?.analysisUrl || '/books/wizard/ajax/folder-analysis/';
+
+        for (let attempt = 0; attempt < maxAttempts; attempt++) {
+            await new Promise(resolve => setTimeout(resolve, interval));
+            try {
+                const data = await Wizard.Utils.makeRequest(analysisUrl, {
+                    body: 'path=' + encodeURIComponent(path)
+                });
+                if (!data.valid) {
+                    return;
+                }
+                onUpdate(data);
+                if (data.complete) {
+                    return;
+                }
+            } catch (error) {
+                console.error('Error polling folder analysis:', error);
+                return;
+            }
+        }
+    },
+
+    /**
+     * Fill in the file counts of suggested folders still being analysed
+     */
+    pollPendingAnalyses() {
+        document.querySelectorAll('[data-analysis-path]').forEach(stats => {
+            this.pollAnalysis(stats.dataset.analysisPath, (data) => {
+                if (!data.complete) {
+                    stats.innerHTML = `<span class="badge bg-info"><i class="fas fa-spinner fa-spin me-1"></i>${data.file_count} ebook files found so far...</span>`;
+                } else if (data.file_count) {
+                    stats.innerHTML = `<span class="badge bg-success"><i class="fas fa-file-alt me-1"></i>${data.file_count} ebook files found</span>`;
+                } else {
+                    stats.innerHTML = '<span class="badge bg-secondary"><i class="fas fa-info-circle me-1"></i>No ebook files found</span>';
+                }
+            });
+        });
+    },
+
     /**
      * Enable/disable form submission during validation
      */
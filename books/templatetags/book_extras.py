@@ -8,56 +8,44 @@ metadata badges, and other book-related UI components.
 import logging
 import os
 
-import requests
 from django import template
 from django.conf import settings
 
+from books.utils.cover_cache import CoverCache
+from books.utils.cover_prefetch import CoverPrefetcher, prefetch_covers
 from books.utils.image_utils import encode_cover_to_base64
 
 register = template.Library()
 logger = logging.getLogger("books.scanner")
 
 
-def download_and_cache_cover(cover_url, book_id):
-    """Download a cover URL and cache it locally, return base64 encoded version"""
-    try:
-        logger.info(f"Starting download for cover URL: {cover_url}")
+def get_cached_remote_cover(cover_url):
+    """Return the media URL of a prefetched remote cover, queueing a download on a miss.
 
-        # Create cache directory if it doesn't exist
-        cache_dir = os.path.join(settings.MEDIA_ROOT, "cover_cache")
-        os.makedirs(cache_dir, exist_ok=True)
-        logger.info(f"Cache directory: {cache_dir}")
+    Never performs network I/O itself, so rendering a page of uncached covers
+    costs one storage lookup per cover. URLs whose download recently failed are
+    not queued again until the failure expires.
+    """
+    cached = CoverCache.get_remote_cover(cover_url)
+    if cached:
+        return f"{settings.MEDIA_URL}{cached}"
 
-        # Create filename from URL hash and book ID
-        url_hash = str(hash(cover_url))[-8:]  # Last 8 chars of hash
-        filename = f"book_{book_id}_cover_{url_hash}.jpg"
-        cache_path = os.path.join(cache_dir, filename)
-        logger.info(f"Cache path: {cache_path}")
+    if not CoverPrefetcher.has_failed(cover_url):
+        prefetch_covers([cover_url])
+    return None
 
-        # Check if already cached
-        if os.path.exists(cache_path):
-            logger.info(f"Found cached file: {cache_path}")
-            base64_result = encode_cover_to_base64(cache_path)
-            logger.info(f"Base64 encoding result length: {len(base64_result) if base64_result else 0}")
-            return base64_result
-
-        # Download and cache the image
-        logger.info(f"Downloading cover from: {cover_url}")
-        response = requests.get(cover_url, timeout=10)
-        response.raise_for_status()
-        logger.info(f"Download successful, content length: {len(response.content)}")
-
-        with open(cache_path, "wb") as f:
-            f.write(response.content)
-        logger.info(f"Saved to cache: {cache_path}")
-
-        # Return base64 encoded version
-        base64_result = encode_cover_to_base64(cache_path)
-        logger.info(f"Base64 encoding result length: {len(base64_result) if base64_result else 0}")
-        return base64_result
 
-    except Exception as e:
-        logger.error(f"Error downloading/caching cover from {cover_url}: {e}")
+def _media_url_for_local_path(cover_path):
+    """Return a media URL for a file stored under MEDIA_ROOT, or None."""
+    try:
+        media_root = os.path.abspath(settings.MEDIA_ROOT)
+        absolute_path = os.path.abspath(cover_path)
+        if os.path.commonpath([media_root, absolute_path]) != media_root:
+            return None
+        relative_path = os.path.relpath(absolute_path, media_root).replace(os.sep, "/")
+        return f"{settings.MEDIA_URL}{relative_path}"
+    except ValueError:
+        # Different drives on Windows
         return None
 
 
@@ -76,10 +64,15 @@ def _get_fallback_context(book, size, badge):
 def _process_cover_for_display(cover_path, book, add_cache_busting=False, skip_download=False):
     """
     Helper function to process cover paths for display.
-    Handles URL downloading, local file encoding, and returns processed data.
+    Resolves remote covers to their prefetched local copy and encodes local files.
+
+    Remote covers are never downloaded during rendering: a cached copy is served
+    from the media cover cache, otherwise the URL is queued for the background
+    prefetcher and the placeholder is shown until it arrives.
 
     Args:
-        skip_download: If True, don't download URL covers (for list views with many books)
+        add_cache_busting: Kept for API compatibility; cached covers have stable URLs
+        skip_download: Kept for API compatibility; rendering never downloads covers
     """
     if not cover_path:
         return "", False, None
@@ -88,36 +81,28 @@ def _process_cover_for_display(cover_path, book, add_cache_busting=False, skip_d
     base64_image = None
 
     if is_url:
-        # For list views, skip downloading to avoid blocking page load
-        if skip_download:
-            logger.debug(f"Skipping download for book {getattr(book, 'id', 'unknown')} (list view optimization)")
-            return cover_path, True, None  # Return URL as-is, will be lazy loaded by browser
-
-        # Download and cache URL-based covers, convert to base64
-        book_id = getattr(book, "id", "unknown")
-        logger.info(f"Processing URL cover for book {book_id}: {cover_path}")
-        base64_image = download_and_cache_cover(cover_path, book_id)
-
-        if base64_image:
-            logger.info(f"Successfully got base64 image, length: {len(base64_image)}")
-            is_url = False  # We have base64, don't need URL
-        elif add_cache_busting:
-            # Add cache busting parameter to force browser refresh
-            logger.warning("Failed to download/cache cover, adding cache busting")
-            timestamp = book.finalmetadata.last_updated.timestamp() if hasattr(book, "finalmetadata") and book.finalmetadata else ""
-            separator = "&" if "?" in cover_path else "?"
-            cover_path += f"{separator}t={timestamp}"
-    else:
-        # Handle local file paths - always encode to base64 for consistent display
-        try:
-            if os.path.exists(cover_path):
-                logger.debug(f"Encoding local file to base64: {cover_path}")
-                base64_image = encode_cover_to_base64(cover_path)
-                if base64_image:
-                    logger.debug(f"Successfully encoded to base64, length: {len(base64_image)}")
-        except Exception as e:
-            logger.error(f"Error encoding local file {cover_path}: {e}")
-            base64_image = None
+        local_url = get_cached_remote_cover(cover_path)
+        if local_url:
+            return local_url, False, None
+
+        logger.debug(f"Cover for book {getattr(book, 'id', 'unknown')} not cached yet, queued for prefetch: {cover_path}")
+        return "", False, None
+
+    # Files already in MEDIA_ROOT are served directly instead of being inlined
+    media_url = _media_url_for_local_path(cover_path)
+    if media_url and os.path.exists(cover_path):
+        return media_url, False, None
+
+    # Other local files (e.g. companion covers next to the book) are encoded to base64
+    try:
+        if os.path.exists(cover_path):
+            logger.debug(f"Encoding local file to base64: {cover_path}")
+            base64_image = encode_cover_to_base64(cover_path)
+            if base64_image:
+                logger.debug(f"Successfully encoded to base64, length: {len(base64_image)}")
+    except Exception as e:
+        logger.error(f"Error encoding local file {cover_path}: {e}")
+        base64_image = None
 
     return cover_path, is_url, base64_image
 
@@ -8,14 +8,18 @@ including superuser creation, admin views, and admin functionality.
 import os
 import shutil
 import tempfile
+from unittest.mock import patch
 
 from django.contrib.admin.sites import AdminSite
 from django.contrib.auth.models import User
+from django.db import connection
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 
 from books.admin import BookAdmin, BookAuthorAdmin
-from books.models import Author, Book, BookAuthor, BookTitle, DataSource, Genre, Publisher, ScanFolder, Series
-from books.tests.test_helpers import create_test_book_with_file
+from books.models import Author, Book, BookAuthor, BookTitle, DataSource, FinalMetadata, Genre, Publisher, ScanFolder, Series
+from books.tests.test_helpers import create_test_book_with_file, create_test_scan_folder
+from books.utils.aggregates import EstimatedCountPaginator
 
 
 class AdminSetupTestCase(TestCase):
@@ -495,3 +499,99 @@ class AdminIntegrationTestCase(TestCase):
         # Clean up the temporary directory created for this test
         if os.path.exists(temp_rel_dir):
             shutil.rmtree(temp_rel_dir)
+
+
+class AdminQueryEfficiencyTestCase(TestCase):
+    """Test that admin lists use a fixed number of queries and the search index."""
+
+    def setUp(self):
+        self.client = Client()
+        User.objects.create_superuser(username="admin", email="admin@test.com", password="testpass123")
+        self.client.login(username="admin", password="testpass123")
+
+        self.scan_folder = create_test_scan_folder()
+        self.source = DataSource.objects.create(name="Admin Source", trust_level=0.8)
+        self.books = []
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author = Author.objects.create(name="Ursula Le Guin")
+            for i, title in enumerate(["A Wizard of Earthsea", "The Left Hand of Darkness", "The Dispossessed"]):
+                self._add_book(i, title)
+
+    def _add_book(self, i, title):
+        book = create_test_book_with_file(f"/library/admin/book{i}.epub", file_size=2 * 1024 * 1024, scan_folder=self.scan_folder, title=title)
+        FinalMetadata.objects.create(book=book, final_title=title)
+        BookAuthor.objects.create(book=book, author=self.author, source=self.source, confidence=0.9)
+        self.books.append(book)
+
+    def _changelist_queries(self, url):
+        self.client.get(url)  # Warm the session and cached user state
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelists_use_fixed_queries(self):
+        urls = ["/admin/books/book/", "/admin/books/bookauthor/", "/admin/books/booktitle/", "/admin/books/bookfile/"]
+        few = {url: self._changelist_queries(url) for url in urls}
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(3, 10):
+                self._add_book(i, f"Extra Book {i}")
+
+        for url in urls:
+            self.assertEqual(self._changelist_queries(url), few[url], url)
+
+    def test_book_list_columns(self):
+        response = self.client.get("/admin/books/book/")
+
+        self.assertContains(response, "A Wizard of Earthsea")
+        self.assertContains(response, "2.00 MB")
+
+    def test_book_search_uses_index(self):
+        def found(term):
+            response = self.client.get("/admin/books/book/", {"q": term})
+            return {book.pk for book in response.context["cl"].result_list}
+
+        self.assertEqual(found("wiz earth"), {self.books[0].pk})
+        self.assertEqual(found("le guin"), {book.pk for book in self.books})
+        self.assertEqual(found("/library/admin/book1.epub"), {self.books[1].pk})
+        self.assertEqual(found(f"#{self.books[2].pk}"), {self.books[2].pk})
+        self.assertEqual(found("nothing"), set())
+
+    def test_related_admin_search_includes_book_matches(self):
+        response = self.client.get("/admin/books/bookauthor/", {"q": "darkness"})
+
+        self.assertEqual([row.book_id for row in response.context["cl"].result_list], [self.books[1].pk])
+
+    def test_book_search_falls_back_for_unindexed_books(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.books[0].soft_delete()
+
+        def found(params):
+            response = self.client.get("/admin/books/book/", params)
+            return {book.pk for book in response.context["cl"].result_list}
+
+        self.assertEqual(found({"q": "wizard"}), set())
+        self.assertEqual(found({"q": "wizard", "deleted_at__isnull": "False"}), {self.books[0].pk})
+        self.assertEqual(found({"q": "wizard", "deleted_at__isnull": "True"}), set())
+
+    def test_related_admin_search_needs_hash_for_book_ids(self):
+        def found(term):
+            response = self.client.get("/admin/books/bookauthor/", {"q": term})
+            return [row.book_id for row in response.context["cl"].result_list]
+
+        self.assertEqual(found(str(self.books[1].pk)), [])
+        self.assertEqual(found(f"#{self.books[1].pk}"), [self.books[1].pk])
+
+    def test_book_autocomplete(self):
+        response = self.client.get("/admin/autocomplete/", {"app_label": "books", "model_name": "bookauthor", "field_name": "book", "term": "dispo"})
+
+        self.assertEqual([result["id"] for result in response.json()["results"]], [str(self.books[2].pk)])
+
+    def test_estimated_count_for_unfiltered_lists(self):
+        with patch("books.utils.aggregates.estimated_row_count", return_value=250000):
+            self.assertEqual(EstimatedCountPaginator(Book.objects.all(), 100).count, 250000)
+            self.assertEqual(EstimatedCountPaginator(Book.objects.filter(pk=self.books[0].pk), 100).count, 1)
+
+        with patch("books.utils.aggregates.estimated_row_count", return_value=None):
+            self.assertEqual(EstimatedCountPaginator(Book.objects.all(), 100).count, 3)
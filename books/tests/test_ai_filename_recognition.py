@@ -13,15 +13,21 @@ import json
 import shutil
 import tempfile
 import unittest
+from pathlib import Path
 from unittest.mock import Mock, patch
 
+import pandas as pd
 from django.contrib.auth.models import User
 from django.http import JsonResponse
 from django.test import RequestFactory, TestCase
 
 from books.management.commands.train_ai_models import Command as TrainCommand
 from books.models import AIFeedback, DataSource, FinalMetadata, ScanFolder
-from books.scanner.ai.filename_recognizer import FilenamePatternRecognizer
+from books.scanner.ai.filename_recognizer import FilenamePatternRecognizer, initialize_ai_system
+from books.scanner.ai.incremental import IncrementalFieldClassifier, build_hashing_vectorizer
+from books.scanner.ai.loader import AIModelLoader
+from books.scanner.parsing import DirectoryPredictionBatcher
+from books.scanner.scanner_engine import EbookScanner
 from books.tests.test_helpers import create_test_book_with_file
 from books.views import AIFeedbackListView, ajax_ai_model_status, ajax_retrain_ai_models, ajax_submit_ai_feedback
 
@@ -165,6 +171,183 @@ class FilenamePatternRecognizerTests(TestCase):
         predictions_low = {"title": ("Test Title", 0.40), "author": ("Test Author", 0.30), "series": ("Test Series", 0.20), "volume": ("1", 0.10)}
         self.assertFalse(self.recognizer.is_prediction_confident(predictions_low))
 
+    def _train_small_model(self):
+        rows = []
+        for i in range(60):
+            author, series, title = f"Author{i % 6}", f"Series{i % 5}", f"Title {i}"
+            rows.append({"filename": self.recognizer._clean_filename(f"{author} - {series} {i % 4:02d} - {title}"), "title": title, "author": author, "series": series, "volume": str(i % 4)})
+        self.recognizer.train_models(pd.DataFrame(rows))
+
+    def test_predict_many_matches_single_predictions(self):
+        """Batched prediction returns the same results as per-file prediction, in order."""
+        self._train_small_model()
+        filenames = ["Author1 - Series2 03 - Title 7", "Author4 - Series0 01 - Title 44", "", "Author1 - Series2 03 - Title 7"]
+
+        batched = self.recognizer.predict_many(filenames)
+        self.recognizer.clear_prediction_cache()
+        single = [self.recognizer.predict_metadata(filename) for filename in filenames]
+
+        self.assertEqual(len(batched), len(filenames))
+        self.assertEqual(batched, single)
+        self.assertEqual(set(batched[0]), {"title", "author", "series", "volume"})
+
+    def test_predict_many_uses_prediction_cache(self):
+        """Filenames that clean to the same string hit the models once."""
+        self._train_small_model()
+        self.recognizer.predict_many(["Author1 - Series2 03 - Title 7"])
+
+        with patch.object(self.recognizer, "_predict_uncached", wraps=self.recognizer._predict_uncached) as mock_predict:
+            results = self.recognizer.predict_many(["Author1 - Series2 03 - Title 7 [retail]", "Author1_-_Series2_03_-_Title_7", "Author2 - Series1 02 - Title 8"])
+
+        mock_predict.assert_called_once_with(["Author2 - Series1 02 - Title 8"])
+        self.assertEqual(results[0], results[1])
+
+    def test_prediction_cache_is_bounded(self):
+        """The LRU cache evicts the oldest entries."""
+        self._train_small_model()
+        self.recognizer.prediction_cache_size = 3
+
+        self.recognizer.predict_many([f"Author{i} - Title {i}" for i in range(5)])
+
+        self.assertEqual(list(self.recognizer._prediction_cache), [f"Author{i} - Title {i}" for i in range(2, 5)])
+
+    def test_directory_batcher_predicts_once_per_directory(self):
+        """The scanner batcher calls predict_many once per directory."""
+        recognizer = Mock()
+        recognizer.predict_many.side_effect = lambda stems: [{"title": (stem, 0.9)} for stem in stems]
+        paths = ["/lib/a/One.epub", "/lib/a/Two.epub", "/lib/b/Three.epub"]
+        batcher = DirectoryPredictionBatcher(recognizer, paths)
+
+        self.assertEqual(batcher.get("/lib/a/One.epub"), {"title": ("One", 0.9)})
+        self.assertEqual(batcher.get("/lib/a/Two.epub"), {"title": ("Two", 0.9)})
+        self.assertEqual(batcher.get("/lib/b/Three.epub"), {"title": ("Three", 0.9)})
+
+        self.assertEqual(recognizer.predict_many.call_count, 2)
+        recognizer.predict_many.assert_any_call(["One", "Two"])
+
+    def test_models_saved_as_memory_mappable_joblib(self):
+        """Trained models are written as joblib files and load back memory-mapped."""
+        self.recognizer = FilenamePatternRecognizer(model_dir=self.temp_dir)
+        self._train_small_model()
+
+        self.assertTrue(self.recognizer.model_paths["vectorizer"].name.endswith(".joblib"))
+        self.assertTrue(self.recognizer.models_exist())
+
+        loaded = FilenamePatternRecognizer(model_dir=self.temp_dir)
+        self.assertTrue(loaded.load_models())
+        filename = "Author1 - Series2 03 - Title 7"
+        self.assertEqual(loaded.predict_metadata(filename), self.recognizer.predict_metadata(filename))
+
+    def test_background_loader_loads_without_training(self):
+        """The loader returns None until models exist, then loads them in a background thread."""
+        loader = AIModelLoader(model_dir=self.temp_dir)
+        self.assertFalse(loader.start())
+        self.assertIsNone(loader.get())
+
+        self.recognizer = FilenamePatternRecognizer(model_dir=self.temp_dir)
+        self._train_small_model()
+
+        recognizer = loader.wait(timeout=30)
+        self.assertIsNotNone(recognizer)
+        self.assertTrue(loader.is_ready())
+        self.assertIn("title", recognizer.predict_metadata("Author1 - Series2 03 - Title 7"))
+
+    def test_initialize_ai_system_never_trains(self):
+        """Without saved models, initialization returns None instead of training."""
+        with patch("books.scanner.ai.filename_recognizer.get_model_dir", return_value=Path(self.temp_dir)):
+            with patch.object(FilenamePatternRecognizer, "train_models") as mock_train:
+                self.assertIsNone(initialize_ai_system())
+        mock_train.assert_not_called()
+
+    def test_training_records_stream_in_one_query(self):
+        """Reviewed books are read with a single query regardless of how many there are."""
+        scan_folder = ScanFolder.objects.create(path=self.temp_dir, is_active=True)
+        for i in range(3):
+            book = create_test_book_with_file(file_path=f"{self.temp_dir}/Author{i} - Title {i}.epub", scan_folder=scan_folder)
+            FinalMetadata.objects.create(book=book, final_title=f"Title {i}", final_author=f"Author{i}", is_reviewed=True)
+
+        with self.assertNumQueries(1):
+            records = list(self.recognizer.iter_training_records())
+
+        self.assertEqual([record["title"] for record in records], ["Title 0", "Title 1", "Title 2"])
+        self.assertEqual(records[0]["filename"], "Author0 - Title 0")
+
+    def test_incremental_update_and_rollback(self):
+        """Feedback is folded into the models without a full retrain and can be rolled back."""
+        recognizer = FilenamePatternRecognizer(model_dir=self.temp_dir)
+        first = [{"filename": f"Author{i} - Series{i} - Title {i}", "title": f"Title {i}", "author": f"Author{i}"} for i in range(20)]
+
+        self.assertEqual(recognizer.train_incremental(first)["mode"], "bootstrap")
+        self.assertTrue(recognizer.is_incremental())
+        title, confidence = recognizer.predict_metadata("Author3 - Series3 - Title 3")["title"]
+        self.assertEqual(title, "Title 3")
+        self.assertGreater(confidence, 0.99)
+
+        with patch.object(recognizer, "iter_training_records") as mock_records:
+            results = recognizer.train_incremental([{"filename": "Author3 - Series3 - Title 3", "title": "Corrected Title", "author": "Author3"}])
+        mock_records.assert_not_called()
+        self.assertEqual(results["mode"], "incremental")
+        self.assertEqual(results["samples"], 1)
+        self.assertEqual(recognizer.predict_metadata("Author3 - Series3 - Title 3")["title"][0], "Corrected Title")
+
+        reloaded = FilenamePatternRecognizer(model_dir=self.temp_dir)
+        self.assertTrue(reloaded.load_models())
+        self.assertEqual(reloaded.predict_metadata("Author3 - Series3 - Title 3")["title"][0], "Corrected Title")
+
+        self.assertEqual(reloaded.rollback_models(), results["previous_version"])
+        self.assertEqual(reloaded.predict_metadata("Author3 - Series3 - Title 3")["title"][0], "Title 3")
+
+    def test_incremental_classifier_keeps_most_recent_rows(self):
+        """Training rows beyond max_rows are dropped oldest first."""
+        vectorizer = build_hashing_vectorizer()
+        classifier = IncrementalFieldClassifier(vectorizer.n_features, max_rows=3)
+        filenames = [f"Author{i} Title{i}" for i in range(5)]
+
+        for filename in filenames:
+            classifier.partial_fit(vectorizer.transform([filename]), [filename], keys=[filename])
+        classifier.partial_fit(vectorizer.transform([filenames[4]]), ["Relabelled"], keys=[filenames[4]])
+
+        self.assertEqual(classifier.rows_.shape[0], 3)
+        self.assertEqual(sorted(classifier.row_keys_), filenames[2:])
+        self.assertEqual(list(classifier.predict(vectorizer.transform(filenames[2:]))), [filenames[2], filenames[3], "Relabelled"])
+
+    def test_incremental_command_marks_feedback_processed(self):
+        """The incremental command folds in pending AIFeedback and marks it processed."""
+        user = User.objects.create_user("feedbackuser", "feedback@example.com", "password")
+        scan_folder = ScanFolder.objects.create(path=self.temp_dir, is_active=True)
+        for i in range(5):
+            book = create_test_book_with_file(file_path=f"{self.temp_dir}/book_{i}.epub", scan_folder=scan_folder)
+            AIFeedback.objects.create(
+                book=book,
+                user=user,
+                original_filename=f"Author{i} - Title {i}.epub",
+                ai_predictions="{}",
+                user_corrections=json.dumps({"title": f"Title {i}", "author": f"Author{i}"}),
+                feedback_rating=4,
+            )
+
+        command = TrainCommand()
+        with patch("books.management.commands.train_ai_models.FilenamePatternRecognizer", lambda: FilenamePatternRecognizer(model_dir=self.temp_dir)):
+            command.incremental_update(min_feedback=5)
+
+        self.assertFalse(AIFeedback.objects.filter(needs_retraining=True).exists())
+        recognizer = FilenamePatternRecognizer(model_dir=self.temp_dir)
+        self.assertTrue(recognizer.load_models())
+        self.assertEqual(recognizer.predict_metadata("Author2 - Title 2")["author"][0], "Author2")
+
+    def test_scanner_starts_without_waiting_for_models(self):
+        """The scanner falls back to regex parsing while models are still loading."""
+        loader = Mock()
+        loader.get.return_value = None
+        with patch("books.scanner.scanner_engine.get_model_loader", return_value=loader):
+            scanner = EbookScanner()
+            self.assertIsNone(scanner.ai_recognizer)
+
+            loader.get.return_value = self.recognizer
+            self.assertIs(scanner.ai_recognizer, self.recognizer)
+
+        loader.refresh.assert_called_once()
+
 
 class AIManagementCommandTests(TestCase):
     """Test the AI training management command."""
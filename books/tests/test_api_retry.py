@@ -0,0 +1,121 @@
+"""
+Test cases for the API completeness statistics and batched API retries
+"""
+
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from books.models import BookAPICompleteness, ScanSession
+from books.scanner.background import BackgroundScanner, background_retry_api_calls, get_running_api_retry, get_scan_progress, retry_api_calls_in_background
+from books.scanner.intelligent import IntelligentAPIScanner, get_completeness_stats
+from books.tests.test_helpers import create_test_book_with_file, create_test_scan_folder
+
+
+class APIRetryTests(TestCase):
+    """Test cases for counting completeness and retrying books in batches"""
+
+    def setUp(self):
+        cache.clear()
+        scan_folder = create_test_scan_folder()
+        self.books = [create_test_book_with_file(f"/library/book{i}.epub", scan_folder=scan_folder) for i in range(4)]
+        for book, priority in zip(self.books, ["high", "high", "medium", "complete"]):
+            BookAPICompleteness.objects.create(book=book, scan_priority=priority, needs_external_scan=priority != "complete")
+
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.client.force_login(self.user)
+
+    def test_completeness_stats_single_cached_query(self):
+        with CaptureQueriesContext(connection) as first:
+            stats = get_completeness_stats()
+        with CaptureQueriesContext(connection) as second:
+            get_completeness_stats()
+
+        self.assertEqual(stats, {"high_priority": 2, "medium_priority": 1, "low_priority": 0, "complete": 1})
+        self.assertEqual((len(first), len(second)), (1, 0))
+
+    def test_retry_all_priority_queues_job(self):
+        with patch("books.views.api_status.retry_api_calls_in_background", return_value="job-1") as queue:
+            response = self.client.post(reverse("books:retry_all_priority", kwargs={"priority": "high"}))
+
+        queue.assert_called_once_with([self.books[0].id, self.books[1].id])
+        self.assertEqual((response.json()["queued"], response.json()["job_id"]), (2, "job-1"))
+
+    def test_resume_failed_api_calls_queues_session_books(self):
+        session = ScanSession.objects.create(session_id="session-1")
+        session.add_book_to_resume_queue(self.books[2].id, ["Google Books"])
+        session.add_book_to_resume_queue(self.books[0].id, ["Open Library"])
+
+        with patch("books.views.api_status.retry_api_calls_in_background", return_value="job-2") as queue:
+            response = self.client.get(reverse("books:resume_failed_api_calls", kwargs={"session_id": "session-1"}))
+
+        self.assertRedirects(response, reverse("books:scan_dashboard"), fetch_redirect_response=False)
+        queue.assert_called_once_with([self.books[2].id, self.books[0].id], session_id="session-1")
+
+    def test_retry_books_preloads_relations_per_batch(self):
+        scanner = IntelligentAPIScanner(session_id="session-2")
+        for book in self.books[:2]:
+            scanner.session.add_book_to_resume_queue(book.id, ["Google Books"])
+        missing_id = max(book.id for book in self.books) + 1
+
+        def scan(book, force_all_apis=False):
+            # Read the relations the scan uses; they must already be loaded
+            self.assertIsNotNone(book.api_completeness)
+            self.assertFalse(hasattr(book, "finalmetadata"))
+            list(book.api_access_logs.all())
+            return {"apis_succeeded": ["Google Books"] if book.id == self.books[0].id else []}
+
+        with patch.object(scanner, "scan_book_with_intelligence", side_effect=scan):
+            with CaptureQueriesContext(connection) as queries:
+                counts = scanner.retry_books([book.id for book in self.books] + [missing_id], batch_size=3)
+
+        self.assertEqual(counts, {"processed": 4, "successful": 1, "failed": 3, "missing": 1, "errors": 0})
+        # Books and access logs per batch, then one save of the resume queue
+        self.assertEqual(len(queries), 2 * 2 + 1)
+        scanner.session.refresh_from_db()
+        self.assertEqual([item["book_id"] for item in scanner.session.resume_queue], [self.books[1].id])
+
+    def test_retry_books_continues_after_a_failing_book(self):
+        scanner = IntelligentAPIScanner(session_id="session-3")
+        scanner.session.add_book_to_resume_queue(self.books[0].id, ["Google Books"])
+
+        def scan(book, force_all_apis=False):
+            if book.id == self.books[0].id:
+                raise ValueError("Malformed response")
+            return {"apis_succeeded": ["Google Books"]}
+
+        with patch.object(scanner, "scan_book_with_intelligence", side_effect=scan):
+            counts = scanner.retry_books([book.id for book in self.books[:3]])
+
+        self.assertEqual(counts, {"processed": 2, "successful": 2, "failed": 0, "missing": 0, "errors": 1})
+        scanner.session.refresh_from_db()
+        self.assertEqual([item["book_id"] for item in scanner.session.resume_queue], [self.books[0].id])
+
+    def test_only_one_background_retry_runs(self):
+        with patch("threading.Thread"):
+            job_id = retry_api_calls_in_background([self.books[0].id])
+            self.assertEqual(retry_api_calls_in_background([self.books[1].id]), job_id)
+        self.assertEqual(get_running_api_retry(), job_id)
+
+        response = self.client.post(reverse("books:retry_all_priority", kwargs={"priority": "high"}))
+        self.assertEqual((response.json()["queued"], response.json()["job_id"]), (0, job_id))
+
+        with patch.object(BackgroundScanner, "retry_api_calls", return_value={"success": True}):
+            background_retry_api_calls(job_id, [self.books[0].id])
+        self.assertIsNone(get_running_api_retry())
+
+    def test_background_retry_job_reports_progress(self):
+        get_completeness_stats()
+
+        with patch.object(IntelligentAPIScanner, "retry_books", return_value={"processed": 2, "successful": 1, "failed": 1, "missing": 0, "errors": 0}) as retry_books:
+            result = BackgroundScanner("retry-job").retry_api_calls([self.books[0].id, self.books[1].id])
+
+        retry_books.assert_called_once()
+        self.assertEqual((result["success"], result["successful"]), (True, 1))
+        self.assertTrue(get_scan_progress("retry-job")["completed"])
+        self.assertIsNone(cache.get("api_completeness_stats"))
@@ -0,0 +1,97 @@
+"""Tests for the comic series/issue index and the series analysis built on it."""
+
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from books.models import Book, BookMetadata, ComicIssue, DataSource, FinalMetadata, ScanFolder
+from books.scanner.extractors.comic import analyze_comic_series, get_comic_series_list
+from books.utils.comic_index import normalize_series_key, parse_issue_number, rebuild_comic_index, refresh_comic_issue, series_gaps
+
+
+class ComicIndexTests(TestCase):
+    """Test cases for maintaining and querying the comic index"""
+
+    def setUp(self):
+        self.source, _ = DataSource.objects.get_or_create(name=DataSource.CONTENT_SCAN, defaults={"trust_level": 0.9})
+        self.scan_folder = ScanFolder.objects.create(path="/comics", name="Comics", content_type="comics")
+
+    def _create_issue(self, series, number=None, issue_type="main_series", index=True):
+        book = Book.objects.create(scan_folder=self.scan_folder, content_type="comic")
+        BookMetadata.objects.create(book=book, source=self.source, field_name="series", field_value=series, confidence=0.9)
+        BookMetadata.objects.create(book=book, source=self.source, field_name="issue_type", field_value=issue_type, confidence=0.9)
+        if number is not None:
+            BookMetadata.objects.create(book=book, source=self.source, field_name="issue_number", field_value=str(number), confidence=0.9)
+        if index:
+            refresh_comic_issue(book)
+        return book
+
+    def test_normalization(self):
+        self.assertEqual(normalize_series_key("The Amazing Spider-Man"), normalize_series_key("amazing spider man"))
+        self.assertEqual(parse_issue_number("#007"), Decimal("7.00"))
+        self.assertEqual(parse_issue_number("1.5"), Decimal("1.50"))
+        self.assertIsNone(parse_issue_number("Special"))
+
+    def test_gaps_and_completeness(self):
+        for number in (1, 2, 4, 7, "7.5"):
+            self._create_issue("Saga", number)
+        self._create_issue("Saga", 1, issue_type="annual")
+
+        analysis = analyze_comic_series("saga")
+
+        self.assertEqual(analysis["total_books"], 6)
+        self.assertEqual(len(analysis["main_series_issues"]), 5)
+        self.assertEqual(len(analysis["annuals"]), 1)
+        completeness = analysis["completeness_analysis"]
+        self.assertFalse(completeness["is_complete"])
+        self.assertEqual(completeness["missing_issues"], [3, 5, 6])
+        self.assertEqual(completeness["gap_analysis"], ["#3", "#5-#6"])
+        self.assertEqual(completeness["issue_range"], "#1-#7")
+        self.assertEqual(completeness["completeness_percentage"], 57.1)
+
+    def test_series_list_is_one_query(self):
+        for number in (1, 2, 3):
+            self._create_issue("Saga", number)
+        self._create_issue("Paper Girls", 2)
+
+        with self.assertNumQueries(1):
+            series = get_comic_series_list()
+
+        self.assertEqual([entry["name"] for entry in series], ["Paper Girls", "Saga"])
+        saga = series[1]
+        self.assertEqual(saga["book_count"], 3)
+        self.assertTrue(saga["is_complete"])
+        self.assertEqual(series_gaps(saga["series_key"]), [])
+
+    def test_reviewed_series_overrides_scanned_series(self):
+        book = self._create_issue("Sagaa", 1)
+
+        FinalMetadata.objects.filter(book=book).delete()
+        FinalMetadata.objects.create(book=book, final_title="Saga #1", final_series="Saga", final_series_number="1")
+
+        self.assertEqual(ComicIssue.objects.get(book=book).series_key, "saga")
+
+    def test_metadata_saves_reindex_only_on_series_changes(self):
+        book = self._create_issue("Saga", 1)
+        FinalMetadata.objects.filter(book=book).delete()
+        FinalMetadata.objects.create(book=book, final_title="Saga #1", final_series="Saga", final_series_number="1")
+
+        final = FinalMetadata.objects.get(book=book)
+        with patch("books.signals.refresh_comic_issue") as refresh:
+            final.final_title = "Saga #1 (Reviewed)"
+            final.save()
+            refresh.assert_not_called()
+
+            final.final_series = "Saga Deluxe"
+            final.save()
+            refresh.assert_called_once()
+            self.assertEqual(refresh.call_args.args[0].pk, book.pk)
+
+    def test_rebuild_indexes_existing_comics(self):
+        self._create_issue("Saga", 1, index=False)
+        self._create_issue("Saga", 2, index=False)
+        Book.objects.create(scan_folder=self.scan_folder, content_type="ebook")
+
+        self.assertEqual(rebuild_comic_index(), 2)
+        self.assertEqual(sorted(ComicIssue.objects.values_list("whole_number", flat=True)), [1, 2])
@@ -10,7 +10,7 @@ import zipfile
 from io import BytesIO
 from unittest.mock import MagicMock, patch
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from PIL import Image
 
 from books.utils.cover_extractor import (
@@ -208,6 +208,61 @@ class PDFCoverExtractorTestCase(TestCase):
         self.assertIsNotNone(cover_data)
 
 
+class PDFCoverFastPathTestCase(TestCase):
+    """Test cases for thumbnail-sized PDF rendering, the embedded JPEG fast path and the render cache."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.media_override = override_settings(MEDIA_ROOT=os.path.join(self.temp_dir, "media"))
+        self.media_override.enable()
+
+    def tearDown(self):
+        """Clean up test files."""
+        import shutil
+
+        self.media_override.disable()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _create_image_pdf(self, size=(1200, 1800), name="scan.pdf"):
+        """Create a PDF whose only page is a full-page JPEG (PIL embeds RGB images with DCTDecode)."""
+        pdf_path = os.path.join(self.temp_dir, name)
+        Image.new("RGB", size, color="green").save(pdf_path, format="PDF", resolution=150)
+        return pdf_path
+
+    def test_render_dpi_fits_target_size(self):
+        """An A4 page only needs about 73 dpi to fill a 600x900 thumbnail."""
+        self.assertEqual(PDFCoverExtractor.render_dpi((595, 842), (600, 900), 150), 73)
+        self.assertEqual(PDFCoverExtractor.render_dpi((5000, 7000), (600, 900), 150), PDFCoverExtractor.MIN_DPI)
+        self.assertEqual(PDFCoverExtractor.render_dpi(None, (600, 900), 150), 150)
+
+    @patch("books.utils.cover_extractor.HAS_PDF2IMAGE", True)
+    def test_embedded_jpeg_used_without_rendering(self):
+        """A page that is one full-page JPEG is downscaled from the image stream, not rasterized."""
+        pdf_path = self._create_image_pdf()
+
+        with patch("books.utils.cover_extractor.convert_from_path", create=True) as mock_convert:
+            cover_data = PDFCoverExtractor.extract_cover(pdf_path, use_cache=False)
+
+        mock_convert.assert_not_called()
+        cover = Image.open(BytesIO(cover_data))
+        self.assertEqual(cover.format, "JPEG")
+        self.assertEqual(cover.size, (600, 900))
+
+    def test_unchanged_pdf_is_rendered_once(self):
+        """The render cache is keyed by file content, so only a changed file is extracted again."""
+        pdf_path = self._create_image_pdf()
+
+        with patch.object(PDFCoverExtractor, "_extract_cover", return_value=b"rendered") as mock_extract:
+            self.assertEqual(PDFCoverExtractor.extract_cover(pdf_path), b"rendered")
+            self.assertEqual(PDFCoverExtractor.extract_cover(pdf_path), b"rendered")
+            mock_extract.assert_called_once()
+
+            self._create_image_pdf(size=(1000, 1500))
+            PDFCoverExtractor.extract_cover(pdf_path)
+            self.assertEqual(mock_extract.call_count, 2)
+
+
 class ArchiveCoverExtractorTestCase(TestCase):
     """Test cases for comic archive cover extraction."""
 
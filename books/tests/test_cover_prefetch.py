@@ -0,0 +1,158 @@
+"""
+Tests for the background remote cover prefetcher.
+
+Downloads run against a local HTTP stub server so no real network is used.
+"""
+
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from books.templatetags import book_extras
+from books.utils.cover_cache import CoverCache
+from books.utils.cover_prefetch import CoverPrefetcher
+
+
+def _jpeg_bytes(size=(60, 90)):
+    buffer = BytesIO()
+    Image.new("RGB", size, color="red").save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+class _CoverStubHandler(BaseHTTPRequestHandler):
+    """Serves a JPEG for /covers/*, an HTML page for /not-an-image, 404 otherwise."""
+
+    image = _jpeg_bytes()
+    requests_seen = []
+
+    def do_GET(self):
+        type(self).requests_seen.append(self.path)
+        if self.path.startswith("/covers/"):
+            body, content_type = self.image, "image/jpeg"
+        elif self.path == "/not-an-image":
+            body, content_type = b"<html>error</html>", "text/html"
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class CoverPrefetcherTests(TestCase):
+    """Test CoverPrefetcher against a local HTTP stub."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _CoverStubHandler)
+        cls.server_thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.server_thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        _CoverStubHandler.requests_seen = []
+        cache.clear()
+
+    def test_remote_cache_path_is_stable(self):
+        """The cache key is a content-independent digest of the URL."""
+        url = f"{self.base_url}/covers/1.jpg"
+        self.assertEqual(CoverCache.get_remote_cache_path(url), CoverCache.get_remote_cache_path(url))
+        self.assertNotEqual(CoverCache.get_remote_cache_path(url), CoverCache.get_remote_cache_path(url + "?v=2"))
+        self.assertTrue(CoverCache.get_remote_cache_path(url).startswith("cover_cache/remote_"))
+
+    def test_prefetch_downloads_concurrently_into_cache(self):
+        """Queued URLs are downloaded by the worker pool into the cover cache."""
+        urls = [f"{self.base_url}/covers/{i}.jpg" for i in range(10)]
+        prefetcher = CoverPrefetcher(max_workers=4)
+
+        self.assertEqual(prefetcher.enqueue(urls), 10)
+        prefetcher.join()
+
+        for url in urls:
+            self.assertIsNotNone(CoverCache.get_remote_cover(url))
+        self.assertEqual(prefetcher.pending_count(), 0)
+
+    def test_cached_and_duplicate_urls_are_not_requeued(self):
+        """Already cached or already queued URLs are skipped."""
+        url = f"{self.base_url}/covers/dup.jpg"
+        prefetcher = CoverPrefetcher(max_workers=1)
+
+        prefetcher.enqueue([url, url])
+        prefetcher.join()
+        self.assertEqual(_CoverStubHandler.requests_seen.count("/covers/dup.jpg"), 1)
+
+        self.assertEqual(prefetcher.enqueue([url]), 0)
+
+    def test_failed_and_invalid_downloads_are_not_cached(self):
+        """404s and non-image bodies never reach the cover cache."""
+        prefetcher = CoverPrefetcher(max_workers=2)
+        missing = f"{self.base_url}/missing.jpg"
+        html = f"{self.base_url}/not-an-image"
+
+        self.assertIsNone(prefetcher.fetch(missing))
+        self.assertIsNone(prefetcher.fetch(html))
+        self.assertIsNone(CoverCache.get_remote_cover(missing))
+        self.assertIsNone(CoverCache.get_remote_cover(html))
+
+    def test_failed_urls_are_not_requeued(self):
+        """A failed download is remembered and not queued again by page renders."""
+        missing = f"{self.base_url}/dead.jpg"
+        prefetcher = CoverPrefetcher(max_workers=1)
+
+        self.assertEqual(prefetcher.enqueue([missing]), 1)
+        prefetcher.join()
+        self.assertTrue(CoverPrefetcher.has_failed(missing))
+        self.assertEqual(prefetcher.enqueue([missing]), 0)
+
+        with patch("books.templatetags.book_extras.prefetch_covers") as mock_prefetch:
+            self.assertIsNone(book_extras.get_cached_remote_cover(missing))
+        mock_prefetch.assert_not_called()
+        self.assertEqual(_CoverStubHandler.requests_seen, ["/dead.jpg"])
+
+    def test_non_http_paths_are_ignored(self):
+        """Local paths and empty values are not queued."""
+        prefetcher = CoverPrefetcher(max_workers=1)
+        self.assertEqual(prefetcher.enqueue(["", None, "/local/cover.jpg"]), 0)
+
+    def test_template_uses_local_copy_or_placeholder(self):
+        """Rendering never downloads: uncached covers get a placeholder and a queued prefetch."""
+        url = f"{self.base_url}/covers/render.jpg"
+
+        with patch("books.templatetags.book_extras.prefetch_covers") as mock_prefetch:
+            cover_path, is_url, base64_image = book_extras._process_cover_for_display(url, None)
+
+        self.assertEqual((cover_path, is_url, base64_image), ("", False, None))
+        mock_prefetch.assert_called_once_with([url])
+        self.assertEqual(_CoverStubHandler.requests_seen, [])
+
+        CoverPrefetcher(max_workers=1).fetch(url)
+        cover_path, is_url, base64_image = book_extras._process_cover_for_display(url, None)
+
+        self.assertEqual(cover_path, f"/media/{CoverCache.get_remote_cache_path(url)}")
+        self.assertFalse(is_url)
+        self.assertIsNone(base64_image)
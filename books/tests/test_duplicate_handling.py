@@ -5,12 +5,21 @@ Tests TC9.5: Verify that books with identical titles but different authors
 are stored as separate entries and not merged incorrectly.
 """
 
+import json
+import os
+import shutil
+import tempfile
 from unittest.mock import patch
 
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
 
 from books.models import Author, Book, BookAuthor, DataSource, FinalMetadata
 from books.tests.test_helpers import create_test_book_with_file, create_test_scan_folder
+from books.utils import duplicate_index
+from books.utils.duplicate_index import DuplicateIndex, find_duplicate_groups, get_cached_duplicate_index, invalidate_duplicate_index, normalize_tokens, refresh_content_hash
 
 
 class DuplicateHandlingTests(TestCase):
@@ -187,3 +196,129 @@ class DuplicateHandlingTests(TestCase):
 
         series_names = [book.final_series for book in dragons_books]
         self.assertEqual(len(set(series_names)), 2, "Should have 2 different series names")
+
+
+class DuplicateIndexTests(TestCase):
+    """Test content-hash and MinHash/LSH duplicate detection."""
+
+    def setUp(self):
+        cache.clear()
+        self.scan_folder = create_test_scan_folder(name="Duplicate Index Folder")
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+
+    def _book_with_content(self, name, content, title, author):
+        path = os.path.join(self.temp_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+        book = create_test_book_with_file(file_path=path, file_format="epub", scan_folder=self.scan_folder)
+        book_file = book.files.first()
+        refresh_content_hash(book_file)
+        book_file.save()
+        FinalMetadata.objects.create(book=book, final_title=title, final_author=author)
+        return book
+
+    def test_content_hash_matches_copies_in_different_folders(self):
+        """Identical files in different folders share a content hash; edits change it."""
+        first = self._book_with_content("a/book.epub", b"same bytes", "Alpha", "Writer One")
+        second = self._book_with_content("b/book.epub", b"same bytes", "Beta", "Writer Two")
+        third = self._book_with_content("c/book.epub", b"other bytes", "Gamma", "Writer Three")
+
+        report = find_duplicate_groups()
+
+        self.assertEqual([group["book_ids"] for group in report["exact"]], [sorted([first.id, second.id])])
+        self.assertNotIn(third.id, report["exact"][0]["book_ids"])
+
+    def test_content_hash_reused_when_file_unchanged(self):
+        """Rescans reuse the stored hash unless the file's size or mtime changed."""
+        book = self._book_with_content("book.epub", b"original", "Title", "Author")
+        book_file = book.files.first()
+
+        self.assertFalse(refresh_content_hash(book_file))
+
+        with open(book_file.file_path, "ab") as f:
+            f.write(b" and more")
+        self.assertTrue(refresh_content_hash(book_file))
+
+    def test_normalize_tokens(self):
+        """Case, accents, bracketed notes, punctuation and word order are ignored."""
+        self.assertEqual(normalize_tokens("The Hobbit (Copy)", "Tolkien, J.R.R."), normalize_tokens("the hobbit", "J R R Tolkien"))
+        self.assertEqual(normalize_tokens("Les Misérables", "Hugo"), frozenset({"les", "miserables", "hugo"}))
+
+    def test_index_groups_near_duplicates(self):
+        """Similar title/author pairs are grouped; unrelated books are not."""
+        index = DuplicateIndex(
+            [
+                (1, "The Way of Kings", "Brandon Sanderson"),
+                (2, "Way of Kings [Retail]", "Sanderson, Brandon"),
+                (3, "The Way of Kings: Book One", "Brandon Sanderson"),
+                (4, "Words of Radiance", "Brandon Sanderson"),
+                (5, "Dune", "Frank Herbert"),
+            ]
+        )
+
+        self.assertEqual(index.groups(), [{"book_ids": [1, 2, 3], "similarity": 0.667}])
+        self.assertEqual([book_id for book_id, _ in index.near_duplicates_of(3)], [1, 2])
+        self.assertEqual(index.near_duplicates_of(5), [])
+
+    def test_similar_to_matches_tokens_outside_the_index(self):
+        """A book is matched on its current title and author, even if they changed after the build."""
+        index = DuplicateIndex([(1, "The Way of Kings", "Brandon Sanderson"), (2, "Dune", "Frank Herbert")])
+
+        self.assertEqual(index.similar_to(normalize_tokens("Way of Kings (Retail) Special", "Brandon Sanderson"), exclude_book_id=3), [(1, 0.8)])
+        self.assertEqual(index.similar_to(normalize_tokens("Dune", "Frank Herbert"), exclude_book_id=2), [])
+
+    @override_settings(DUPLICATE_INDEX_BACKGROUND=True, DUPLICATE_INDEX_REBUILD_INTERVAL=0)
+    def test_stale_index_served_while_rebuilding_in_background(self):
+        """Book pages get the last index at once; one background thread rebuilds it."""
+        self._book_with_content("one.epub", b"one", "Mistborn", "Brandon Sanderson")
+        with patch.object(duplicate_index, "_index", None), patch.object(duplicate_index, "_index_generation", None):
+            old_index = duplicate_index.get_duplicate_index()
+            invalidate_duplicate_index()
+
+            with patch.object(duplicate_index.threading, "Thread") as thread:
+                self.assertIs(get_cached_duplicate_index(), old_index)
+                self.assertIs(get_cached_duplicate_index(), old_index)
+
+            thread.assert_called_once()
+            thread.return_value.start.assert_called_once()
+            duplicate_index._rebuild_in_background()
+            self.assertIsNot(get_cached_duplicate_index(), old_index)
+
+    def test_detect_and_resolve_endpoints(self):
+        """The AJAX report lists groups and resolving marks all but one book."""
+        user = User.objects.create_user("dupuser", "dup@example.com", "password")
+        self.client.force_login(user)
+        first = self._book_with_content("one.epub", b"one", "Mistborn", "Brandon Sanderson")
+        second = self._book_with_content("two.epub", b"two", "Mistborn (Copy)", "Brandon Sanderson")
+
+        response = self.client.post(reverse("books:ajax_detect_duplicates"))
+        duplicates = response.json()["duplicates"]
+        self.assertEqual(duplicates, [{"type": "similar", "book_ids": [first.id, second.id], "similarity": 1.0, "reason": "Similar title and author"}])
+
+        response = self.client.post(
+            reverse("books:ajax_resolve_duplicates"),
+            data=json.dumps({"duplicate_groups": duplicates, "resolution_strategy": "keep_first"}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.json()["marked_duplicates"], 1)
+        self.assertTrue(Book.objects.get(id=second.id).is_duplicate)
+        self.assertEqual(self.client.post(reverse("books:ajax_detect_duplicates")).json()["duplicates"], [])
+
+    def test_resolve_endpoint_validates_input(self):
+        """Malformed groups are rejected with 400; form-encoded groups are accepted."""
+        user = User.objects.create_user("dupuser", "dup@example.com", "password")
+        self.client.force_login(user)
+        first = self._book_with_content("one.epub", b"one", "Dune", "Frank Herbert")
+        second = self._book_with_content("two.epub", b"two", "Dune", "Frank Herbert")
+        url = reverse("books:ajax_resolve_duplicates")
+
+        for groups in ([{"book_ids": ["abc"]}], [{"ids": [first.id]}], [first.id], "not json"):
+            response = self.client.post(url, data={"duplicate_groups": groups if isinstance(groups, str) else json.dumps(groups)})
+            self.assertEqual(response.status_code, 400, groups)
+        self.assertFalse(Book.objects.filter(is_duplicate=True).exists())
+
+        response = self.client.post(url, data={"duplicate_groups": json.dumps([{"book_ids": [str(first.id), str(second.id)]}]), "resolution_strategy": "keep_last"})
+        self.assertEqual(response.json()["marked_duplicates"], 1)
+        self.assertTrue(Book.objects.get(id=first.id).is_duplicate)
@@ -0,0 +1,125 @@
+"""
+Test cases for the bounded-cost wizard folder analysis
+"""
+
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from books.models import SetupWizard
+from books.utils.folder_analysis import FolderAnalyzer, analyze_folder, format_file_count, get_cached_analysis
+
+
+def _touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"data")
+
+
+class FolderAnalysisTests(TestCase):
+    """Test cases for sampling, classifying and caching folder analyses"""
+
+    def setUp(self):
+        cache.clear()
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        for name in ["a.epub", "b.MOBI", "c.pdf", "notes.txt", "sub/d.cbz", "sub/deeper/e.mp3", "sub/deeper/f.m4b"]:
+            _touch(os.path.join(self.root, name))
+
+    def test_classifies_extensions(self):
+        analysis = analyze_folder(self.root)
+
+        self.assertTrue(analysis["complete"])
+        self.assertFalse(analysis["truncated"])
+        self.assertEqual(analysis["total_files"], 6)
+        self.assertEqual(analysis["ebooks"]["formats"], {"epub": 1, "mobi": 1, "azw": 0, "pdf": 1, "other": 0})
+        self.assertEqual(analysis["comics"]["formats"]["cbz"], 1)
+        self.assertEqual((analysis["audiobooks"]["formats"]["mp3"], analysis["audiobooks"]["formats"]["m4a"]), (1, 1))
+        self.assertEqual(analysis["suggested_type"], "ebooks")
+
+    def test_pdf_in_comic_folder_counts_as_comic(self):
+        comics = os.path.join(self.root, "Comics")
+        _touch(os.path.join(comics, "issue.pdf"))
+
+        analysis = analyze_folder(comics)
+
+        self.assertEqual((analysis["comics"]["formats"]["pdf"], analysis["ebooks"]["total"]), (1, 0))
+        self.assertEqual(analysis["suggested_type"], "comics")
+
+    def test_budgets_and_depth_bound_the_walk(self):
+        truncated = analyze_folder(self.root, entry_budget=3)
+        shallow = analyze_folder(self.root, max_depth=1)
+
+        self.assertTrue(truncated["truncated"])
+        self.assertLessEqual(truncated["entries_checked"], 3)
+        self.assertEqual(format_file_count(truncated), f"{truncated['total_files']}+")
+        # Only the top level is read: a.epub, b.MOBI and c.pdf
+        self.assertEqual(shallow["total_files"], 3)
+
+    def test_cached_per_folder_modification_time(self):
+        analyzer = FolderAnalyzer(background=False)
+        self.assertEqual(analyzer.start(self.root)["total_files"], 6)
+
+        # Unchanged folder: the cached analysis is reused
+        _touch(os.path.join(self.root, "sub", "g.epub"))
+        self.assertEqual(analyzer.start(self.root)["total_files"], 6)
+        self.assertEqual(get_cached_analysis(self.root)["total_files"], 6)
+
+        # A change to the folder itself invalidates it
+        _touch(os.path.join(self.root, "h.epub"))
+        stat = os.stat(self.root)
+        os.utime(self.root, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertEqual(analyzer.start(self.root)["total_files"], 8)
+
+    def test_background_analysis_publishes_results(self):
+        analyzer = FolderAnalyzer()
+        analysis = analyzer.start(self.root, wait=5)
+
+        self.assertTrue(analysis["complete"])
+        self.assertEqual(get_cached_analysis(self.root)["total_files"], 6)
+        self.assertEqual(analyzer.analyze(self.root)["total_files"], 6)
+
+    def test_unreadable_folder(self):
+        missing = os.path.join(self.root, "missing")
+
+        with self.assertRaises(OSError):
+            FolderAnalyzer(background=False).start(missing)
+        self.assertEqual(FolderAnalyzer(background=False).analyze(missing)["total_files"], 0)
+
+
+class FolderAnalysisViewTests(TestCase):
+    """Test cases for the wizard endpoints and steps using the analysis"""
+
+    def setUp(self):
+        cache.clear()
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        for name in ["a.cbz", "b.cbr", "sub/c.epub"]:
+            _touch(os.path.join(self.root, name))
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.client.force_login(self.user)
+
+    def test_validate_and_poll(self):
+        validated = self.client.post(reverse("books:wizard_validate_folder"), {"path": self.root}).json()
+        polled = self.client.post(reverse("books:wizard_folder_analysis"), {"path": self.root}).json()
+
+        self.assertTrue(validated["valid"])
+        self.assertEqual((validated["file_count"], validated["complete"]), (3, True))
+        self.assertEqual(polled["analysis"]["comics"]["total"], 2)
+        self.assertFalse(self.client.post(reverse("books:wizard_folder_analysis"), {"path": os.path.join(self.root, "a.cbz")}).json()["valid"])
+
+    def test_content_types_step_uses_analysis(self):
+        wizard, _ = SetupWizard.get_or_create_for_user(self.user)
+        wizard.selected_folders = [self.root]
+        wizard.save()
+
+        response = self.client.get(reverse("books:wizard_content_types"))
+
+        folder = response.context["folder_analysis"][0]
+        self.assertEqual((folder["suggested_type"], folder["analysis"]["total_files"]), ("comics", 3))
+        self.assertIsNotNone(get_cached_analysis(self.root))
@@ -0,0 +1,157 @@
+"""
+Test cases for stored scan folder progress counters
+"""
+
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from books.models import Book, ScanFolder
+from books.scanner.watcher import CREATED, DELETED, ChangeSet, _update_file_counts
+from books.tests.test_helpers import create_test_book_with_file, create_test_scan_folder
+from books.utils.folder_counts import reconcile_folder_counts, request_stale_recounts
+
+
+def _touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"data")
+
+
+class FolderCountersTests(TestCase):
+    """Test cases for maintaining and serving the counters"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        self.folder = create_test_scan_folder(self.root)
+
+    def test_progress_served_without_queries(self):
+        ScanFolder.objects.filter(pk=self.folder.pk).update(file_count=4, book_count=1)
+        self.folder.refresh_from_db()
+
+        with self.assertNumQueries(0):
+            progress = self.folder.get_scan_progress_info()
+
+        self.assertEqual(progress, {"scanned": 1, "total_files": 4, "percentage": 25.0, "needs_scan": True})
+
+    def test_uncounted_folder_reports_counting(self):
+        progress = self.folder.get_scan_progress_info()
+
+        self.assertTrue(progress["counting"])
+        self.assertIsNone(progress["total_files"])
+
+    def test_book_signals_keep_book_count(self):
+        book = create_test_book_with_file(os.path.join(self.root, "a.epub"), scan_folder=self.folder)
+        create_test_book_with_file(os.path.join(self.root, "b.epub"), scan_folder=self.folder)
+        self.folder.refresh_from_db()
+        self.assertEqual(self.folder.book_count, 2)
+
+        book.delete()
+        self.folder.refresh_from_db()
+        self.assertEqual(self.folder.book_count, 1)
+
+    def test_refresh_counts_walks_folder(self):
+        _touch(os.path.join(self.root, "a.epub"))
+        _touch(os.path.join(self.root, "nested", "b.pdf"))
+        _touch(os.path.join(self.root, "nested", "cover.jpg"))
+        Book.objects.create(scan_folder=self.folder)
+
+        self.assertEqual(reconcile_folder_counts([self.folder]), 1)
+
+        self.folder.refresh_from_db()
+        self.assertEqual((self.folder.file_count, self.folder.book_count), (2, 1))
+        self.assertIsNotNone(self.folder.counts_updated_at)
+        self.assertFalse(self.folder.counts_are_stale(3600))
+
+    def test_saving_stale_instance_keeps_counters(self):
+        stale = ScanFolder.objects.get(pk=self.folder.pk)
+        Book.objects.create(scan_folder=self.folder)
+
+        stale.name = "Renamed"
+        stale.save()
+
+        self.folder.refresh_from_db()
+        self.assertEqual((self.folder.name, self.folder.book_count), ("Renamed", 1))
+
+    def test_scan_records_collected_file_count(self):
+        from books.scanner.folder import scan_directory
+
+        with patch("books.scanner.folder._collect_files", return_value=(["/x/a.epub", "/x/b.epub"], [], [])), patch(
+            "books.scanner.folder._process_files_individually"
+        ), patch("books.scanner.folder._handle_orphans"):
+            scan_directory(self.root, self.folder)
+
+        self.folder.refresh_from_db()
+        self.assertEqual(self.folder.file_count, 2)
+
+    def test_watcher_applies_file_deltas(self):
+        other = create_test_scan_folder(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, other.path, ignore_errors=True)
+        ScanFolder.objects.filter(pk__in=[self.folder.pk, other.pk]).update(file_count=5)
+
+        changes = ChangeSet()
+        changes.changes = {os.path.join(self.root, "new.epub"): CREATED, os.path.join(self.root, "notes.txt"): CREATED, os.path.join(other.path, "gone.epub"): DELETED}
+        changes.moves = {os.path.join(other.path, "moved.epub"): os.path.join(self.root, "old.epub")}
+        _update_file_counts(changes, [self.folder, other])
+
+        self.assertEqual(dict(ScanFolder.objects.values_list("pk", "file_count")), {self.folder.pk: 5, other.pk: 5})
+
+        changes = ChangeSet()
+        changes.changes = {os.path.join(self.root, "new.epub"): CREATED}
+        _update_file_counts(changes, [self.folder, other])
+        self.assertEqual(ScanFolder.objects.get(pk=self.folder.pk).file_count, 6)
+
+    def test_command_recounts_folders(self):
+        _touch(os.path.join(self.root, "a.epub"))
+        out = StringIO()
+
+        call_command("reconcile_folder_counts", stdout=out)
+
+        self.assertIn("Recounted 1 scan folder(s)", out.getvalue())
+        self.assertEqual(ScanFolder.objects.get(pk=self.folder.pk).file_count, 1)
+
+
+class FolderProgressEndpointTests(TestCase):
+    """Test cases for the progress endpoints"""
+
+    def setUp(self):
+        from django.contrib.auth.models import User
+
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.client.login(username="testuser", password="testpass")
+        self.folders = [create_test_scan_folder(name=f"Folder {i}") for i in range(3)]
+        for folder in self.folders:
+            self.addCleanup(shutil.rmtree, folder.path, ignore_errors=True)
+        ScanFolder.objects.filter(pk=self.folders[0].pk).update(file_count=10, book_count=5)
+
+    def test_bulk_progress_single_query_without_walks(self):
+        url = reverse("books:ajax_bulk_folder_progress")
+        params = {"folder_ids[]": [folder.pk for folder in self.folders]}
+
+        with patch.object(ScanFolder, "count_files_on_disk") as walk, CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+
+        walk.assert_not_called()
+        self.assertEqual(len([query for query in queries if "books_scanfolder" in query["sql"]]), 1)
+        data = response.json()["progress_data"]
+        self.assertEqual(data[str(self.folders[0].pk)]["percentage"], 50.0)
+        self.assertTrue(data[str(self.folders[1].pk)]["counting"])
+
+    @override_settings(FOLDER_COUNTS_RECONCILE_ENABLED=True, FOLDER_COUNTS_MAX_AGE=3600)
+    def test_stale_folders_queued_for_reconciliation(self):
+        self.folders[0].refresh_counts(file_count=10)
+        folders = list(ScanFolder.objects.filter(pk__in=[folder.pk for folder in self.folders]))
+
+        with patch("books.utils.folder_counts.FolderCountReconciler.enqueue", return_value=2) as enqueue:
+            self.assertEqual(request_stale_recounts(folders), 2)
+
+        self.assertEqual(sorted(enqueue.call_args[0][0]), sorted(folder.pk for folder in self.folders[1:]))
@@ -0,0 +1,100 @@
+"""
+Test cases for the streaming library export
+"""
+
+import csv
+import io
+import json
+import os
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from lxml import etree as ET
+
+from books.models import Book, BookFile, BookGenre, DataSource, FinalMetadata, Genre
+from books.tests.test_helpers import create_test_book_with_file, create_test_scan_folder
+from books.utils.library_export import stream_library_export
+
+
+class LibraryExportTests(TestCase):
+    """Test cases for exporting curated metadata with the primary file"""
+
+    def setUp(self):
+        self.scan_folder = create_test_scan_folder()
+        source, _ = DataSource.objects.get_or_create(name="test_source", defaults={"trust_level": 0.8})
+        fantasy = Genre.objects.create(name="Fantasy")
+
+        self.books = []
+        for i in range(5):
+            book = create_test_book_with_file(f"/library/book{i}.epub", file_size=1000 + i, scan_folder=self.scan_folder)
+            FinalMetadata.objects.create(book=book, final_title=f"Title {i}", final_author="Jane Doe", final_series="Saga", final_series_number=str(i), isbn=f"97800000000{i:02d}")
+            BookGenre.objects.create(book=book, genre=fantasy, source=source, confidence=0.9)
+            self.books.append(book)
+
+        # Audiobook tracks: the first track is the primary file
+        audiobook = self.books[4]
+        BookFile.objects.filter(book=audiobook).update(track_number=2)
+        BookFile.objects.create(book=audiobook, file_path="/library/book4-track1.mp3", file_format="mp3", track_number=1)
+
+        deleted = create_test_book_with_file("/library/deleted.epub", scan_folder=self.scan_folder)
+        FinalMetadata.objects.create(book=deleted, final_title="Deleted")
+        Book.objects.filter(pk=deleted.pk).update(deleted_at="2026-01-01T00:00:00Z")
+
+    def _export(self, export_format, chunk_size=2):
+        return b"".join(stream_library_export(export_format, chunk_size=chunk_size)).decode("utf-8")
+
+    def test_csv_export(self):
+        rows = list(csv.DictReader(io.StringIO(self._export("csv"))))
+
+        self.assertEqual([row["Title"] for row in rows], [f"Title {i}" for i in range(5)])
+        self.assertEqual((rows[0]["Author"], rows[0]["Genre"], rows[0]["Series"], rows[0]["File Path"]), ("Jane Doe", "Fantasy", "Saga", "/library/book0.epub"))
+        self.assertEqual(rows[4]["File Path"], "/library/book4-track1.mp3")
+
+    def test_jsonl_export(self):
+        rows = [json.loads(line) for line in self._export("jsonl").splitlines()]
+
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[1]["genres"], ["Fantasy"])
+        self.assertEqual((rows[1]["file_size"], rows[1]["file_format"]), (1001, "epub"))
+
+    def test_opf_collection_export(self):
+        root = ET.fromstring(self._export("opf").encode("utf-8"))
+        packages = root.findall("{http://www.idpf.org/2007/opf}package")
+
+        self.assertEqual(len(packages), 5)
+        titles = [package.findtext(".//{http://purl.org/dc/elements/1.1/}title") for package in packages]
+        self.assertEqual(titles, [f"Title {i}" for i in range(5)])
+
+    def test_constant_queries_per_chunk(self):
+        with CaptureQueriesContext(connection) as two_chunks:
+            self._export("jsonl", chunk_size=3)
+        with CaptureQueriesContext(connection) as five_chunks:
+            self._export("jsonl", chunk_size=1)
+
+        # Metadata rows, then primary files and genres once per chunk
+        self.assertEqual(len(two_chunks), 1 + 2 * 2)
+        self.assertEqual(len(five_chunks), 1 + 2 * 5)
+
+    def test_streaming_view(self):
+        User.objects.create_user(username="testuser", password="testpass")
+        self.client.login(username="testuser", password="testpass")
+
+        response = self.client.get(reverse("books:export_library", kwargs={"export_format": "jsonl"}))
+
+        self.assertTrue(response.streaming)
+        self.assertIn("library_export.jsonl", response["Content-Disposition"])
+        self.assertEqual(len(b"".join(response.streaming_content).splitlines()), 5)
+        self.assertEqual(self.client.get(reverse("books:export_library", kwargs={"export_format": "xls"})).status_code, 404)
+
+    def test_command_writes_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "library.csv")
+            call_command("export_library", "--format", "csv", "--output", output, stderr=io.StringIO())
+
+            with open(output, encoding="utf-8") as f:
+                self.assertEqual(len(list(csv.DictReader(f))), 5)
@@ -13,17 +13,66 @@ import shutil
 import tempfile
 import zipfile
 from pathlib import Path
+from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase, TransactionTestCase
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
 from django.urls import reverse
 
 from books.models import Book, BookFile, FinalMetadata, ScanFolder
+from books.tests.test_helpers import create_test_book_with_file
 from books.utils.cover_extractor import EPUBCoverExtractor
 
 User = get_user_model()
 
 
+def create_cover_candidates_epub(epub_path):
+    """Create an EPUB with an OPF cover-image, a spine image, a cover-named image and plain images."""
+    from io import BytesIO
+
+    from PIL import Image
+
+    with zipfile.ZipFile(epub_path, "w", zipfile.ZIP_DEFLATED) as epub:
+        epub.writestr("mimetype", "application/epub+zip", compress_type=zipfile.ZIP_STORED)
+        epub.writestr(
+            "META-INF/container.xml",
+            """<?xml version="1.0"?>
+<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">
+  <rootfiles><rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/></rootfiles>
+</container>""",
+        )
+        epub.writestr(
+            "OEBPS/content.opf",
+            """<?xml version="1.0"?>
+<package xmlns="http://www.idpf.org/2007/opf" version="3.0">
+  <metadata xmlns:dc="http://purl.org/dc/elements/1.1/"><dc:title>Test</dc:title></metadata>
+  <manifest>
+<item id="front" href="images/front.png" media-type="image/png" properties="cover-image"/>
+<item id="title" href="text/title.xhtml" media-type="application/xhtml+xml"/>
+<item id="ch1" href="text/ch1.xhtml" media-type="application/xhtml+xml"/>
+  </manifest>
+  <spine><itemref idref="title"/><itemref idref="ch1"/></spine>
+</package>""",
+        )
+        epub.writestr("OEBPS/text/title.xhtml", '<html><body><img src="../images/title%20page.jpg"/></body></html>')
+        epub.writestr("OEBPS/text/ch1.xhtml", "<html><body><p>Text</p></body></html>")
+
+        images = [
+            ("OEBPS/images/a_wide.jpg", 2000, 1000),  # Landscape, largest
+            ("OEBPS/images/b_small.jpg", 300, 500),  # Portrait
+            ("OEBPS/images/c_tall.jpg", 900, 1400),  # Portrait, larger
+            ("OEBPS/images/front.png", 600, 900),  # OPF cover-image
+            ("OEBPS/images/title page.jpg", 500, 300),  # First spine document
+            ("OEBPS/images/z_cover_back.jpg", 400, 200),  # Named like a cover
+        ]
+        for path, width, height in images:
+            img = Image.new("RGB", (width, height), color="blue")
+            img_bytes = BytesIO()
+            img.save(img_bytes, format="PNG" if path.endswith(".png") else "JPEG")
+            epub.writestr(path, img_bytes.getvalue())
+
+
 class EPUBImageExtractionTestCase(TestCase):
     """Test list_all_covers() function."""
 
@@ -163,6 +212,112 @@ class EPUBImageExtractionTestCase(TestCase):
         self.assertEqual(len(covers), 0)
 
 
+class EPUBCoverCandidatesTestCase(TestCase):
+    """Test list_cover_candidates() and cover_thumbnail()."""
+
+    def setUp(self):
+        """Create test EPUB with cover hints of every kind."""
+        cache.clear()
+        self.test_dir = Path(tempfile.mkdtemp())
+        self.epub_path = str(self.test_dir / "test.epub")
+        create_cover_candidates_epub(self.epub_path)
+
+    def tearDown(self):
+        """Clean up."""
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def test_candidates_ordered_likeliest_first(self):
+        candidates = EPUBCoverExtractor.list_cover_candidates(self.epub_path)
+
+        self.assertEqual(
+            [c["internal_path"].rsplit("/", 1)[1] for c in candidates],
+            ["front.png", "title page.jpg", "z_cover_back.jpg", "c_tall.jpg", "b_small.jpg", "a_wide.jpg"],
+        )
+        self.assertTrue(candidates[0]["is_opf_cover"])
+        self.assertFalse(any(c["is_opf_cover"] for c in candidates[1:]))
+
+    def test_candidates_read_dimensions_without_image_data(self):
+        candidates = {c["internal_path"]: c for c in EPUBCoverExtractor.list_cover_candidates(self.epub_path)}
+
+        front = candidates["OEBPS/images/front.png"]
+        self.assertEqual((front["width"], front["height"], front["format"]), (600, 900, "PNG"))
+        self.assertEqual(candidates["OEBPS/images/c_tall.jpg"]["format"], "JPEG")
+        self.assertNotIn("image_data", front)
+        with zipfile.ZipFile(self.epub_path) as zf:
+            self.assertEqual(front["file_size"], zf.getinfo("OEBPS/images/front.png").file_size)
+
+    def test_candidate_index_cached_per_fingerprint(self):
+        first = EPUBCoverExtractor.list_cover_candidates(self.epub_path)
+
+        with patch.object(EPUBCoverExtractor, "_build_candidates") as build:
+            self.assertEqual(EPUBCoverExtractor.list_cover_candidates(self.epub_path), first)
+        build.assert_not_called()
+
+        with zipfile.ZipFile(self.epub_path, "a") as epub:
+            epub.writestr("OEBPS/images/added.gif", b"GIF89a\x10\x00\x20\x00\x00\x00\x00;")
+        self.assertEqual(len(EPUBCoverExtractor.list_cover_candidates(self.epub_path)), len(first) + 1)
+
+    def test_thumbnail_made_once_and_cached(self):
+        from io import BytesIO
+
+        from PIL import Image
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            thumbnail, cache_path = EPUBCoverExtractor.cover_thumbnail(self.epub_path, "OEBPS/images/a_wide.jpg")
+
+            self.assertTrue(cache_path)
+            self.assertTrue((Path(media_root) / cache_path).exists())
+            width, height = Image.open(BytesIO(thumbnail)).size
+            self.assertLessEqual(width, EPUBCoverExtractor.THUMBNAIL_SIZE[0])
+            self.assertLessEqual(height, EPUBCoverExtractor.THUMBNAIL_SIZE[1])
+
+            self.assertEqual(EPUBCoverExtractor.cover_thumbnail(self.epub_path, "OEBPS/images/a_wide.jpg"), (None, cache_path))
+
+
+class AJAXCoverCandidatesTestCase(TestCase):
+    """Test paging of the internal covers AJAX endpoint."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.client.login(username="testuser", password="testpass")
+
+        self.test_dir = Path(tempfile.mkdtemp())
+        epub_path = str(self.test_dir / "test.epub")
+        create_cover_candidates_epub(epub_path)
+        self.book = create_test_book_with_file(epub_path, scan_folder=ScanFolder.objects.create(path=str(self.test_dir), name="Test"))
+        self.url = reverse("books:ajax_list_internal_covers", kwargs={"book_id": self.book.id})
+
+    def tearDown(self):
+        if self.test_dir.exists():
+            shutil.rmtree(self.test_dir)
+
+    def test_returns_one_page_at_a_time(self):
+        with patch.object(EPUBCoverExtractor, "cover_thumbnail", return_value=(None, "cover_cache/render_x.jpg")) as thumbnail:
+            first = self.client.get(self.url, {"page": 1, "page_size": 4}).json()
+            second = self.client.get(self.url, {"page": 2, "page_size": 4}).json()
+
+        self.assertEqual(thumbnail.call_count, 6)  # Only the images on the requested pages
+        self.assertEqual((first["total_count"], len(first["covers"]), first["has_more"]), (6, 4, True))
+        self.assertEqual(first["covers"][0]["internal_path"], "OEBPS/images/front.png")
+        self.assertTrue(first["covers"][0]["preview_url"].endswith("cover_cache/render_x.jpg"))
+        self.assertEqual((second["page"], len(second["covers"]), second["has_more"]), (2, 2, False))
+        self.assertFalse({c["internal_path"] for c in first["covers"]} & {c["internal_path"] for c in second["covers"]})
+
+    def test_inlines_thumbnail_that_could_not_be_cached(self):
+        with patch.object(EPUBCoverExtractor, "cover_thumbnail", return_value=(b"jpeg", None)):
+            data = self.client.get(self.url, {"page_size": 1}).json()
+
+        self.assertEqual(data["covers"][0]["preview_url"], "data:image/jpeg;base64,anBlZw==")
+
+    def test_invalid_page(self):
+        response = self.client.get(self.url, {"page": "x"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.json()["success"])
+
+
 class AJAXListInternalCoversTestCase(TransactionTestCase):
     """Test AJAX endpoint for listing internal covers."""
 
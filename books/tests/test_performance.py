@@ -14,11 +14,13 @@ from unittest.mock import patch
 from django.contrib.auth.models import User
 from django.core.cache import cache
 from django.db import connection
-from django.test import Client, TestCase, TransactionTestCase
+from django.test import Client, RequestFactory, TestCase, TransactionTestCase
 from django.test.utils import override_settings
 from django.urls import reverse
 
-from books.models import Book, BookMetadata, DataSource, FinalMetadata, ScanFolder
+from books.context_processors import theme_context, user_preferences
+from books.context_processors_wizard import wizard_context
+from books.models import Book, BookMetadata, DataSource, FinalMetadata, ScanFolder, SetupWizard, UserProfile
 from books.tests.test_helpers import create_test_book_with_file
 
 
@@ -712,3 +714,85 @@ class PerformanceRegressionTests(TestCase):
                 self.assertLess(timing, 3.0)
             elif operation == "ajax_search":
                 self.assertLess(timing, 1.0)
+
+
+class ContextProcessorCachingTests(TestCase):
+    """Tests that the global context processors are cached and lazy."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.user = User.objects.create_user(username="testuser", password="testpass123")
+        cache.clear()
+
+    def _request(self, path="/dashboard/"):
+        request = self.factory.get(path)
+        request.user = self.user
+        request.session = {}
+        return request
+
+    def _render_all(self, request):
+        context = {}
+        context.update(theme_context(request))
+        context.update(user_preferences(request))
+        context.update(wizard_context(request))
+        # Force evaluation of every lazy value, as a full page render would
+        return {key: str(value) for key, value in context.items() if key != "bootswatch_themes"}
+
+    def test_context_processors_add_no_queries_on_warm_cache(self):
+        """A warm cache serves profile and wizard state without touching the database."""
+        cold = self._render_all(self._request())
+
+        with self.assertNumQueries(0):
+            warm = self._render_all(self._request())
+
+        self.assertEqual(cold, warm)
+        self.assertEqual(warm["current_theme"], "flatly")
+        self.assertEqual(warm["should_show_wizard_banner"], "True")
+
+    def test_unreferenced_context_is_not_evaluated(self):
+        """Templates that never read the profile or wizard keys pay nothing."""
+        request = self._request()
+
+        with self.assertNumQueries(0):
+            theme_context(request)
+            user_preferences(request)
+            wizard_context(request)
+
+    def test_processors_share_one_profile_lookup_per_request(self):
+        """Theme and preferences read the same per-request profile."""
+        request = self._request()
+        self._render_all(request)
+
+        self.assertTrue(hasattr(request, "_cached_user_profile"))
+        self.assertEqual(UserProfile.objects.filter(user=self.user).count(), 1)
+
+    def test_profile_save_invalidates_cache(self):
+        """Saving the profile is reflected on the next request."""
+        self._render_all(self._request())
+
+        profile = UserProfile.objects.get(user=self.user)
+        profile.theme = "darkly"
+        profile.items_per_page = 25
+        profile.save()
+
+        context = self._render_all(self._request())
+        self.assertEqual(context["current_theme"], "darkly")
+        self.assertEqual(context["items_per_page"], "25")
+
+    def test_wizard_and_folder_changes_invalidate_cache(self):
+        """Completing the wizard or adding a folder hides the banner immediately."""
+        self.assertEqual(self._render_all(self._request())["should_show_wizard_banner"], "True")
+
+        wizard = SetupWizard.objects.get(user=self.user)
+        wizard.is_skipped = True
+        wizard.save()
+        self.assertEqual(self._render_all(self._request())["should_show_wizard_banner"], "False")
+
+        wizard.is_skipped = False
+        wizard.save()
+        self.assertEqual(self._render_all(self._request())["should_show_wizard_banner"], "True")
+
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir, ignore_errors=True)
+        ScanFolder.objects.create(name="Library", path=temp_dir)
+        self.assertEqual(self._render_all(self._request())["should_show_wizard_banner"], "False")
@@ -0,0 +1,125 @@
+"""
+Test cases for the indexed quick search
+"""
+
+import io
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from books.models import Author, FinalMetadata, Genre, SearchToken, Series
+from books.tests.test_helpers import create_test_book_with_file, create_test_scan_folder
+from books.utils.quick_search import cached_search, normalize_text, search
+
+
+class QuickSearchTests(TestCase):
+    """Test cases for word-prefix matching on the SearchToken index"""
+
+    def setUp(self):
+        cache.clear()
+        self.scan_folder = create_test_scan_folder()
+        self.books = {}
+        # Signals index after commit, which TestCase only simulates
+        with self.captureOnCommitCallbacks(execute=True):
+            for title in ["The Hobbit", "The Fellowship of the Ring", "Les Misérables", "Hobbies for Everyone"]:
+                book = create_test_book_with_file(f"/library/{title}.epub", scan_folder=self.scan_folder)
+                FinalMetadata.objects.create(book=book, final_title=title)
+                self.books[title] = book
+            Author.objects.create(name="J.R.R. Tolkien")
+            Series.objects.create(name="Middle-earth")
+            Genre.objects.create(name="Fantasy")
+
+    def _titles(self, query):
+        return [book["title"] for book in search(query)["books"]]
+
+    def test_normalize_text(self):
+        self.assertEqual(normalize_text("  Les Misérables: Tome_1 "), "les miserables tome 1")
+
+    def test_prefix_matching_ranks_leading_matches_first(self):
+        self.assertEqual(self._titles("hob"), ["Hobbies for Everyone", "The Hobbit"])
+        self.assertEqual(search("tolk")["authors"][0]["name"], "J.R.R. Tolkien")
+        self.assertEqual(search("middle")["series"][0]["name"], "Middle-earth")
+        self.assertEqual(search("FANT")["genres"][0]["name"], "Fantasy")
+
+    def test_leading_matches_survive_large_match_sets(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for number in range(20):
+                Genre.objects.create(name=f"Epic Space Adventure {number}")
+            Genre.objects.create(name="Space Opera")
+
+        # Created last, so it has the highest id of the twenty-one matches
+        self.assertEqual(search("space")["genres"][0]["name"], "Space Opera")
+
+    def test_every_word_must_match(self):
+        self.assertEqual(self._titles("fell ring"), ["The Fellowship of the Ring"])
+        self.assertEqual(self._titles("hobbit ring"), [])
+
+    def test_accents_are_ignored(self):
+        self.assertEqual(self._titles("miserables"), ["Les Misérables"])
+        self.assertEqual(self._titles("Misé"), ["Les Misérables"])
+
+    def test_signals_keep_index_current(self):
+        book = self.books["The Hobbit"]
+        with self.captureOnCommitCallbacks(execute=True):
+            book.finalmetadata.final_title = "There and Back Again"
+            book.finalmetadata.save()
+        self.assertEqual(self._titles("hobbit"), [])
+        self.assertEqual(self._titles("back again"), ["There and Back Again"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            book.soft_delete()
+        self.assertEqual(self._titles("back"), [])
+        self.assertFalse(SearchToken.objects.filter(kind=SearchToken.BOOK, object_id=book.pk).exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Genre.objects.get(name="Fantasy").delete()
+        self.assertEqual(search("fantasy")["genres"], [])
+
+    def test_cached_results_follow_index_changes(self):
+        user = User.objects.create_user(username="reader", password="pass")
+        self.assertEqual(len(cached_search(user, "hob")["books"]), 2)
+
+        with CaptureQueriesContext(connection) as cached:
+            cached_search(user, "HOB ")
+        # Only the index version is read
+        self.assertEqual(len(cached), 1)
+
+        # Index changes made elsewhere (another process, a command) change the version too
+        SearchToken.objects.filter(kind=SearchToken.BOOK, object_id=self.books["The Hobbit"].pk).delete()
+        self.assertEqual(len(cached_search(user, "hob")["books"]), 1)
+        call_command("rebuild_search_index", stdout=io.StringIO())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            book = create_test_book_with_file("/library/hobgoblin.epub", scan_folder=self.scan_folder)
+            FinalMetadata.objects.create(book=book, final_title="Hobgoblin")
+        self.assertEqual(len(cached_search(user, "hob")["books"]), 3)
+
+    def test_view_uses_constant_queries(self):
+        User.objects.create_user(username="reader", password="pass")
+        self.client.login(username="reader", password="pass")
+        url = reverse("books:quick_search")
+
+        self.assertEqual(self.client.get(url, {"q": "h"}).json()["error"], "Query too short")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {"q": "the"})
+        data = response.json()
+        self.assertTrue(data["success"])
+        self.assertEqual(len(data["results"]["books"]), 2)
+        # The index version plus one ranked lookup per kind, however many words or matches
+        search_queries = [q for q in queries.captured_queries if "books_searchtoken" in q["sql"]]
+        self.assertEqual(len(search_queries), 5)
+
+    def test_rebuild_command(self):
+        SearchToken.objects.all().delete()
+        self.assertEqual(self._titles("fellowship"), [])
+        out = io.StringIO()
+        call_command("rebuild_search_index", stdout=out)
+
+        self.assertIn("Indexed", out.getvalue())
+        self.assertEqual(self._titles("fellowship"), ["The Fellowship of the Ring"])
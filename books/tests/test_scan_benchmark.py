@@ -0,0 +1,99 @@
+"""
+Test cases for the synthetic library generator and the scan benchmark runner
+"""
+
+import os
+import random
+import shutil
+import tempfile
+import zipfile
+
+import requests
+from django.test import TestCase
+from PyPDF2 import PdfReader
+
+from books.models import ScanFolder
+from books.scanner.extractors.audio import extract_duration
+from books.utils.scan_benchmark import external_api_stub, run_scan_benchmark
+from books.utils.synthetic_library import build_mobi, generate_library
+
+
+class SyntheticLibraryTests(TestCase):
+    """Test cases for generating synthetic libraries"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _files(self, root):
+        return sorted(os.path.relpath(os.path.join(directory, name), root) for directory, _, names in os.walk(root) for name in names)
+
+    def test_same_seed_same_library(self):
+        first, second = os.path.join(self.temp_dir, "a"), os.path.join(self.temp_dir, "b")
+
+        summary = generate_library(first, ebooks=20, comics=5, audiobooks=2, seed=7)
+        generate_library(second, ebooks=20, comics=5, audiobooks=2, seed=7)
+
+        self.assertEqual(self._files(first), self._files(second))
+        self.assertEqual(summary["epub"] + summary["pdf"] + summary["mobi"], 20)
+        self.assertEqual((summary["cbz"], summary["mp3"]), (5, 6))
+        self.assertEqual(sorted(os.listdir(first)), ["audiobooks", "comics", "ebooks"])
+
+    def test_files_are_readable(self):
+        generate_library(self.temp_dir, ebooks=30, comics=2, audiobooks=1, sidecar_ratio=1.0, series_ratio=0, seed=1)
+        files = self._files(self.temp_dir)
+        by_extension = {}
+        for path in files:
+            by_extension.setdefault(os.path.splitext(path)[1], []).append(os.path.join(self.temp_dir, path))
+
+        with zipfile.ZipFile(by_extension[".epub"][0]) as epub:
+            self.assertEqual(epub.namelist()[0], "mimetype")
+            self.assertIn("<dc:title>", epub.read("OEBPS/content.opf").decode())
+        with zipfile.ZipFile(by_extension[".cbz"][0]) as cbz:
+            self.assertIn("ComicInfo.xml", cbz.namelist())
+        self.assertTrue(PdfReader(by_extension[".pdf"][0]).metadata.title)
+        self.assertGreater(extract_duration(by_extension[".mp3"][0]), 0)
+        self.assertEqual(len(by_extension[".opf"]), len(by_extension[".jpg"]) - 1)  # The audiobook cover has no OPF
+
+    def test_mobi_headers(self):
+        data = build_mobi({"title": "Winter Star", "author": "Ann Leckie", "publisher": "Orbit", "isbn": "9780000000002", "year": 2014}, random.Random(0))
+
+        self.assertEqual(data[60:68], b"BOOKMOBI")
+        record0 = int.from_bytes(data[78:82], "big")
+        self.assertEqual(data[record0 + 16 : record0 + 20], b"MOBI")
+        self.assertIn(b"EXTH", data)
+        self.assertIn(b"Ann Leckie", data)
+
+
+class ScanBenchmarkTests(TestCase):
+    """Test cases for the scan benchmark runner"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_external_requests_go_to_stub(self):
+        with external_api_stub() as stub:
+            response = requests.get("https://openlibrary.org/search.json", params={"q": "dune"}, timeout=5)
+            cover = requests.get("https://covers.openlibrary.org/b/id/1-L.jpg", timeout=5)
+
+        self.assertEqual(response.json()["docs"], [])
+        self.assertEqual(cover.status_code, 404)
+        self.assertEqual(stub.request_count, 2)
+
+    def test_report(self):
+        generate_library(self.temp_dir, ebooks=3, comics=2, audiobooks=1, tracks_per_audiobook=2, series_ratio=0, sidecar_ratio=1.0, seed=3)
+
+        report = run_scan_benchmark(self.temp_dir, isolate=False)
+
+        self.assertEqual(ScanFolder.objects.count(), 3)
+        run = report["runs"][0]
+        self.assertEqual(run["files"], 7)
+        self.assertGreater(run["files_per_second"], 0)
+        self.assertGreater(run["queries_per_file"], 0)
+        self.assertIn("collect_files", run["stages"])
+        self.assertEqual(run["stages"]["collect_files"]["calls"], 6)  # Counting pass and scan pass per folder
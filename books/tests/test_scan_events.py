@@ -0,0 +1,196 @@
+"""
+Test cases for the progress event hub and its server-sent event stream
+"""
+
+import json
+import threading
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from books.models import ScanFolder, ScanQueue
+from books.scanner import events
+from books.scanner.background import ScanProgress
+from books.scanner.events import ProgressEventHub
+from books.tests.test_helpers import create_test_scan_folder
+from books.utils.batch_renamer import BatchRenamer, FileOperation
+
+
+def _parse_stream(response):
+    """Split a server-sent event response into ``(id, event, data)`` messages."""
+    return _parse_stream_body(b"".join(response.streaming_content).decode())
+
+
+def _parse_stream_body(body):
+    messages = []
+    for block in body.split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        if "event" in fields:
+            messages.append((fields["id"], fields["event"], json.loads(fields["data"])))
+    return messages
+
+
+class ProgressEventHubTests(TestCase):
+    """Test cases for buffering and resuming progress events"""
+
+    def setUp(self):
+        self.hub = ProgressEventHub(buffer_size=3, folder_interval=0)
+
+    def test_events_after_resumes_from_id(self):
+        first = self.hub.publish("scan_progress", {"current": 1})
+        self.hub.publish("scan_progress", {"current": 2})
+
+        events, complete = self.hub.events_after(first)
+
+        self.assertTrue(complete)
+        self.assertEqual([event["data"]["current"] for event in events], [2])
+        self.assertEqual(self.hub.events_after(self.hub.last_event_id()), ([], True))
+
+    def test_gap_or_unknown_id_is_incomplete(self):
+        first = self.hub.publish("scan_progress", {"current": 1})
+        for current in range(2, 6):
+            self.hub.publish("scan_progress", {"current": current})
+
+        # The buffer only keeps the last three events
+        events, complete = self.hub.events_after(first)
+        self.assertFalse(complete)
+        self.assertEqual([event["data"]["current"] for event in events], [3, 4, 5])
+
+        self.assertFalse(self.hub.events_after(None)[1])
+        self.assertFalse(self.hub.events_after("otherhub-1")[1])
+
+    def test_wait_wakes_on_publish(self):
+        last_event_id = self.hub.last_event_id()
+        threading.Timer(0.05, self.hub.publish, args=("batch_progress", {"done": 1})).start()
+
+        self.hub.wait(last_event_id, timeout=5)
+
+        self.assertEqual(len(self.hub.events_after(last_event_id)[0]), 1)
+
+    def test_counter_changes_mark_folder(self):
+        folder = create_test_scan_folder()
+
+        with patch.object(events, "_hub", self.hub), self.captureOnCommitCallbacks(execute=True):
+            ScanFolder.adjust_counts(folder.pk, files=2)
+
+        self.assertEqual(self.hub.publish_folder_progress(), 1)
+
+    def test_database_sync_picks_up_other_processes(self):
+        folder = create_test_scan_folder()
+        hub = ProgressEventHub(sync_interval=60)
+        self.assertFalse(hub.sync_from_database())
+        last_event_id = hub.last_event_id()
+
+        # Writes another process made: no signal or hub call in this one
+        ScanQueue.objects.create(name="Queued elsewhere", created_by=User.objects.create_user(username="scheduler"))
+        ScanFolder.objects.filter(pk=folder.pk).update(book_count=3)
+        self.assertFalse(hub.sync_from_database())
+        self.assertTrue(hub.sync_from_database(force=True))
+        self.assertEqual(hub.publish_folder_progress(force=True), 1)
+
+        events, _complete = hub.events_after(last_event_id)
+        self.assertEqual([event["event"] for event in events], ["snapshot", "folder_progress"])
+        self.assertEqual(events[0]["data"]["queue"]["pending"], 1)
+        self.assertEqual((events[1]["data"]["folder_id"], events[1]["data"]["progress"]["scanned"]), (folder.pk, 3))
+
+    def test_folder_progress_published_in_one_batch(self):
+        folder = create_test_scan_folder()
+        ScanFolder.objects.filter(pk=folder.pk).update(file_count=4, book_count=0)
+        self.hub.folder_changed(folder.pk)
+        self.hub.folder_changed(folder.pk)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.hub.publish_folder_progress(), 1)
+
+        events, _complete = self.hub.events_after(self.hub.format_id(0))
+        self.assertEqual(events[0]["event"], "folder_progress")
+        self.assertEqual((events[0]["data"]["folder_id"], events[0]["data"]["progress"]["total_files"]), (folder.pk, 4))
+        self.assertEqual(self.hub.publish_folder_progress(), 0)
+
+
+class ScanEventViewTests(TestCase):
+    """Test cases for the event stream and its polling fallback"""
+
+    def setUp(self):
+        cache.clear()
+        self.hub = ProgressEventHub()
+        patcher = patch.object(events, "_hub", self.hub)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.client.force_login(self.user)
+
+    def test_stream_starts_with_snapshot_then_resumes(self):
+        ScanProgress("job-1").update(1, 10, "Processing")
+        response = self.client.get(reverse("books:scan_event_stream"))
+
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        messages = _parse_stream(response)
+        self.assertEqual([event for _id, event, _data in messages], ["snapshot"])
+
+        ScanProgress("job-1").update(2, 10, "Processing")
+        ScanProgress("job-1").complete(True, "Done")
+        messages = _parse_stream(self.client.get(reverse("books:scan_event_stream"), HTTP_LAST_EVENT_ID=messages[0][0]))
+
+        self.assertEqual([event for _id, event, _data in messages], ["scan_progress", "scan_progress"])
+        self.assertEqual(messages[0][2]["current"], 2)
+        self.assertTrue(messages[1][2]["completed"])
+
+    @override_settings(SCAN_EVENTS_STREAM_SECONDS=0.5, SCAN_EVENTS_HEARTBEAT_SECONDS=0.1)
+    def test_stream_waits_with_heartbeats_and_resumes(self):
+        self.hub.sync_interval = 0
+        threading.Timer(0.2, ScanProgress("job-3").update, args=(1, 10, "Processing")).start()
+
+        with patch("books.views.scanning._release_connection") as release_connection:
+            response = self.client.get(reverse("books:scan_event_stream"))
+            body = b"".join(response.streaming_content).decode()
+        self.assertTrue(release_connection.called)
+        # Nothing was published in the first 0.2 s and the last 0.3 s
+        self.assertGreaterEqual(body.count(": keepalive"), 2)
+
+        messages = _parse_stream_body(body)
+        self.assertEqual([event for _id, event, _data in messages], ["snapshot", "scan_progress"])
+        self.assertEqual(messages[1][2]["job_id"], "job-3")
+
+        ScanProgress("job-3").update(2, 10, "Processing")
+        messages = _parse_stream(self.client.get(reverse("books:scan_event_stream"), HTTP_LAST_EVENT_ID=messages[1][0]))
+        self.assertEqual([(event, data["current"]) for _id, event, data in messages], [("scan_progress", 2)])
+
+    def test_stream_count_is_capped(self):
+        self.hub.max_streams = 1
+        self.assertTrue(self.hub.open_stream())
+
+        response = self.client.get(reverse("books:scan_event_stream"))
+        self.assertEqual((response.status_code, response["Retry-After"]), (503, "3"))
+
+        self.hub.close_stream()
+        _parse_stream(self.client.get(reverse("books:scan_event_stream")))
+        # The finished stream gave its slot back
+        self.assertTrue(self.hub.open_stream())
+
+    def test_poll_fallback(self):
+        response = self.client.get(reverse("books:scan_events_poll"))
+        last_event_id = response.json()["last_event_id"]
+        self.assertEqual(response.json()["events"][0]["event"], "snapshot")
+
+        ScanProgress("job-2").update(3, 10, "Processing")
+        data = self.client.get(reverse("books:scan_events_poll"), {"last_event_id": last_event_id}).json()
+
+        self.assertEqual([(event["event"], event["data"]["job_id"]) for event in data["events"]], [("scan_progress", "job-2")])
+        self.assertEqual(self.client.get(reverse("books:scan_events_poll"), {"last_event_id": data["last_event_id"]}).json()["events"], [])
+
+    def test_batch_renamer_publishes_progress(self):
+        renamer = BatchRenamer(dry_run=False, progress_id="batch-1")
+        renamer.operations = [FileOperation(f"/library/book{i}.epub", f"/renamed/book{i}.epub", "main_rename", book_id=i) for i in (1, 2)]
+
+        with patch.object(BatchRenamer, "_execute_book_operations", side_effect=[None, OSError("Disk full")]), patch.object(BatchRenamer, "_update_book_path"):
+            with patch.object(BatchRenamer, "_rollback_book_operations"):
+                renamer.execute_operations()
+
+        batch_events = [event["data"] for event in self.hub.events_after(self.hub.format_id(0))[0] if event["event"] == "batch_progress"]
+        self.assertEqual([(data["batch"], data["done"], data["total"]) for data in batch_events], [("batch-1", 0, 2), ("batch-1", 1, 2), ("batch-1", 2, 2)])
+        self.assertEqual((batch_events[-1]["successful"], batch_events[-1]["failed"], batch_events[-1]["completed"]), (1, 1, True))
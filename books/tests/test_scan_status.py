@@ -0,0 +1,102 @@
+"""
+Test cases for the scan status read model and its conditional GET endpoint
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from books.models import ScanHistory, ScanQueue, ScanStatus
+from books.scanner.background import ScanProgress, add_active_scan
+from books.scanner.status import scan_status_snapshot
+
+
+def _history(job_id, status, completed_at):
+    return ScanHistory.objects.create(
+        job_id=job_id, folder_path="/library", folder_name="library", status=status, started_at=completed_at - timedelta(minutes=5), completed_at=completed_at, duration_seconds=300
+    )
+
+
+class ScanStatusTests(TestCase):
+    """Test cases for the single-query scanning status"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser", password="testpass")
+        self.client.force_login(self.user)
+
+        ScanQueue.objects.create(name="First", created_by=self.user)
+        ScanQueue.objects.create(name="Second", created_by=self.user)
+        ScanQueue.objects.create(name="Broken", status="failed", created_by=self.user)
+        ScanStatus.objects.create(status="Running")
+        now = timezone.now()
+        self.recent = _history("job-recent", "completed", now - timedelta(hours=1))
+        _history("job-failed", "failed", now - timedelta(hours=2))
+        _history("job-old", "completed", now - timedelta(days=3))
+
+        for job_id in ["job-1", "job-2"]:
+            add_active_scan(job_id)
+            ScanProgress(job_id).update(5, 10, "Processing")
+        ScanProgress("job-2").complete(True, "Done")
+
+    def test_snapshot_single_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            snapshot = scan_status_snapshot()
+
+        self.assertEqual(len(queries), 1)
+        self.assertEqual([job["job_id"] for job in snapshot["active_jobs"]], ["job-1"])
+        self.assertEqual((snapshot["queue"]["pending"], snapshot["queue"]["failed"], snapshot["queue"]["total"]), (2, 1, 3))
+        self.assertEqual(snapshot["scan_status"]["Running"], 1)
+        self.assertEqual((snapshot["history"]["completed"], snapshot["history"]["failed"]), (1, 1))
+        self.assertEqual(snapshot["history"]["last_completed_at"], self.recent.completed_at.isoformat())
+
+    def test_conditional_get(self):
+        url = reverse("books:scan_status_feed")
+        response = self.client.get(url)
+        etag = response["ETag"]
+
+        self.assertEqual(response.json()["queue"]["total"], 3)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # Any progress report changes the version
+        ScanProgress("job-1").update(6, 10, "Processing")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+        # So does a change to the queue
+        etag = response["ETag"]
+        ScanQueue.objects.create(name="Third", created_by=self.user)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.json()["queue"]["pending"], 3)
+
+        # And changes no signal reports, e.g. history ageing out of the window or other processes' updates
+        etag = response["ETag"]
+        ScanHistory.objects.filter(pk=self.recent.pk).update(completed_at=timezone.now() - timedelta(days=2))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.json()["history"]["completed"], 0)
+
+        etag = response["ETag"]
+        ScanStatus.objects.update(status="Completed")
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).json()["scan_status"]["Completed"], 1)
+
+    def test_conditional_get_single_query(self):
+        url = reverse("books:scan_status_feed")
+        etag = self.client.get(url)["ETag"]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len([query for query in queries.captured_queries if "books_scan" in query["sql"]]), 1)
+
+    def test_queue_page_statistics(self):
+        response = self.client.get(reverse("books:scan_queue"))
+
+        self.assertEqual(response.context["stats"]["total_items"], 3)
+        self.assertEqual((response.context["stats"]["pending_items"], response.context["stats"]["failed_items"]), (2, 1))
@@ -0,0 +1,162 @@
+"""
+Tests for the persistent external API response cache.
+"""
+
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from books.models import ExternalAPIResponse
+from books.scanner import api_cache
+from books.scanner.extractors.comicvine import ComicVineAPI
+from books.scanner.rate_limiting import RateLimitConfig, RateLimitedAPIClient
+
+
+def _response(status_code=200, data=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = data
+    return response
+
+
+class LookupKeyTests(TestCase):
+    """Test cases for cache key normalization."""
+
+    def test_isbn10_and_isbn13_share_a_key(self):
+        self.assertEqual(api_cache.lookup_key(isbn="0-306-40615-2"), api_cache.lookup_key(isbn="978-0-306-40615-7"))
+
+    def test_isbn_takes_precedence_over_title(self):
+        self.assertEqual(api_cache.lookup_key(isbn="9780306406157", title="Anything"), "isbn:9780306406157")
+
+    def test_title_author_key_ignores_case_and_punctuation(self):
+        self.assertEqual(
+            api_cache.lookup_key(title="The Hobbit!", author="J.R.R. Tolkien"),
+            api_cache.lookup_key(title="the  hobbit", author="j r r tolkien"),
+        )
+
+    def test_nothing_to_look_up(self):
+        self.assertIsNone(api_cache.lookup_key(title="  ", author=None))
+
+    def test_comicvine_key_normalizes_query_per_resource(self):
+        self.assertEqual(api_cache.comicvine_key("volume", "Saga!", 5), api_cache.comicvine_key("volume", "  saga ", 5))
+        self.assertNotEqual(api_cache.comicvine_key("volume", "Saga", 5), api_cache.comicvine_key("issue", "Saga", 5))
+        self.assertNotEqual(api_cache.comicvine_key("volume", "Saga", 5), api_cache.comicvine_key("volume", "Saga", 20))
+        self.assertIsNone(api_cache.comicvine_key("issue", "", 5))
+
+    def test_request_key_ignores_credentials(self):
+        self.assertEqual(
+            api_cache.request_key("search", {"query": "Saga", "api_key": "one", "format": "json"}),
+            api_cache.request_key("search", {"api_key": "two", "query": "Saga"}),
+        )
+
+
+@patch("books.scanner.rate_limiting.time.sleep")
+class PersistentResponseCacheTests(TestCase):
+    """Test cases for RateLimitedAPIClient going through the persistent cache."""
+
+    def setUp(self):
+        self.client = RateLimitedAPIClient("Open Library", RateLimitConfig.OPEN_LIBRARY)
+        cache.clear()
+
+    @patch("books.scanner.rate_limiting.requests.get")
+    def test_second_edition_with_same_isbn_costs_no_request(self, mock_get, mock_sleep):
+        mock_get.return_value = _response(data={"docs": [{"title": "Dune"}]})
+
+        first = self.client.make_request("http://example.com", cache_key="a", lookup_key=api_cache.lookup_key(isbn="0441172717"))
+        cache.clear()  # Short-lived cache gone, as after a restart
+        second = self.client.make_request("http://example.com", cache_key="b", lookup_key=api_cache.lookup_key(isbn="9780441172719"))
+
+        self.assertEqual(first, second)
+        mock_get.assert_called_once()
+        self.assertFalse(ExternalAPIResponse.objects.get(provider="open_library").is_negative)
+
+    @patch("books.scanner.rate_limiting.requests.get")
+    def test_empty_result_is_cached_with_shorter_ttl(self, mock_get, mock_sleep):
+        mock_get.return_value = _response(data={"docs": [], "numFound": 0})
+        key = api_cache.lookup_key(title="Unknown Book", author="Nobody")
+
+        self.client.make_request("http://example.com", lookup_key=key)
+        self.client.make_request("http://example.com", lookup_key=key)
+
+        mock_get.assert_called_once()
+        entry = ExternalAPIResponse.objects.get(provider="open_library", lookup_key=key)
+        positive_ttl, negative_ttl = api_cache.get_cache_ttls("open_library")
+        self.assertTrue(entry.is_negative)
+        self.assertLess(negative_ttl, positive_ttl)
+        self.assertLessEqual(entry.expires_at, timezone.now() + timedelta(seconds=negative_ttl))
+
+    @patch("books.scanner.rate_limiting.requests.get")
+    def test_not_found_is_cached(self, mock_get, mock_sleep):
+        mock_get.return_value = _response(status_code=404)
+        key = api_cache.lookup_key(isbn="9780306406157")
+
+        self.assertIsNone(self.client.make_request("http://example.com", lookup_key=key))
+        self.assertIsNone(self.client.make_request("http://example.com", lookup_key=key))
+        mock_get.assert_called_once()
+
+    @patch("books.scanner.rate_limiting.requests.get")
+    def test_stored_response_served_while_circuit_open(self, mock_get, mock_sleep):
+        key = api_cache.lookup_key(isbn="9780306406157")
+        api_cache.store_response("open_library", key, {"docs": [{"title": "Stored"}]})
+        for _ in range(self.client.circuit_breaker.failure_threshold):
+            self.client.circuit_breaker.record_failure()
+
+        self.assertEqual(self.client.make_request("http://example.com", lookup_key=key), {"docs": [{"title": "Stored"}]})
+        mock_get.assert_not_called()
+
+    @patch("books.scanner.rate_limiting.requests.get")
+    def test_expired_entry_is_refetched(self, mock_get, mock_sleep):
+        key = api_cache.lookup_key(isbn="9780306406157")
+        api_cache.store_response("open_library", key, {"docs": [{"title": "Old"}]})
+        ExternalAPIResponse.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        mock_get.return_value = _response(data={"docs": [{"title": "New"}]})
+
+        self.assertEqual(self.client.make_request("http://example.com", lookup_key=key), {"docs": [{"title": "New"}]})
+        self.assertEqual(ExternalAPIResponse.objects.get(lookup_key=key).response, {"docs": [{"title": "New"}]})
+
+    def test_comicvine_errors_are_not_cached(self, mock_sleep):
+        self.assertFalse(api_cache.store_response("comic_vine", "search:x", {"status_code": 107, "error": "Rate limit exceeded"}))
+        self.assertTrue(api_cache.store_response("comic_vine", "search:y", {"status_code": 101, "error": "Object Not Found"}))
+        self.assertTrue(ExternalAPIResponse.objects.get(lookup_key="search:y").is_negative)
+
+    @override_settings(COMICVINE_API_KEY="test_key")
+    @patch("books.scanner.rate_limiting.requests.get")
+    def test_comicvine_search_shared_across_books(self, mock_get, mock_sleep):
+        mock_get.return_value = _response(data={"status_code": 1, "results": [{"id": 1, "name": "Saga"}]})
+        api = ComicVineAPI()
+        api.client = RateLimitedAPIClient("Comic Vine", RateLimitConfig.COMIC_VINE)
+
+        self.assertEqual(api.search_volumes("Saga")[0]["id"], 1)
+        cache.clear()
+        self.assertEqual(api.search_volumes("saga."), [{"id": 1, "name": "Saga"}])
+
+        mock_get.assert_called_once()
+        self.assertEqual(ExternalAPIResponse.objects.get().lookup_key, api_cache.comicvine_key("volume", "Saga", 5))
+
+        # A larger limit is a different request
+        api.search_volumes("Saga", limit=20)
+        self.assertEqual(mock_get.call_count, 2)
+
+    def test_expired_responses_are_pruned(self, mock_sleep):
+        for index in range(3):
+            api_cache.store_response("open_library", f"isbn:{index}", {"docs": [{"title": "Dune"}]})
+        ExternalAPIResponse.objects.exclude(lookup_key="isbn:0").update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        self.assertEqual(api_cache.prune_expired_responses(dry_run=True), 2)
+        self.assertEqual(api_cache.prune_expired_responses(chunk_size=1), 2)
+        self.assertEqual(list(ExternalAPIResponse.objects.values_list("lookup_key", flat=True)), ["isbn:0"])
+
+    def test_prune_scan_logs_command_prunes_api_cache(self, mock_sleep):
+        api_cache.store_response("open_library", "isbn:1", {"docs": [{"title": "Dune"}]})
+        ExternalAPIResponse.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        out = StringIO()
+
+        call_command("prune_scan_logs", stdout=out)
+
+        self.assertIn("Deleted 1 expired external API responses", out.getvalue())
+        self.assertFalse(ExternalAPIResponse.objects.exists())
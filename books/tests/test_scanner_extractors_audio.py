@@ -0,0 +1,132 @@
+"""
+Test cases for the header-only audio duration extractor
+"""
+
+import os
+import shutil
+import struct
+import tempfile
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from books.models import BookFile, BookMetadata, DataSource
+from books.scanner.content_processing import _process_audiobook_files, _update_audiobook_durations
+from books.scanner.extractors.audio import extract_duration, extract_durations, probe_header_duration
+from books.tests.test_helpers import create_test_book_with_file, create_test_scan_folder
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, stereo; 417-byte frames of 1152 samples
+MP3_FRAME_HEADER = b"\xff\xfb\x90\x00"
+MP3_FRAME_LENGTH = 417
+
+
+def _mp3_frames(count, first_frame_payload=b""):
+    first = MP3_FRAME_HEADER + first_frame_payload
+    frames = [first + b"\x00" * (MP3_FRAME_LENGTH - len(first))]
+    frames.extend(MP3_FRAME_HEADER + b"\x00" * (MP3_FRAME_LENGTH - 4) for _ in range(count - 1))
+    return b"".join(frames)
+
+
+def _box(box_type, payload):
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+
+class AudioHeaderDurationTests(TestCase):
+    """Test cases for reading durations from container headers"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write(self, name, data):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_mp3_xing_header_after_id3_tag(self):
+        """The Xing frame count gives the duration; the ID3 tag (e.g. cover art) is skipped, not read"""
+        id3 = b"ID3\x03\x00\x00" + bytes([0, 0, 0x10, 0]) + b"\x00" * 2048
+        xing = b"\x00" * 32 + b"Xing" + struct.pack(">II", 0x01, 5000)
+        path = self._write("vbr.mp3", id3 + _mp3_frames(10, xing))
+
+        self.assertAlmostEqual(probe_header_duration(path), 5000 * 1152 / 44100)
+
+    def test_mp3_vbri_header(self):
+        vbri = b"\x00" * 32 + b"VBRI" + b"\x00" * 10 + struct.pack(">I", 2000)
+        path = self._write("vbri.mp3", _mp3_frames(10, vbri))
+
+        self.assertAlmostEqual(probe_header_duration(path), 2000 * 1152 / 44100)
+
+    def test_mp3_cbr_duration_from_bitrate(self):
+        path = self._write("cbr.mp3", _mp3_frames(1000) + b"TAG" + b"\x00" * 125)
+
+        self.assertEqual(extract_duration(path), int(1000 * MP3_FRAME_LENGTH * 8 / 128000))
+
+    def test_m4b_moov_after_media_data(self):
+        """moov at the end of the file is reached by seeking past mdat"""
+        mvhd = _box(b"mvhd", struct.pack(">IIIII", 0, 0, 0, 1000, 3_600_500) + b"\x00" * 80)
+        data = _box(b"ftyp", b"M4B \x00\x00\x00\x00") + _box(b"mdat", b"\x00" * 100_000) + _box(b"moov", mvhd)
+        path = self._write("book.m4b", data)
+
+        self.assertAlmostEqual(probe_header_duration(path), 3600.5)
+
+    @patch("mutagen.File")
+    def test_other_formats_fall_back_to_mutagen(self, mock_file):
+        mock_file.return_value.info.length = 42.7
+        path = self._write("track.flac", b"fLaC")
+
+        self.assertIsNone(probe_header_duration(path))
+        self.assertEqual(extract_duration(path), 42)
+
+    def test_extract_durations_concurrently(self):
+        paths = [self._write(f"{i:02d}.mp3", _mp3_frames(100 * i)) for i in range(1, 6)]
+
+        durations = extract_durations(paths, workers=4)
+
+        self.assertEqual(list(durations), paths)
+        self.assertEqual(durations[paths[4]], extract_duration(paths[4]))
+
+
+class AudiobookDurationUpdateTests(TestCase):
+    """Test cases for storing audiobook track durations"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.scan_folder = create_test_scan_folder(self.temp_dir, content_type="audiobooks")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_durations_saved_in_one_bulk_update(self):
+        book = create_test_book_with_file(os.path.join(self.temp_dir, "01.mp3"), file_format="mp3", content_type="audiobook", scan_folder=self.scan_folder)
+        for number in (2, 3):
+            BookFile.objects.create(book=book, file_path=os.path.join(self.temp_dir, f"0{number}.mp3"), file_format="mp3")
+        book_files = list(book.files.order_by("file_path"))
+        durations = {book_file.file_path: 60 * number for number, book_file in enumerate(book_files, 1)}
+
+        with patch("books.scanner.content_processing.extract_durations", return_value=durations):
+            with patch.object(BookFile, "save") as mock_save:
+                _update_audiobook_durations(book_files, rescan=False)
+
+        mock_save.assert_not_called()
+        self.assertEqual(sorted(book.files.values_list("duration_seconds", flat=True)), [60, 120, 180])
+
+    @patch("books.scanner.content_processing._query_audiobook_external_metadata")
+    def test_totals_computed_from_tracks(self, mock_query):
+        DataSource.objects.get_or_create(name=DataSource.INITIAL_SCAN)
+        paths = []
+        for number in (1, 2):
+            path = os.path.join(self.temp_dir, f"Dune - Part {number}.mp3")
+            with open(path, "wb") as f:
+                f.write(_mp3_frames(1000))
+            paths.append(path)
+
+        _process_audiobook_files(paths, self.scan_folder, [], [], rescan=False)
+
+        track_duration = extract_duration(paths[0])
+        total = BookMetadata.objects.get(field_name="total_duration_seconds")
+        self.assertEqual(int(total.field_value), 2 * track_duration)
+        self.assertEqual(set(BookFile.objects.values_list("duration_seconds", flat=True)), {track_duration})
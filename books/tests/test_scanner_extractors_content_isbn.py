@@ -5,6 +5,7 @@ Test cases for Content ISBN Scanner Extractor
 import os
 import shutil
 import tempfile
+import zipfile
 from unittest.mock import MagicMock, patch
 
 from django.test import TestCase
@@ -17,6 +18,7 @@ from books.scanner.extractors.content_isbn import (
     bulk_scan_content_isbns,
     extract_isbn_from_content,
     save_content_isbns,
+    scan_content_isbn,
 )
 from books.tests.test_helpers import create_test_book_with_file
 
@@ -230,28 +232,24 @@ class ContentISBNExtractorTests(TestCase):
         metadata = BookMetadata.objects.filter(book=self.epub_book, field_name="isbn", source=self.content_source)
         self.assertEqual(metadata.count(), 2)
 
-    @patch("books.scanner.extractors.content_isbn.save_content_isbns")
-    def test_bulk_scan_content_isbns(self, mock_save):
+    @patch("books.scanner.extractors.content_isbn.scan_content_isbn")
+    def test_bulk_scan_content_isbns(self, mock_scan):
         """Test bulk scanning of content ISBNs"""
         # Create multiple books
         book2 = create_test_book_with_file(file_path="/test/scan/folder/test2.epub", file_format="epub", file_size=1024000, scan_folder=self.scan_folder)
 
-        # Mock save_content_isbns to simulate finding ISBNs
-        def mock_save_side_effect(book):
-            if book == self.epub_book:
-                # Simulate finding ISBNs for first book
-                BookMetadata.objects.create(book=book, field_name="isbn", field_value="9780134685991", source=self.content_source, confidence=0.85)
-
-        mock_save.side_effect = mock_save_side_effect
+        # Simulate finding ISBNs for the first book only
+        mock_scan.side_effect = lambda file_path, page_limit, time_budget: ["9780134685991"] if file_path == self.epub_book.file_path else []
 
         queryset = Book.objects.filter(id__in=[self.epub_book.id, book2.id])
         stats = bulk_scan_content_isbns(queryset)
 
         self.assertEqual(stats["total_books"], 2)
-        self.assertEqual(mock_save.call_count, 2)
+        self.assertEqual(stats["books_with_isbns"], 1)
+        self.assertEqual(mock_scan.call_count, 2)
 
-    @patch("books.scanner.extractors.content_isbn.save_content_isbns")
-    def test_bulk_scan_content_isbns_skip_existing(self, mock_save):
+    @patch("books.scanner.extractors.content_isbn.scan_content_isbn")
+    def test_bulk_scan_content_isbns_skip_existing(self, mock_scan):
         """Test bulk scanning skips books with existing content ISBNs"""
         # Create existing content ISBN
         BookMetadata.objects.create(book=self.epub_book, field_name="isbn", field_value="9780134685991", source=self.content_source, confidence=0.85)
@@ -260,8 +258,18 @@ class ContentISBNExtractorTests(TestCase):
         stats = bulk_scan_content_isbns(queryset)
 
         self.assertEqual(stats["total_books"], 1)
-        # Should not call save_content_isbns for book with existing ISBNs
-        mock_save.assert_not_called()
+        # Should not scan the book with existing ISBNs
+        mock_scan.assert_not_called()
+
+    @patch("books.scanner.extractors.content_isbn.scan_content_isbn")
+    def test_bulk_scan_sequential_honours_limits(self, mock_scan):
+        """Test the single-process path passes page_limit and time_budget through"""
+        mock_scan.return_value = ["9780134685991"]
+
+        stats = bulk_scan_content_isbns(Book.objects.filter(id=self.epub_book.id), page_limit=3, workers=1, time_budget=2.5)
+
+        mock_scan.assert_called_once_with(self.epub_book.file_path, 3, 2.5)
+        self.assertEqual(stats["total_isbns_found"], 1)
 
     @patch("ebooklib.epub.read_epub")
     def test_extract_isbn_from_content_epub_error_handling(self, mock_read_epub):
@@ -311,3 +319,99 @@ class ContentISBNExtractorTests(TestCase):
         # Should handle page errors gracefully
         isbns = extract_isbn_from_content(self.pdf_book)
         self.assertEqual(isbns, [])
+
+
+def _write_epub(path, documents):
+    """Write a minimal EPUB whose spine holds ``documents`` (name -> HTML body) in order."""
+    manifest = "".join(f'<item id="item{i}" href="text/{name}" media-type="application/xhtml+xml"/>' for i, name in enumerate(documents))
+    spine = "".join(f'<itemref idref="item{i}"/>' for i in range(len(documents)))
+    with zipfile.ZipFile(path, "w") as epub_zip:
+        epub_zip.writestr("mimetype", "application/epub+zip")
+        epub_zip.writestr(
+            "META-INF/container.xml",
+            '<?xml version="1.0"?><container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">'
+            '<rootfiles><rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/></rootfiles></container>',
+        )
+        epub_zip.writestr(
+            "OEBPS/content.opf",
+            f'<?xml version="1.0"?><package xmlns="http://www.idpf.org/2007/opf" version="3.0"><manifest>{manifest}</manifest><spine>{spine}</spine></package>',
+        )
+        for name, body in documents.items():
+            epub_zip.writestr(f"OEBPS/text/{name}", f"<html><body>{body}</body></html>")
+
+
+class BoundedContentISBNScanTests(TestCase):
+    """Test cases for page selection, early exit and the parallel bulk mode"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.scan_folder = ScanFolder.objects.create(path=self.temp_dir, name="Bounded Scan Folder")
+        DataSource.objects.get_or_create(name=DataSource.CONTENT_SCAN, defaults={"trust_level": 0.85})
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_epub_copyright_item_found_beyond_page_limit(self):
+        """Test spine items named like a copyright page are read even outside the first/last pages"""
+        documents = {f"chapter{i:02d}.xhtml": "<p>Chapter text</p>" for i in range(30)}
+        documents["copyright.xhtml"] = "<p>ISBN 978-0-13-468599-1</p>"
+        documents.update({f"appendix{i}.xhtml": "<p>Appendix</p>" for i in range(5)})
+        path = os.path.join(self.temp_dir, "book.epub")
+        _write_epub(path, documents)
+
+        with patch("ebooklib.epub.read_epub") as mock_read_epub:
+            self.assertEqual(scan_content_isbn(path, page_limit=2), ["9780134685991"])
+            mock_read_epub.assert_not_called()
+
+    @patch("PyPDF2.PdfReader")
+    def test_pdf_stops_at_first_page_with_valid_isbn(self, mock_pdf_reader):
+        """Test scanning stops at the first page with a valid ISBN and skips the middle of the book"""
+        pages = [MagicMock() for _ in range(200)]
+        for page in pages:
+            page.extract_text.return_value = "Chapter text"
+        pages[3].extract_text.return_value = "Copyright page ISBN: 9780134685991"
+        mock_pdf_reader.return_value.pages = pages
+
+        self.assertEqual(scan_content_isbn(os.path.join(self.temp_dir, "book.pdf"), page_limit=10), ["9780134685991"])
+        self.assertEqual([index for index, page in enumerate(pages) if page.extract_text.called], [0, 1, 2, 3])
+
+    @patch("PyPDF2.PdfReader")
+    def test_pdf_back_pages_scanned_from_the_end(self, mock_pdf_reader):
+        """Test back matter is scanned last page first"""
+        pages = [MagicMock() for _ in range(50)]
+        for page in pages:
+            page.extract_text.return_value = ""
+        pages[48].extract_text.return_value = "ISBN 0-13-468599-7"
+        mock_pdf_reader.return_value.pages = pages
+
+        self.assertEqual(scan_content_isbn(os.path.join(self.temp_dir, "book.pdf"), page_limit=5), ["9780134685991"])
+        self.assertFalse(pages[45].extract_text.called)
+
+    @patch("books.scanner.extractors.content_isbn.time.monotonic")
+    @patch("PyPDF2.PdfReader")
+    def test_time_budget_stops_scan(self, mock_pdf_reader, mock_monotonic):
+        """Test pages after the time budget is used up are skipped"""
+        mock_monotonic.side_effect = [0, 1, 2, 100, 101, 102]
+        pages = [MagicMock() for _ in range(10)]
+        for page in pages:
+            page.extract_text.return_value = ""
+        mock_pdf_reader.return_value.pages = pages
+
+        self.assertEqual(scan_content_isbn(os.path.join(self.temp_dir, "book.pdf"), page_limit=5, time_budget=10), [])
+        self.assertEqual(sum(page.extract_text.called for page in pages), 2)
+
+    def test_bulk_scan_in_process_pool(self):
+        """Test bulk scanning with worker processes saves the ISBNs found"""
+        books = []
+        for index, isbn in enumerate(["9780134685991", "9780321356680", None]):
+            path = os.path.join(self.temp_dir, f"book{index}.epub")
+            _write_epub(path, {"title.xhtml": "<p>Title</p>", "imprint.xhtml": f"<p>ISBN {isbn}</p>" if isbn else "<p>No number</p>"})
+            books.append(create_test_book_with_file(file_path=path, file_format="epub", scan_folder=self.scan_folder))
+
+        stats = bulk_scan_content_isbns(Book.objects.filter(id__in=[book.id for book in books]), workers=2)
+
+        self.assertEqual(stats, {"total_books": 3, "books_with_isbns": 2, "total_isbns_found": 2, "errors": 0})
+        self.assertEqual(
+            set(BookMetadata.objects.filter(field_name="isbn", source__name=DataSource.CONTENT_SCAN).values_list("book_id", "field_value")),
+            {(books[0].id, "9780134685991"), (books[1].id, "9780321356680")},
+        )
@@ -0,0 +1,175 @@
+"""
+Test cases for buffered scan logging and scan log retention
+"""
+
+import logging
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from books.models import ScanLog
+from books.scanner.logging_helpers import ScanLogBuffer, ScanLogHandler, prune_scan_logs
+from books.tests.test_helpers import create_test_scan_folder
+
+
+class ScanLogBufferTests(TestCase):
+    """Test cases for batching ScanLog writes"""
+
+    def setUp(self):
+        self.scan_folder = create_test_scan_folder()
+
+    def test_writes_in_batches(self):
+        buffer = ScanLogBuffer(batch_size=3, flush_interval=3600)
+
+        with self.assertNumQueries(0):
+            buffer.add(logging.ERROR, "first", "/books/a.epub", self.scan_folder)
+            buffer.add(logging.WARNING, "second")
+        with CaptureQueriesContext(connection) as queries:
+            buffer.add(logging.ERROR, "third")
+
+        self.assertEqual(len([query for query in queries if query["sql"].startswith("INSERT")]), 1)
+        self.assertEqual(len(buffer), 0)
+        log = ScanLog.objects.get(message="first")
+        self.assertEqual((log.level, log.file_path, log.scan_folder), ("ERROR", "/books/a.epub", self.scan_folder))
+        self.assertEqual(ScanLog.objects.get(message="second").level, "WARNING")
+
+    def test_flushes_after_interval(self):
+        buffer = ScanLogBuffer(batch_size=100, flush_interval=5)
+        buffer.add(logging.ERROR, "first")
+
+        with patch("books.scanner.logging_helpers.time.monotonic", return_value=buffer._last_flush + 6):
+            buffer.add(logging.ERROR, "second")
+
+        self.assertEqual(ScanLog.objects.count(), 2)
+
+    def test_background_flusher_writes_on_its_own_thread(self):
+        buffer = ScanLogBuffer(batch_size=100, flush_interval=0.05, background=True)
+        flushed = threading.Event()
+        flush_threads = []
+
+        def flush():
+            flush_threads.append(threading.current_thread().name)
+            flushed.set()
+            return 0
+
+        with patch.object(buffer, "flush", side_effect=flush), patch("books.scanner.logging_helpers.close_old_connections") as mock_close:
+            with self.assertNumQueries(0):
+                buffer.add(logging.WARNING, "lone warning")
+            self.assertTrue(flushed.wait(5))
+            buffer._stopped = True
+            buffer._flusher.join(5)
+
+        self.assertEqual(flush_threads[0], "scan-log-flusher")
+        mock_close.assert_called()
+        self.assertEqual(len(buffer), 1)
+        self.assertEqual(buffer.close(), 1)
+        self.assertEqual(ScanLog.objects.get().message, "lone warning")
+
+    def test_logging_does_not_wait_for_a_flush(self):
+        buffer = ScanLogBuffer(batch_size=100, flush_interval=3600)
+        buffer.add(logging.ERROR, "first")
+        added_during_write = []
+        bulk_create = ScanLog.objects.bulk_create
+
+        def slow_bulk_create(rows, **kwargs):
+            # Another thread logs while the batch is being written
+            thread = threading.Thread(target=lambda: added_during_write.append(buffer.add(logging.ERROR, "during write")))
+            thread.start()
+            thread.join(5)
+            return bulk_create(rows, **kwargs)
+
+        with patch.object(ScanLog.objects, "bulk_create", side_effect=slow_bulk_create):
+            self.assertEqual(buffer.flush(), 1)
+
+        self.assertEqual(added_during_write, [True])
+        self.assertEqual(len(buffer), 1)
+
+    def test_failed_batch_falls_back_to_single_rows(self):
+        buffer = ScanLogBuffer(batch_size=100, flush_interval=3600)
+        for message in ("first", "stale folder", "third"):
+            buffer.add(logging.ERROR, message, scan_folder=self.scan_folder)
+        create = ScanLog.objects.create
+
+        def create_row(**entry):
+            if entry["message"] == "stale folder":
+                raise IntegrityError("FOREIGN KEY constraint failed")
+            return create(**entry)
+
+        with patch.object(ScanLog.objects, "bulk_create", side_effect=IntegrityError("FOREIGN KEY constraint failed")):
+            with patch.object(ScanLog.objects, "create", side_effect=create_row):
+                self.assertEqual(buffer.flush(), 2)
+
+        self.assertEqual(sorted(ScanLog.objects.values_list("message", flat=True)), ["first", "third"])
+
+    def test_minimum_level(self):
+        buffer = ScanLogBuffer(batch_size=1, min_level=logging.WARNING)
+
+        self.assertFalse(buffer.add(logging.INFO, "progress"))
+        self.assertTrue(buffer.add(logging.WARNING, "unreadable cover"))
+
+        self.assertEqual(list(ScanLog.objects.values_list("message", flat=True)), ["unreadable cover"])
+
+    def test_handler_uses_extra_values(self):
+        buffer = ScanLogBuffer(batch_size=100, min_level=logging.INFO)
+        handler = ScanLogHandler()
+        test_logger = logging.getLogger("books.tests.scan_log")
+        test_logger.addHandler(handler)
+        test_logger.setLevel(logging.INFO)
+
+        try:
+            with patch("books.scanner.logging_helpers._buffer", buffer):
+                test_logger.info("Scanned %s", "a.epub", extra={"file_path": "/books/a.epub", "scan_folder": self.scan_folder})
+                handler.flush()
+        finally:
+            test_logger.removeHandler(handler)
+
+        log = ScanLog.objects.get()
+        self.assertEqual((log.level, log.message, log.file_path, log.scan_folder), ("INFO", "Scanned a.epub", "/books/a.epub", self.scan_folder))
+
+
+class PruneScanLogsTests(TestCase):
+    """Test cases for scan log retention"""
+
+    def setUp(self):
+        self.scan_folder = create_test_scan_folder()
+
+    def _create_logs(self, count, scan_folder=None, age_days=0):
+        logs = ScanLog.objects.bulk_create([ScanLog(level="INFO", message=f"entry {i}", scan_folder=scan_folder) for i in range(count)])
+        if age_days:
+            ScanLog.objects.filter(pk__in=[log.pk for log in logs]).update(timestamp=timezone.now() - timedelta(days=age_days))
+        return logs
+
+    def test_prunes_by_age_in_chunks(self):
+        self._create_logs(5, self.scan_folder, age_days=40)
+        recent = self._create_logs(2, self.scan_folder)
+
+        result = prune_scan_logs(older_than_days=30, chunk_size=2)
+
+        self.assertEqual(result["by_age"], 5)
+        self.assertEqual(set(ScanLog.objects.values_list("pk", flat=True)), {log.pk for log in recent})
+
+    def test_keeps_newest_per_folder(self):
+        folder_logs = self._create_logs(5, self.scan_folder)
+        other_logs = self._create_logs(2)
+
+        result = prune_scan_logs(keep_per_folder=3)
+
+        self.assertEqual(result["by_count"], 2)
+        remaining = set(ScanLog.objects.values_list("pk", flat=True))
+        self.assertEqual(remaining, {log.pk for log in folder_logs[2:] + other_logs})
+
+    def test_command_dry_run(self):
+        self._create_logs(3, self.scan_folder, age_days=40)
+        out = StringIO()
+
+        call_command("prune_scan_logs", "--days", "30", "--dry-run", stdout=out)
+
+        self.assertIn("Would delete 3 entries", out.getvalue())
+        self.assertEqual(ScanLog.objects.count(), 3)
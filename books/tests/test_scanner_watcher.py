@@ -0,0 +1,259 @@
+"""
+Test cases for the filesystem watcher
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from books.models import Book, BookFile
+from books.scanner.watcher import CREATED, DELETED, MODIFIED, ChangeSet, InotifyBackend, LibraryWatcher, PollingBackend, apply_changes
+from books.tests.test_helpers import create_test_book_with_file, create_test_scan_folder
+
+
+def _touch(path, data=b"data"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+class ChangeSetTests(unittest.TestCase):
+    """Test cases for coalescing events within a debounce window"""
+
+    def test_created_then_deleted_is_dropped(self):
+        changes = ChangeSet()
+        changes.created("/lib/a.epub")
+        changes.modified("/lib/a.epub")
+        changes.deleted("/lib/a.epub")
+
+        self.assertFalse(changes)
+
+    def test_replaced_file_is_modified(self):
+        changes = ChangeSet()
+        changes.deleted("/lib/a.epub")
+        changes.created("/lib/a.epub")
+
+        self.assertEqual(changes.changes, {"/lib/a.epub": MODIFIED})
+
+    def test_chained_moves_collapse(self):
+        changes = ChangeSet()
+        changes.moved("/lib/a.epub", "/lib/b.epub")
+        changes.moved("/lib/b.epub", "/lib/c.epub")
+
+        self.assertEqual(changes.moves, {"/lib/c.epub": "/lib/a.epub"})
+        self.assertEqual(changes.changes, {})
+
+    def test_new_file_renamed_is_created_under_final_name(self):
+        changes = ChangeSet()
+        changes.created("/lib/a.epub.part")
+        changes.moved("/lib/a.epub.part", "/lib/a.epub")
+
+        self.assertEqual(changes.changes, {"/lib/a.epub": CREATED})
+        self.assertEqual(changes.moves, {})
+
+    def test_moved_then_deleted_deletes_original(self):
+        changes = ChangeSet()
+        changes.moved("/lib/a.epub", "/lib/b.epub")
+        changes.deleted("/lib/b.epub")
+
+        self.assertEqual(changes.changes, {"/lib/a.epub": DELETED})
+        self.assertEqual(changes.moves, {})
+
+
+class WatcherBackendTests(unittest.TestCase):
+    """Test cases for detecting changes on disk"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        _touch(os.path.join(self.temp_dir, "old.epub"))
+        _touch(os.path.join(self.temp_dir, "gone.epub"))
+        _touch(os.path.join(self.temp_dir, "series", "one.epub"))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _make_changes(self):
+        os.rename(os.path.join(self.temp_dir, "old.epub"), os.path.join(self.temp_dir, "new.epub"))
+        os.remove(os.path.join(self.temp_dir, "gone.epub"))
+        _touch(os.path.join(self.temp_dir, "added.epub"))
+        os.rename(os.path.join(self.temp_dir, "series"), os.path.join(self.temp_dir, "renamed"))
+
+    def _assert_changes(self, changes):
+        join = os.path.join
+        self.assertEqual(changes.moves, {join(self.temp_dir, "new.epub"): join(self.temp_dir, "old.epub")})
+        self.assertEqual(changes.changes, {join(self.temp_dir, "gone.epub"): DELETED, join(self.temp_dir, "added.epub"): CREATED})
+        self.assertEqual(changes.dir_moves, [(join(self.temp_dir, "series"), join(self.temp_dir, "renamed"))])
+
+    def test_polling_detects_changes(self):
+        backend = PollingBackend(interval=0)
+        self.assertEqual(len(backend.add_tree(self.temp_dir)), 3)
+        # Forget the recorded mtime so coarse filesystem timestamps can't hide the change
+        backend._dirs[self.temp_dir] = (0, backend._dirs[self.temp_dir][1])
+
+        self._make_changes()
+        changes = ChangeSet()
+        backend.poll(changes, timeout=0)
+
+        self._assert_changes(changes)
+
+    def test_polling_skips_unchanged_directories(self):
+        backend = PollingBackend(interval=0)
+        backend.add_tree(self.temp_dir)
+
+        with patch("os.scandir") as mock_scandir:
+            backend.poll(ChangeSet(), timeout=0)
+
+        mock_scandir.assert_not_called()
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify is Linux-only")
+    def test_inotify_detects_changes(self):
+        try:
+            backend = InotifyBackend()
+        except OSError:
+            self.skipTest("inotify is not available")
+        try:
+            backend.add_tree(self.temp_dir)
+            self._make_changes()
+            changes = ChangeSet()
+            backend.poll(changes, timeout=1)
+
+            self._assert_changes(changes)
+        finally:
+            backend.close()
+
+
+class ApplyChangesTests(TestCase):
+    """Test cases for applying changes to the library"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.scan_folder = create_test_scan_folder(self.temp_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_moved_file_keeps_its_book(self):
+        old_path = os.path.join(self.temp_dir, "old.epub")
+        new_path = os.path.join(self.temp_dir, "new.epub")
+        book = create_test_book_with_file(old_path, scan_folder=self.scan_folder)
+        _touch(new_path)
+        changes = ChangeSet()
+        changes.moved(old_path, new_path)
+
+        with patch("books.scanner.folder._process_book") as mock_process:
+            stats = apply_changes(changes)
+
+        mock_process.assert_not_called()
+        self.assertEqual(stats["moved"], 1)
+        book_file = BookFile.objects.get(book=book)
+        self.assertEqual(book_file.file_path, new_path)
+        self.assertEqual(book_file.file_path_hash, book_file.generate_hash(new_path))
+
+    def test_moved_directory_rewrites_paths(self):
+        source = os.path.join(self.temp_dir, "series")
+        destination = os.path.join(self.temp_dir, "renamed")
+        books = [create_test_book_with_file(os.path.join(source, f"{number}.epub"), scan_folder=self.scan_folder) for number in (1, 2)]
+        BookFile.objects.filter(book=books[0]).update(cover_path=os.path.join(source, "cover.jpg"))
+        changes = ChangeSet()
+        changes.dir_moved(source, destination)
+
+        apply_changes(changes)
+
+        book_file = BookFile.objects.get(book=books[0])
+        self.assertEqual(book_file.file_path, os.path.join(destination, "1.epub"))
+        self.assertEqual(book_file.cover_path, os.path.join(destination, "cover.jpg"))
+        self.assertEqual(BookFile.objects.get(book=books[1]).file_path, os.path.join(destination, "2.epub"))
+
+    def test_deleted_file_soft_deletes_book(self):
+        path = os.path.join(self.temp_dir, "gone.epub")
+        book = create_test_book_with_file(path, scan_folder=self.scan_folder)
+        changes = ChangeSet()
+        changes.deleted(path)
+
+        apply_changes(changes)
+
+        self.assertIsNotNone(Book.objects.get(pk=book.pk).deleted_at)
+
+    def test_deleted_directory_keeps_books_with_live_files(self):
+        series = os.path.join(self.temp_dir, "series")
+        gone = [create_test_book_with_file(os.path.join(series, f"{number}.epub"), scan_folder=self.scan_folder) for number in (1, 2, 3)]
+        kept_path = os.path.join(self.temp_dir, "kept.mp3")
+        _touch(kept_path)
+        audiobook = create_test_book_with_file(os.path.join(series, "part1.mp3"), scan_folder=self.scan_folder)
+        BookFile.objects.create(book=audiobook, file_path=kept_path, file_format="mp3")
+        changes = ChangeSet()
+        changes.dir_deleted(series)
+
+        stats = apply_changes(changes)
+
+        self.assertEqual(stats["deleted"], 4)
+        self.assertEqual(Book.objects.filter(pk__in=[book.pk for book in gone], deleted_at__isnull=False).count(), 3)
+        self.assertIsNone(Book.objects.get(pk=audiobook.pk).deleted_at)
+        self.assertEqual(list(BookFile.objects.filter(book=audiobook).values_list("file_path", flat=True)), [kept_path])
+
+    def test_created_files_are_processed(self):
+        path = os.path.join(self.temp_dir, "added.epub")
+        cover = os.path.join(self.temp_dir, "cover.jpg")
+        _touch(path)
+        _touch(cover)
+        _touch(os.path.join(self.temp_dir, "notes.txt"))
+        changes = ChangeSet()
+        changes.created(path)
+        changes.created(os.path.join(self.temp_dir, "notes.txt"))
+
+        with patch("books.scanner.folder._process_book") as mock_process:
+            stats = apply_changes(changes)
+
+        mock_process.assert_called_once_with(path, self.scan_folder, [cover], [], rescan=False)
+        self.assertEqual(stats["processed"], 1)
+
+    def test_vanished_directory_is_skipped(self):
+        self.scan_folder.content_type = "comics"
+        self.scan_folder.save()
+        path = os.path.join(self.temp_dir, "issue1.cbz")
+        _touch(path)
+        changes = ChangeSet()
+        changes.created(path)
+
+        with patch("books.scanner.watcher.os.listdir", side_effect=FileNotFoundError(self.temp_dir)) as mock_listdir, patch("books.scanner.content_processing.process_files_by_type") as mock_process:
+            stats = apply_changes(changes)
+
+        mock_listdir.assert_called_with(self.temp_dir)
+        mock_process.assert_not_called()
+        self.assertEqual(stats["processed"], 0)
+
+
+class LibraryWatcherRunTests(unittest.TestCase):
+    """Test cases for the watch loop"""
+
+    def test_failed_batch_does_not_stop_watching(self):
+        stop_event = threading.Event()
+        watcher = LibraryWatcher(debounce=0, folder_refresh=3600)
+
+        class Backend:
+            def poll(self, changes, timeout):
+                changes.created(f"/library/book{len(applied)}.epub")
+
+            def close(self):
+                pass
+
+        applied = []
+
+        def start_backend():
+            watcher.backend = Backend()
+
+        def on_apply(stats):
+            applied.append(stats)
+            stop_event.set()
+
+        with patch.object(watcher, "_start_backend", start_backend), patch.object(watcher, "_apply", side_effect=[OSError("gone"), {"processed": 1}]) as mock_apply:
+            watcher.run(stop_event=stop_event, on_apply=on_apply)
+
+        self.assertEqual(mock_apply.call_count, 2)
+        self.assertEqual(applied, [{"processed": 1}])
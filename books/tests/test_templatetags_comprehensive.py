@@ -7,7 +7,7 @@ Focuses on achieving higher coverage for template tag functionality.
 import os
 import shutil
 import tempfile
-from unittest.mock import Mock, PropertyMock, mock_open, patch
+from unittest.mock import Mock, PropertyMock, patch
 
 import django
 from django.template import Context, Template
@@ -44,47 +44,27 @@ class BookExtrasTemplateTagsTests(BaseTestCaseWithTempDir):
             book=self.book, final_title="Test Title", final_author="Test Author", final_cover_path="/test/cover.jpg", is_reviewed=True  # Prevent auto-updating
         )
 
-    @patch("books.templatetags.book_extras.encode_cover_to_base64")
-    @patch("books.templatetags.book_extras.requests.get")
-    @patch("os.path.exists")
-    @patch("os.makedirs")
-    def test_download_and_cache_cover_success(self, mock_makedirs, mock_exists, mock_get, mock_encode):
-        """Test successful cover download and caching"""
-        # Setup mocks
-        mock_exists.return_value = False  # Cache doesn't exist
-        mock_response = Mock()
-        mock_response.content = b"fake_image_content"
-        mock_get.return_value = mock_response
-        mock_encode.return_value = "base64_encoded_image"
-
-        with patch("builtins.open", mock_open()) as mock_file:
-            result = book_extras.download_and_cache_cover("http://example.com/cover.jpg", 1)
-
-        self.assertEqual(result, "base64_encoded_image")
-        mock_get.assert_called_once_with("http://example.com/cover.jpg", timeout=10)
-        mock_file.assert_called()
-        mock_encode.assert_called()
-
-    @patch("books.templatetags.book_extras.encode_cover_to_base64")
-    @patch("os.path.exists")
-    def test_download_and_cache_cover_cached(self, mock_exists, mock_encode):
-        """Test cover download when already cached"""
-        mock_exists.return_value = True  # Cache exists
-        mock_encode.return_value = "cached_base64_image"
+    @patch("books.templatetags.book_extras.prefetch_covers")
+    @patch("books.templatetags.book_extras.CoverCache.get_remote_cover")
+    def test_get_cached_remote_cover_hit(self, mock_get_remote, mock_prefetch):
+        """Test cached remote cover resolves to its media URL"""
+        mock_get_remote.return_value = "cover_cache/remote_abc.jpg"
 
-        result = book_extras.download_and_cache_cover("http://example.com/cover.jpg", 1)
+        result = book_extras.get_cached_remote_cover("http://example.com/cover.jpg")
 
-        self.assertEqual(result, "cached_base64_image")
-        mock_encode.assert_called()
+        self.assertEqual(result, "/media/cover_cache/remote_abc.jpg")
+        mock_prefetch.assert_not_called()
 
-    @patch("books.templatetags.book_extras.requests.get")
-    def test_download_and_cache_cover_error(self, mock_get):
-        """Test cover download with error"""
-        mock_get.side_effect = Exception("Network error")
+    @patch("books.templatetags.book_extras.prefetch_covers")
+    @patch("books.templatetags.book_extras.CoverCache.get_remote_cover")
+    def test_get_cached_remote_cover_miss_queues_prefetch(self, mock_get_remote, mock_prefetch):
+        """Test uncached remote cover is queued instead of downloaded"""
+        mock_get_remote.return_value = None
 
-        result = book_extras.download_and_cache_cover("http://example.com/cover.jpg", 1)
+        result = book_extras.get_cached_remote_cover("http://example.com/cover.jpg")
 
         self.assertIsNone(result)
+        mock_prefetch.assert_called_once_with(["http://example.com/cover.jpg"])
 
     def test_get_fallback_context(self):
         """Test _get_fallback_context function"""
@@ -113,16 +93,16 @@ class BookExtrasTemplateTagsTests(BaseTestCaseWithTempDir):
         self.assertFalse(is_url)
         self.assertEqual(base64_image, "local_base64_image")
 
-    @patch("books.templatetags.book_extras.download_and_cache_cover")
-    def test_process_cover_for_display_url(self, mock_download):
+    @patch("books.templatetags.book_extras.get_cached_remote_cover")
+    def test_process_cover_for_display_url(self, mock_cached):
         """Test _process_cover_for_display with URL"""
-        mock_download.return_value = "url_base64_image"
+        mock_cached.return_value = "/media/cover_cache/remote_abc.jpg"
 
         cover_path, is_url, base64_image = book_extras._process_cover_for_display("http://example.com/cover.jpg", self.book, False)
 
-        self.assertEqual(cover_path, "http://example.com/cover.jpg")
-        self.assertFalse(is_url)  # Should be False because we have base64
-        self.assertEqual(base64_image, "url_base64_image")
+        self.assertEqual(cover_path, "/media/cover_cache/remote_abc.jpg")
+        self.assertFalse(is_url)  # Served from the local cover cache
+        self.assertIsNone(base64_image)
 
     def test_process_cover_for_display_empty_path(self):
         """Test _process_cover_for_display with empty path"""
@@ -4,13 +4,16 @@ Test cases for Image utilities
 
 import os
 import tempfile
+from io import BytesIO
 from unittest.mock import MagicMock, mock_open, patch
 
+from django.core.cache import cache
 from django.test import TestCase, override_settings
+from PIL import Image
 
 # Removed unused imports
 from books.tests.test_helpers import create_test_book_with_file, create_test_scan_folder
-from books.utils.image_utils import download_and_store_cover, encode_cover_to_base64
+from books.utils.image_utils import PROBE_RANGE_BYTES, download_and_store_cover, encode_cover_to_base64, probe_remote_image, read_image_header
 
 
 class ImageUtilsTests(TestCase):
@@ -185,3 +188,78 @@ class ImageUtilsTests(TestCase):
         # Verify slugify was called with book filename from primary file
         expected_filename = self.book.primary_file.filename if self.book.primary_file else f"book_{self.book.id}"
         mock_slugify.assert_called_once_with(expected_filename)
+
+
+def _image_bytes(image_format, size=(640, 960), **save_kwargs):
+    buffer = BytesIO()
+    Image.new("RGB", size, "white").save(buffer, format=image_format, **save_kwargs)
+    return buffer.getvalue()
+
+
+def _streamed_response(data, status_code=200, headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.iter_content.side_effect = lambda chunk_size: (data[i : i + chunk_size] for i in range(0, len(data), chunk_size))
+    response.__enter__.return_value = response
+    return response
+
+
+class RemoteImageProbeTests(TestCase):
+    """Test cases for header-only remote image probing"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_read_image_header_formats(self):
+        """Test dimensions are read from the first bytes of each supported format"""
+        for image_format, expected in [("JPEG", "jpeg"), ("PNG", "png"), ("GIF", "gif"), ("WEBP", "webp")]:
+            with self.subTest(image_format=image_format):
+                self.assertEqual(read_image_header(_image_bytes(image_format)[:1024]), (640, 960, expected))
+
+    def test_read_image_header_lossless_webp(self):
+        """Test lossless WebP headers"""
+        self.assertEqual(read_image_header(_image_bytes("WEBP", lossless=True)), (640, 960, "webp"))
+
+    def test_read_image_header_truncated_or_unknown(self):
+        """Test headers cut short or in unknown formats are not guessed"""
+        self.assertIsNone(read_image_header(_image_bytes("PNG")[:20]))
+        self.assertIsNone(read_image_header(b"not an image"))
+
+    @patch("books.utils.image_utils.requests.get")
+    def test_probe_uses_range_request(self, mock_get):
+        """Test only the requested range is read and the size comes from Content-Range"""
+        data = _image_bytes("JPEG", size=(1200, 1800))
+        mock_get.return_value = _streamed_response(data[:PROBE_RANGE_BYTES], status_code=206, headers={"Content-Range": f"bytes 0-{PROBE_RANGE_BYTES - 1}/{len(data)}"})
+
+        self.assertEqual(probe_remote_image("http://example.com/cover.jpg"), (1200, 1800, len(data), "jpeg"))
+        self.assertEqual(mock_get.call_args[1]["headers"], {"Range": f"bytes=0-{PROBE_RANGE_BYTES - 1}"})
+
+    @patch("books.utils.image_utils.requests.get")
+    def test_probe_stops_early_when_range_ignored(self, mock_get):
+        """Test a server ignoring the range is only read until the header parses"""
+        data = _image_bytes("PNG") + b"\0" * 200000
+        response = _streamed_response(data, headers={"Content-Length": str(len(data))})
+        mock_get.return_value = response
+
+        self.assertEqual(probe_remote_image("http://example.com/cover.png"), (640, 960, len(data), "png"))
+        # The generator was abandoned after the first chunk
+        self.assertEqual(response.iter_content.call_count, 1)
+
+    @patch("books.utils.image_utils.requests.get")
+    def test_probe_results_cached_by_url(self, mock_get):
+        """Test repeated probes of the same URL don't hit the network"""
+        mock_get.return_value = _streamed_response(_image_bytes("GIF"))
+
+        first = probe_remote_image("http://example.com/cover.gif")
+        second = probe_remote_image("http://example.com/cover.gif")
+
+        self.assertEqual(first, second)
+        mock_get.assert_called_once()
+
+    @patch("books.utils.image_utils.requests.get")
+    def test_probe_failure(self, mock_get):
+        """Test network errors give an empty result"""
+        mock_get.side_effect = Exception("Network error")
+
+        self.assertEqual(probe_remote_image("http://example.com/missing.jpg"), (None, None, None, None))
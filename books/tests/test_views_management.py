@@ -3,9 +3,13 @@ Comprehensive test suite for management views in views.py.
 Tests CRUD operations for Authors, Genres, and Series management.
 """
 
+from unittest.mock import patch
+
 from django.contrib.auth.models import User
 from django.contrib.messages import get_messages
+from django.db import connection
 from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from books.models import (
@@ -19,6 +23,7 @@ from books.models import (
     Series,
 )
 from books.tests.test_helpers import create_test_book_with_file, create_test_scan_folder
+from books.utils.aggregates import bulk_delete_in_batches, bulk_update_in_batches, count_rows
 
 
 class AuthorManagementViewTests(TestCase):
@@ -164,6 +169,43 @@ class AuthorManagementViewTests(TestCase):
         self.assertIn(self.reviewed_author.id, author_sources)
         self.assertIn("Manual Entry", author_sources[self.reviewed_author.id])
 
+    def test_author_list_rows_carry_counts_and_sources(self):
+        """Book counts and source names come from the page query"""
+        BookAuthor.objects.create(book=self.book1, author=self.reviewed_author, confidence=0.5, is_active=True, source=self.epub_source)
+
+        response = self.client.get(reverse("books:author_list"))
+        authors = {author.id: author for author in response.context["authors"]}
+
+        self.assertEqual(authors[self.reviewed_author.id].book_count, 1)
+        self.assertEqual(authors[self.unreviewed_author2.id].book_count, 0)
+        self.assertEqual(response.context["author_sources"][self.reviewed_author.id], ["EPUB", "Manual Entry"])
+        self.assertEqual(response.context["author_sources"][self.unreviewed_author2.id], [])
+
+    def test_author_list_query_count_is_fixed(self):
+        """Adding authors with books does not add queries to the page"""
+        self.client.get(reverse("books:author_list"))  # Warm the cached user state
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(reverse("books:author_list"))
+
+        for i in range(10):
+            author = Author.objects.create(name=f"Extra Author {i}", first_name="Extra", last_name=f"Author{i}")
+            BookAuthor.objects.create(book=self.book1, author=author, confidence=0.5, is_active=True, source=self.epub_source)
+
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(reverse("books:author_list"))
+
+        self.assertEqual(len(many), len(few))
+        self.assertEqual(len(response.context["authors"]), 13)
+        # The page count does not join the relationship tables
+        self.assertNotIn("bookauthor", next(q["sql"] for q in many.captured_queries if "COUNT(*)" in q["sql"]))
+
+    def test_author_sources_fallback_without_string_aggregation(self):
+        """Backends without GROUP_CONCAT get the sources from one extra query"""
+        with patch("books.utils.aggregates.supports_group_concat", return_value=False):
+            response = self.client.get(reverse("books:author_list"))
+
+        self.assertEqual(response.context["author_sources"][self.unreviewed_author1.id], ["EPUB"])
+
     def test_author_bulk_delete_view_requires_login(self):
         """Test that author bulk delete requires authentication"""
         self.client.logout()
@@ -499,6 +541,15 @@ class GenreManagementViewTests(TestCase):
         messages = list(get_messages(response.wsgi_request))
         self.assertTrue(any("Successfully marked 2 genre(s) as reviewed" in str(msg) for msg in messages))
 
+    def test_genre_list_rows_carry_counts_and_sources(self):
+        """Genre rows show their book count and sources"""
+        response = self.client.get(reverse("books:genre_list"))
+        genres = {genre.id: genre for genre in response.context["genres"]}
+
+        self.assertEqual(genres[self.reviewed_genre.id].book_count, 1)
+        self.assertEqual(genres[self.unreviewed_genre1.id].book_count, 0)
+        self.assertEqual(response.context["genre_sources"][self.reviewed_genre.id], ["Manual Entry"])
+
 
 class SeriesManagementViewTests(TestCase):
     """Test suite for Series management views"""
@@ -587,6 +638,21 @@ class SeriesManagementViewTests(TestCase):
             self.assertEqual(test_series1.book_count, 2)
             self.assertEqual(test_series3.book_count, 0)
 
+    def test_series_list_aggregates_per_relation(self):
+        """Test that author counts and genre names are not multiplied by each other or split on commas"""
+        genres = [Genre.objects.create(name=name) for name in ["Science Fiction, Space Opera", "Adventure", "Humor"]]
+        for book in (self.book1, self.book2):
+            for genre in genres:
+                BookGenre.objects.create(book=book, genre=genre, source=self.manual_source, confidence=0.9)
+        for name in ["First Author", "Second Author"]:
+            BookAuthor.objects.create(book=self.book1, author=Author.objects.create(name=name), source=self.manual_source, confidence=0.9)
+
+        response = self.client.get(reverse("books:series_list"))
+        series = next(s for s in response.context["series"] if s.pk == self.series1.pk)
+
+        self.assertEqual((series.book_count, series.author_count), (2, 2))
+        self.assertEqual(series.genres, ["Adventure", "Humor", "Science Fiction, Space Opera"])
+
     def test_series_with_books_view_functionality(self):
         """Test series filtering and search functionality"""
         # Test search functionality if implemented
@@ -611,6 +677,41 @@ class SeriesManagementViewTests(TestCase):
             pass
 
 
+class BulkManagementQueryTests(TestCase):
+    """Test suite for the batched bulk operations and combined counts"""
+
+    def setUp(self):
+        self.authors = [Author.objects.create(name=f"Author {i}", first_name="First", last_name=f"Last{i}") for i in range(7)]
+        Author.objects.filter(pk=self.authors[0].pk).update(is_reviewed=True)
+
+    def test_bulk_update_runs_in_batches(self):
+        ids = [author.pk for author in self.authors]
+
+        with CaptureQueriesContext(connection) as queries:
+            updated = bulk_update_in_batches(Author.objects.filter(is_reviewed=False), ids, batch_size=3, is_reviewed=True)
+
+        self.assertEqual(updated, 6)
+        self.assertEqual(len([q for q in queries.captured_queries if q["sql"].startswith("UPDATE")]), 3)
+        self.assertFalse(Author.objects.filter(is_reviewed=False).exists())
+
+    def test_bulk_delete_counts_only_selected_model(self):
+        ids = [str(author.pk) for author in self.authors[:4]]
+
+        deleted = bulk_delete_in_batches(Author.objects.filter(is_reviewed=False), ids, batch_size=2)
+
+        self.assertEqual(deleted, 3)
+        self.assertEqual(Author.objects.count(), 4)
+
+    def test_count_rows_uses_one_query(self):
+        Genre.objects.create(name="Horror")
+
+        with CaptureQueriesContext(connection) as queries:
+            counts = count_rows(authors=Author.objects.all(), genres=Genre.objects.all(), series=Series.objects.all())
+
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(counts, {"authors": 7, "genres": 1, "series": 0})
+
+
 class ManagementViewEdgeCaseTests(TestCase):
     """Test edge cases and error scenarios in management views"""
 
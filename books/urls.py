@@ -42,6 +42,7 @@ urlpatterns = [
     path("wizard/complete/", wizard_views.WizardCompleteView.as_view(), name="wizard_complete"),
     path("wizard/<str:step>/", wizard_views.wizard_dispatcher, name="wizard_step"),
     path("wizard/ajax/validate-folder/", wizard_views.wizard_validate_folder, name="wizard_validate_folder"),
+    path("wizard/ajax/folder-analysis/", wizard_views.wizard_folder_analysis, name="wizard_folder_analysis"),
     path("wizard/ajax/skip/", wizard_views.wizard_skip, name="wizard_skip"),
     # User settings and preferences
     path("settings/", views.UserSettingsView.as_view(), name="user_settings"),
@@ -51,6 +52,8 @@ urlpatterns = [
     path("settings/save-default-template/", views.save_default_template, name="save_default_template"),
     # Book management
     path("books/", views.BookListView.as_view(), name="book_list"),
+    path("export/library.csv", views.export_library_csv, name="export_library_csv"),
+    path("export/library/<str:export_format>/", views.export_library, name="export_library"),
     # Media Type Sections
     path("ebooks/", views.EbooksMainView.as_view(), name="ebooks_main"),
     path("ebooks/ajax/list/", views.ebooks_ajax_list, name="ebooks_ajax_list"),
@@ -115,6 +118,9 @@ urlpatterns = [
     path("scanning/folder-progress/<int:folder_id>/", views.scan_folder_progress_ajax, name="scan_folder_progress_ajax"),
     path("scanning/api-status/", views.api_status_ajax, name="api_status_ajax"),
     path("scanning/active-scans/", views.active_scans_ajax, name="active_scans_ajax"),
+    path("scanning/status/", views.scan_status_feed, name="scan_status_feed"),
+    path("scanning/events/", views.scan_event_stream, name="scan_event_stream"),
+    path("scanning/events/poll/", views.scan_events_poll, name="scan_events_poll"),
     path("scanning/cancel/<str:job_id>/", views.cancel_scan_ajax, name="cancel_scan_ajax"),
     path("scanning/history/", views.scan_history, name="scan_history"),
     path("scanning/queue/", scanning_views.scan_queue, name="scan_queue"),
@@ -138,6 +144,7 @@ urlpatterns = [
     path("ai-feedback/", views.AIFeedbackListView.as_view(), name="ai_feedback_list"),
     path("ai-feedback/<int:pk>/", views.AIFeedbackDetailView.as_view(), name="ai_feedback_detail"),
     # AJAX endpoints
+    path("ajax/quick-search/", views.quick_search, name="quick_search"),
     path("ajax/book/<int:book_id>/update_status/", views.ajax_update_book_status, name="ajax_update_book_status"),
     path("ajax/book/<int:book_id>/conflicts/", views.ajax_get_metadata_conflicts, name="ajax_get_metadata_conflicts"),
     path("ajax/book/<int:book_id>/remove_metadata/", views.ajax_get_metadata_remove, name="ajax_get_metadata_remove"),
@@ -270,6 +277,7 @@ urlpatterns = [
     # Missing AJAX endpoints needed by integration tests
     path("ajax/create-backup/", views.ajax_create_backup, name="ajax_create_backup"),
     path("ajax/detect-duplicates/", views.ajax_detect_duplicates, name="ajax_detect_duplicates"),
+    path("ajax/resolve-duplicates/", views.ajax_resolve_duplicates, name="ajax_resolve_duplicates"),
     path("ajax/migrate-library/", views.ajax_migrate_library, name="ajax_migrate_library"),
     path("ajax/comprehensive-statistics/", views.ajax_comprehensive_statistics, name="ajax_comprehensive_statistics"),
     path("ajax/metadata-quality-report/", views.ajax_metadata_quality_report, name="ajax_metadata_quality_report"),
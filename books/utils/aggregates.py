@@ -0,0 +1,180 @@
+"""
+Set-based helpers for the Author, Genre and Series management lists.
+
+Per-row book counts and source names are computed by the page query itself,
+each in its own correlated subquery (``related_count`` and
+``annotate_grouped_values``), so aggregates over different relations never
+join each other's rows. ``JSONGroupArray`` collects distinct related values
+as a JSON array per row (``JSON_GROUP_ARRAY`` on SQLite, ``JSON_AGG`` on
+PostgreSQL, quoted ``GROUP_CONCAT`` on MySQL), so values containing commas
+survive. Other backends skip the annotation and ``unpack_grouped_values``
+fills the values in with a single grouped query for the page instead, so the
+number of queries per page stays fixed either way. ``RowCountPaginator`` counts the list before
+the aggregates are added, so the page count does not join the related tables,
+and ``EstimatedCountPaginator`` reads the table statistics instead of counting
+unfiltered admin lists of large tables.
+"""
+
+import json
+from typing import Dict, Iterable, List, Optional
+
+from django.core.paginator import Paginator
+from django.db import connection, transaction
+from django.db.models import Aggregate, CharField, Count, OuterRef, Q, Subquery, Value
+from django.utils.functional import cached_property
+
+BULK_BATCH_SIZE = 500
+# Unfiltered tables estimated above this many rows are not counted exactly
+ESTIMATED_COUNT_THRESHOLD = 10000
+GROUP_CONCAT_VENDORS = {"sqlite", "mysql", "postgresql"}
+
+
+class JSONGroupArray(Aggregate):
+    """Values per group as a JSON array string."""
+
+    function = "JSON_GROUP_ARRAY"
+    template = "%(function)s(%(distinct)s%(expressions)s)"
+    allow_distinct = True
+    output_field = CharField()
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        # JSON_ARRAYAGG has no DISTINCT; quoted values joined by commas form the same array
+        return super().as_sql(compiler, connection, function="GROUP_CONCAT", template="CONCAT('[', %(function)s(%(distinct)sJSON_QUOTE(%(expressions)s)), ']')", **extra_context)
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return super().as_sql(compiler, connection, function="JSON_AGG", template="%(function)s(%(distinct)s%(expressions)s)::text", **extra_context)
+
+
+def supports_group_concat() -> bool:
+    return connection.vendor in GROUP_CONCAT_VENDORS
+
+
+def _annotation_name(attr: str) -> str:
+    return f"{attr}_concat"
+
+
+def _per_row(model, aggregate):
+    """``aggregate`` over one row of ``model`` and its relations, as a correlated subquery."""
+    return Subquery(model.objects.filter(pk=OuterRef("pk")).values("pk").annotate(value=aggregate).values("value"))
+
+
+def related_count(model, lookup: str, filter: Optional[Q] = None):
+    """Distinct ``lookup`` values per row of ``model``, counted in a subquery of their own."""
+    return _per_row(model, Count(lookup, filter=filter, distinct=True))
+
+
+def annotate_grouped_values(queryset, attr: str, lookup: str, filter: Optional[Q] = None):
+    """Annotate the distinct values of ``lookup`` per row when the backend can aggregate strings."""
+    if not supports_group_concat():
+        return queryset
+    return queryset.annotate(**{_annotation_name(attr): _per_row(queryset.model, JSONGroupArray(lookup, distinct=True, filter=filter))})
+
+
+def unpack_grouped_values(objects: Iterable, attr: str, lookup: str, filter: Optional[Q] = None) -> Dict[int, List[str]]:
+    """
+    Set ``attr`` on each object to the sorted list of its ``lookup`` values.
+
+    Reads the ``annotate_grouped_values`` annotation, or runs one query for all
+    ``objects`` on backends without string aggregation.
+
+    Returns:
+        Object id to value list, for templates that look values up by id
+    """
+    objects = list(objects)
+    if not objects:
+        return {}
+
+    values: Dict[int, set] = {obj.pk: set() for obj in objects}
+    if supports_group_concat():
+        for obj in objects:
+            array = getattr(obj, _annotation_name(attr), None) or "[]"
+            values[obj.pk].update(value for value in json.loads(array) if value)
+    else:
+        model = type(objects[0])
+        rows = model.objects.filter(pk__in=values).filter(filter or Q()).values_list("pk", lookup).distinct()
+        for pk, value in rows:
+            if value:
+                values[pk].add(value)
+
+    result = {pk: sorted(names) for pk, names in values.items()}
+    for obj in objects:
+        setattr(obj, attr, result[obj.pk])
+    return result
+
+
+class RowCountPaginator(Paginator):
+    """Paginator that counts ``count_queryset``, the list before per-row aggregates were added."""
+
+    def __init__(self, object_list, per_page, count_queryset=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_queryset = count_queryset
+
+    @cached_property
+    def count(self):
+        if self.count_queryset is None:
+            return super().count
+        return self.count_queryset.count()
+
+
+def estimated_row_count(model) -> Optional[int]:
+    """Row count of ``model``'s table from the database statistics, or None where there are none (SQLite)."""
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == "mysql":
+            cursor.execute("SELECT table_rows FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s", [table])
+        elif connection.vendor == "postgresql":
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+        else:
+            return None
+        row = cursor.fetchone()
+    if not row or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that uses the table statistics for unfiltered querysets of large tables."""
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, "query", None)
+        if query is not None and not query.where and not query.combinator:
+            estimate = estimated_row_count(self.object_list.model)
+            if estimate is not None and estimate >= ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
+
+
+def count_rows(**querysets) -> Dict[str, int]:
+    """Count several querysets with a single ``UNION ALL`` query."""
+    counts = [
+        queryset.order_by().annotate(label=Value(name, output_field=CharField())).values("label").annotate(total=Count("pk")).values_list("label", "total")
+        for name, queryset in querysets.items()
+    ]
+    result = dict.fromkeys(querysets, 0)
+    result.update(counts[0].union(*counts[1:], all=True))
+    return result
+
+
+def _batches(ids: List, batch_size: int):
+    for start in range(0, len(ids), batch_size):
+        yield ids[start : start + batch_size]
+
+
+def bulk_update_in_batches(queryset, ids: Iterable, batch_size: int = BULK_BATCH_SIZE, **values) -> int:
+    """Apply ``queryset.update(**values)`` to ``ids`` a batch at a time in one transaction; returns rows updated."""
+    updated = 0
+    with transaction.atomic():
+        for batch in _batches(list(ids), batch_size):
+            updated += queryset.filter(pk__in=batch).update(**values)
+    return updated
+
+
+def bulk_delete_in_batches(queryset, ids: Iterable, batch_size: int = BULK_BATCH_SIZE) -> int:
+    """Delete the ``queryset`` rows among ``ids`` a batch at a time in one transaction; returns rows of its model deleted."""
+    deleted = 0
+    label = queryset.model._meta.label
+    with transaction.atomic():
+        for batch in _batches(list(ids), batch_size):
+            deleted += queryset.filter(pk__in=batch).delete()[1].get(label, 0)
+    return deleted
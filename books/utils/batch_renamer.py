@@ -7,6 +7,7 @@ Handles batch renaming operations, companion file management, and rollback capab
 import logging
 import os
 import shutil
+import uuid
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
@@ -14,6 +15,7 @@ from django.db import transaction
 from django.utils import timezone
 
 from books.models import Book
+from books.scanner.events import BATCH_PROGRESS, publish_event
 
 from .file_collision import apply_suffix_to_path, get_collision_suffix, resolve_collision
 from .renaming_engine import RenamingEngine
@@ -185,8 +187,10 @@ class BatchRenamer:
     Handles batch renaming operations with rollback capability.
     """
 
-    def __init__(self, dry_run: bool = True, remove_unused_images: bool = False):
+    def __init__(self, dry_run: bool = True, remove_unused_images: bool = False, progress_id: Optional[str] = None):
         self.dry_run = dry_run
+        # Identifies this batch's events on the progress stream
+        self.progress_id = progress_id or uuid.uuid4().hex
         self.remove_unused_images = remove_unused_images
         self.engine = RenamingEngine()
         self.companion_finder = CompanionFileFinder()
@@ -359,8 +363,9 @@ class BatchRenamer:
 
         # Group operations by book for proper rollback handling
         book_operations = self._group_operations_by_book()
+        self._publish_progress(0, len(book_operations), successful, failed)
 
-        for book_id, ops in book_operations.items():
+        for done, (book_id, ops) in enumerate(book_operations.items(), start=1):
             try:
                 self._execute_book_operations(book_id, ops)
                 successful += len(ops)
@@ -377,8 +382,14 @@ class BatchRenamer:
                 # Rollback this book's operations
                 self._rollback_book_operations(book_id, ops)
 
+            self._publish_progress(done, len(book_operations), successful, failed)
+
         return ExecutionResult(successful, failed, errors, success=(failed == 0), dry_run=False)
 
+    def _publish_progress(self, done: int, total: int, successful: int, failed: int) -> None:
+        """Publish the number of books processed so far to the progress event stream."""
+        publish_event(BATCH_PROGRESS, {"batch": self.progress_id, "done": done, "total": total, "successful": successful, "failed": failed, "completed": done == total})
+
     def _group_operations_by_book(self) -> Dict[int, List[FileOperation]]:
         """Group operations by book ID for atomic processing."""
         grouped = {}
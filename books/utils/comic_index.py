@@ -0,0 +1,222 @@
+"""Normalized comic series/issue index.
+
+Every comic book has one ``ComicIssue`` row holding its normalized series key
+and numeric issue number, refreshed whenever the scanner stores comic metadata
+or the book's final metadata changes. Series lists, completeness and missing
+issues are then answered with aggregate and window queries over that table
+instead of loading every issue and its metadata into Python.
+"""
+
+import logging
+import re
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, Q, Window
+from django.db.models.functions import Lag
+
+logger = logging.getLogger("books.scanner")
+
+# BookMetadata fields the index is built from
+INDEXED_FIELDS = ("series", "issue_number", "issue_type", "volume_number", "volume", "publisher")
+SPECIAL_ISSUE_TYPES = ("special", "holiday_special", "giant_size")
+
+_NON_WORD_RE = re.compile(r"[\W_]+")
+_NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def normalize_series_key(name: Optional[str]) -> str:
+    """Grouping key for a series name: case, punctuation and a leading article don't matter."""
+    key = " ".join(_NON_WORD_RE.split((name or "").lower())).strip()
+    if key.startswith("the "):
+        key = key[4:]
+    return key[:200]
+
+
+def parse_issue_number(value) -> Optional[Decimal]:
+    """Numeric issue number from values like ``"007"``, ``"#12"`` or ``"1.5"``, or None."""
+    if value is None:
+        return None
+    match = _NUMBER_RE.search(str(value))
+    if not match:
+        return None
+    try:
+        number = Decimal(match.group())
+    except InvalidOperation:
+        return None
+    # Keep within DecimalField(max_digits=10, decimal_places=2)
+    if abs(number) >= Decimal("100000000"):
+        return None
+    return number.quantize(Decimal("0.01"))
+
+
+def _parse_int(value) -> Optional[int]:
+    number = parse_issue_number(value)
+    return int(number) if number is not None and number == int(number) else None
+
+
+def _build_issue(book_id: int, metadata: Dict[str, str], final: Optional[dict], model):
+    """Resolve the indexed values of one book; reviewed final metadata wins over scanned metadata."""
+    final = final or {}
+    series_name = (final.get("final_series") or metadata.get("series") or "").strip()
+    series_key = normalize_series_key(series_name)
+    if not series_key:
+        return None
+
+    issue_number = parse_issue_number(metadata.get("issue_number") or final.get("final_series_number"))
+    return model(
+        book_id=book_id,
+        series_key=series_key,
+        series_name=series_name[:200],
+        publisher=(final.get("final_publisher") or metadata.get("publisher") or "").strip()[:200],
+        issue_type=(metadata.get("issue_type") or "main_series")[:30],
+        issue_number=issue_number,
+        whole_number=int(issue_number) if issue_number is not None and issue_number == int(issue_number) else None,
+        volume=_parse_int(metadata.get("volume_number") or metadata.get("volume")),
+    )
+
+
+def _load_sources(book_ids: List[int], BookMetadata, FinalMetadata) -> Tuple[Dict[int, dict], Dict[int, dict]]:
+    """Highest-confidence active indexed metadata and final metadata for ``book_ids``, in two queries."""
+    metadata: Dict[int, dict] = {}
+    rows = (
+        BookMetadata.objects.filter(book_id__in=book_ids, field_name__in=INDEXED_FIELDS, is_active=True)
+        .order_by("book_id", "field_name", "-confidence")
+        .values_list("book_id", "field_name", "field_value")
+    )
+    for book_id, field_name, field_value in rows:
+        metadata.setdefault(book_id, {}).setdefault(field_name, field_value)
+
+    finals = {
+        row["book_id"]: row
+        for row in FinalMetadata.objects.filter(book_id__in=book_ids).values("book_id", "final_series", "final_series_number", "final_publisher")
+    }
+    return metadata, finals
+
+
+def refresh_comic_issue(book) -> None:
+    """Bring the index row of one comic book up to date with its metadata."""
+    from books.models import BookMetadata, ComicIssue, FinalMetadata
+
+    try:
+        metadata, finals = _load_sources([book.pk], BookMetadata, FinalMetadata)
+        issue = _build_issue(book.pk, metadata.get(book.pk, {}), finals.get(book.pk), ComicIssue)
+
+        if issue is None:
+            ComicIssue.objects.filter(book_id=book.pk).delete()
+            return
+
+        values = {field: getattr(issue, field) for field in ("series_key", "series_name", "publisher", "issue_type", "issue_number", "whole_number", "volume")}
+        ComicIssue.objects.update_or_create(book_id=book.pk, defaults=values)
+    except Exception as e:
+        logger.warning(f"Could not update comic index for book {book.pk}: {e}")
+
+
+def rebuild_comic_index(batch_size: int = 1000) -> int:
+    """
+    Rebuild the whole index from stored metadata.
+
+    Args:
+        batch_size: Books resolved and inserted per batch
+
+    Returns:
+        Number of indexed issues
+    """
+    from books.models import Book, BookMetadata, ComicIssue, FinalMetadata
+
+    book_ids = list(Book.objects.filter(content_type="comic").order_by("id").values_list("id", flat=True))
+    indexed = 0
+
+    with transaction.atomic():
+        ComicIssue.objects.all().delete()
+        for start in range(0, len(book_ids), batch_size):
+            batch = book_ids[start : start + batch_size]
+            metadata, finals = _load_sources(batch, BookMetadata, FinalMetadata)
+            issues = [issue for book_id in batch if (issue := _build_issue(book_id, metadata.get(book_id, {}), finals.get(book_id), ComicIssue)) is not None]
+            ComicIssue.objects.bulk_create(issues)
+            indexed += len(issues)
+
+    return indexed
+
+
+def _completeness(first: Optional[int], last: Optional[int], distinct_issues: int) -> dict:
+    """Completeness figures from the whole-number range and count of a series' main issues."""
+    if first is None:
+        return {"is_complete": False, "missing_count": 0, "completeness_percentage": 0.0}
+
+    expected = last - first + 1
+    missing = expected - distinct_issues
+    return {
+        "is_complete": missing == 0,
+        "missing_count": missing,
+        "completeness_percentage": round(distinct_issues / expected * 100, 1),
+    }
+
+
+def series_summaries(series_keys: Optional[Iterable[str]] = None, publisher: Optional[str] = None) -> List[dict]:
+    """
+    Counts and completeness for each series, computed in one aggregate query.
+
+    Args:
+        series_keys: Only summarize these series (e.g. the page being shown)
+        publisher: Only count issues from this publisher
+
+    Returns:
+        One dict per series, ordered by name
+    """
+    from books.models import ComicIssue
+
+    issues = ComicIssue.objects.all()
+    if series_keys is not None:
+        issues = issues.filter(series_key__in=list(series_keys))
+    if publisher:
+        issues = issues.filter(publisher__iexact=publisher)
+
+    main = Q(issue_type="main_series")
+    rows = (
+        issues.values("series_key")
+        .annotate(
+            name=Max("series_name"),
+            publisher=Max("publisher"),
+            book_count=Count("id"),
+            main_series_count=Count("id", filter=main),
+            annuals_count=Count("id", filter=Q(issue_type="annual")),
+            specials_count=Count("id", filter=Q(issue_type__in=SPECIAL_ISSUE_TYPES)),
+            first_issue=Min("whole_number", filter=main),
+            last_issue=Max("whole_number", filter=main),
+            distinct_issues=Count("whole_number", filter=main, distinct=True),
+        )
+        .order_by("name")
+    )
+
+    summaries = []
+    for row in rows:
+        row.update(_completeness(row["first_issue"], row["last_issue"], row["distinct_issues"]))
+        summaries.append(row)
+    return summaries
+
+
+def series_gaps(series_key: str, publisher: Optional[str] = None) -> List[Tuple[int, int]]:
+    """
+    Missing ranges of main-series issue numbers, found with a window query.
+
+    Only the issue following each gap is returned by the database, so the
+    cost depends on the number of gaps rather than the number of issues.
+
+    Returns:
+        ``(first_missing, last_missing)`` tuples in ascending order
+    """
+    from books.models import ComicIssue
+
+    issues = ComicIssue.objects.filter(series_key=series_key, issue_type="main_series", whole_number__isnull=False)
+    if publisher:
+        issues = issues.filter(publisher__iexact=publisher)
+
+    after_gaps = (
+        issues.annotate(previous=Window(Lag("whole_number"), order_by=F("whole_number").asc()))
+        .filter(whole_number__gt=F("previous") + 1)
+        .order_by("whole_number")
+        .values_list("previous", "whole_number")
+    )
+    return [(previous + 1, number - 1) for previous, number in after_gaps]
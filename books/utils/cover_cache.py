@@ -44,6 +44,153 @@ class CoverCache:
         # Always use forward slashes for consistency across platforms
         return f"{cls.CACHE_DIR}/{cache_filename}"
 
+    @classmethod
+    def get_remote_cache_path(cls, url: str) -> str:
+        """
+        Generate a stable cache path for a remote cover URL.
+
+        Unlike Python's built-in ``hash()``, the SHA-256 digest is identical
+        across processes, so downloaded covers survive restarts.
+
+        Args:
+            url: Remote image URL
+
+        Returns:
+            Relative path within media storage (e.g., 'cover_cache/remote_abc123.jpg')
+        """
+        url_hash = hashlib.sha256(url.encode()).hexdigest()[:16]
+        return f"{cls.CACHE_DIR}/remote_{url_hash}.jpg"
+
+    @classmethod
+    def get_remote_cover(cls, url: str) -> Optional[str]:
+        """
+        Retrieve the cached copy of a remote cover.
+
+        Args:
+            url: Remote image URL
+
+        Returns:
+            Relative path within media storage if cached, None otherwise
+        """
+        cache_path = cls.get_remote_cache_path(url)
+
+        if default_storage.exists(cache_path):
+            return cache_path
+
+        return None
+
+    @classmethod
+    def save_remote_cover(cls, url: str, cover_data: bytes) -> Tuple[bool, str]:
+        """
+        Save a downloaded remote cover under its stable cache path.
+
+        Args:
+            url: Remote image URL the data was fetched from
+            cover_data: Binary image data
+
+        Returns:
+            Tuple of (success: bool, cache_path: str)
+        """
+        try:
+            cache_path = cls.get_remote_cache_path(url)
+
+            cache_dir = Path(settings.MEDIA_ROOT) / cls.CACHE_DIR
+            cache_dir.mkdir(parents=True, exist_ok=True)
+
+            if default_storage.exists(cache_path):
+                return True, cache_path
+
+            saved_path = default_storage.save(cache_path, ContentFile(cover_data))
+            if saved_path != cache_path:
+                # Another worker stored the same URL first; keep the canonical copy
+                default_storage.delete(saved_path)
+
+            logger.info(f"Cached remote cover {url} at {cache_path}")
+            return True, cache_path
+
+        except Exception as e:
+            logger.error(f"Failed to cache remote cover {url}: {e}")
+            return False, ""
+
+    @classmethod
+    def get_render_cache_path(cls, fingerprint: str) -> str:
+        """
+        Generate the cache path for a rendered cover keyed by file fingerprint.
+
+        Args:
+            fingerprint: Content fingerprint of the source file and render settings
+
+        Returns:
+            Relative path within media storage
+        """
+        return f"{cls.CACHE_DIR}/render_{fingerprint[:32]}.jpg"
+
+    @classmethod
+    def get_rendered_cover(cls, fingerprint: str) -> Optional[bytes]:
+        """
+        Retrieve a previously rendered cover.
+
+        Args:
+            fingerprint: Content fingerprint of the source file and render settings
+
+        Returns:
+            Image data if this exact file was rendered before, None otherwise
+        """
+        cache_path = cls.get_render_cache_path(fingerprint)
+
+        try:
+            if default_storage.exists(cache_path):
+                with default_storage.open(cache_path, "rb") as cached:
+                    return cached.read()
+        except Exception as e:
+            logger.warning(f"Failed to read rendered cover {cache_path}: {e}")
+
+        return None
+
+    @classmethod
+    def has_rendered_cover(cls, fingerprint: str) -> bool:
+        """
+        Check if a rendered cover is cached.
+
+        Args:
+            fingerprint: Content fingerprint of the source file and render settings
+
+        Returns:
+            True if cached, False otherwise
+        """
+        return default_storage.exists(cls.get_render_cache_path(fingerprint))
+
+    @classmethod
+    def save_rendered_cover(cls, fingerprint: str, cover_data: bytes) -> bool:
+        """
+        Store a rendered cover under its fingerprint.
+
+        Args:
+            fingerprint: Content fingerprint of the source file and render settings
+            cover_data: Binary image data
+
+        Returns:
+            True if the cover is now cached
+        """
+        try:
+            cache_path = cls.get_render_cache_path(fingerprint)
+
+            cache_dir = Path(settings.MEDIA_ROOT) / cls.CACHE_DIR
+            cache_dir.mkdir(parents=True, exist_ok=True)
+
+            if default_storage.exists(cache_path):
+                return True
+
+            saved_path = default_storage.save(cache_path, ContentFile(cover_data))
+            if saved_path != cache_path:
+                # Rendered concurrently by another worker; keep the canonical copy
+                default_storage.delete(saved_path)
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to cache rendered cover {fingerprint}: {e}")
+            return False
+
     @classmethod
     def save_cover(cls, book_file_path: str, cover_data: bytes, internal_path: Optional[str] = None) -> Tuple[bool, str]:
         """
@@ -8,14 +8,25 @@ This module provides extractors for:
 - MOBI files (internal cover)
 """
 
+import hashlib
 import logging
+import math
+import os
+import posixpath
+import re
 import zipfile
 from io import BytesIO
 from pathlib import Path
 from typing import Optional, Tuple
+from urllib.parse import unquote
 
+from django.core.cache import cache
 from PIL import Image
 
+from books.utils.cache_key import make_cache_key
+from books.utils.cover_cache import CoverCache
+from books.utils.image_utils import read_image_header, read_image_header_with_pil
+
 logger = logging.getLogger(__name__)
 
 # Optional dependencies for enhanced functionality
@@ -73,6 +84,21 @@ class EPUBCoverExtractor:
         "images/cover.png",
     ]
 
+    IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
+    # Bytes decompressed per image to read its dimensions
+    HEADER_READ_SIZE = 32 * 1024
+    # Bytes read from the end of the file to fingerprint it
+    FINGERPRINT_SAMPLE_SIZE = 64 * 1024
+    # Leading spine documents whose images are ranked as likely covers
+    SPINE_DOCUMENTS_SCANNED = 3
+    CANDIDATE_CACHE_TIMEOUT = 7 * 24 * 3600
+    # Candidate previews only fill a selector card
+    THUMBNAIL_SIZE = (300, 450)
+
+    _ATTRIBUTE_RE = re.compile(r'([\w:-]+)\s*=\s*["\']([^"\']*)["\']')
+    _TAG_RE = re.compile(r"<(?:\w+:)?(item|itemref|meta)\b([^>]*)>", re.IGNORECASE)
+    _IMAGE_REF_RE = re.compile(r'<(?:\w+:)?(?:img\b[^>]*?\bsrc|image\b[^>]*?\b(?:xlink:)?href)\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+
     @classmethod
     def find_cover_in_opf(cls, epub_path: str) -> Optional[str]:
         """
@@ -101,8 +127,6 @@ class EPUBCoverExtractor:
 
                 # Look for cover metadata
                 # Format: <meta name="cover" content="cover-image-id"/>
-                import re
-
                 cover_id_match = re.search(r'<meta\s+name=["\']cover["\']\s+content=["\']([^"\']+)["\']', opf_content)
 
                 if cover_id_match:
@@ -284,18 +308,382 @@ class EPUBCoverExtractor:
             logger.error(f"Failed to list all covers in EPUB {epub_path}: {e}")
             return []
 
+    @classmethod
+    def fingerprint(cls, epub_path: str) -> Optional[str]:
+        """
+        Fingerprint an EPUB by size and its last bytes.
+
+        The zip central directory at the end of the file records the name, size
+        and CRC of every entry, so any change to the book changes the fingerprint.
+
+        Args:
+            epub_path: Path to EPUB file
+
+        Returns:
+            Hex digest, or None if the file cannot be read
+        """
+        try:
+            file_size = os.path.getsize(epub_path)
+            with open(epub_path, "rb") as f:
+                f.seek(max(0, file_size - cls.FINGERPRINT_SAMPLE_SIZE))
+                tail = f.read()
+        except OSError:
+            return None
+
+        digest = hashlib.sha256(f"epub:{file_size}:".encode())
+        digest.update(tail)
+        return digest.hexdigest()
+
+    @classmethod
+    def _package_document(cls, zf: zipfile.ZipFile) -> Tuple[Optional[str], str]:
+        """Return the OPF path named by META-INF/container.xml (else the first .opf) and its text."""
+        opf_path = None
+        try:
+            container = zf.read("META-INF/container.xml").decode("utf-8", errors="ignore")
+            match = re.search(r'<(?:\w+:)?rootfile\b[^>]*full-path=["\']([^"\']+)["\']', container)
+            if match and match.group(1) in zf.NameToInfo:
+                opf_path = match.group(1)
+        except KeyError:
+            pass
+
+        if not opf_path:
+            opf_path = next((name for name in zf.namelist() if name.endswith(".opf")), None)
+        if not opf_path:
+            return None, ""
+        return opf_path, zf.read(opf_path).decode("utf-8", errors="ignore")
+
+    @staticmethod
+    def _resolve_href(base_path: str, href: str) -> str:
+        """Resolve an href relative to the document at ``base_path`` inside the archive."""
+        href = unquote(href.split("#", 1)[0])
+        return posixpath.normpath(posixpath.join(posixpath.dirname(base_path), href))
+
+    @classmethod
+    def _rank_hints(cls, zf: zipfile.ZipFile) -> Tuple[Optional[str], list[str]]:
+        """
+        Read the OPF cover and the images used by the first spine documents.
+
+        Returns:
+            Tuple of (OPF cover path or None, spine image paths in reading order)
+        """
+        opf_path, opf_content = cls._package_document(zf)
+        if not opf_path:
+            return None, []
+
+        manifest = {}
+        cover_id = cover_path = None
+        spine = []
+        for tag, attributes in cls._TAG_RE.findall(opf_content):
+            attributes = dict(cls._ATTRIBUTE_RE.findall(attributes))
+            tag = tag.lower()
+            if tag == "item" and attributes.get("id") and attributes.get("href"):
+                href = cls._resolve_href(opf_path, attributes["href"])
+                manifest[attributes["id"]] = href
+                if "cover-image" in attributes.get("properties", "").split():
+                    cover_path = href
+            elif tag == "meta" and attributes.get("name") == "cover":
+                cover_id = attributes.get("content")
+            elif tag == "itemref" and attributes.get("idref"):
+                spine.append(attributes["idref"])
+
+        if cover_id in manifest:
+            cover_path = manifest[cover_id]
+
+        spine_images = []
+        for idref in spine[: cls.SPINE_DOCUMENTS_SCANNED]:
+            document = manifest.get(idref)
+            if not document or document not in zf.NameToInfo:
+                continue
+            if Path(document).suffix.lower() in cls.IMAGE_EXTENSIONS:
+                spine_images.append(document)
+                continue
+            content = zf.read(document).decode("utf-8", errors="ignore")
+            for href in cls._IMAGE_REF_RE.findall(content):
+                image_path = cls._resolve_href(document, href)
+                if image_path not in spine_images:
+                    spine_images.append(image_path)
+
+        return cover_path, spine_images
+
+    @classmethod
+    def _read_dimensions(cls, zf: zipfile.ZipFile, internal_path: str) -> Tuple[int, int, str]:
+        """Read ``(width, height, FORMAT)`` from the start of an image without decompressing all of it."""
+        with zf.open(internal_path) as image_file:
+            header = image_file.read(cls.HEADER_READ_SIZE)
+        info = read_image_header(header) or read_image_header_with_pil(header)
+        if not info:
+            return 0, 0, "UNKNOWN"
+        width, height, img_format = info
+        return width, height, img_format.upper()
+
+    @classmethod
+    def _build_candidates(cls, epub_path: str) -> list[dict]:
+        with zipfile.ZipFile(epub_path, "r") as zf:
+            try:
+                opf_cover_path, spine_images = cls._rank_hints(zf)
+            except Exception as e:
+                logger.warning(f"Error parsing OPF for cover candidates in {epub_path}: {e}")
+                opf_cover_path, spine_images = None, []
+            spine_order = {path: index for index, path in enumerate(spine_images)}
+
+            image_files = [
+                info
+                for info in sorted(zf.infolist(), key=lambda info: info.filename)
+                if Path(info.filename).suffix.lower() in cls.IMAGE_EXTENSIONS and not info.filename.startswith("__MACOSX") and not Path(info.filename).name.startswith(".")
+            ]
+
+            candidates = []
+            for position, info in enumerate(image_files):
+                internal_path = info.filename
+                try:
+                    width, height, img_format = cls._read_dimensions(zf, internal_path)
+                except Exception as e:
+                    logger.warning(f"Could not read image header {internal_path}: {e}")
+                    width = height = 0
+                    img_format = "UNKNOWN"
+
+                area = width * height
+                if internal_path == opf_cover_path:
+                    rank = (0, 0, position)
+                elif internal_path in spine_order:
+                    rank = (1, spine_order[internal_path], position)
+                elif "cover" in Path(internal_path).stem.lower():
+                    rank = (2, -area, position)
+                elif height > width:
+                    rank = (3, -area, position)
+                else:
+                    rank = (4, -area, position)
+
+                candidates.append(
+                    {
+                        "internal_path": internal_path,
+                        "width": width,
+                        "height": height,
+                        "file_size": info.file_size,
+                        "format": img_format,
+                        "is_opf_cover": internal_path == opf_cover_path,
+                        "position": position,
+                        "rank": rank,
+                    }
+                )
+
+        candidates.sort(key=lambda candidate: candidate.pop("rank"))
+        return candidates
+
+    @classmethod
+    def list_cover_candidates(cls, epub_path: str, fingerprint: Optional[str] = None) -> list[dict]:
+        """
+        List the images of an EPUB as cover candidates, likeliest covers first.
+
+        Only the header of each image is decompressed, so listing a heavily
+        illustrated book stays cheap. The OPF cover comes first, then images used
+        by the first spine documents, images named like covers, portrait images
+        by size and finally everything else by size. The index is cached per file
+        fingerprint.
+
+        Args:
+            epub_path: Path to EPUB file
+            fingerprint: Precomputed ``fingerprint(epub_path)``, if the caller has it
+
+        Returns:
+            List of dicts with the keys of ``list_all_covers`` except ``image_data``;
+            ``file_size`` is the uncompressed size from the zip directory
+        """
+        fingerprint = fingerprint or cls.fingerprint(epub_path)
+        if not fingerprint:
+            return []
+
+        cache_key = make_cache_key("epub_cover_candidates", fingerprint)
+        candidates = cache.get(cache_key)
+        if candidates is not None:
+            return candidates
+
+        try:
+            candidates = cls._build_candidates(epub_path)
+        except Exception as e:
+            logger.error(f"Failed to list cover candidates in EPUB {epub_path}: {e}")
+            return []
+
+        cache.set(cache_key, candidates, cls.CANDIDATE_CACHE_TIMEOUT)
+        logger.info(f"Indexed {len(candidates)} cover candidates in EPUB: {epub_path}")
+        return candidates
+
+    @classmethod
+    def cover_thumbnail(cls, epub_path: str, internal_path: str, fingerprint: Optional[str] = None) -> Tuple[Optional[bytes], Optional[str]]:
+        """
+        Make (or reuse) a small JPEG preview of one image inside an EPUB.
+
+        Args:
+            epub_path: Path to EPUB file
+            internal_path: Path of the image inside the EPUB
+            fingerprint: Precomputed ``fingerprint(epub_path)``, if the caller has it
+
+        Returns:
+            Tuple of (thumbnail bytes or None if the image cannot be decoded,
+            media storage path of the cached thumbnail or None if caching failed).
+            The bytes are None when the thumbnail was already cached.
+        """
+        fingerprint = fingerprint or cls.fingerprint(epub_path)
+        if not fingerprint:
+            return None, None
+
+        size = cls.THUMBNAIL_SIZE
+        thumbnail_key = hashlib.sha256(f"{fingerprint}:{internal_path}:{size[0]}x{size[1]}".encode()).hexdigest()
+        if CoverCache.has_rendered_cover(thumbnail_key):
+            return None, CoverCache.get_render_cache_path(thumbnail_key)
+
+        try:
+            with zipfile.ZipFile(epub_path, "r") as zf:
+                img = Image.open(BytesIO(zf.read(internal_path)))
+                img.draft("RGB", size)  # Let JPEG decode at reduced scale
+                img.thumbnail(size)
+                if img.mode not in ("RGB", "L"):
+                    img = img.convert("RGB")
+                output = BytesIO()
+                img.save(output, format="JPEG", quality=80)
+        except Exception as e:
+            logger.warning(f"Could not make thumbnail for {internal_path} in {epub_path}: {e}")
+            return None, None
+
+        thumbnail = output.getvalue()
+        if CoverCache.save_rendered_cover(thumbnail_key, thumbnail):
+            return thumbnail, CoverCache.get_render_cache_path(thumbnail_key)
+        return thumbnail, None
+
 
 class PDFCoverExtractor:
     """Extract first page from PDF as cover image."""
 
+    # Covers are shown as thumbnails; render just enough pixels to fill this box
+    TARGET_SIZE = (600, 900)
+    MIN_DPI = 36
+    # Bytes read from each end of the file to fingerprint it
+    FINGERPRINT_SAMPLE_SIZE = 64 * 1024
+
+    @classmethod
+    def fingerprint(cls, pdf_path: str, target_size: Tuple[int, int]) -> Optional[str]:
+        """
+        Fingerprint a PDF by size and its first and last bytes.
+
+        The trailer and cross-reference table live at the end of a PDF, so any
+        edit (including an incremental update) changes the fingerprint, while a
+        moved or copied file keeps it.
+
+        Args:
+            pdf_path: Path to PDF file
+            target_size: Render size, part of the key so a new size re-renders
+
+        Returns:
+            Hex digest, or None if the file cannot be read
+        """
+        try:
+            file_size = os.path.getsize(pdf_path)
+            with open(pdf_path, "rb") as f:
+                head = f.read(cls.FINGERPRINT_SAMPLE_SIZE)
+                tail = b""
+                if file_size > 2 * cls.FINGERPRINT_SAMPLE_SIZE:
+                    f.seek(-cls.FINGERPRINT_SAMPLE_SIZE, os.SEEK_END)
+                    tail = f.read()
+        except OSError:
+            return None
+
+        digest = hashlib.sha256(f"{file_size}:{target_size[0]}x{target_size[1]}:".encode())
+        digest.update(head)
+        digest.update(tail)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _page_size(page) -> Optional[Tuple[float, float]]:
+        """Displayed size of a page in points, or None if it can't be determined."""
+        try:
+            width, height = float(page.mediabox.width), float(page.mediabox.height)
+            if int(page.get("/Rotate", 0) or 0) % 180 == 90:
+                width, height = height, width
+        except Exception:
+            return None
+
+        if width <= 0 or height <= 0:
+            return None
+        return width, height
+
+    @classmethod
+    def render_dpi(cls, page_size: Optional[Tuple[float, float]], target_size: Tuple[int, int], max_dpi: int) -> int:
+        """
+        DPI at which the page fits the target size (one point is 1/72 inch).
+
+        Args:
+            page_size: Page size in points, or None if unknown
+            target_size: Thumbnail (width, height) in pixels
+            max_dpi: Upper bound, also used when the page size is unknown
+
+        Returns:
+            DPI to pass to the renderer
+        """
+        if not page_size:
+            return max_dpi
+
+        scale = min(target_size[0] / page_size[0], target_size[1] / page_size[1])
+        return min(max_dpi, max(cls.MIN_DPI, math.ceil(72 * scale)))
+
     @classmethod
-    def extract_cover(cls, pdf_path: str, dpi: int = 150) -> Optional[bytes]:
+    def _extract_embedded_jpeg(cls, page, page_size: Optional[Tuple[float, float]], target_size: Tuple[int, int]) -> Optional[bytes]:
+        """
+        Return the first page's image directly when the page is a single full-page JPEG.
+
+        Scanned books and image-only covers store the page as one DCT-encoded
+        image; its stream already is a JPEG, so there is nothing to rasterize.
+        Pages with text or several images are left to the renderer.
+        """
+        if not page_size:
+            return None
+
+        resources = page["/Resources"]
+        if "/XObject" not in resources or "/Font" in resources:
+            return None
+
+        xobjects = resources["/XObject"].get_object()
+        images = [xobjects[name] for name in xobjects if xobjects[name]["/Subtype"] == "/Image"]
+        if len(images) != 1 or len(images) != len(xobjects):
+            return None
+
+        image = images[0]
+        filters = image["/Filter"] if "/Filter" in image else None
+        if isinstance(filters, list):
+            filters = filters[0] if len(filters) == 1 else None
+        if filters != "/DCTDecode":
+            return None
+
+        # Must cover the page, not be a small picture on an otherwise blank page
+        width, height = int(image["/Width"]), int(image["/Height"])
+        if not width or not height or abs(width / height - page_size[0] / page_size[1]) > 0.05 * page_size[0] / page_size[1]:
+            return None
+
+        data = image.get_data()
+        img = Image.open(BytesIO(data))
+        if img.width <= target_size[0] and img.height <= target_size[1] and img.mode in ("RGB", "L"):
+            return data
+
+        # Let the JPEG decoder downscale while decoding, then finish the resize
+        img.draft("RGB", target_size)
+        img = img.convert("RGB")
+        img.thumbnail(target_size)
+        img_bytes = BytesIO()
+        img.save(img_bytes, format="JPEG", quality=85)
+        return img_bytes.getvalue()
+
+    @classmethod
+    def extract_cover(cls, pdf_path: str, dpi: int = 150, target_size: Optional[Tuple[int, int]] = None, use_cache: bool = True) -> Optional[bytes]:
         """
         Extract first page of PDF as JPG image.
 
+        An unchanged PDF is served from the render cache; otherwise an embedded
+        full-page JPEG is used as-is, and only then is the page rendered.
+
         Args:
             pdf_path: Path to PDF file
-            dpi: Resolution for rendering (default: 150)
+            dpi: Maximum resolution for rendering (default: 150)
+            target_size: Thumbnail (width, height) the render should fill (default: TARGET_SIZE)
+            use_cache: Look up and store the result by file fingerprint
 
         Returns:
             JPG image data as bytes, or None if extraction fails
@@ -303,30 +691,67 @@ class PDFCoverExtractor:
         Raises:
             CoverExtractionError: If PDF is invalid or cannot be read
         """
+        target_size = target_size or cls.TARGET_SIZE
+        fingerprint = cls.fingerprint(pdf_path, target_size) if use_cache else None
+
+        if fingerprint:
+            cached = CoverCache.get_rendered_cover(fingerprint)
+            if cached:
+                logger.debug(f"Using cached PDF cover render: {pdf_path}")
+                return cached
+
+        cover_data = cls._extract_cover(pdf_path, dpi, target_size)
+
+        if cover_data and fingerprint:
+            CoverCache.save_rendered_cover(fingerprint, cover_data)
+        return cover_data
+
+    @classmethod
+    def _extract_cover(cls, pdf_path: str, dpi: int, target_size: Tuple[int, int]) -> Optional[bytes]:
         try:
+            page = page_size = reader_error = None
+
+            if HAS_PYPDF2:
+                try:
+                    reader = PdfReader(pdf_path)
+                    if not reader.pages:
+                        logger.warning(f"PDF has no pages: {pdf_path}")
+                        return None
+                    page = reader.pages[0]
+                    page_size = cls._page_size(page)
+                except Exception as e:
+                    # poppler copes with files PyPDF2 rejects; only fatal without it
+                    reader_error = e
+
+            if page is not None:
+                try:
+                    cover_data = cls._extract_embedded_jpeg(page, page_size, target_size)
+                    if cover_data:
+                        logger.info(f"Extracted embedded PDF cover image without rendering: {pdf_path}")
+                        return cover_data
+                except Exception as e:
+                    logger.debug(f"Embedded JPEG fast path failed for {pdf_path}: {e}")
+
             # Try using pdf2image first (requires poppler)
             if HAS_PDF2IMAGE:
-                images = convert_from_path(pdf_path, dpi=dpi, first_page=1, last_page=1)
+                render_dpi = cls.render_dpi(page_size, target_size, dpi)
+                images = convert_from_path(pdf_path, dpi=render_dpi, first_page=1, last_page=1)
 
                 if images:
                     # Convert to JPG
                     img_bytes = BytesIO()
                     images[0].save(img_bytes, format="JPEG", quality=85)
-                    logger.info(f"Extracted PDF first page using pdf2image: {pdf_path}")
+                    logger.info(f"Extracted PDF first page using pdf2image at {render_dpi} dpi: {pdf_path}")
                     return img_bytes.getvalue()
             else:
                 logger.debug("pdf2image not available, trying PyPDF2")
 
             # Fallback to PyPDF2 (lower quality, but no external dependencies)
             if HAS_PYPDF2:
-
-                reader = PdfReader(pdf_path)
-                if not reader.pages:
-                    logger.warning(f"PDF has no pages: {pdf_path}")
-                    return None
+                if reader_error is not None:
+                    raise reader_error
 
                 # Try to extract images from first page
-                page = reader.pages[0]
                 if "/XObject" in page["/Resources"]:
                     xobjects = page["/Resources"]["/XObject"].get_object()
 
@@ -0,0 +1,166 @@
+"""
+Background prefetching of remote cover images.
+
+Cover URLs discovered by the scanner and the external metadata queries are
+queued here and downloaded by a small pool of daemon worker threads into the
+cover cache (see ``CoverCache.get_remote_cache_path``). Templates never
+download anything themselves: they show the cached copy when it exists and a
+placeholder otherwise. Failed downloads are remembered for
+``COVER_PREFETCH_FAILURE_TTL`` seconds so a dead URL is not fetched again on
+every page view.
+"""
+
+import logging
+import queue
+import threading
+from io import BytesIO
+from typing import Iterable, Optional
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from PIL import Image
+
+from books.utils.cache_key import make_cache_key
+from books.utils.cover_cache import CoverCache
+
+logger = logging.getLogger("books.scanner")
+
+
+class CoverPrefetcher:
+    """Queue of remote cover URLs downloaded concurrently into the cover cache."""
+
+    def __init__(self, max_workers: int = 4, timeout: int = 10, max_bytes: int = 10 * 1024 * 1024, failure_ttl: int = 6 * 3600):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.failure_ttl = failure_ttl
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._workers = []
+
+    def enqueue(self, urls: Iterable[str]) -> int:
+        """
+        Queue remote cover URLs for download.
+
+        URLs that are already cached, already queued, recently failed, or not
+        http(s) are ignored.
+
+        Returns:
+            Number of URLs newly queued
+        """
+        queued = 0
+        for url in urls:
+            if not url or not str(url).startswith(("http://", "https://")):
+                continue
+            with self._lock:
+                if url in self._pending:
+                    continue
+                if CoverCache.get_remote_cover(url) or self.has_failed(url):
+                    continue
+                self._pending.add(url)
+            self._queue.put(url)
+            queued += 1
+
+        if queued:
+            self._ensure_workers()
+        return queued
+
+    def fetch(self, url: str) -> Optional[str]:
+        """
+        Download a single cover into the cache synchronously.
+
+        Returns:
+            Relative cache path on success, None otherwise
+        """
+        cached = CoverCache.get_remote_cover(url)
+        if cached:
+            return cached
+
+        try:
+            with requests.get(url, timeout=self.timeout, stream=True) as response:
+                response.raise_for_status()
+                data = BytesIO()
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    data.write(chunk)
+                    if data.tell() > self.max_bytes:
+                        logger.warning(f"[COVER PREFETCH] Skipping oversized cover {url}")
+                        self._record_failure(url)
+                        return None
+
+            content = data.getvalue()
+            # Reject error pages and truncated downloads before they reach the cache
+            Image.open(BytesIO(content)).verify()
+
+            success, cache_path = CoverCache.save_remote_cover(url, content)
+            if not success:
+                self._record_failure(url)
+            return cache_path if success else None
+
+        except Exception as e:
+            logger.warning(f"[COVER PREFETCH] Failed to download {url}: {e}")
+            self._record_failure(url)
+            return None
+
+    @staticmethod
+    def has_failed(url: str) -> bool:
+        """Whether a download of ``url`` failed within the failure TTL."""
+        return cache.get(_failure_cache_key(url)) is not None
+
+    def _record_failure(self, url: str):
+        if self.failure_ttl:
+            cache.set(_failure_cache_key(url), True, self.failure_ttl)
+
+    def join(self):
+        """Block until every queued URL has been processed."""
+        self._queue.join()
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def _ensure_workers(self):
+        with self._lock:
+            self._workers = [worker for worker in self._workers if worker.is_alive()]
+            while len(self._workers) < self.max_workers:
+                worker = threading.Thread(target=self._run, name=f"cover-prefetch-{len(self._workers)}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def _run(self):
+        while True:
+            url = self._queue.get()
+            try:
+                self.fetch(url)
+            finally:
+                with self._lock:
+                    self._pending.discard(url)
+                self._queue.task_done()
+
+
+def _failure_cache_key(url: str) -> str:
+    return make_cache_key("cover_prefetch_failed", url)
+
+
+_prefetcher = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_cover_prefetcher() -> CoverPrefetcher:
+    """Return the process-wide cover prefetcher."""
+    global _prefetcher
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = CoverPrefetcher(
+                max_workers=getattr(settings, "COVER_PREFETCH_WORKERS", 4),
+                failure_ttl=getattr(settings, "COVER_PREFETCH_FAILURE_TTL", 6 * 3600),
+            )
+        return _prefetcher
+
+
+def prefetch_covers(urls: Iterable[str]) -> int:
+    """Queue remote cover URLs for background download, if prefetching is enabled."""
+    if not getattr(settings, "COVER_PREFETCH_ENABLED", True):
+        return 0
+    return get_cover_prefetcher().enqueue(urls)
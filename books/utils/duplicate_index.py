@@ -0,0 +1,369 @@
+"""
+Duplicate detection for the library.
+
+Exact duplicates share a SHA-256 of their file contents
+(``BookFile.content_hash``). The hash is computed while scanning and reused on
+rescans as long as the file's size and modification time are unchanged, so
+grouping is a lookup on an indexed column instead of a comparison of files.
+
+Near-duplicates are found with MinHash signatures over normalized title and
+author tokens. Signatures are split into bands and bucketed (locality-sensitive
+hashing); only books that share a bucket are compared, so the report scales
+with the number of likely matches rather than with the square of the library.
+
+Book and metadata changes mark the index stale. Reports wait for a rebuild;
+book pages use ``get_cached_duplicate_index``, which keeps serving the last
+index while a background thread rebuilds it, and look a book up by its
+current title and author so its own edits show up straight away.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+import uuid
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+
+logger = logging.getLogger("books.scanner")
+
+CONTENT_HASH_CHUNK_SIZE = 1024 * 1024
+
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16  # 16 bands of 4 rows: pairs above ~0.5 Jaccard similarity almost always share a bucket
+NEAR_DUPLICATE_THRESHOLD = 0.6
+MINHASH_CHUNK_SIZE = 10000
+
+INDEX_GENERATION_CACHE_KEY = "duplicate_index_generation"
+
+_random = np.random.RandomState(20240601)
+# Odd multipliers make ``a * x + b`` (mod 2**32) a permutation of 32-bit token hashes
+_PERMUTATION_A = (_random.randint(0, 1 << 31, MINHASH_PERMUTATIONS, dtype=np.uint64) * 2 + 1).astype(np.uint32)[:, None]
+_PERMUTATION_B = _random.randint(0, 1 << 32, MINHASH_PERMUTATIONS, dtype=np.uint64).astype(np.uint32)[:, None]
+_BAND_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+_BRACKETED_RE = re.compile(r"[\(\[\{][^\)\]\}]*[\)\]\}]")
+_NON_WORD_RE = re.compile(r"[\W_]+")
+_IGNORED_TOKENS = frozenset({"", "a", "an", "and", "by", "of", "the"})
+
+
+def compute_content_hash(file_path: str) -> str:
+    """SHA-256 of a file's contents, read in fixed-size chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(CONTENT_HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def refresh_content_hash(book_file, force: bool = False) -> bool:
+    """
+    Bring ``book_file.content_hash`` up to date without saving it.
+
+    The existing hash is kept if the file's size and modification time match
+    the values recorded when it was computed.
+
+    Returns:
+        True if the hash was (re)computed
+    """
+    try:
+        stat = os.stat(book_file.file_path)
+    except OSError:
+        return False
+
+    if not force and book_file.content_hash and book_file.content_hash_mtime == stat.st_mtime and book_file.file_size == stat.st_size:
+        return False
+
+    try:
+        book_file.content_hash = compute_content_hash(book_file.file_path)
+    except OSError as e:
+        logger.warning(f"[DUPLICATES] Could not hash {book_file.file_path}: {e}")
+        return False
+
+    book_file.content_hash_mtime = stat.st_mtime
+    book_file.file_size = stat.st_size
+    return True
+
+
+def normalize_tokens(title: Optional[str], author: Optional[str]) -> FrozenSet[str]:
+    """Lower-cased, accent-free word tokens of title and author, ignoring bracketed notes and stopwords."""
+    text = f"{title or ''} {author or ''}".lower()
+    if not text.isascii():
+        text = "".join(char for char in unicodedata.normalize("NFKD", text) if not unicodedata.combining(char))
+    text = _BRACKETED_RE.sub(" ", text)
+    return frozenset(_NON_WORD_RE.split(text)) - _IGNORED_TOKENS
+
+
+def jaccard(first: FrozenSet[str], second: FrozenSet[str]) -> float:
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+
+@lru_cache(maxsize=65536)
+def _token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=4).digest(), "little")
+
+
+def minhash_signatures(token_sets: List[FrozenSet[str]]) -> np.ndarray:
+    """Return one MinHash signature row per token set (empty sets get an all-max row)."""
+    signatures = np.full((len(token_sets), MINHASH_PERMUTATIONS), np.iinfo(np.uint32).max, dtype=np.uint32)
+
+    for start in range(0, len(token_sets), MINHASH_CHUNK_SIZE):
+        chunk = token_sets[start : start + MINHASH_CHUNK_SIZE]
+        rows = [index for index, tokens in enumerate(chunk) if tokens]
+        if not rows:
+            continue
+
+        lengths = np.fromiter((len(chunk[index]) for index in rows), dtype=np.int64, count=len(rows))
+        token_hashes = np.fromiter((_token_hash(token) for index in rows for token in chunk[index]), dtype=np.uint32, count=int(lengths.sum()))
+
+        # One hash per permutation (row), then the minimum over each token set's columns
+        permuted = _PERMUTATION_A * token_hashes + _PERMUTATION_B
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        signatures[start + np.asarray(rows)] = np.minimum.reduceat(permuted, offsets, axis=1).T
+
+    return signatures
+
+
+def band_keys(signatures: np.ndarray, band: int) -> np.ndarray:
+    """Fold one band of each signature into a single 64-bit bucket key."""
+    rows_per_band = MINHASH_PERMUTATIONS // LSH_BANDS
+    keys = np.zeros(len(signatures), dtype=np.uint64)
+    for column in range(band * rows_per_band, (band + 1) * rows_per_band):
+        keys = (keys * _BAND_MIX) ^ signatures[:, column].astype(np.uint64)
+    return keys
+
+
+class DuplicateIndex:
+    """MinHash/LSH index over the title and author tokens of a set of books."""
+
+    def __init__(self, books: Iterable[Tuple[int, Optional[str], Optional[str]]], threshold: float = NEAR_DUPLICATE_THRESHOLD):
+        self.threshold = threshold
+
+        # Books with identical token sets collapse to one entry before hashing
+        books_by_tokens = defaultdict(list)
+        for book_id, title, author in books:
+            tokens = normalize_tokens(title, author)
+            if tokens:
+                books_by_tokens[tokens].append(book_id)
+
+        self.token_sets = list(books_by_tokens)
+        self.book_ids = [books_by_tokens[tokens] for tokens in self.token_sets]
+        self._entry_for_book = {book_id: entry for entry, ids in enumerate(self.book_ids) for book_id in ids}
+
+        signatures = minhash_signatures(self.token_sets)
+        self._band_index = []
+        self._bucket_members = []
+        for band in range(LSH_BANDS):
+            keys = band_keys(signatures, band)
+            order = np.argsort(keys, kind="stable")
+            sorted_keys = keys[order]
+            starts = np.flatnonzero(np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1])))
+
+            # Only buckets with more than one entry can produce groups
+            ends = np.append(starts[1:], len(keys))
+            members = {bucket: order[starts[bucket] : ends[bucket]].tolist() for bucket in np.flatnonzero(ends - starts > 1).tolist()}
+
+            self._band_index.append((sorted_keys, order))
+            self._bucket_members.append(members)
+
+    def __len__(self):
+        return len(self._entry_for_book)
+
+    def _candidates(self, tokens: FrozenSet[str]) -> set:
+        """Entries sharing at least one band bucket with ``tokens``."""
+        signature = minhash_signatures([tokens])
+        candidates = set()
+        for band, (sorted_keys, order) in enumerate(self._band_index):
+            key = band_keys(signature, band)[0]
+            start = np.searchsorted(sorted_keys, key, side="left")
+            end = np.searchsorted(sorted_keys, key, side="right")
+            candidates.update(order[start:end].tolist())
+        return candidates
+
+    def similar_to(self, tokens: FrozenSet[str], exclude_book_id: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        Return ``(book_id, similarity)`` for indexed books resembling ``tokens``, best first.
+
+        ``tokens`` need not be in the index, so a book whose metadata changed
+        after the index was built is matched on its current title and author.
+        """
+        if not tokens:
+            return []
+
+        matches = []
+        for candidate in self._candidates(tokens):
+            similarity = jaccard(tokens, self.token_sets[candidate])
+            if similarity >= self.threshold:
+                matches.extend((other_id, similarity) for other_id in self.book_ids[candidate] if other_id != exclude_book_id)
+
+        return sorted(matches, key=lambda match: (-match[1], match[0]))
+
+    def near_duplicates_of(self, book_id: int) -> List[Tuple[int, float]]:
+        """Return ``(book_id, similarity)`` for books whose title and author resemble ``book_id``'s, best first."""
+        entry = self._entry_for_book.get(book_id)
+        if entry is None:
+            return []
+        return self.similar_to(self.token_sets[entry], exclude_book_id=book_id)
+
+    def groups(self) -> List[Dict]:
+        """Return groups of near-duplicate books as ``{"book_ids": [...], "similarity": float}``, largest first."""
+        parent = list(range(len(self.token_sets)))
+        best_similarity = defaultdict(float)
+
+        def find(entry):
+            while parent[entry] != entry:
+                parent[entry] = parent[parent[entry]]
+                entry = parent[entry]
+            return entry
+
+        compared = set()
+        for members in self._bucket_members:
+            for bucket_entries in members.values():
+                for position, entry in enumerate(bucket_entries):
+                    for other in bucket_entries[position + 1 :]:
+                        if (entry, other) in compared:
+                            continue
+                        compared.add((entry, other))
+                        similarity = jaccard(self.token_sets[entry], self.token_sets[other])
+                        if similarity >= self.threshold:
+                            root, other_root = find(entry), find(other)
+                            if root != other_root:
+                                parent[other_root] = root
+                            best_similarity[entry] = max(best_similarity[entry], similarity)
+                            best_similarity[other] = max(best_similarity[other], similarity)
+
+        grouped = defaultdict(list)
+        for entry, book_ids in enumerate(self.book_ids):
+            if len(book_ids) > 1 or entry in best_similarity:
+                grouped[find(entry)].append(entry)
+
+        groups = []
+        for entries in grouped.values():
+            book_ids = sorted(book_id for entry in entries for book_id in self.book_ids[entry])
+            if len(book_ids) < 2:
+                continue
+            similarity = min(best_similarity.get(entry, 1.0) for entry in entries) if len(entries) > 1 else 1.0
+            groups.append({"book_ids": book_ids, "similarity": round(similarity, 3)})
+
+        return sorted(groups, key=lambda group: (-len(group["book_ids"]), group["book_ids"][0]))
+
+
+def build_duplicate_index(threshold: float = NEAR_DUPLICATE_THRESHOLD) -> DuplicateIndex:
+    """Build a near-duplicate index over live books with final metadata that aren't already marked as duplicates."""
+    from books.models import FinalMetadata
+
+    rows = (
+        FinalMetadata.objects.filter(book__is_placeholder=False, book__is_duplicate=False, book__deleted_at__isnull=True)
+        .values_list("book_id", "final_title", "final_author")
+        .order_by("book_id")
+        .iterator(chunk_size=5000)
+    )
+    return DuplicateIndex(rows, threshold=threshold)
+
+
+_index = None
+_index_generation = None
+_index_built_at = 0.0
+_rebuild_running = False
+_build_lock = threading.Lock()
+_state_lock = threading.Lock()
+
+
+def invalidate_duplicate_index():
+    """Mark the cached near-duplicate index as stale in every process."""
+    cache.set(INDEX_GENERATION_CACHE_KEY, uuid.uuid4().hex, None)
+
+
+def _current_generation() -> str:
+    generation = cache.get(INDEX_GENERATION_CACHE_KEY)
+    if generation is None:
+        cache.add(INDEX_GENERATION_CACHE_KEY, uuid.uuid4().hex, None)
+        generation = cache.get(INDEX_GENERATION_CACHE_KEY)
+    return generation
+
+
+def get_duplicate_index() -> DuplicateIndex:
+    """Return the process-wide near-duplicate index, rebuilding it first if the library changed."""
+    global _index, _index_generation, _index_built_at
+
+    generation = _current_generation()
+    with _build_lock:
+        if _index is None or generation != _index_generation:
+            index = build_duplicate_index()
+            with _state_lock:
+                _index, _index_generation, _index_built_at = index, generation, time.monotonic()
+            logger.debug(f"[DUPLICATES] Built near-duplicate index over {len(index)} books")
+        return _index
+
+
+def _rebuild_in_background():
+    global _rebuild_running
+    try:
+        get_duplicate_index()
+    except Exception as e:
+        logger.warning(f"[DUPLICATES] Could not rebuild the near-duplicate index: {e}")
+    finally:
+        with _state_lock:
+            _rebuild_running = False
+        close_old_connections()
+
+
+def get_cached_duplicate_index() -> Optional[DuplicateIndex]:
+    """
+    Return the last built near-duplicate index without waiting for a rebuild.
+
+    A stale index is refreshed in a background thread, at most once every
+    ``DUPLICATE_INDEX_REBUILD_INTERVAL`` seconds, and served until the new one
+    is ready. Returns None until the first build finishes.
+    """
+    global _rebuild_running
+
+    if not getattr(settings, "DUPLICATE_INDEX_BACKGROUND", True):
+        return get_duplicate_index()
+
+    generation = _current_generation()
+    with _state_lock:
+        index = _index
+        stale = index is None or generation != _index_generation
+        interval = getattr(settings, "DUPLICATE_INDEX_REBUILD_INTERVAL", 60)
+        if not stale or _rebuild_running or (index is not None and time.monotonic() - _index_built_at < interval):
+            return index
+        _rebuild_running = True
+
+    threading.Thread(target=_rebuild_in_background, name="duplicate-index-rebuild", daemon=True).start()
+    return index
+
+
+def exact_duplicate_groups() -> List[Dict]:
+    """Return groups of books whose files have identical content, as ``{"content_hash", "book_ids"}``."""
+    from django.db.models import Count
+
+    from books.models import BookFile
+
+    live_files = BookFile.objects.exclude(content_hash="").filter(book__is_placeholder=False, book__is_duplicate=False, book__deleted_at__isnull=True)
+    shared_hashes = live_files.values("content_hash").annotate(book_count=Count("book", distinct=True)).filter(book_count__gt=1).values("content_hash")
+
+    groups = defaultdict(set)
+    for content_hash, book_id in live_files.filter(content_hash__in=shared_hashes).values_list("content_hash", "book_id").iterator(chunk_size=5000):
+        groups[content_hash].add(book_id)
+
+    return [{"content_hash": content_hash, "book_ids": sorted(book_ids)} for content_hash, book_ids in sorted(groups.items())]
+
+
+def find_duplicate_groups() -> Dict[str, List[Dict]]:
+    """Full-library duplicate report: exact content matches and near-duplicate title/author groups."""
+    exact = exact_duplicate_groups()
+    exact_sets = {frozenset(group["book_ids"]) for group in exact}
+    similar = [group for group in get_duplicate_index().groups() if frozenset(group["book_ids"]) not in exact_sets]
+    return {"exact": exact, "similar": similar}
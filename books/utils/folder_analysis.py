@@ -0,0 +1,281 @@
+"""
+Bounded-cost media analysis of library folders for the setup wizard.
+
+A folder is sampled breadth first with ``os.scandir`` until it has been read
+completely or the entry or time budget runs out, so a huge or slow (network)
+tree costs the same as a small one. File extensions are classified with a
+single dict lookup.
+
+Analyses run on daemon threads and write their partial counts to the cache as
+they go; the wizard polls ``wizard_folder_analysis`` for them. Results are
+cached per folder path and modification time of the folder itself, so later
+wizard steps and the first scan of the folder reuse them instead of walking
+the tree again. Files added deeper in the tree do not change the folder's
+modification time; ``FOLDER_ANALYSIS_CACHE_TIMEOUT`` bounds how long such an
+analysis is reused.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from books.models import AUDIOBOOK_FORMATS, COMIC_FORMATS, EBOOK_FORMATS
+from books.utils.cache_key import make_cache_key
+
+logger = logging.getLogger("books.scanner")
+
+# Entries read between two partial results written to the cache
+PROGRESS_INTERVAL = 500
+# Entries read between two checks of the time budget
+CLOCK_INTERVAL = 64
+MAX_DEPTH = 8
+
+
+def _build_extension_map() -> Dict[str, tuple]:
+    """Extension (with dot) -> (category, format bucket) for every supported media format."""
+    extensions = {}
+    for fmt in AUDIOBOOK_FORMATS:
+        bucket = "m4a" if fmt in ("m4a", "m4b") else fmt if fmt in ("mp3", "aac", "flac") else "other"
+        extensions[f".{fmt}"] = ("audiobooks", bucket)
+    for fmt in COMIC_FORMATS:
+        extensions[f".{fmt}"] = ("comics", fmt)
+    for fmt in EBOOK_FORMATS:
+        bucket = "mobi" if fmt in ("mobi", "azw", "azw3") else fmt if fmt in ("epub", "pdf") else "other"
+        extensions[f".{fmt}"] = ("ebooks", bucket)
+    return extensions
+
+
+# PDF is listed as an ebook and a comic format; it counts as an ebook unless the folder name says otherwise
+MEDIA_EXTENSIONS = _build_extension_map()
+
+
+def _is_comic_folder(path: str) -> bool:
+    lowered = path.lower()
+    return "comic" in lowered or "manga" in lowered
+
+
+def empty_analysis() -> dict:
+    return {
+        "ebooks": {"total": 0, "formats": {"epub": 0, "mobi": 0, "azw": 0, "pdf": 0, "other": 0}},
+        "comics": {"total": 0, "formats": {"cbr": 0, "cbz": 0, "cb7": 0, "cbt": 0, "pdf": 0}},
+        "audiobooks": {"total": 0, "formats": {"mp3": 0, "m4a": 0, "m4b": 0, "aac": 0, "flac": 0, "other": 0}},
+        "total_files": 0,
+        "entries_checked": 0,
+        "suggested_type": "ebooks",
+        "complete": False,
+        "truncated": False,
+    }
+
+
+def suggest_content_type(analysis: dict, folder_path: str) -> str:
+    """Content type with the most files, falling back to hints in the folder name."""
+    ebooks, comics, audiobooks = (analysis[category]["total"] for category in ("ebooks", "comics", "audiobooks"))
+    if comics > ebooks and comics > audiobooks:
+        return "comics"
+    if audiobooks > ebooks:
+        return "audiobooks"
+    if _is_comic_folder(folder_path):
+        return "comics"
+    lowered = folder_path.lower()
+    if "audio" in lowered or "audiobook" in lowered:
+        return "audiobooks"
+    return "ebooks"
+
+
+def analyze_folder(
+    folder_path: str,
+    time_budget: float = 2.0,
+    entry_budget: int = 20000,
+    max_depth: int = MAX_DEPTH,
+    on_progress: Optional[Callable[[dict], None]] = None,
+) -> dict:
+    """
+    Count media files under ``folder_path`` within the given budgets.
+
+    ``on_progress`` receives the partial analysis every ``PROGRESS_INTERVAL``
+    entries. Unreadable subfolders are skipped.
+
+    Returns:
+        Analysis dict; ``truncated`` is set when a budget ran out first
+
+    Raises:
+        OSError: if ``folder_path`` itself cannot be read
+    """
+    analysis = empty_analysis()
+    deadline = time.monotonic() + time_budget
+    comic_folder = _is_comic_folder(folder_path)
+    pending = deque([(folder_path, 0)])
+    entries = 0
+
+    while pending:
+        directory, depth = pending.popleft()
+        try:
+            iterator = os.scandir(directory)
+        except OSError:
+            if directory == folder_path:
+                raise
+            continue
+
+        with iterator:
+            for entry in iterator:
+                entries += 1
+                if entries >= entry_budget or (entries % CLOCK_INTERVAL == 0 and time.monotonic() > deadline):
+                    analysis["truncated"] = True
+                    pending.clear()
+                    break
+                if on_progress and entries % PROGRESS_INTERVAL == 0:
+                    analysis["entries_checked"] = entries
+                    on_progress(analysis)
+
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if depth + 1 < max_depth:
+                            pending.append((entry.path, depth + 1))
+                        continue
+                except OSError:
+                    continue
+
+                classification = MEDIA_EXTENSIONS.get(os.path.splitext(entry.name)[1].lower())
+                if classification is None:
+                    continue
+                category, bucket = classification
+                if bucket == "pdf" and comic_folder:
+                    category = "comics"
+                analysis[category]["formats"][bucket] += 1
+                analysis[category]["total"] += 1
+                analysis["total_files"] += 1
+
+    analysis["entries_checked"] = entries
+    analysis["suggested_type"] = suggest_content_type(analysis, folder_path)
+    analysis["complete"] = True
+    return analysis
+
+
+def format_file_count(analysis: dict):
+    """File count for display: ``"N+"`` when the analysis stopped early."""
+    total = analysis["total_files"]
+    return f"{total}+" if analysis["truncated"] and total else total
+
+
+def _analysis_cache_key(folder_path: str) -> Optional[str]:
+    try:
+        mtime = os.stat(folder_path).st_mtime_ns
+    except OSError:
+        return None
+    return make_cache_key("folder_analysis", os.path.normpath(folder_path), str(mtime))
+
+
+def get_cached_analysis(folder_path: str) -> Optional[dict]:
+    """Latest analysis of ``folder_path`` in its current state, possibly partial, or None."""
+    key = _analysis_cache_key(folder_path)
+    return cache.get(key) if key else None
+
+
+class FolderAnalyzer:
+    """Runs folder analyses on daemon threads, at most one per folder at a time."""
+
+    def __init__(self, time_budget: float = 2.0, entry_budget: int = 20000, cache_timeout: int = 3600, background: bool = True):
+        self.time_budget = time_budget
+        self.entry_budget = entry_budget
+        self.cache_timeout = cache_timeout
+        self.background = background
+        self._running: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def start(self, folder_path: str, wait: float = 0.0) -> dict:
+        """
+        Start analysing ``folder_path`` unless a current analysis is cached or running.
+
+        Waits up to ``wait`` seconds for the analysis to finish, so small
+        folders are answered in one request.
+
+        Returns:
+            The cached analysis, possibly partial
+
+        Raises:
+            OSError: if the folder cannot be read
+        """
+        key = _analysis_cache_key(folder_path)
+        if key is None:
+            raise FileNotFoundError(f"Folder not found: {folder_path}")
+
+        analysis = cache.get(key)
+        if analysis and analysis["complete"]:
+            return analysis
+
+        if not self.background:
+            return self._run(folder_path, key)
+
+        with self._lock:
+            done = self._running.get(key)
+            if done is None:
+                # Surface permission errors on the folder itself to the caller
+                os.scandir(folder_path).close()
+                done = self._running[key] = threading.Event()
+                cache.set(key, empty_analysis(), self.cache_timeout)
+                threading.Thread(target=self._run_in_thread, args=(folder_path, key, done), name="folder-analysis", daemon=True).start()
+
+        if wait:
+            done.wait(wait)
+        return cache.get(key) or empty_analysis()
+
+    def analyze(self, folder_path: str) -> dict:
+        """
+        Complete analysis of ``folder_path``, waiting for a running one up to the time budget.
+
+        Returns an empty analysis for folders that cannot be read.
+        """
+        try:
+            analysis = self.start(folder_path, wait=self.time_budget + 1)
+        except OSError:
+            analysis = empty_analysis()
+            analysis.update(suggested_type=suggest_content_type(analysis, folder_path), complete=True)
+            return analysis
+        if not analysis["complete"]:
+            # The background job is stuck on a slow filesystem; answer from a fresh bounded pass
+            analysis = self._run(folder_path, _analysis_cache_key(folder_path))
+        return analysis
+
+    def _run(self, folder_path: str, key: Optional[str]) -> dict:
+        def publish(partial):
+            cache.set(key, partial, self.cache_timeout)
+
+        analysis = analyze_folder(folder_path, self.time_budget, self.entry_budget, on_progress=publish if key else None)
+        if key:
+            publish(analysis)
+        return analysis
+
+    def _run_in_thread(self, folder_path: str, key: str, done: threading.Event):
+        try:
+            self._run(folder_path, key)
+        except Exception as e:
+            logger.warning(f"Folder analysis of {folder_path} failed: {e}")
+            cache.delete(key)
+        finally:
+            done.set()
+            with self._lock:
+                self._running.pop(key, None)
+
+
+_analyzer = None
+_analyzer_lock = threading.Lock()
+
+
+def get_folder_analyzer() -> FolderAnalyzer:
+    """Return the process-wide folder analyzer."""
+    global _analyzer
+    with _analyzer_lock:
+        if _analyzer is None:
+            _analyzer = FolderAnalyzer(
+                time_budget=getattr(settings, "FOLDER_ANALYSIS_TIME_BUDGET", 2.0),
+                entry_budget=getattr(settings, "FOLDER_ANALYSIS_ENTRY_BUDGET", 20000),
+                cache_timeout=getattr(settings, "FOLDER_ANALYSIS_CACHE_TIMEOUT", 3600),
+                background=getattr(settings, "FOLDER_ANALYSIS_BACKGROUND", True),
+            )
+        return _analyzer
@@ -0,0 +1,139 @@
+"""
+Background reconciliation of scan folder progress counters.
+
+``ScanFolder.file_count`` and ``book_count`` are kept current as the library
+changes: the scanner stores the number of files it collected, the watcher
+applies per-file deltas and book signals count created and deleted books.
+Anything that slips past those (files copied in while nothing was watching,
+bulk database changes) is corrected here by recounting on disk, in a daemon
+thread or from the ``reconcile_folder_counts`` command, so the progress
+endpoints never walk a folder on the request path.
+"""
+
+import logging
+import queue
+import threading
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger("books.scanner")
+
+
+def reconcile_folder_counts(folders=None, max_age: Optional[float] = None) -> int:
+    """
+    Recount files and books for scan folders.
+
+    Args:
+        folders: Folders to recount (default: all active folders)
+        max_age: Only recount folders whose counts are missing or older than
+            this many seconds (default: recount all)
+
+    Returns:
+        Number of folders recounted
+    """
+    from books.models import ScanFolder
+
+    if folders is None:
+        folders = ScanFolder.objects.filter(is_active=True)
+
+    reconciled = 0
+    for folder in folders:
+        if max_age is not None and not folder.counts_are_stale(max_age):
+            continue
+        try:
+            folder.refresh_counts()
+            reconciled += 1
+        except Exception as e:
+            logger.warning(f"[FOLDER COUNTS] Failed to recount {folder.path}: {e}")
+    return reconciled
+
+
+class FolderCountReconciler:
+    """Queue of scan folders recounted one at a time by a daemon thread."""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def enqueue(self, folder_ids: Iterable[int]) -> int:
+        """
+        Queue folders for a recount; folders already queued are ignored.
+
+        Returns:
+            Number of folders newly queued
+        """
+        queued = 0
+        for folder_id in folder_ids:
+            with self._lock:
+                if folder_id in self._pending:
+                    continue
+                self._pending.add(folder_id)
+            self._queue.put(folder_id)
+            queued += 1
+
+        if queued:
+            self._ensure_worker()
+        return queued
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="folder-count-reconciler", daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        from books.models import ScanFolder
+
+        while True:
+            folder_id = self._queue.get()
+            try:
+                folder = ScanFolder.objects.filter(pk=folder_id).first()
+                if folder is not None:
+                    reconcile_folder_counts([folder])
+            except Exception as e:
+                logger.warning(f"[FOLDER COUNTS] Reconciliation of folder {folder_id} failed: {e}")
+            finally:
+                with self._lock:
+                    self._pending.discard(folder_id)
+                self._queue.task_done()
+                close_old_connections()
+
+    def join(self):
+        """Block until every queued folder has been recounted."""
+        self._queue.join()
+
+
+_reconciler = None
+_reconciler_lock = threading.Lock()
+
+
+def get_folder_count_reconciler() -> FolderCountReconciler:
+    """Return the process-wide folder count reconciler."""
+    global _reconciler
+    with _reconciler_lock:
+        if _reconciler is None:
+            _reconciler = FolderCountReconciler()
+        return _reconciler
+
+
+def request_stale_recounts(folders) -> int:
+    """
+    Queue background recounts for folders whose counts are missing or older than FOLDER_COUNTS_MAX_AGE.
+
+    Returns:
+        Number of folders queued (0 when FOLDER_COUNTS_RECONCILE_ENABLED is off)
+    """
+    if not getattr(settings, "FOLDER_COUNTS_RECONCILE_ENABLED", True):
+        return 0
+
+    max_age = getattr(settings, "FOLDER_COUNTS_MAX_AGE", 24 * 3600)
+    stale = [folder.pk for folder in folders if folder.counts_are_stale(max_age)]
+    return get_folder_count_reconciler().enqueue(stale) if stale else 0
@@ -5,11 +5,32 @@ book cover images for display and storage operations.
 """
 
 import base64
+import logging
 import os
+import re
+import struct
+from typing import Optional, Tuple
 
 import requests
 from django.conf import settings
+from django.core.cache import cache
 from django.utils.text import slugify
+from PIL import ImageFile
+
+from books.utils.cache_key import make_cache_key
+
+logger = logging.getLogger("books.scanner")
+
+PROBE_RANGE_BYTES = 32 * 1024  # Enough for the headers of nearly all covers
+PROBE_MAX_BYTES = 512 * 1024  # Give up on headers larger than this (huge EXIF/ICC blocks)
+PROBE_CHUNK_SIZE = 8192
+PROBE_CACHE_TIMEOUT = 7 * 24 * 3600
+PROBE_FAILURE_CACHE_TIMEOUT = 3600
+
+# JPEG start-of-frame markers carry the dimensions; C4 (DHT), C8 (JPG) and CC (DAC) are not frames
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+_JPEG_STANDALONE_MARKERS = frozenset(range(0xD0, 0xDA)) | {0x01}
+_CONTENT_RANGE_RE = re.compile(r"bytes\s+\d+-\d+/(\d+)")
 
 
 def download_and_store_cover(candidate):
@@ -39,3 +60,138 @@ def encode_cover_to_base64(path):
     except Exception as e:
         print(f"Error encoding image: {e}")
         return ""
+
+
+def _jpeg_dimensions(data: bytes) -> Optional[Tuple[int, int]]:
+    position = 2
+    while position + 9 <= len(data):
+        if data[position] != 0xFF:
+            position += 1
+            continue
+        marker = data[position + 1]
+        if marker == 0xFF:  # Fill byte
+            position += 1
+            continue
+        if marker in _JPEG_STANDALONE_MARKERS:
+            position += 2
+            continue
+        if marker in _JPEG_SOF_MARKERS:
+            height, width = struct.unpack(">HH", data[position + 5 : position + 9])
+            return width, height
+        (segment_length,) = struct.unpack(">H", data[position + 2 : position + 4])
+        position += 2 + segment_length
+    return None
+
+
+def _webp_dimensions(data: bytes) -> Optional[Tuple[int, int]]:
+    chunk = data[12:16]
+    if chunk == b"VP8 " and len(data) >= 30:
+        width, height = struct.unpack("<HH", data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and len(data) >= 25:
+        bits = int.from_bytes(data[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X" and len(data) >= 30:
+        return int.from_bytes(data[24:27], "little") + 1, int.from_bytes(data[27:30], "little") + 1
+    return None
+
+
+def read_image_header(data: bytes) -> Optional[Tuple[int, int, str]]:
+    """
+    Read ``(width, height, format)`` from the first bytes of a JPEG, PNG, WebP or GIF image.
+
+    Returns None if the format isn't recognised or ``data`` stops before the dimensions.
+    """
+    if data[:8] == b"\x89PNG\r\n\x1a\n" and data[12:16] == b"IHDR" and len(data) >= 24:
+        width, height = struct.unpack(">II", data[16:24])
+        return width, height, "png"
+
+    if data[:6] in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+        width, height = struct.unpack("<HH", data[6:10])
+        return width, height, "gif"
+
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        dimensions = _webp_dimensions(data)
+        return (*dimensions, "webp") if dimensions else None
+
+    if data[:2] == b"\xff\xd8":
+        dimensions = _jpeg_dimensions(data)
+        return (*dimensions, "jpeg") if dimensions else None
+
+    return None
+
+
+def read_image_header_with_pil(data: bytes) -> Optional[Tuple[int, int, str]]:
+    """Fallback for formats ``read_image_header`` doesn't know; PIL only needs the header too."""
+    parser = ImageFile.Parser()
+    try:
+        parser.feed(data)
+    except Exception:
+        return None
+    if parser.image is None or not parser.image.format:
+        return None
+    width, height = parser.image.size
+    return width, height, parser.image.format.lower()
+
+
+def _total_size(response) -> Optional[int]:
+    content_range = _CONTENT_RANGE_RE.match(response.headers.get("Content-Range", ""))
+    if content_range:
+        return int(content_range.group(1))
+    if response.status_code == 200 and response.headers.get("Content-Length", "").isdigit():
+        return int(response.headers["Content-Length"])
+    return None
+
+
+def _read_remote_header(url: str, timeout: int, byte_range: bool) -> Tuple[bytes, Optional[Tuple[int, int, str]], Optional[int], bool]:
+    """Stream ``url`` until its header parses; returns the bytes read, the header, the total size and whether the body was exhausted."""
+    headers = {"Range": f"bytes=0-{PROBE_RANGE_BYTES - 1}"} if byte_range else None
+    with requests.get(url, headers=headers, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        total_size = _total_size(response)
+
+        data = b""
+        header = None
+        exhausted = True
+        for chunk in response.iter_content(PROBE_CHUNK_SIZE):
+            data += chunk
+            header = read_image_header(data)
+            if header or len(data) >= PROBE_MAX_BYTES:
+                exhausted = False
+                break
+
+        partial = response.status_code == 206 and (total_size is None or len(data) < total_size)
+        return data, header, total_size, exhausted and not partial
+
+
+def probe_remote_image(url: str, timeout: int = 10) -> Tuple[Optional[int], Optional[int], Optional[int], Optional[str]]:
+    """
+    Get ``(width, height, file_size, format)`` of a remote image without downloading all of it.
+
+    Only the first few kilobytes are requested with an HTTP Range header; servers
+    that ignore it are read as a stream that stops once the header has been
+    parsed. ``file_size`` comes from Content-Range/Content-Length and is None if
+    the server sends neither. Results (including failures, for a shorter time)
+    are cached by URL.
+    """
+    cache_key = f"image_probe:{make_cache_key(url)}"
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return tuple(cached)
+
+    result = (None, None, None, None)
+    try:
+        data, header, total_size, exhausted = _read_remote_header(url, timeout, byte_range=True)
+        if header is None and not exhausted and len(data) < PROBE_MAX_BYTES:
+            # The range ended before the dimensions (large metadata blocks) - read on without a range
+            data, header, total_size, exhausted = _read_remote_header(url, timeout, byte_range=False)
+        header = header or read_image_header_with_pil(data)
+
+        if header:
+            width, height, image_format = header
+            result = (width, height, total_size or (len(data) if exhausted else None), image_format)
+    except Exception as e:
+        logger.warning(f"Image probe failed for {url}: {e}")
+
+    cache.set(cache_key, result, PROBE_CACHE_TIMEOUT if result[3] else PROBE_FAILURE_CACHE_TIMEOUT)
+    return result
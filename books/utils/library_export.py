@@ -0,0 +1,215 @@
+"""
+Streaming library export.
+
+Exports the curated metadata of every book (``FinalMetadata``) with its primary
+file as CSV, JSON Lines or an OPF collection (one OPF ``package`` per book in a
+single XML document). Rows are read with ``.iterator(chunk_size=...)`` and
+exported a chunk at a time: each chunk costs one query for the primary files
+and one for the genres, and nothing but the current chunk is held in memory,
+so the same generator backs both the streaming download and the
+``export_library`` command.
+"""
+
+import csv
+import io
+import json
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List
+
+from lxml import etree as ET
+
+from books.models import BookFile, BookGenre, FinalMetadata
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# Export key -> CSV header
+FIELDS = [
+    ("book_id", "Book ID"),
+    ("title", "Title"),
+    ("author", "Author"),
+    ("genres", "Genre"),
+    ("series", "Series"),
+    ("series_number", "Series Number"),
+    ("publisher", "Publisher"),
+    ("publication_year", "Year"),
+    ("language", "Language"),
+    ("isbn", "ISBN"),
+    ("content_type", "Content Type"),
+    ("file_format", "Format"),
+    ("file_path", "File Path"),
+    ("file_size", "File Size"),
+    ("date_added", "Date Added"),
+    ("is_reviewed", "Reviewed"),
+    ("description", "Description"),
+]
+
+# Format -> (content type, file extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "jsonl": ("application/x-ndjson", "jsonl"),
+    "opf": ("application/xml", "opf.xml"),
+}
+
+_METADATA_COLUMNS = {
+    "book_id": "book_id",
+    "title": "final_title",
+    "author": "final_author",
+    "series": "final_series",
+    "series_number": "final_series_number",
+    "publisher": "final_publisher",
+    "publication_year": "publication_year",
+    "language": "language",
+    "isbn": "isbn",
+    "description": "description",
+    "is_reviewed": "is_reviewed",
+    "content_type": "book__content_type",
+    "date_added": "book__first_scanned",
+}
+
+OPF_NS = "http://www.idpf.org/2007/opf"
+DC_NS = "http://purl.org/dc/elements/1.1/"
+
+
+def export_queryset():
+    """Curated metadata of the books in the library (not deleted, not placeholders), in book order."""
+    return FinalMetadata.objects.filter(book__deleted_at__isnull=True, book__is_placeholder=False).order_by("book_id")
+
+
+def _chunks(iterable: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _primary_files(book_ids: List[int]) -> Dict[int, dict]:
+    """First file of each book in BookFile's own order (chapter, then track)."""
+    files = {}
+    rows = BookFile.objects.filter(book_id__in=book_ids).order_by("book_id", "chapter_sort", "track_number", "id").values("book_id", "file_path", "file_format", "file_size")
+    for row in rows:
+        files.setdefault(row["book_id"], row)
+    return files
+
+
+def _genres(book_ids: List[int]) -> Dict[int, List[str]]:
+    genres: Dict[int, List[str]] = {}
+    rows = BookGenre.objects.filter(book_id__in=book_ids, is_active=True).order_by("book_id", "-confidence", "genre__name").values_list("book_id", "genre__name")
+    for book_id, name in rows:
+        names = genres.setdefault(book_id, [])
+        if name not in names:
+            names.append(name)
+    return genres
+
+
+def iter_export_chunks(queryset=None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[dict]]:
+    """
+    Yield export rows a chunk at a time.
+
+    Args:
+        queryset: FinalMetadata queryset to export (default: ``export_queryset()``)
+        chunk_size: Rows per chunk; also the database fetch size
+
+    Yields:
+        Lists of row dicts keyed by the names in ``FIELDS``
+    """
+    queryset = export_queryset() if queryset is None else queryset
+    rows = queryset.values(*_METADATA_COLUMNS.values()).iterator(chunk_size=chunk_size)
+
+    for chunk in _chunks(rows, chunk_size):
+        book_ids = [row["book_id"] for row in chunk]
+        files = _primary_files(book_ids)
+        genres = _genres(book_ids)
+
+        export_rows = []
+        for row in chunk:
+            record = {key: row[column] for key, column in _METADATA_COLUMNS.items()}
+            primary = files.get(record["book_id"], {})
+            record.update(
+                genres=genres.get(record["book_id"], []),
+                file_path=primary.get("file_path"),
+                file_format=primary.get("file_format"),
+                file_size=primary.get("file_size"),
+                date_added=record["date_added"].isoformat() if record["date_added"] else None,
+            )
+            export_rows.append(record)
+        yield export_rows
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return "; ".join(value)
+    return value
+
+
+def _opf_package(row: dict) -> bytes:
+    package = ET.Element(f"{{{OPF_NS}}}package", attrib={"version": "2.0", "unique-identifier": "BookId"}, nsmap={"opf": OPF_NS, "dc": DC_NS})
+    metadata = ET.SubElement(package, f"{{{OPF_NS}}}metadata")
+
+    def dc(name, value, **attrib):
+        if value not in (None, ""):
+            element = ET.SubElement(metadata, f"{{{DC_NS}}}{name}", attrib=attrib)
+            element.text = str(value).strip()
+
+    dc("identifier", row["isbn"] or f"ebook-manager-{row['book_id']}", id="BookId")
+    dc("title", row["title"] or "Unknown Title")
+    dc("creator", row["author"] or "Unknown Author", **{f"{{{OPF_NS}}}role": "aut"})
+    dc("language", row["language"] or "en")
+    dc("publisher", row["publisher"])
+    dc("date", row["publication_year"])
+    dc("description", row["description"])
+    for genre in row["genres"]:
+        dc("subject", genre)
+
+    for name, value in (("calibre:series", row["series"]), ("calibre:series_index", row["series_number"]), ("ebook-manager:file_path", row["file_path"])):
+        if value not in (None, ""):
+            ET.SubElement(metadata, f"{{{OPF_NS}}}meta", attrib={"name": name, "content": str(value)})
+
+    return ET.tostring(package, encoding="utf-8")
+
+
+def stream_library_export(export_format: str, queryset=None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Serialize the library export in ``export_format`` (``csv``, ``jsonl`` or ``opf``).
+
+    Yields:
+        Encoded output, one piece per chunk of rows (plus header and footer)
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([header for _, header in FIELDS])
+        for chunk in iter_export_chunks(queryset, chunk_size):
+            writer.writerows([_csv_value(row[key]) for key, _ in FIELDS] for row in chunk)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+
+    elif export_format == "jsonl":
+        for chunk in iter_export_chunks(queryset, chunk_size):
+            yield "".join(json.dumps({key: row[key] for key, _ in FIELDS}, ensure_ascii=False) + "\n" for row in chunk).encode("utf-8")
+
+    else:
+        yield f'<?xml version="1.0" encoding="utf-8"?>\n<collection xmlns:opf="{OPF_NS}" xmlns:dc="{DC_NS}">\n'.encode("utf-8")
+        for chunk in iter_export_chunks(queryset, chunk_size):
+            yield b"".join(_opf_package(row) + b"\n" for row in chunk)
+        yield b"</collection>\n"
+
+
+def write_library_export(output, export_format: str, queryset=None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Write the library export to a binary file object.
+
+    Returns:
+        Number of bytes written
+    """
+    written = 0
+    for piece in stream_library_export(export_format, queryset=queryset, chunk_size=chunk_size):
+        output.write(piece)
+        written += len(piece)
+    return written
@@ -0,0 +1,271 @@
+"""
+Indexed quick search for the navigation search box.
+
+Book titles (``FinalMetadata.final_title``), author, series and genre names
+are split into normalized words stored in ``SearchToken``. A query matches a
+name when every query word is a prefix of one of its words; the longest word
+is looked up as a ``token >= prefix AND token < successor`` range, which uses
+the token index on every backend (SQLite never uses an index for ``LIKE``),
+and the remaining words are checked with ``EXISTS`` lookups on the
+``(kind, object_id, token)`` index.
+
+The index is updated after commit by the signals in ``books.signals`` and
+rebuilt with the ``rebuild_search_index`` command. Matches are ranked in SQL
+(names starting with the query, then shorter names) before the candidate list
+is cut, so a large match set never pushes the best names out.
+
+Results are cached per user and query. The cache key includes the highest
+token id and the token count: every index update writes new rows with higher
+ids or removes rows, so the key changes in every process as soon as the index
+does, including updates made by management commands.
+"""
+
+import logging
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, Count, Exists, IntegerField, Max, OuterRef, Q, Value, When
+from django.db.models.functions import Length
+
+from books.utils.cache_key import make_cache_key
+
+logger = logging.getLogger("books.scanner")
+
+MIN_QUERY_LENGTH = 2
+MAX_TOKEN_LENGTH = 50
+RESULT_CACHE_TIMEOUT = 300
+
+# Kind -> results shown
+RESULT_LIMITS = {"book": 5, "author": 3, "genre": 3, "series": 3}
+# Best candidates fetched per kind before the final ranking by normalized label
+CANDIDATE_FACTOR = 4
+
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+
+def normalize_text(value: Optional[str]) -> str:
+    """Lowercase ``value``, strip accents and collapse punctuation to single spaces."""
+    decomposed = unicodedata.normalize("NFKD", (value or "").lower())
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(_NON_WORD_RE.split(stripped)).strip()
+
+
+def tokenize(value: Optional[str]) -> List[str]:
+    """Distinct normalized words of ``value`` in order of appearance."""
+    return list(dict.fromkeys(word[:MAX_TOKEN_LENGTH] for word in normalize_text(value).split()))
+
+
+def _prefix_range(prefix: str) -> Tuple[str, str]:
+    """``(low, high)`` such that ``low <= token < high`` holds exactly for tokens starting with ``prefix``."""
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def _prefix_filter(prefix: str) -> dict:
+    low, high = _prefix_range(prefix)
+    return {"token__gte": low, "token__lt": high}
+
+
+# Index maintenance
+
+
+def _token_rows(kind: str, object_id: int, label: Optional[str]):
+    from books.models import SearchToken
+
+    return [SearchToken(kind=kind, object_id=object_id, token=token) for token in tokenize(label)]
+
+
+def index_objects(entries: Iterable[Tuple[str, int, Optional[str]]]) -> None:
+    """Replace the words of each ``(kind, object_id, label)``; a label of None removes the object."""
+    from books.models import SearchToken
+
+    entries = list(entries)
+    if not entries:
+        return
+
+    by_kind: Dict[str, Set[int]] = {}
+    for kind, object_id, _label in entries:
+        by_kind.setdefault(kind, set()).add(object_id)
+
+    with transaction.atomic():
+        for kind, object_ids in by_kind.items():
+            SearchToken.objects.filter(kind=kind, object_id__in=object_ids).delete()
+        SearchToken.objects.bulk_create([row for kind, object_id, label in entries if label is not None for row in _token_rows(kind, object_id, label)], batch_size=1000)
+
+
+def _index_quietly(entries) -> None:
+    try:
+        index_objects(entries)
+    except Exception as e:
+        logger.warning(f"Could not update quick search index for {len(entries)} object(s): {e}")
+
+
+def schedule_index(kind: str, object_id: int, label: Optional[str]) -> None:
+    """
+    Update the words of one object once the current transaction commits.
+
+    Changes made in one transaction are written together by a single commit
+    hook, so bulk deletes cost one index update rather than one per row.
+    """
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        _index_quietly([(kind, object_id, label)])
+        return
+
+    flush = getattr(connection, "quick_search_flush", None)
+    # A rollback discards the hook; start a new batch rather than adding to an orphaned one
+    if flush is None or not any(hook is flush for _sids, hook, _robust in connection.run_on_commit):
+        pending: Dict[Tuple[str, int], Optional[str]] = {}
+
+        def flush():
+            connection.quick_search_flush = None
+            _index_quietly([(kind, object_id, label) for (kind, object_id), label in pending.items()])
+
+        flush.pending = pending
+        connection.quick_search_flush = flush
+        transaction.on_commit(flush)
+
+    flush.pending[(kind, object_id)] = label
+
+
+def rebuild_search_index(batch_size: int = 1000) -> int:
+    """
+    Rebuild the whole index from the searchable tables.
+
+    Returns:
+        Number of tokens written
+    """
+    from books.models import Author, FinalMetadata, Genre, SearchToken, Series
+
+    sources = [
+        (SearchToken.BOOK, FinalMetadata.objects.filter(book__deleted_at__isnull=True, book__is_placeholder=False).values_list("book_id", "final_title")),
+        (SearchToken.AUTHOR, Author.objects.values_list("id", "name")),
+        (SearchToken.SERIES, Series.objects.values_list("id", "name")),
+        (SearchToken.GENRE, Genre.objects.values_list("id", "name")),
+    ]
+
+    written = 0
+    with transaction.atomic():
+        SearchToken.objects.all().delete()
+        for kind, rows in sources:
+            batch = []
+            for object_id, label in rows.iterator(chunk_size=batch_size):
+                batch.extend(_token_rows(kind, object_id, label))
+                if len(batch) >= batch_size:
+                    written += len(SearchToken.objects.bulk_create(batch))
+                    batch = []
+            written += len(SearchToken.objects.bulk_create(batch))
+    return written
+
+
+def get_search_version() -> str:
+    """
+    Version of the index, read from the database so every process agrees on it.
+
+    Token ids are never reused, so any update that writes tokens raises the
+    highest id and any update that only removes tokens lowers the count.
+    """
+    from books.models import SearchToken
+
+    state = SearchToken.objects.aggregate(last_id=Max("id"), tokens=Count("id"))
+    return f"{state['last_id'] or 0}.{state['tokens']}"
+
+
+# Searching
+
+
+def _token_matches(kind: str, words: List[str]):
+    """Tokens of ``kind`` objects having a word starting with each of ``words``."""
+    from books.models import SearchToken
+
+    driver = max(words, key=len)
+    matches = SearchToken.objects.filter(kind=kind, **_prefix_filter(driver))
+    for word in words:
+        if word != driver:
+            matches = matches.filter(Exists(SearchToken.objects.filter(kind=kind, object_id=OuterRef("object_id"), **_prefix_filter(word))))
+    return matches
+
+
+def matching_ids(kind: str, query: str):
+    """All ids of ``kind`` matching ``query`` word by word, as a subquery for ``__in`` filters."""
+    from books.models import SearchToken
+
+    words = tokenize(query)
+    if not words:
+        return SearchToken.objects.none().values("object_id")
+    return _token_matches(kind, words).values("object_id")
+
+
+def matching_book_ids(query: str):
+    """Ids of books whose title or an active author matches ``query``, as a subquery for ``__in`` filters."""
+    from books.models import Book, BookAuthor, SearchToken
+
+    by_author = BookAuthor.objects.filter(author_id__in=matching_ids(SearchToken.AUTHOR, query), is_active=True).values("book_id")
+    return Book.objects.filter(Q(pk__in=matching_ids(SearchToken.BOOK, query)) | Q(pk__in=by_author)).values("pk")
+
+
+def _ranked_candidates(kind: str, words: List[str], query: str, limit: int) -> List[Tuple[int, str]]:
+    """
+    Best ``limit`` matches of ``kind`` as ``(id, label)``, ranked in SQL.
+
+    Labels starting with the query come first, then shorter labels. The SQL
+    comparison sees the stored label rather than its normalized form, so
+    ``_rank`` settles the final order of the candidates.
+    """
+    from books.models import Author, FinalMetadata, Genre, SearchToken, Series
+
+    if kind == SearchToken.BOOK:
+        rows = FinalMetadata.objects.filter(book_id__in=_token_matches(kind, words).values("object_id"), book__deleted_at__isnull=True, book__is_placeholder=False)
+        id_field, label_field = "book_id", "final_title"
+    else:
+        model = {SearchToken.AUTHOR: Author, SearchToken.SERIES: Series, SearchToken.GENRE: Genre}[kind]
+        rows = model.objects.filter(id__in=_token_matches(kind, words).values("object_id"))
+        id_field, label_field = "id", "name"
+
+    rows = rows.annotate(
+        leading=Case(When(**{f"{label_field}__istartswith": query}, then=Value(0)), default=Value(1), output_field=IntegerField()),
+        label_length=Length(label_field),
+    )
+    return list(rows.order_by("leading", "label_length", id_field).values_list(id_field, label_field)[:limit])
+
+
+def _rank(query: str, label: str) -> Tuple[int, int, str]:
+    """Names starting with the query first, then shorter names."""
+    normalized = normalize_text(label)
+    return (not normalized.startswith(query), len(normalized), normalized)
+
+
+def search(query: str) -> Dict[str, List[dict]]:
+    """
+    Search books, authors, genres and series by word prefixes.
+
+    Returns:
+        ``{"books": [{"id", "title"}], "authors": [{"id", "name"}], "genres": [...], "series": [...]}``
+    """
+    normalized = normalize_text(query)
+    words = tokenize(normalized)
+    results = {"books": [], "authors": [], "genres": [], "series": []}
+    if not words:
+        return results
+
+    for kind, limit in RESULT_LIMITS.items():
+        candidates = _ranked_candidates(kind, words, normalized, limit * CANDIDATE_FACTOR)
+        ranked = sorted(candidates, key=lambda item: _rank(normalized, item[1]))[:limit]
+        if kind == "book":
+            results["books"] = [{"id": object_id, "title": label} for object_id, label in ranked]
+        else:
+            results["series" if kind == "series" else f"{kind}s"] = [{"id": object_id, "name": label} for object_id, label in ranked]
+    return results
+
+
+def cached_search(user, query: str) -> Dict[str, List[dict]]:
+    """``search()`` cached per user and normalized query until the index changes."""
+    normalized = normalize_text(query)
+    key = make_cache_key("quick_search", str(getattr(user, "pk", "") or ""), str(get_search_version()), normalized)
+    results = cache.get(key)
+    if results is None:
+        results = search(normalized)
+        cache.set(key, results, RESULT_CACHE_TIMEOUT)
+    return results
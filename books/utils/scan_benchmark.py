@@ -0,0 +1,284 @@
+"""Scan benchmark runner.
+
+Times a full ``EbookScanner`` run over a library (usually one written by
+``books.utils.synthetic_library``) and reports machine-readable figures for
+regression tracking: files per second, database queries per file, peak RSS,
+and per-stage call counts, time and queries.
+
+Runs are isolated from the real library: the scan writes to a throwaway test
+database seeded with the default data sources, media and cache go to
+temporary locations, and every outgoing HTTP request is redirected to a
+local stub server that answers with empty search results. Rate-limit delays are disabled for the stub, since they model the
+remote services rather than local work.
+
+Stage figures are inclusive and stages can nest (content-type processing
+contains metadata extraction, for example), so they don't add up to the
+total.
+"""
+
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from importlib import import_module
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+import django
+from django.db import connection
+from django.test.utils import override_settings
+
+try:
+    import resource
+
+    HAS_RESOURCE = True
+except ImportError:  # Windows
+    HAS_RESOURCE = False
+
+# Stage name -> (module, function); patched where the scanner looks them up
+STAGES = {
+    "collect_files": ("books.scanner.folder", "_collect_files"),
+    "content_type_processing": ("books.scanner.content_processing", "process_files_by_type"),
+    "book_processing": ("books.scanner.folder", "_process_book"),
+    "cover_detection": ("books.scanner.folder", "_detect_and_extract_cover"),
+    "filename_metadata": ("books.scanner.folder", "_extract_filename_metadata"),
+    "internal_metadata": ("books.scanner.folder", "_extract_internal_metadata"),
+    "content_isbn": ("books.scanner.extractors.content_isbn", "save_content_isbns"),
+    "opf_metadata": ("books.scanner.extractors.opf", "extract"),
+    "external_metadata": ("books.scanner.folder", "query_metadata_and_covers"),
+    "final_metadata": ("books.scanner.folder", "resolve_final_metadata"),
+}
+
+# Top-level library folder -> ScanFolder content type
+CONTENT_FOLDERS = (("ebooks", "ebooks"), ("comics", "comics"), ("audiobooks", "audiobooks"))
+
+_EMPTY_RESULTS = json.dumps({"docs": [], "numFound": 0, "items": [], "totalItems": 0, "results": [], "number_of_total_results": 0, "status_code": 1, "error": "OK"}).encode()
+
+
+class _StubAPIHandler(BaseHTTPRequestHandler):
+    """Answers every API call with an empty result set and every image request with 404."""
+
+    def do_GET(self):
+        self.server.request_count += 1
+        if os.path.splitext(urlsplit(self.path).path)[1].lower() in (".jpg", ".jpeg", ".png", ".gif", ".webp"):
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        body = b"[]" if "apify" in self.headers.get("X-Original-Host", "") else _EMPTY_RESULTS
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        self.do_GET()
+
+    do_HEAD = do_GET
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def external_api_stub():
+    """Redirect all ``requests`` traffic to a local stub server; yields the server (``request_count``)."""
+    import requests
+
+    from books.scanner.rate_limiting import RateLimitConfig
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubAPIHandler)
+    server.request_count = 0
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, name="scan-benchmark-api-stub", daemon=True)
+    thread.start()
+
+    original_request = requests.sessions.Session.request
+
+    def redirected_request(session, method, url, *args, **kwargs):
+        parts = urlsplit(url)
+        headers = dict(kwargs.pop("headers", None) or {}, **{"X-Original-Host": parts.netloc})
+        return original_request(session, method, urlunsplit(("http", base[len("http://") :], parts.path, parts.query, "")), *args, headers=headers, **kwargs)
+
+    configs = [config for config in vars(RateLimitConfig).values() if isinstance(config, dict) and "base_delay" in config]
+    delays = [config["base_delay"] for config in configs]
+
+    requests.sessions.Session.request = redirected_request
+    for config in configs:
+        config["base_delay"] = 0
+    try:
+        yield server
+    finally:
+        requests.sessions.Session.request = original_request
+        for config, delay in zip(configs, delays):
+            config["base_delay"] = delay
+        server.shutdown()
+        server.server_close()
+
+
+class StageTimer:
+    """Wraps scanner stage functions to count calls, wall time and database queries."""
+
+    def __init__(self, stages: Dict[str, tuple] = STAGES):
+        self.stages = stages
+        self.stats = {name: {"calls": 0, "seconds": 0.0, "queries": 0} for name in stages}
+        self.queries = 0
+
+    def _count_query(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+    def _wrap(self, name, function):
+        stats = self.stats[name]
+
+        def timed(*args, **kwargs):
+            started, queries = time.perf_counter(), self.queries
+            try:
+                return function(*args, **kwargs)
+            finally:
+                stats["calls"] += 1
+                stats["seconds"] += time.perf_counter() - started
+                stats["queries"] += self.queries - queries
+
+        return timed
+
+    @contextmanager
+    def installed(self):
+        patched = []
+        try:
+            for name, (module_name, attribute) in self.stages.items():
+                module = import_module(module_name)
+                original = getattr(module, attribute)
+                setattr(module, attribute, self._wrap(name, original))
+                patched.append((module, attribute, original))
+            with connection.execute_wrapper(self._count_query):
+                yield self
+        finally:
+            for module, attribute, original in reversed(patched):
+                setattr(module, attribute, original)
+
+    def report(self, files: int) -> Dict[str, dict]:
+        return {
+            name: dict(stats, seconds=round(stats["seconds"], 4), queries_per_file=round(stats["queries"] / files, 2) if files else None)
+            for name, stats in self.stats.items()
+            if stats["calls"]
+        }
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MiB, where the platform reports it."""
+    if not HAS_RESOURCE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)  # bytes on macOS, KiB elsewhere
+
+
+def _content_folders(root: str) -> Iterable[tuple]:
+    folders = [(os.path.join(root, name), content_type) for name, content_type in CONTENT_FOLDERS if os.path.isdir(os.path.join(root, name))]
+    return folders or [(root, "ebooks")]
+
+
+def _measure(label: str, rescan: bool, external: bool) -> dict:
+    from books.models import Book, BookFile, ScanFolder
+    from books.scanner.folder import _collect_files
+    from books.scanner.scanner_engine import EbookScanner
+
+    files = 0
+    for folder in ScanFolder.objects.filter(is_active=True):
+        files += len(_collect_files(folder.path, folder.get_extensions(), set())[0])
+
+    timer = StageTimer()
+    with ExitStack() as stack:
+        stub = stack.enter_context(external_api_stub())
+        stack.enter_context(timer.installed())
+        if not external:
+            folder_module = import_module("books.scanner.folder")
+            stack.callback(setattr, folder_module, "query_metadata_and_covers", folder_module.query_metadata_and_covers)
+            folder_module.query_metadata_and_covers = lambda book: None
+
+        scanner = EbookScanner(rescan=rescan)
+        started = time.perf_counter()
+        scanner.run()
+        seconds = time.perf_counter() - started
+
+    return {
+        "run": label,
+        "files": files,
+        "books": Book.objects.count(),
+        "book_files": BookFile.objects.count(),
+        "seconds": round(seconds, 3),
+        "files_per_second": round(files / seconds, 2) if seconds else None,
+        "queries": timer.queries,
+        "queries_per_file": round(timer.queries / files, 2) if files else None,
+        "external_requests": stub.request_count,
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": timer.report(files),
+    }
+
+
+def run_scan_benchmark(root: str, include_rescan: bool = False, external: bool = True, isolate: bool = True) -> dict:
+    """
+    Scan the library at ``root`` and report throughput figures.
+
+    Args:
+        root: Library root; its ``ebooks``, ``comics`` and ``audiobooks`` folders
+            become scan folders of that content type (else ``root`` is one ebook folder)
+        include_rescan: Also time a rescan of the already-scanned library
+        external: Run the external metadata stage against the local stub (else skip it)
+        isolate: Scan into a throwaway test database (turn off only when already
+            running inside one, e.g. from a test case)
+
+    Returns:
+        JSON-serializable report with one entry per run
+    """
+    from books.models import ScanFolder
+    from books.scanner.bootstrap import ensure_data_sources
+
+    root = os.path.abspath(root)
+    media_root = tempfile.mkdtemp(prefix="scan-benchmark-media-")
+    benchmark_settings = override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "scan-benchmark"}},
+        MEDIA_ROOT=media_root,
+        COVER_PREFETCH_ENABLED=False,
+        # Build the throwaway schema straight from the models, as the test suite does
+        MIGRATION_MODULES={"books": None},
+    )
+
+    old_database_name = None
+    try:
+        with benchmark_settings:
+            if isolate:
+                old_database_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            ensure_data_sources()
+
+            for path, content_type in _content_folders(root):
+                ScanFolder.objects.create(path=path, name=os.path.basename(path) or path, content_type=content_type, is_active=True)
+
+            runs = [_measure("initial", rescan=False, external=external)]
+            if include_rescan:
+                runs.append(_measure("rescan", rescan=True, external=external))
+    finally:
+        if old_database_name is not None:
+            connection.creation.destroy_test_db(old_database_name, verbosity=0)
+        shutil.rmtree(media_root, ignore_errors=True)
+
+    return {
+        "library": root,
+        "external": "stub" if external else "off",
+        "database": connection.vendor,
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "platform": platform.platform(),
+        "runs": runs,
+    }
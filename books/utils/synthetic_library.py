@@ -0,0 +1,376 @@
+"""Synthetic library generator for scan benchmarks.
+
+Writes a reproducible library of small but structurally valid files that the
+scanner's extractors can actually open:
+
+- EPUB: OCF container with OPF package metadata, NCX and an XHTML chapter
+- PDF: single page with a text stream, document info and a correct xref table
+- MOBI: PalmDB/MOBI 6 container with EXTH title and author records
+- CBZ: a few JPEG pages and a ComicInfo.xml
+- MP3: ID3v2 tag, Xing header and MPEG audio frames
+
+File and folder names follow common library layouts (Calibre-style author
+folders, series folders, numbered comic issues, multi-part audiobooks), and
+some books get ``cover.jpg`` and ``metadata.opf`` sidecars. The same seed
+always produces the same library.
+"""
+
+import io
+import os
+import random
+import struct
+import zipfile
+from typing import Dict
+from xml.sax.saxutils import escape
+
+from PIL import Image
+
+FIRST_NAMES = "Ursula, Isaac, Octavia, Terry, Margaret, Neil, Agatha, Arthur, Mary, Kazuo, Toni, Haruki, Jane, Iain, Ann, Brandon, Robin, Frank, Lois, Connie".split(", ")
+LAST_NAMES = "Le Guin, Asimov, Butler, Pratchett, Atwood, Gaiman, Christie, Clarke, Shelley, Ishiguro, Murakami, Austen, Banks, Leckie, Hobb, Herbert, Bujold, Willis".split(", ")
+TITLE_WORDS = "Shadow, River, Empire, Glass, Winter, Crown, Silent, Star, Garden, Iron, Memory, Storm, Harbor, Ember, Night, Hollow, Library, Machine, Salt, Tide".split(", ")
+SERIES_NAMES = ["The Long Road", "Chronicles of Vey", "Starfall", "The Quiet Sea", "Northern Lights", "Broken Crown"]
+COMIC_SERIES = ["Night Watch", "Star Runners", "The Iron Cat", "Paper Moons", "Deep Current"]
+PUBLISHERS = ["Tor", "Orbit", "Gollancz", "Penguin", "Vintage", "Image Comics", "Dark Horse"]
+
+EBOOK_FORMATS = (("epub", 0.6), ("pdf", 0.25), ("mobi", 0.15))
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz: 417-byte frames of 1152 samples
+MP3_FRAME_HEADER = b"\xff\xfb\x90\x00"
+MP3_FRAME_LENGTH = 417
+
+MOBI_HEADER_LENGTH = 232
+
+
+def _isbn13(rng: random.Random) -> str:
+    digits = [9, 7, 8] + [rng.randrange(10) for _ in range(9)]
+    check = (10 - sum(digit * (3 if index % 2 else 1) for index, digit in enumerate(digits)) % 10) % 10
+    return "".join(map(str, digits + [check]))
+
+
+def _safe_name(name: str) -> str:
+    return "".join(ch for ch in name if ch not in '<>:"/\\|?*').strip()
+
+
+def _jpeg(width: int, height: int, color) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(buffer, "JPEG", quality=70)
+    return buffer.getvalue()
+
+
+def _opf_document(meta: dict, manifest: str = "", spine: str = "") -> str:
+    series = ""
+    if meta.get("series"):
+        series = (
+            f'    <meta name="calibre:series" content="{escape(meta["series"])}"/>\n'
+            f'    <meta name="calibre:series_index" content="{meta["series_index"]}"/>\n'
+        )
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<package xmlns="http://www.idpf.org/2007/opf" unique-identifier="bookid" version="2.0">\n'
+        '  <metadata xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:opf="http://www.idpf.org/2007/opf">\n'
+        f'    <dc:title>{escape(meta["title"])}</dc:title>\n'
+        f'    <dc:creator opf:role="aut">{escape(meta["author"])}</dc:creator>\n'
+        f'    <dc:publisher>{escape(meta["publisher"])}</dc:publisher>\n'
+        f'    <dc:date>{meta["year"]}-01-01</dc:date>\n'
+        "    <dc:language>en</dc:language>\n"
+        f'    <dc:identifier id="bookid" opf:scheme="ISBN">{meta["isbn"]}</dc:identifier>\n'
+        f"{series}"
+        "  </metadata>\n"
+        f"  <manifest>\n{manifest}  </manifest>\n"
+        f'  <spine toc="ncx">\n{spine}  </spine>\n'
+        "</package>\n"
+    )
+
+
+def _paragraphs(meta: dict, rng: random.Random, count: int = 12) -> str:
+    words = TITLE_WORDS + ["the", "and", "of", "a", "was", "in", "to"]
+    return "\n".join(f"<p>{' '.join(rng.choice(words) for _ in range(60))}.</p>" for _ in range(count))
+
+
+def build_epub(meta: dict, rng: random.Random, cover: bytes = None) -> bytes:
+    """A minimal EPUB 2 package with metadata, navigation and one chapter."""
+    chapter = (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<html xmlns="http://www.w3.org/1999/xhtml"><head><title>Chapter 1</title></head><body>\n'
+        f'<h1>{escape(meta["title"])}</h1>\n<p>Copyright {meta["year"]} {escape(meta["author"])}. ISBN {meta["isbn"]}</p>\n'
+        f"{_paragraphs(meta, rng)}\n</body></html>\n"
+    )
+    ncx = (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<ncx xmlns="http://www.daisy.org/z3986/2005/ncx/" version="2005-1">\n'
+        f'  <head><meta name="dtb:uid" content="{meta["isbn"]}"/></head>\n'
+        f'  <docTitle><text>{escape(meta["title"])}</text></docTitle>\n'
+        '  <navMap><navPoint id="np1" playOrder="1"><navLabel><text>Chapter 1</text></navLabel><content src="chapter1.xhtml"/></navPoint></navMap>\n'
+        "</ncx>\n"
+    )
+    manifest = (
+        '    <item id="ncx" href="toc.ncx" media-type="application/x-dtbncx+xml"/>\n'
+        '    <item id="chapter1" href="chapter1.xhtml" media-type="application/xhtml+xml"/>\n'
+    )
+    if cover:
+        manifest += '    <item id="cover-image" href="cover.jpg" media-type="image/jpeg" properties="cover-image"/>\n'
+    container = (
+        '<?xml version="1.0"?>\n'
+        '<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">\n'
+        '  <rootfiles><rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/></rootfiles>\n'
+        "</container>\n"
+    )
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(zipfile.ZipInfo("mimetype"), "application/epub+zip", compress_type=zipfile.ZIP_STORED)
+        archive.writestr("META-INF/container.xml", container)
+        opf = _opf_document(meta, manifest, '    <itemref idref="chapter1"/>\n')
+        if cover:
+            opf = opf.replace("  </metadata>", '    <meta name="cover" content="cover-image"/>\n  </metadata>')
+            archive.writestr("OEBPS/cover.jpg", cover)
+        archive.writestr("OEBPS/content.opf", opf)
+        archive.writestr("OEBPS/toc.ncx", ncx)
+        archive.writestr("OEBPS/chapter1.xhtml", chapter)
+    return buffer.getvalue()
+
+
+def _pdf_string(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def build_pdf(meta: dict) -> bytes:
+    """A one-page PDF with document info, a text stream and a valid cross-reference table."""
+    content = f"BT /F1 24 Tf 72 720 Td ({_pdf_string(meta['title'])}) Tj 0 -36 Td /F1 14 Tf (by {_pdf_string(meta['author'])}) Tj ET".encode("latin-1", "replace")
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        f"<< /Title ({_pdf_string(meta['title'])}) /Author ({_pdf_string(meta['author'])}) /Producer (Synthetic Library) >>".encode("latin-1", "replace"),
+    ]
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R /Info 6 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(output)
+
+
+def build_mobi(meta: dict, rng: random.Random) -> bytes:
+    """An uncompressed MOBI 6 book: PalmDB header, record 0 with MOBI/EXTH headers, text and EOF records."""
+    text = f"<html><head></head><body><h1>{escape(meta['title'])}</h1>{_paragraphs(meta, rng, 4)}</body></html>".encode("utf-8")
+    text_records = [text[start : start + 4096] for start in range(0, len(text), 4096)]
+    title = meta["title"].encode("utf-8")
+
+    exth_records = [(100, meta["author"]), (101, meta["publisher"]), (104, meta["isbn"]), (503, meta["title"])]
+    exth_body = b"".join(struct.pack(">II", kind, 8 + len(value.encode("utf-8"))) + value.encode("utf-8") for kind, value in exth_records)
+    exth = b"EXTH" + struct.pack(">II", 12 + len(exth_body), len(exth_records)) + exth_body
+    exth += b"\0" * (-len(exth) % 4)
+
+    first_non_text = len(text_records) + 1
+    full_name_offset = 16 + MOBI_HEADER_LENGTH + len(exth)
+
+    # Offsets below are relative to the "MOBI" identifier; unused indexes are 0xFFFFFFFF
+    mobi_header = bytearray(b"\xff" * MOBI_HEADER_LENGTH)
+    struct.pack_into(">4sIIIII", mobi_header, 0, b"MOBI", MOBI_HEADER_LENGTH, 2, 65001, rng.getrandbits(32), 6)  # Book, UTF-8, version 6
+    struct.pack_into(">IIIIIII", mobi_header, 64, first_non_text, full_name_offset, len(title), 9, 0, 0, 6)  # English, min. version 6
+    struct.pack_into(">IIIIII", mobi_header, 92, first_non_text, 0, 0, 0, 0, 0x40)  # No images or Huffman tables; EXTH present
+    mobi_header[116:148] = b"\0" * 32
+    struct.pack_into(">IIII", mobi_header, 152, 0xFFFFFFFF, 0, 0, 0)  # No DRM
+    mobi_header[168:176] = b"\0" * 8
+    struct.pack_into(">HHI", mobi_header, 176, 1, len(text_records), 1)  # Text records, unknown (1)
+    struct.pack_into(">IIII", mobi_header, 184, first_non_text, 1, first_non_text, 1)  # FCIS/FLIS (absent), unknowns (1)
+    mobi_header[200:208] = b"\0" * 8
+    struct.pack_into(">IIIII", mobi_header, 212, 0, 0xFFFFFFFF, 0, 0, 0xFFFFFFFF)  # No trailing entries, no NCX index
+
+    palmdoc = struct.pack(">HHIHHHH", 1, 0, len(text), len(text_records), 4096, 0, 0)
+    record0 = palmdoc + mobi_header + exth + title + b"\0" * (4 - len(title) % 4 + 4)
+    records = [record0] + text_records + [b"\xe9\x8e\r\n"]  # End-of-file record
+
+    header_size = 78 + 8 * len(records) + 2
+    palm_name = _safe_name(meta["title"]).encode("ascii", "replace")[:31].ljust(32, b"\0")
+    output = bytearray(palm_name)
+    output += struct.pack(">HHIIIIII4s4sIIH", 0, 0, 0, 0, 0, 0, 0, 0, b"BOOK", b"MOBI", 2 * len(records), 0, len(records))
+    offset = header_size
+    for index, record in enumerate(records):
+        output += struct.pack(">II", offset, 2 * index)
+        offset += len(record)
+    output += b"\0\0"
+    for record in records:
+        output += record
+    return bytes(output)
+
+
+def build_cbz(meta: dict, pages: int = 3) -> bytes:
+    """A comic archive with a few JPEG pages and ComicInfo.xml."""
+    comic_info = (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        "<ComicInfo>\n"
+        f"  <Title>{escape(meta['title'])}</Title>\n"
+        f"  <Series>{escape(meta['series'])}</Series>\n"
+        f"  <Number>{meta['series_index']}</Number>\n"
+        f"  <Year>{meta['year']}</Year>\n"
+        f"  <Writer>{escape(meta['author'])}</Writer>\n"
+        f"  <Publisher>{escape(meta['publisher'])}</Publisher>\n"
+        f"  <PageCount>{pages}</PageCount>\n"
+        "</ComicInfo>\n"
+    )
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+        for page in range(1, pages + 1):
+            archive.writestr(f"{page:03d}.jpg", _jpeg(160, 240, (page * 60 % 256, 80, 120)))
+        archive.writestr("ComicInfo.xml", comic_info)
+    return buffer.getvalue()
+
+
+def _id3_frame(frame_id: bytes, text: str) -> bytes:
+    payload = b"\x03" + text.encode("utf-8")  # UTF-8 text encoding
+    return frame_id + struct.pack(">I", len(payload)) + b"\0\0" + payload
+
+
+def build_mp3(meta: dict, frames: int = 200) -> bytes:
+    """An MP3 track: ID3v2.3 tag, a Xing header frame carrying the frame count, then silent frames."""
+    tag_body = (
+        _id3_frame(b"TIT2", meta["title"])
+        + _id3_frame(b"TPE1", meta["author"])
+        + _id3_frame(b"TALB", meta["album"])
+        + _id3_frame(b"TRCK", str(meta["track"]))
+        + _id3_frame(b"TYER", str(meta["year"]))
+    )
+    size = len(tag_body)
+    synchsafe = bytes([(size >> 21) & 0x7F, (size >> 14) & 0x7F, (size >> 7) & 0x7F, size & 0x7F])
+    tag = b"ID3\x03\x00\x00" + synchsafe + tag_body
+
+    xing = MP3_FRAME_HEADER + b"\0" * 32 + b"Xing" + struct.pack(">II", 0x01, frames)
+    frame = MP3_FRAME_HEADER + b"\0" * (MP3_FRAME_LENGTH - 4)
+    return tag + xing + b"\0" * (MP3_FRAME_LENGTH - len(xing)) + frame * frames
+
+
+def _pick_format(rng: random.Random) -> str:
+    roll = rng.random()
+    for file_format, share in EBOOK_FORMATS:
+        if roll < share:
+            return file_format
+        roll -= share
+    return EBOOK_FORMATS[0][0]
+
+
+def _write(path: str, data, summary: dict) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb" if isinstance(data, bytes) else "w", **({} if isinstance(data, bytes) else {"encoding": "utf-8"})) as f:
+        f.write(data)
+    summary["bytes"] += len(data)
+
+
+def generate_library(
+    root: str,
+    ebooks: int = 100,
+    comics: int = 20,
+    audiobooks: int = 5,
+    tracks_per_audiobook: int = 3,
+    series_ratio: float = 0.3,
+    sidecar_ratio: float = 0.3,
+    seed: int = 0,
+) -> Dict[str, int]:
+    """
+    Write a synthetic library under ``root``.
+
+    The library has one top-level folder per content type (``ebooks``,
+    ``comics``, ``audiobooks``) so each can be registered as a ScanFolder
+    of the matching content type.
+
+    Args:
+        root: Directory to write into (created if missing)
+        ebooks: Number of EPUB/PDF/MOBI books
+        comics: Number of CBZ issues, spread over a few series
+        audiobooks: Number of audiobooks
+        tracks_per_audiobook: MP3 tracks per audiobook
+        series_ratio: Share of ebooks placed in series folders
+        sidecar_ratio: Share of ebooks with ``cover.jpg`` and ``metadata.opf`` sidecars
+        seed: Random seed; the same seed gives the same library
+
+    Returns:
+        Counts of generated files per format plus covers, OPF sidecars and total bytes
+    """
+    rng = random.Random(seed)
+    summary = {"epub": 0, "pdf": 0, "mobi": 0, "cbz": 0, "mp3": 0, "covers": 0, "opf": 0, "bytes": 0}
+    covers = [_jpeg(60, 90, (rng.randrange(256), rng.randrange(256), rng.randrange(256))) for _ in range(8)]
+    used_paths = set()
+
+    def book_meta():
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        return {
+            "title": " ".join(rng.sample(TITLE_WORDS, rng.randint(2, 3))),
+            "author": f"{first} {last}",
+            "author_sort": f"{last}, {first}",
+            "publisher": rng.choice(PUBLISHERS),
+            "year": rng.randint(1950, 2024),
+            "isbn": _isbn13(rng),
+        }
+
+    for _ in range(ebooks):
+        meta = book_meta()
+        file_format = _pick_format(rng)
+        author_dir = os.path.join(root, "ebooks", _safe_name(meta["author_sort"]))
+
+        if rng.random() < series_ratio:
+            meta["series"] = rng.choice(SERIES_NAMES)
+            meta["series_index"] = rng.randint(1, 12)
+            directory = os.path.join(author_dir, _safe_name(meta["series"]))
+            filename = f"{_safe_name(meta['series'])} {meta['series_index']:02d} - {_safe_name(meta['title'])}"
+            sidecars = False  # Several books share a series folder
+        else:
+            directory = os.path.join(author_dir, _safe_name(meta["title"]))
+            filename = f"{_safe_name(meta['title'])} - {_safe_name(meta['author'])}"
+            sidecars = rng.random() < sidecar_ratio
+
+        path = os.path.join(directory, f"{filename}.{file_format}")
+        if path in used_paths:
+            path = os.path.join(directory, f"{filename} ({len(used_paths)}).{file_format}")
+        used_paths.add(path)
+
+        cover = rng.choice(covers)
+        if file_format == "epub":
+            data = build_epub(meta, rng, cover=cover if rng.random() < 0.7 else None)
+        elif file_format == "pdf":
+            data = build_pdf(meta)
+        else:
+            data = build_mobi(meta, rng)
+        _write(path, data, summary)
+        summary[file_format] += 1
+
+        if sidecars:
+            _write(os.path.join(directory, "cover.jpg"), cover, summary)
+            _write(os.path.join(directory, "metadata.opf"), _opf_document(meta), summary)
+            summary["covers"] += 1
+            summary["opf"] += 1
+
+    series_numbers: Dict[str, int] = {}
+    series_years = {series: rng.randint(1960, 2015) for series in COMIC_SERIES}
+    for _ in range(comics):
+        meta = book_meta()
+        meta["series"] = rng.choice(COMIC_SERIES)
+        meta["publisher"] = PUBLISHERS[-1 - COMIC_SERIES.index(meta["series"]) % 2]
+        meta["series_index"] = series_numbers[meta["series"]] = series_numbers.get(meta["series"], 0) + 1
+        if rng.random() < 0.1:
+            meta["series_index"] = series_numbers[meta["series"]] = meta["series_index"] + 1  # Leave a gap now and then
+        meta["year"] = series_years[meta["series"]] + meta["series_index"] // 12
+        path = os.path.join(root, "comics", _safe_name(meta["series"]), f"{_safe_name(meta['series'])} #{meta['series_index']:03d} ({meta['year']}).cbz")
+        _write(path, build_cbz(meta), summary)
+        summary["cbz"] += 1
+
+    for _ in range(audiobooks):
+        meta = book_meta()
+        meta["album"] = meta["title"]
+        directory = os.path.join(root, "audiobooks", f"{_safe_name(meta['author'])} - {_safe_name(meta['title'])}")
+        for track in range(1, tracks_per_audiobook + 1):
+            track_meta = dict(meta, title=f"{meta['title']} - Part {track:02d}", track=track)
+            _write(os.path.join(directory, f"{_safe_name(meta['title'])} - Part {track:02d}.mp3"), build_mp3(track_meta, frames=rng.randint(100, 400)), summary)
+            summary["mp3"] += 1
+        if rng.random() < sidecar_ratio:
+            _write(os.path.join(directory, "cover.jpg"), rng.choice(covers), summary)
+            summary["covers"] += 1
+
+    return summary
@@ -0,0 +1,85 @@
+"""Cached per-user UI state for context processors.
+
+Context processors run on every rendered template, so the profile and
+setup-wizard lookups they need are memoised twice: on the request object
+(so several processors share one lookup) and in the Django cache (so
+subsequent requests skip the database entirely). Cached entries are
+invalidated by the signal handlers in ``books.signals``.
+"""
+
+from django.core.cache import cache
+
+USER_STATE_CACHE_TIMEOUT = 300  # 5 minutes
+LIBRARY_STATE_CACHE_TIMEOUT = 60
+LIBRARY_STATE_CACHE_KEY = "library_has_content"
+
+
+def _user_key(prefix, user):
+    # date_joined guards against a recreated user inheriting a cached entry for a reused primary key
+    joined = int(user.date_joined.timestamp() * 1000000) if getattr(user, "date_joined", None) else 0
+    return f"{prefix}_{user.pk}_{joined}"
+
+
+def profile_cache_key(user):
+    return _user_key("user_profile", user)
+
+
+def wizard_cache_key(user):
+    return _user_key("user_wizard_state", user)
+
+
+def invalidate_user_profile(user):
+    """Drop the cached profile for a user."""
+    cache.delete(profile_cache_key(user))
+
+
+def invalidate_wizard_state(user):
+    """Drop the cached setup wizard state for a user."""
+    cache.delete(wizard_cache_key(user))
+
+
+def invalidate_library_state():
+    """Drop the cached 'library has folders or books' flag."""
+    cache.delete(LIBRARY_STATE_CACHE_KEY)
+
+
+def get_cached_profile(request):
+    """Return the UserProfile for ``request.user``, creating it on first use."""
+    if not hasattr(request, "_cached_user_profile"):
+        from books.models import UserProfile
+
+        key = profile_cache_key(request.user)
+        profile = cache.get(key)
+        if not isinstance(profile, UserProfile):
+            profile = UserProfile.get_or_create_for_user(request.user)
+            cache.set(key, profile, USER_STATE_CACHE_TIMEOUT)
+        request._cached_user_profile = profile
+    return request._cached_user_profile
+
+
+def library_has_content():
+    """Return True once any scan folder or non-placeholder book exists."""
+    has_content = cache.get(LIBRARY_STATE_CACHE_KEY)
+    if not isinstance(has_content, bool):
+        from books.models import Book, ScanFolder
+
+        has_content = ScanFolder.objects.exists() or Book.objects.filter(is_placeholder=False).exists()
+        cache.set(LIBRARY_STATE_CACHE_KEY, has_content, LIBRARY_STATE_CACHE_TIMEOUT)
+    return has_content
+
+
+def get_cached_wizard_state(user):
+    """Return a dict with the wizard fields the templates need, creating the wizard if required."""
+    key = wizard_cache_key(user)
+    state = cache.get(key)
+    if not isinstance(state, dict):
+        from books.models import SetupWizard
+
+        wizard, created = SetupWizard.get_or_create_for_user(user)
+        state = {
+            "is_completed": wizard.is_completed,
+            "is_skipped": wizard.is_skipped,
+            "current_step": wizard.current_step,
+        }
+        cache.set(key, state, USER_STATE_CACHE_TIMEOUT)
+    return state
@@ -73,9 +73,12 @@ from .views.scanning import (  # noqa: F401
     api_status_ajax,
     cancel_scan_ajax,
     scan_dashboard,
+    scan_event_stream,
+    scan_events_poll,
     scan_history,
     scan_progress_ajax,
     scan_queue,
+    scan_status_feed,
     scanning_help,
     start_book_rescan,
     start_folder_scan,
@@ -116,6 +119,7 @@ from .views.simple import (  # noqa: F401
     PrivacyPolicyView,
     StatisticsView,
     debug_view_info,
+    export_library,
     export_library_csv,
     get_navigation_data,
     isbn_lookup,
@@ -109,9 +109,12 @@ from .scanning import (  # noqa: F401
     api_status_ajax,
     cancel_scan_ajax,
     scan_dashboard,
+    scan_event_stream,
+    scan_events_poll,
     scan_folder_progress_ajax,
     scan_history,
     scan_progress_ajax,
+    scan_status_feed,
     scanning_help,
     start_book_rescan,
     start_folder_scan,
@@ -141,6 +144,7 @@ from .simple import (  # noqa: F401
     PrivacyPolicyView,
     StatisticsView,
     debug_view_info,
+    export_library,
     export_library_csv,
     get_navigation_data,
     isbn_lookup,
@@ -257,6 +261,7 @@ __all__ = [
     "system_status",
     "get_navigation_data",
     "quick_search",
+    "export_library",
     "export_library_csv",
     "debug_view_info",
     "toggle_needs_review",
@@ -272,6 +277,9 @@ __all__ = [
     "api_status_ajax",
     "active_scans_ajax",
     "cancel_scan_ajax",
+    "scan_status_feed",
+    "scan_event_stream",
+    "scan_events_poll",
     "scan_history",
     "scanning_help",
     # Media sections views
@@ -20,9 +20,14 @@ from django.views.decorators.http import require_http_methods, require_POST
 from books.book_utils import BookStatusManager, CoverManager, MetadataConflictAnalyzer, MetadataRemover
 from books.models import Book, UserProfile
 from books.utils.decorators import ajax_response_handler
+from books.utils.folder_counts import request_stale_recounts
 
 logger = logging.getLogger("books.scanner")
 
+# Internal cover candidates returned per page of the multi-cover selector
+COVER_PAGE_SIZE = 24
+MAX_COVER_PAGE_SIZE = 96
+
 
 # Core AJAX Operations
 @ajax_response_handler
@@ -86,20 +91,27 @@ def ajax_manage_cover(request, book_id):
 @login_required
 def ajax_list_internal_covers(request, book_id):
     """
-    List all internal images from an EPUB file.
+    List the internal images of an EPUB file as cover candidates, one page at a time.
 
-    Returns JSON with all internal images, their metadata, and preview URLs.
+    Candidates come from a cached header-only index ordered likeliest cover first;
+    preview thumbnails are only made for the requested page. Query parameters
+    ``page`` (1-based) and ``page_size`` select the page.
     Used for multi-cover selection feature.
     """
     try:
         from books.models import BookFile
         from books.utils.cover_extractor import EPUBCoverExtractor
-        from books.utils.cover_cache import CoverCache
         from django.conf import settings
         import base64
 
         book = get_object_or_404(Book, pk=book_id)
 
+        try:
+            page = max(1, int(request.GET.get("page", 1)))
+            page_size = min(MAX_COVER_PAGE_SIZE, max(1, int(request.GET.get("page_size", COVER_PAGE_SIZE))))
+        except ValueError:
+            return JsonResponse({"success": False, "error": "Invalid page or page_size"}, status=400)
+
         # Get primary EPUB file
         epub_file = BookFile.objects.filter(book=book, file_format="epub").first()
 
@@ -112,31 +124,28 @@ def ajax_list_internal_covers(request, book_id):
         if not os.path.exists(epub_path):
             return JsonResponse({"success": False, "error": "EPUB file not found on disk"}, status=404)
 
-        # Extract all covers with metadata
-        covers_data = EPUBCoverExtractor.list_all_covers(epub_path)
+        fingerprint = EPUBCoverExtractor.fingerprint(epub_path)
+        candidates = EPUBCoverExtractor.list_cover_candidates(epub_path, fingerprint=fingerprint)
 
-        if not covers_data:
+        if not candidates:
             return JsonResponse({"success": False, "error": "No images found in EPUB"})
 
         # Prepare response data
         covers_list = []
         current_cover_path = book.finalmetadata.final_cover_path if hasattr(book, "finalmetadata") else None
+        offset = (page - 1) * page_size
 
-        for cover_info in covers_data:
-            # Try to cache the image for preview
-            cache_success, cache_path = CoverCache.save_cover(epub_path, cover_info["image_data"], cover_info["internal_path"])
+        for cover_info in candidates[offset : offset + page_size]:
+            thumbnail, cache_path = EPUBCoverExtractor.cover_thumbnail(epub_path, cover_info["internal_path"], fingerprint=fingerprint)
 
             # Generate preview URL
-            if cache_success and cache_path:
+            if cache_path:
                 preview_url = f"{settings.MEDIA_URL}{cache_path}"
+            elif thumbnail:
+                # Fallback: inline the thumbnail when it couldn't be cached
+                preview_url = f"data:image/jpeg;base64,{base64.b64encode(thumbnail).decode('utf-8')}"
             else:
-                # Fallback: base64 encode for small images
-                if cover_info["file_size"] < 100 * 1024:  # < 100KB
-                    img_base64 = base64.b64encode(cover_info["image_data"]).decode("utf-8")
-                    img_format = cover_info["format"].lower()
-                    preview_url = f"data:image/{img_format};base64,{img_base64}"
-                else:
-                    preview_url = None
+                preview_url = None
 
             # Check if this is the currently selected cover
             is_current = (epub_file.cover_path == cover_info["internal_path"]) if epub_file.cover_path else False
@@ -156,7 +165,18 @@ def ajax_list_internal_covers(request, book_id):
                 }
             )
 
-        return JsonResponse({"success": True, "covers": covers_list, "total_count": len(covers_list), "epub_path": epub_path, "current_cover": current_cover_path})
+        return JsonResponse(
+            {
+                "success": True,
+                "covers": covers_list,
+                "total_count": len(candidates),
+                "page": page,
+                "page_size": page_size,
+                "has_more": offset + page_size < len(candidates),
+                "epub_path": epub_path,
+                "current_cover": current_cover_path,
+            }
+        )
 
     except Exception as e:
         logger.error(f"Error listing internal covers for book {book_id}: {e}", exc_info=True)
@@ -984,6 +1004,7 @@ def ajax_folder_progress(request, folder_id):
 
         folder = ScanFolder.objects.get(id=folder_id)
         progress_info = folder.get_scan_progress_info()
+        request_stale_recounts([folder])
 
         return JsonResponse({"success": True, "progress": progress_info})
     except ScanFolder.DoesNotExist:
@@ -1008,8 +1029,9 @@ def ajax_bulk_folder_progress(request):
 
         ScanFolder = apps.get_model("books", "ScanFolder")
 
+        # Stored counters: one query for all folders, no filesystem access
         progress_data = {}
-        folders = ScanFolder.objects.filter(id__in=folder_ids)
+        folders = list(ScanFolder.objects.filter(id__in=folder_ids))
 
         for folder in folders:
             try:
@@ -1018,6 +1040,8 @@ def ajax_bulk_folder_progress(request):
             except Exception as e:
                 progress_data[str(folder.id)] = {"error": str(e)}
 
+        request_stale_recounts(folders)
+
         return JsonResponse({"success": True, "progress_data": progress_data})
     except Exception as e:
         return JsonResponse({"success": False, "error": str(e)})
@@ -1521,7 +1545,7 @@ def ajax_retrain_ai_models(request):
         # Check if we have sufficient feedback for retraining
         from ..models import AIFeedback
 
-        feedback_count = AIFeedback.objects.filter().count()
+        feedback_count = AIFeedback.objects.filter(needs_retraining=True).count()
 
         if feedback_count < 5:  # Minimum threshold for retraining
             return JsonResponse({"success": False, "error": "Need at least 5 feedback entries for retraining", "feedback_count": feedback_count, "minimum_required": 5})
@@ -1530,11 +1554,18 @@ def ajax_retrain_ai_models(request):
         try:
             import threading
 
+            from django.core.management import call_command
+
             def retrain_models():
-                """Background task for model retraining."""
-                # In a real implementation, this would trigger actual ML model retraining
-                # For now, just simulate the process
-                pass
+                """Background task folding pending feedback into the models."""
+                try:
+                    call_command("train_ai_models", action="incremental", min_feedback=5)
+
+                    from books.scanner.ai import get_model_loader
+
+                    get_model_loader().refresh()
+                except Exception as e:
+                    logger.error(f"Background AI model update failed: {e}")
 
             # Start retraining in background thread
             thread = threading.Thread(target=retrain_models)
@@ -1547,7 +1578,7 @@ def ajax_retrain_ai_models(request):
                     "message": "AI models retraining initiated",
                     "feedback_count": feedback_count,
                     "feedback_used": feedback_count,
-                    "estimated_completion": "5-10 minutes",
+                    "estimated_completion": "under a minute",
                 }
             )
 
@@ -2085,6 +2116,7 @@ __all__ = [
     # Integration test placeholders
     "ajax_create_backup",
     "ajax_detect_duplicates",
+    "ajax_resolve_duplicates",
     "ajax_migrate_library",
     "ajax_comprehensive_statistics",
     "ajax_metadata_quality_report",
@@ -2111,8 +2143,62 @@ def ajax_create_backup(request):
 @require_http_methods(["POST"])
 @login_required
 def ajax_detect_duplicates(request):
-    """Detect duplicate books in library."""
-    return {"success": True, "duplicates": [], "message": "No duplicates found"}
+    """Detect duplicate books in library by file content and by similar title/author."""
+    from books.utils.duplicate_index import find_duplicate_groups
+
+    report = find_duplicate_groups()
+    duplicates = [{"type": "exact", "book_ids": group["book_ids"], "reason": "Identical file contents"} for group in report["exact"]]
+    duplicates += [
+        {"type": "similar", "book_ids": group["book_ids"], "similarity": group["similarity"], "reason": "Similar title and author"} for group in report["similar"]
+    ]
+
+    if not duplicates:
+        return {"success": True, "duplicates": [], "message": "No duplicates found"}
+    return {
+        "success": True,
+        "duplicates": duplicates,
+        "exact_groups": len(report["exact"]),
+        "similar_groups": len(report["similar"]),
+        "message": f"Found {len(duplicates)} duplicate group(s)",
+    }
+
+
+@ajax_response_handler
+@require_http_methods(["POST"])
+@login_required
+def ajax_resolve_duplicates(request):
+    """Mark all but one book of each duplicate group as a duplicate.
+
+    Accepts a JSON body, or form data whose ``duplicate_groups`` field is a
+    JSON-encoded list of ``{"book_ids": [...]}`` groups.
+    """
+    data = getattr(request, "json", None) or request.POST
+    groups = data.get("duplicate_groups") or []
+    if isinstance(groups, str):
+        groups = json.loads(groups)
+    strategy = data.get("resolution_strategy", "keep_first")
+
+    if strategy not in ("keep_first", "keep_last"):
+        return JsonResponse({"success": False, "error": f"Unknown resolution strategy: {strategy}"}, status=400)
+
+    try:
+        id_groups = [sorted(int(book_id) for book_id in group["book_ids"]) for group in groups]
+    except (KeyError, TypeError, ValueError):
+        return JsonResponse({"success": False, "error": "duplicate_groups must be a list of {book_ids: [...]} groups of integer ids"}, status=400)
+
+    duplicate_ids = set()
+    for book_ids in id_groups:
+        if not book_ids:
+            continue
+        keep = book_ids[0] if strategy == "keep_first" else book_ids[-1]
+        duplicate_ids.update(book_id for book_id in book_ids if book_id != keep)
+
+    marked = Book.objects.filter(id__in=duplicate_ids, is_duplicate=False).update(is_duplicate=True)
+    if marked:
+        from books.utils.duplicate_index import invalidate_duplicate_index
+
+        invalidate_duplicate_index()
+    return {"success": True, "marked_duplicates": marked, "message": f"Marked {marked} book(s) as duplicates"}
 
 
 @ajax_response_handler
@@ -16,8 +16,9 @@ from django.views.generic import ListView
 
 from books.constants import PAGINATION
 from books.mixins.navigation import BookNavigationMixin
-from books.models import Book, BookAPICompleteness
-from books.scanner.intelligent import IntelligentAPIScanner
+from books.models import Book, BookAPICompleteness, ScanSession
+from books.scanner.background import get_running_api_retry, retry_api_calls_in_background
+from books.scanner.intelligent import IntelligentAPIScanner, get_completeness_stats
 
 logger = logging.getLogger("books.scanner")
 
@@ -65,13 +66,7 @@ class APIStatusView(LoginRequiredMixin, BookNavigationMixin, ListView):
         context = super().get_context_data(**kwargs)
 
         # Calculate statistics
-        all_completeness = BookAPICompleteness.objects.all()
-        context["stats"] = {
-            "high_priority": all_completeness.filter(scan_priority="high").count(),
-            "medium_priority": all_completeness.filter(scan_priority="medium").count(),
-            "low_priority": all_completeness.filter(scan_priority="low").count(),
-            "complete": all_completeness.filter(scan_priority="complete").count(),
-        }
+        context["stats"] = get_completeness_stats()
 
         return context
 
@@ -111,26 +106,22 @@ def retry_book_api(request, book_id):
 
 @login_required
 def retry_all_priority(request, priority):
-    """Retry API calls for all books of a specific priority"""
+    """Queue an API retry for all books of a specific priority as a background job"""
     if request.method != "POST":
         return JsonResponse({"error": "POST required"}, status=400)
 
     try:
-        books = Book.objects.filter(api_completeness__scan_priority=priority, api_completeness__needs_external_scan=True).select_related("api_completeness")[
-            :100
-        ]  # Limit to prevent timeout
+        book_ids = list(BookAPICompleteness.objects.filter(scan_priority=priority, needs_external_scan=True).order_by("book_id").values_list("book_id", flat=True))
+        if not book_ids:
+            return JsonResponse({"success": True, "message": f"No {priority} priority books need an API retry.", "queued": 0})
 
-        scanner = IntelligentAPIScanner()
-        success_count = 0
+        running_job_id = get_running_api_retry()
+        if running_job_id:
+            return JsonResponse({"success": True, "message": f"An API retry is already running (Job ID: {running_job_id}).", "queued": 0, "job_id": running_job_id})
 
-        for book in books:
-            result = scanner.scan_book_with_intelligence(book, force_all_apis=False)
-            if result["apis_succeeded"]:
-                success_count += 1
+        job_id = retry_api_calls_in_background(book_ids)
 
-        return JsonResponse(
-            {"success": True, "message": f"Processed {len(books)} books. {success_count} had successful API calls.", "processed": len(books), "successful": success_count}
-        )
+        return JsonResponse({"success": True, "message": f"Queued {len(book_ids)} books for an API retry (Job ID: {job_id}).", "queued": len(book_ids), "job_id": job_id})
 
     except Exception as e:
         logger.error(f"Error retrying priority {priority}: {e}", exc_info=True)
@@ -139,10 +130,9 @@ def retry_all_priority(request, priority):
 
 @login_required
 def resume_failed_api_calls(request, session_id):
-    """Resume API calls for books that failed during a previous scan"""
+    """Queue a background retry of the books that failed during a previous scan"""
     try:
-        scanner = IntelligentAPIScanner(session_id=session_id)
-        session = scanner.session
+        session = ScanSession.objects.filter(session_id=session_id).first()
 
         if not session:
             messages.error(request, "Session not found")
@@ -152,30 +142,15 @@ def resume_failed_api_calls(request, session_id):
             messages.warning(request, "No books to retry in this session")
             return redirect("books:scan_dashboard")
 
-        # Process resume queue
-        success_count = 0
-        failed_count = 0
-
-        for book_data in list(session.resume_queue):  # Copy list to avoid modification during iteration
-            try:
-                book = Book.objects.get(id=book_data["book_id"])
-                result = scanner.scan_book_with_intelligence(book, force_all_apis=False)
-
-                if result["apis_succeeded"]:
-                    success_count += 1
-                    # Remove from queue if all missing sources were attempted
-                    session.remove_book_from_resume_queue(book.id)
-                else:
-                    failed_count += 1
-
-            except Book.DoesNotExist:
-                logger.warning(f"Book {book_data['book_id']} not found, removing from queue")
-                session.remove_book_from_resume_queue(book_data["book_id"])
-            except Exception as e:
-                logger.error(f"Error processing book {book_data['book_id']}: {e}")
-                failed_count += 1
-
-        messages.success(request, f"Processed {success_count + failed_count} books. " f"Success: {success_count}, Failed: {failed_count}")
+        running_job_id = get_running_api_retry()
+        if running_job_id:
+            messages.info(request, f"An API retry is already running (Job ID: {running_job_id}). Check the scanning dashboard for progress.")
+            return redirect("books:scan_dashboard")
+
+        book_ids = list(dict.fromkeys(book_data["book_id"] for book_data in session.resume_queue))
+        job_id = retry_api_calls_in_background(book_ids, session_id=session_id)
+
+        messages.success(request, f"Queued {len(book_ids)} books for an API retry (Job ID: {job_id}). Check the scanning dashboard for progress.")
 
     except Exception as e:
         logger.error(f"Error resuming session {session_id}: {e}", exc_info=True)
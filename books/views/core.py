@@ -146,7 +146,6 @@ class DashboardView(WizardRequiredMixin, LoginRequiredMixin, TemplateView):
 
         from datetime import timedelta
 
-        from django.db.models import Count
         from django.utils import timezone
 
         from books.models import Book, FinalMetadata, ScanFolder, ScanLog
@@ -182,8 +181,8 @@ class DashboardView(WizardRequiredMixin, LoginRequiredMixin, TemplateView):
 
         recent_books = Book.objects.filter(first_scanned__gte=week_ago, is_placeholder=False, is_duplicate=False).select_related("finalmetadata").order_by("-first_scanned")[:5]
 
-        # Get scan folders with book counts
-        scan_folders = ScanFolder.objects.annotate(book_count=Count("book")).order_by("name")
+        # Scan folders carry their book counts (ScanFolder.book_count)
+        scan_folders = ScanFolder.objects.order_by("name")
 
         context.update(
             {
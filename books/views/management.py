@@ -28,6 +28,7 @@ from ..forms import DataSourceForm, ScanFolderEditForm, ScanFolderForm, TriggerS
 
 # Import mixins and utilities
 from books.constants import PAGINATION
+from books.utils.aggregates import RowCountPaginator, annotate_grouped_values, bulk_delete_in_batches, bulk_update_in_batches, count_rows, related_count, unpack_grouped_values
 from ..mixins.navigation import BookNavigationMixin
 
 
@@ -38,6 +39,17 @@ def get_model(model_name):
 
 logger = logging.getLogger(__name__)
 
+
+class RowCountPaginationMixin:
+    """Count list pages on ``unannotated_queryset`` so per-row aggregates are only computed for the shown page."""
+
+    paginator_class = RowCountPaginator
+    unannotated_queryset = None
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return super().get_paginator(queryset, per_page, count_queryset=self.unannotated_queryset, **kwargs)
+
+
 # =============================================================================
 # SCAN FOLDER MANAGEMENT VIEWS
 # =============================================================================
@@ -53,10 +65,8 @@ class ScanFolderListView(LoginRequiredMixin, BookNavigationMixin, ListView):
         return get_model("ScanFolder")
 
     def get_queryset(self):
-        from django.db.models import Count
-
         ScanFolder = self.get_model()
-        queryset = ScanFolder.objects.annotate(book_count=Count("book"))
+        queryset = ScanFolder.objects.all()
 
         # Handle sorting
         sort_by = self.request.GET.get("sort", "name")
@@ -353,7 +363,7 @@ def update_trust(request, pk):
 # =============================================================================
 
 
-class AuthorListView(LoginRequiredMixin, BookNavigationMixin, ListView):
+class AuthorListView(LoginRequiredMixin, BookNavigationMixin, RowCountPaginationMixin, ListView):
     """List all authors with management options."""
 
     template_name = "books/author_list.html"
@@ -379,19 +389,16 @@ class AuthorListView(LoginRequiredMixin, BookNavigationMixin, ListView):
         elif is_reviewed == "false":
             queryset = queryset.filter(is_reviewed=False)
 
-        return queryset.order_by("name")
+        # Book counts and source names come with the page rows; the page count skips them
+        self.unannotated_queryset = queryset
+        active = models.Q(book_relationships__is_active=True)
+        queryset = queryset.annotate(book_count=related_count(queryset.model, "book_relationships__book", active))
+        return annotate_grouped_values(queryset, "source_names", "book_relationships__source__name", active).order_by("name")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["search_query"] = self.request.GET.get("search", "")
-
-        # Add author sources mapping
-        BookAuthor = get_model("BookAuthor")
-        author_sources = {}
-        for author in context["authors"]:
-            sources = BookAuthor.objects.filter(author=author, is_active=True).values_list("source__name", flat=True).distinct()
-            author_sources[author.id] = list(sources)
-        context["author_sources"] = author_sources
+        context["author_sources"] = unpack_grouped_values(context["authors"], "source_names", "book_relationships__source__name", models.Q(book_relationships__is_active=True))
 
         return context
 
@@ -466,9 +473,7 @@ class AuthorBulkDeleteView(LoginRequiredMixin, BookNavigationMixin, ListView):
             return redirect("books:author_list")
 
         # Only delete unreviewed authors
-        authors_to_delete = Author.objects.filter(id__in=selected_authors, is_reviewed=False)
-
-        deleted_count = authors_to_delete.count()
+        deleted_count = bulk_delete_in_batches(Author.objects.filter(is_reviewed=False), selected_authors)
 
         if deleted_count == 0:
             messages.info(
@@ -476,7 +481,6 @@ class AuthorBulkDeleteView(LoginRequiredMixin, BookNavigationMixin, ListView):
                 "No authors deleted. Only unreviewed authors can be bulk deleted.",
             )
         else:
-            authors_to_delete.delete()
             messages.success(request, f"Successfully deleted {deleted_count} author(s).")
 
         return redirect("books:author_list")
@@ -506,14 +510,11 @@ class AuthorMarkReviewedView(LoginRequiredMixin, BookNavigationMixin, ListView):
             return redirect("books:author_list")
 
         # Update unreviewed authors to reviewed
-        authors_to_update = Author.objects.filter(id__in=selected_authors, is_reviewed=False)
-
-        updated_count = authors_to_update.count()
+        updated_count = bulk_update_in_batches(Author.objects.filter(is_reviewed=False), selected_authors, is_reviewed=True)
 
         if updated_count == 0:
             messages.info(request, "No changes made. Selected authors are already reviewed.")
         else:
-            authors_to_update.update(is_reviewed=True)
             messages.success(request, f"Successfully marked {updated_count} author(s) as reviewed.")
 
         return redirect("books:author_list")
@@ -524,7 +525,7 @@ class AuthorMarkReviewedView(LoginRequiredMixin, BookNavigationMixin, ListView):
 # =============================================================================
 
 
-class GenreListView(LoginRequiredMixin, BookNavigationMixin, ListView):
+class GenreListView(LoginRequiredMixin, BookNavigationMixin, RowCountPaginationMixin, ListView):
     """List all genres with management options."""
 
     template_name = "books/genre_list.html"
@@ -550,14 +551,16 @@ class GenreListView(LoginRequiredMixin, BookNavigationMixin, ListView):
         elif is_reviewed == "false":
             queryset = queryset.filter(is_reviewed=False)
 
-        return queryset.order_by("name")
+        # Book counts and source names come with the page rows; the page count skips them
+        self.unannotated_queryset = queryset
+        active = models.Q(book_relationships__is_active=True)
+        queryset = queryset.annotate(book_count=related_count(queryset.model, "book_relationships__book", active))
+        return annotate_grouped_values(queryset, "source_names", "book_relationships__source__name", active).order_by("name")
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["search_query"] = self.request.GET.get("search", "")
-
-        # Add empty genre sources mapping to avoid template errors
-        context["genre_sources"] = {}
+        context["genre_sources"] = unpack_grouped_values(context["genres"], "source_names", "book_relationships__source__name", models.Q(book_relationships__is_active=True))
 
         return context
 
@@ -630,9 +633,7 @@ class GenreBulkDeleteView(LoginRequiredMixin, BookNavigationMixin, ListView):
             return redirect("books:genre_list")
 
         # Only delete unreviewed genres
-        genres_to_delete = Genre.objects.filter(id__in=selected_genres, is_reviewed=False)
-
-        deleted_count = genres_to_delete.count()
+        deleted_count = bulk_delete_in_batches(Genre.objects.filter(is_reviewed=False), selected_genres)
 
         if deleted_count == 0:
             messages.info(
@@ -640,7 +641,6 @@ class GenreBulkDeleteView(LoginRequiredMixin, BookNavigationMixin, ListView):
                 "No genres deleted. Only unreviewed genres can be bulk deleted.",
             )
         else:
-            genres_to_delete.delete()
             messages.success(request, f"Successfully deleted {deleted_count} genre(s).")
 
         return redirect("books:genre_list")
@@ -668,14 +668,11 @@ class GenreMarkReviewedView(LoginRequiredMixin, BookNavigationMixin, ListView):
             return redirect("books:genre_list")
 
         # Update unreviewed genres to reviewed
-        genres_to_update = Genre.objects.filter(id__in=selected_genres, is_reviewed=False)
-
-        updated_count = genres_to_update.count()
+        updated_count = bulk_update_in_batches(Genre.objects.filter(is_reviewed=False), selected_genres, is_reviewed=True)
 
         if updated_count == 0:
             messages.info(request, "No changes made. Selected genres are already reviewed.")
         else:
-            genres_to_update.update(is_reviewed=True)
             messages.success(request, f"Successfully marked {updated_count} genre(s) as reviewed.")
 
         return redirect("books:genre_list")
@@ -686,7 +683,7 @@ class GenreMarkReviewedView(LoginRequiredMixin, BookNavigationMixin, ListView):
 # =============================================================================
 
 
-class SeriesListView(LoginRequiredMixin, BookNavigationMixin, ListView):
+class SeriesListView(LoginRequiredMixin, BookNavigationMixin, RowCountPaginationMixin, ListView):
     """List all series with management options."""
 
     template_name = "books/series_list.html"
@@ -698,7 +695,27 @@ class SeriesListView(LoginRequiredMixin, BookNavigationMixin, ListView):
 
     def get_queryset(self):
         Series = self.get_model()
-        return Series.objects.all().order_by("name")
+        self.unannotated_queryset = Series.objects.all()
+        active = models.Q(book_relationships__is_active=True)
+        # One subquery per relation, so authors and genres never multiply each other's rows
+        queryset = Series.objects.annotate(
+            book_count=related_count(Series, "book_relationships__book", active),
+            author_count=related_count(
+                Series,
+                "book_relationships__book__author_relationships__author",
+                active & models.Q(book_relationships__book__author_relationships__is_active=True),
+            ),
+        )
+        return annotate_grouped_values(queryset, "genres", "book_relationships__book__genre_relationships__genre__name", self._genre_filter()).order_by("name")
+
+    @staticmethod
+    def _genre_filter():
+        return models.Q(book_relationships__is_active=True, book_relationships__book__genre_relationships__is_active=True)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        unpack_grouped_values(context["series"], "genres", "book_relationships__book__genre_relationships__genre__name", self._genre_filter())
+        return context
 
 
 class SeriesCreateView(LoginRequiredMixin, BookNavigationMixin, CreateView):
@@ -836,10 +853,8 @@ class ScanStatusView(LoginRequiredMixin, BookNavigationMixin, ListView):
             "has_active_scan": bool(active_scans),
         }
 
-        # Add scan folders for template use
-        from django.db.models import Count
-
-        context["scan_folders"] = ScanFolder.objects.annotate(book_count=Count("book")).order_by("name")
+        # Add scan folders for template use (book counts are stored on the folder)
+        context["scan_folders"] = ScanFolder.objects.order_by("name")
 
         return context
 
@@ -876,11 +891,14 @@ def bulk_management(request):
     Genre = get_model("Genre")
     Series = get_model("Series")
 
+    # One UNION ALL query instead of four counts
+    counts = count_rows(books=Book.objects.all(), authors=Author.objects.all(), genres=Genre.objects.all(), series=Series.objects.all())
+
     context = {
         "active_tab": "bulk_management",
-        "total_books": Book.objects.count(),
-        "total_authors": Author.objects.count(),
-        "total_genres": Genre.objects.count(),
-        "total_series": Series.objects.count(),
+        "total_books": counts["books"],
+        "total_authors": counts["authors"],
+        "total_genres": counts["genres"],
+        "total_series": counts["series"],
     }
     return render(request, "books/management/bulk_management.html", context)
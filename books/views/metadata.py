@@ -14,6 +14,7 @@ from books.book_utils import CoverManager, GenreManager
 from books.constants import PAGINATION
 from books.mixins import MetadataContextMixin, SimpleNavigationMixin
 from books.models import Author, Book, BookAuthor, BookCover, BookFile, BookGenre, BookMetadata, BookPublisher, BookSeries, BookTitle, DataSource, FinalMetadata, Publisher, Series
+from books.utils.duplicate_index import get_cached_duplicate_index, normalize_tokens
 
 logger = logging.getLogger("books.scanner")
 
@@ -308,41 +309,47 @@ class BookMetadataView(LoginRequiredMixin, DetailView, SimpleNavigationMixin, Me
         if not book_file:
             return {"duplicates": duplicates}
 
-        # Find by file hash (exact duplicates)
-        if book_file.file_path_hash:
-            duplicate_files = BookFile.objects.filter(file_path_hash=book_file.file_path_hash).exclude(book=book).select_related("book", "book__finalmetadata")
+        # Find by content hash (exact duplicates)
+        exact_book_ids = set()
+        if book_file.content_hash:
+            duplicate_files = BookFile.objects.filter(content_hash=book_file.content_hash).exclude(book=book).select_related("book", "book__finalmetadata")
 
             for dup_file in duplicate_files:
+                exact_book_ids.add(dup_file.book_id)
                 duplicates.append(
                     {
                         "type": "exact",
                         "book": dup_file.book,
                         "file_path": dup_file.file_path,
-                        "reason": "Identical file hash",
+                        "reason": "Identical file contents",
                     }
                 )
 
-        # Find by similar metadata (title + author)
-        if hasattr(book, "finalmetadata") and book.finalmetadata:
-            fm = book.finalmetadata
-            if fm.final_title and fm.final_author:
-                similar_books = (
-                    Book.objects.filter(finalmetadata__final_title__iexact=fm.final_title, finalmetadata__final_author__iexact=fm.final_author)
-                    .exclude(id=book.id)
-                    .select_related("finalmetadata")
-                    .prefetch_related("files")
-                )
+        # Find by similar metadata (title + author) through the near-duplicate index;
+        # it may be a rebuild behind, so match on this book's current metadata and skip books gone since
+        index = get_cached_duplicate_index()
+        metadata = getattr(book, "finalmetadata", None)
+        tokens = normalize_tokens(metadata.final_title, metadata.final_author) if metadata else frozenset()
+        matches = index.similar_to(tokens, exclude_book_id=book.id) if index is not None else []
+        similarity_by_book = {book_id: similarity for book_id, similarity in matches if book_id not in exact_book_ids}
+        if similarity_by_book:
+            similar_books = (
+                Book.objects.filter(id__in=similarity_by_book, is_placeholder=False, is_duplicate=False, deleted_at__isnull=True)
+                .select_related("finalmetadata")
+                .prefetch_related("files")
+            )
 
-                for similar_book in similar_books:
-                    dup_file = similar_book.files.first()
-                    duplicates.append(
-                        {
-                            "type": "similar",
-                            "book": similar_book,
-                            "file_path": dup_file.file_path if dup_file else "Unknown",
-                            "reason": "Same title and author",
-                        }
-                    )
+            for similar_book in sorted(similar_books, key=lambda b: -similarity_by_book[b.id]):
+                files = list(similar_book.files.all())
+                similarity = similarity_by_book[similar_book.id]
+                duplicates.append(
+                    {
+                        "type": "similar",
+                        "book": similar_book,
+                        "file_path": files[0].file_path if files else "Unknown",
+                        "reason": "Same title and author" if similarity >= 1.0 else f"Similar title and author ({similarity:.0%} match)",
+                    }
+                )
 
         return {"duplicates": duplicates}
 
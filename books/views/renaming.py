@@ -11,6 +11,7 @@ from django.apps import apps
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db import models
+from django.db.models.functions import Cast
 from django.http import JsonResponse
 from django.views.generic import ListView, TemplateView
 
@@ -302,32 +303,38 @@ class BookRenamerView(LoginRequiredMixin, ListView):
         return list(series_map.values())
 
     def _analyze_series_completion(self):
-        """Analyze series completion status."""
+        """Analyze series completion status with a single aggregate query."""
         Book = self.get_model()
 
-        # Get all series with their books
-        series_analysis = {}
-        books = Book.objects.filter(finalmetadata__is_reviewed=True).select_related("finalmetadata")
+        # Only whole series numbers take part in the 1..N completeness check
+        numbered = models.Q(finalmetadata__final_series_number__regex=r"^[0-9]+$")
+        number = Cast("finalmetadata__final_series_number", models.IntegerField())
 
-        for book in books:
-            if hasattr(book, "finalmetadata") and book.finalmetadata:
-                series_name = getattr(book.finalmetadata, "final_series", None)
-                if series_name:
-                    if series_name not in series_analysis:
-                        series_analysis[series_name] = {"name": series_name, "books": [], "numbers": set(), "complete": False}
-
-                    series_analysis[series_name]["books"].append(book)
-                    series_number = getattr(book.finalmetadata, "final_series_number", None)
-                    if series_number:
-                        series_analysis[series_name]["numbers"].add(int(series_number))
-
-        # Determine completeness
-        for series_name, data in series_analysis.items():
-            if data["numbers"]:
-                expected_numbers = set(range(1, max(data["numbers"]) + 1))
-                data["complete"] = data["numbers"] == expected_numbers
-            else:
-                data["complete"] = False
+        rows = (
+            Book.objects.filter(finalmetadata__is_reviewed=True)
+            .exclude(finalmetadata__final_series__isnull=True)
+            .exclude(finalmetadata__final_series="")
+            .values("finalmetadata__final_series")
+            .annotate(
+                book_count=models.Count("id"),
+                first_number=models.Min(number, filter=numbered),
+                last_number=models.Max(number, filter=numbered),
+                numbered_count=models.Count(number, filter=numbered, distinct=True),
+            )
+            .order_by()
+        )
+
+        series_analysis = {}
+        for row in rows:
+            series_name = row["finalmetadata__final_series"]
+            series_analysis[series_name] = {
+                "name": series_name,
+                "book_count": row["book_count"],
+                "first_number": row["first_number"],
+                "last_number": row["last_number"],
+                # Complete when the whole numbers are exactly 1..N
+                "complete": row["first_number"] == 1 and row["numbered_count"] == row["last_number"],
+            }
 
         return {
             "complete_series": [name for name, data in series_analysis.items() if data["complete"]],
@@ -1047,7 +1054,7 @@ def execute_batch_rename(request):
             books = Book.objects.filter(id__in=book_ids)
 
             # Create batch renamer with optional image cleanup
-            renamer = BatchRenamer(dry_run=dry_run, remove_unused_images=remove_unused_images)
+            renamer = BatchRenamer(dry_run=dry_run, remove_unused_images=remove_unused_images, progress_id=request.POST.get("progress_id"))
 
             # Add books to the batch
             renamer.add_books(books, folder_pattern, filename_pattern, embed_metadata)
@@ -7,21 +7,30 @@ This module provides web interface views for:
 - Managing active scan jobs
 """
 
+import json
 import logging
 import threading
+import time
 import uuid
 
 from django.apps import apps
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import redirect, render
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_http_methods
 
 # Import scanner modules
 from books.constants import SCAN_PRIORITY
 from books.scanner.background import add_active_scan, background_rescan_books, background_scan_folder, get_all_active_scans, get_scan_progress
+from books.scanner.events import SNAPSHOT, get_event_hub
 from books.scanner.rate_limiting import check_api_health, get_api_status
+from books.scanner.status import scan_status_snapshot, status_counts
+from books.utils.folder_counts import request_stale_recounts
 from books.utils.language_manager import LanguageManager
 
 logger = logging.getLogger("books.scanner")
@@ -47,23 +56,19 @@ def scan_dashboard(request):
         api_info = {}
 
     # Get recent scan folders with book count annotation - DATABASE ONLY (FAST)
-    from django.db.models import Count, Q
+    from django.db.models import Q
 
     ScanFolder = apps.get_model("books", "ScanFolder")
     ScanStatus = apps.get_model("books", "ScanStatus")
 
-    # Get folders with basic info only - no filesystem operations (OPTIMIZED)
-    recent_folders = list(ScanFolder.objects.annotate(book_count=Count("book")).select_related().order_by("-created_at")[:10])
+    # Progress comes from the folders' stored counters - no filesystem operations (OPTIMIZED)
+    recent_folders = list(ScanFolder.objects.order_by("-created_at")[:10])
 
-    # Add basic progress info without filesystem calls (FAST)
     for folder in recent_folders:
-        folder.progress_info = {
-            "scanned": folder.book_count,  # From annotation
-            "total_files": 0,  # Will be loaded via AJAX
-            "percentage": 0,  # Will be calculated via AJAX
-            "needs_scan": True,  # Assume true, will be updated via AJAX
-            "loading": True,  # Flag for UI to show loading spinner
-        }
+        folder.progress_info = folder.get_scan_progress_info()
+        # Folders not counted yet show a spinner and are loaded via AJAX once recounted
+        folder.progress_info["loading"] = folder.progress_info.get("counting", False)
+    request_stale_recounts(recent_folders)
 
     # Check for interrupted scans (Failed status with progress > 0) - OPTIMIZED
     interrupted_scans = ScanStatus.objects.filter(Q(status="Failed") & Q(processed_files__gt=0), scan_folders__isnull=False).order_by("-updated")[:5]
@@ -347,6 +352,146 @@ def api_status_ajax(request):
     return JsonResponse(combined_status)
 
 
+def _scan_status_etag(request):
+    # The view answers with the snapshot the ETag was computed from
+    request.scan_status_snapshot = scan_status_snapshot()
+    return f"scan-status-{request.scan_status_snapshot['version']}"
+
+
+@login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_scan_status_etag)
+def scan_status_feed(request):
+    """
+    AJAX endpoint with the whole scanning state: active jobs, queue depth and recent history.
+
+    Answers 304 Not Modified while the status version in the client's
+    If-None-Match is still current.
+    """
+    return JsonResponse(getattr(request, "scan_status_snapshot", None) or scan_status_snapshot())
+
+
+# Milliseconds the browser waits before reconnecting a closed event stream
+EVENT_STREAM_RETRY_MS = 3000
+
+
+def _requested_event_id(request):
+    return request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+
+
+def _catch_up_events(hub, last_event_id):
+    """
+    Events a client that saw ``last_event_id`` has missed.
+
+    Starts with a ``snapshot`` of the whole scanning state when the client
+    is new or the buffer no longer holds everything it missed.
+    """
+    events, complete = hub.events_after(last_event_id)
+    if complete:
+        return events
+    current_id = hub.last_event_id()
+    snapshot = {"id": current_id, "event": SNAPSHOT, "data": scan_status_snapshot()}
+    return [snapshot] + hub.events_after(current_id)[0]
+
+
+def _sse_message(event):
+    data = json.dumps(event["data"], cls=DjangoJSONEncoder)
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {data}\n\n"
+
+
+def _release_connection():
+    """Hand the database connection back while a stream waits; the next query opens a new one."""
+    if not connection.in_atomic_block:
+        connection.close()
+
+
+def _event_stream(hub, last_event_id):
+    stream_seconds = getattr(settings, "SCAN_EVENTS_STREAM_SECONDS", 300)
+    heartbeat = getattr(settings, "SCAN_EVENTS_HEARTBEAT_SECONDS", 15)
+    deadline = time.monotonic() + stream_seconds
+    last_write = time.monotonic()
+
+    yield f"retry: {EVENT_STREAM_RETRY_MS}\n\n"
+    events = _catch_up_events(hub, last_event_id)
+    while True:
+        for event in events:
+            last_event_id = event["id"]
+            yield _sse_message(event)
+            last_write = time.monotonic()
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        _release_connection()
+        hub.wait(last_event_id, min(heartbeat, remaining))
+        events = _catch_up_events(hub, last_event_id)
+        if not events and time.monotonic() - last_write >= heartbeat:
+            # Comment line: keeps proxies from closing an idle connection
+            yield ": keepalive\n\n"
+            last_write = time.monotonic()
+
+
+class _StreamSlot:
+    """Iterates a stream and gives its slot back when the response is closed, even if it never started."""
+
+    def __init__(self, hub, stream):
+        self.hub = hub
+        self.stream = stream
+        self.open = True
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self.stream)
+
+    def close(self):
+        self.stream.close()
+        if self.open:
+            self.open = False
+            self.hub.close_stream()
+
+
+@login_required
+def scan_event_stream(request):
+    """
+    Server-sent event stream of scan, folder and batch progress.
+
+    Sends a ``snapshot`` of the scanning state first, then ``scan_progress``,
+    ``folder_progress`` and ``batch_progress`` events as they are published.
+    A browser reconnecting with ``Last-Event-ID`` resumes after that event.
+    The stream closes after ``SCAN_EVENTS_STREAM_SECONDS``; the browser then
+    reconnects on its own. Once ``SCAN_EVENTS_MAX_STREAMS`` streams are open
+    the answer is 503, and the client polls ``scan_events_poll`` instead.
+    """
+    hub = get_event_hub()
+    if not hub.open_stream():
+        response = JsonResponse({"error": "Too many open event streams; poll instead"}, status=503)
+        response["Retry-After"] = str(EVENT_STREAM_RETRY_MS // 1000)
+        return response
+
+    response = StreamingHttpResponse(_StreamSlot(hub, _event_stream(hub, _requested_event_id(request))), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Stop nginx from buffering the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@login_required
+def scan_events_poll(request):
+    """
+    AJAX fallback for clients without server-sent events.
+
+    Returns the events after ``last_event_id`` (a ``snapshot`` first when
+    they are no longer all buffered) and the ID to send with the next poll.
+    """
+    hub = get_event_hub()
+    hub.publish_pending()
+    last_event_id = _requested_event_id(request)
+    events = _catch_up_events(hub, last_event_id)
+    return JsonResponse({"events": events, "last_event_id": events[-1]["id"] if events else last_event_id})
+
+
 @login_required
 def active_scans_ajax(request):
     """AJAX endpoint for getting active scans."""
@@ -430,25 +575,20 @@ def scan_queue(request):
     page_number = request.GET.get("page")
     page_obj = paginator.get_page(page_number)
 
-    # Statistics
-    total_items = queue_items.count()
-    pending_items = queue_items.filter(status="pending").count()
-    scheduled_items = queue_items.filter(status="scheduled").count()
-    processing_items = queue_items.filter(status="processing").count()
-    completed_items = queue_items.filter(status="completed").count()
-    failed_items = queue_items.filter(status="failed").count()
+    # Statistics, from one grouped query
+    queue_counts = status_counts()["queue"]
 
     context = {
         "page_title": "Scan Queue Management",
         "page_obj": page_obj,
         "queue_items": page_obj.object_list,
         "stats": {
-            "total_items": total_items,
-            "pending_items": pending_items,
-            "scheduled_items": scheduled_items,
-            "processing_items": processing_items,
-            "completed_items": completed_items,
-            "failed_items": failed_items,
+            "total_items": queue_counts["total"],
+            "pending_items": queue_counts["pending"],
+            "scheduled_items": queue_counts["scheduled"],
+            "processing_items": queue_counts["processing"],
+            "completed_items": queue_counts["completed"],
+            "failed_items": queue_counts["failed"],
         },
     }
 
@@ -522,8 +662,9 @@ def scan_folder_progress_ajax(request, folder_id):
         ScanFolder = apps.get_model("books", "ScanFolder")
         folder = ScanFolder.objects.get(id=folder_id)
 
-        # Get progress info (this is the expensive operation, now done individually)
+        # Served from the folder's stored counters; stale counts are recounted in the background
         progress_info = folder.get_scan_progress_info()
+        request_stale_recounts([folder])
 
         return JsonResponse({"success": True, "progress": progress_info})
 
@@ -7,12 +7,14 @@ from django.apps import apps
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.paginator import Paginator
-from django.db.models import Q
+from django.db.models import Count, Q
+from django.db.models.functions import Trim
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
 from django.views.generic import TemplateView
 
 from books.models import AUDIOBOOK_FORMATS, COMIC_FORMATS, EBOOK_FORMATS, Book, UserProfile
+from books.utils.comic_index import normalize_series_key, series_summaries
 from books.utils.decorators import ajax_response_handler
 from books.utils.metadata_helpers import (
     format_book_detail_for_json,
@@ -284,19 +286,15 @@ class ComicsMainView(LoginRequiredMixin, TemplateView):
         # Count comics from scan folders designated as 'comics'
         comics_from_final = FinalMetadata.objects.filter(
             book__scan_folder__content_type="comics", book__scan_folder__is_active=True, book__files__file_format__in=COMIC_FORMATS
-        ).select_related("book")
-
-        # Count unique series + standalone comics
-        series_names = set()
-        standalone_count = 0
+        )
 
-        for final_meta in comics_from_final:
-            if final_meta.final_series and final_meta.final_series.strip():
-                series_names.add(final_meta.final_series.strip())
-            else:
-                standalone_count += 1
+        # Count unique series + standalone comics in a single aggregate query
+        counts = comics_from_final.annotate(series_name=Trim("final_series")).aggregate(
+            series_count=Count("series_name", filter=~Q(series_name=""), distinct=True),
+            standalone_count=Count("id", filter=Q(series_name__isnull=True) | Q(series_name=""), distinct=True),
+        )
 
-        comics_count = len(series_names) + standalone_count
+        comics_count = counts["series_count"] + counts["standalone_count"]
 
         # If no comics in final metadata, fall back to scan folder detection
         if comics_count == 0:
@@ -431,9 +429,16 @@ def comics_ajax_list(request):
             # Standalone comic
             standalone_comics.append(comic_data)
 
+    # Library-wide completeness for the series on this page, in one aggregate query
+    summaries = {summary["series_key"]: summary for summary in series_summaries(normalize_series_key(name) for name in series_dict)}
+
     # Convert series dict to list and sort books within each series
     series_list = []
     for series_data in series_dict.values():
+        summary = summaries.get(normalize_series_key(series_data["name"]), {})
+        series_data["is_complete"] = summary.get("is_complete")
+        series_data["missing_count"] = summary.get("missing_count")
+        series_data["completeness_percentage"] = summary.get("completeness_percentage")
         # Sort books by position
         series_data["books"].sort(key=lambda x: x["position"])
         # Convert sets to lists for JSON serialization
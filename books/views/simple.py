@@ -9,12 +9,14 @@ import requests
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db.models import Count
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
 from django.views.decorators.http import require_POST
 from django.views.generic import TemplateView
 
 from books.models import Author, Book, FinalMetadata, Genre, Series
+from books.utils.library_export import EXPORT_FORMATS, stream_library_export
+from books.utils.quick_search import MIN_QUERY_LENGTH, cached_search
 
 
 # Static/Information Pages
@@ -182,19 +184,12 @@ def quick_search(request):
     """Quick search functionality for the search bar."""
     query = request.GET.get("q", "").strip()
 
-    if not query or len(query) < 2:
+    if len(query) < MIN_QUERY_LENGTH:
         return JsonResponse({"success": False, "error": "Query too short"})
 
     try:
-        # Search in books, authors, genres, series
-        results = {
-            "books": list(Book.objects.filter(title__icontains=query)[:5].values("id", "title")),
-            "authors": list(Author.objects.filter(name__icontains=query)[:3].values("id", "name")),
-            "genres": list(Genre.objects.filter(name__icontains=query)[:3].values("id", "name")),
-            "series": list(Series.objects.filter(name__icontains=query)[:3].values("id", "name")),
-        }
-
-        return JsonResponse({"success": True, "results": results})
+        # Word-prefix lookups on the SearchToken index, cached until the index changes
+        return JsonResponse({"success": True, "results": cached_search(request.user, query)})
 
     except Exception as e:
         return JsonResponse({"success": False, "error": str(e)}, status=500)
@@ -202,35 +197,21 @@ def quick_search(request):
 
 # Export and Backup Utilities
 @login_required
-def export_library_csv(request):
-    """Export library data as CSV."""
-    import csv
-
-    from django.http import HttpResponse
+def export_library(request, export_format):
+    """Stream the curated library metadata as CSV, JSON Lines or an OPF collection."""
+    if export_format not in EXPORT_FORMATS:
+        raise Http404(f"Unsupported export format: {export_format}")
 
-    try:
-        response = HttpResponse(content_type="text/csv")
-        response["Content-Disposition"] = 'attachment; filename="library_export.csv"'
-
-        writer = csv.writer(response)
-        writer.writerow(["Title", "Author", "Genre", "Series", "File Path", "Date Added"])
-
-        for book in Book.objects.select_related("author", "genre", "series"):
-            writer.writerow(
-                [
-                    book.title or "Unknown",
-                    book.author.name if book.author else "Unknown",
-                    book.genre.name if book.genre else "Unknown",
-                    book.series.name if book.series else "None",
-                    book.file_path or "Unknown",
-                    book.date_added.strftime("%Y-%m-%d") if book.date_added else "Unknown",
-                ]
-            )
+    content_type, extension = EXPORT_FORMATS[export_format]
+    response = StreamingHttpResponse(stream_library_export(export_format), content_type=f"{content_type}; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="library_export.{extension}"'
+    return response
 
-        return response
 
-    except Exception as e:
-        return JsonResponse({"success": False, "error": str(e)}, status=500)
+@login_required
+def export_library_csv(request):
+    """Export library data as CSV."""
+    return export_library(request, "csv")
 
 
 # Debug and Development Views (only available in DEBUG mode)
@@ -14,24 +14,18 @@ from django.urls import reverse
 from django.utils import timezone
 from django.views.generic import TemplateView
 
-from books.models import AUDIOBOOK_FORMATS, COMIC_FORMATS, EBOOK_FORMATS, LANGUAGE_CHOICES, ScanFolder, SetupWizard
+from books.models import LANGUAGE_CHOICES, ScanFolder, SetupWizard
+from books.utils.folder_analysis import MEDIA_EXTENSIONS, empty_analysis, format_file_count, get_folder_analyzer
 
 logger = logging.getLogger("books.scanner")
 
+# Seconds a wizard request waits for a folder analysis before answering with partial counts
+ANALYSIS_WAIT = 0.3
+
 
 def get_all_media_extensions():
     """Get all supported media file extensions from centralized constants."""
-    extensions = set()
-
-    # Add all format lists with dots
-    for fmt in EBOOK_FORMATS:
-        extensions.add(f".{fmt}")
-    for fmt in COMIC_FORMATS:
-        extensions.add(f".{fmt}")
-    for fmt in AUDIOBOOK_FORMATS:
-        extensions.add(f".{fmt}")
-
-    return extensions
+    return set(MEDIA_EXTENSIONS)
 
 
 class WizardRequiredMixin:
@@ -244,47 +238,28 @@ class WizardFoldersView(SetupWizardView):
 
         for path in common_paths:
             if os.path.exists(path):
-                # Count potential ebook files
-                file_count = self._count_ebook_files(path)
-                suggestions.append({"path": path, "name": os.path.basename(path) or path, "file_count": file_count, "exists": True})
+                # Count potential ebook files; large folders finish in the background
+                analysis = self._folder_analysis(path)
+                suggestions.append(
+                    {
+                        "path": path,
+                        "name": os.path.basename(path) or path,
+                        "file_count": format_file_count(analysis),
+                        "analysis_complete": analysis["complete"],
+                        "exists": True,
+                    }
+                )
 
         return suggestions
 
-    def _count_ebook_files(self, folder_path, max_depth=3):
-        """Count ebook files in a folder with optimized performance."""
-        count = 0
-        files_checked = 0
-        max_files_to_check = 300  # Limit total files for performance
-        extensions = get_all_media_extensions()
-
+    def _folder_analysis(self, folder_path):
+        """The folder's background analysis, as far as it got."""
         try:
-            for root, dirs, files in os.walk(folder_path):
-                # Limit depth to avoid scanning too deep
-                depth = root[len(folder_path) :].count(os.sep)
-                if depth >= max_depth:
-                    dirs[:] = []  # Don't recurse deeper
-                    continue
-
-                # Limit files checked per directory
-                for file in files[:30]:  # Only check first 30 files per directory
-                    files_checked += 1
-
-                    if any(file.lower().endswith(ext) for ext in extensions):
-                        count += 1
-                        if count >= 100:  # Early termination at 100 for quick response
-                            return "100+"
-
-                    # Overall limit to prevent long scans
-                    if files_checked >= max_files_to_check:
-                        break
-
-                if files_checked >= max_files_to_check:
-                    break
-
-        except (PermissionError, OSError):
-            pass
-
-        return count
+            return get_folder_analyzer().start(folder_path, wait=ANALYSIS_WAIT)
+        except OSError:
+            analysis = empty_analysis()
+            analysis["complete"] = True
+            return analysis
 
 
 class WizardContentTypesView(SetupWizardView):
@@ -370,102 +345,8 @@ class WizardContentTypesView(SetupWizardView):
         return redirect("books:wizard_step", step="scrapers")
 
     def _analyze_folder_content(self, folder_path):
-        """Analyze folder content to suggest content type."""
-        analysis = {
-            "ebooks": {"total": 0, "formats": {"epub": 0, "mobi": 0, "azw": 0, "pdf": 0, "other": 0}},
-            "comics": {"total": 0, "formats": {"cbr": 0, "cbz": 0, "cb7": 0, "cbt": 0, "pdf": 0}},
-            "audiobooks": {"total": 0, "formats": {"mp3": 0, "m4a": 0, "m4b": 0, "aac": 0, "flac": 0, "other": 0}},
-            "total_files": 0,
-            "suggested_type": "ebooks",
-        }
-
-        try:
-            for root, dirs, files in os.walk(folder_path):
-                # Allow deeper recursion but limit to reasonable depth for performance
-                depth = root[len(folder_path) :].count(os.sep)
-                if depth >= 8:  # Increased from 2 to 8 for better coverage
-                    dirs[:] = []
-                    continue
-
-                for file in files:
-                    file_lower = file.lower()
-                    file_ext = os.path.splitext(file_lower)[1]
-
-                    # Check if this is a supported media file
-                    if file_ext not in get_all_media_extensions():
-                        continue
-
-                    # Ebook formats
-                    if file_ext in [f".{fmt}" for fmt in EBOOK_FORMATS]:
-                        if file_ext == ".epub":
-                            analysis["ebooks"]["formats"]["epub"] += 1
-                        elif file_ext in [".mobi", ".azw", ".azw3"]:
-                            analysis["ebooks"]["formats"]["mobi"] += 1
-                        elif file_ext == ".pdf":
-                            # PDF could be ebook or comic, check folder context
-                            if "comic" in folder_path.lower() or "manga" in folder_path.lower():
-                                analysis["comics"]["formats"]["pdf"] += 1
-                                analysis["comics"]["total"] += 1
-                                analysis["total_files"] += 1
-                                continue  # Skip the ebook counting below
-                            else:
-                                analysis["ebooks"]["formats"]["pdf"] += 1
-                        else:  # fb2, lit, pdb, prc, etc.
-                            analysis["ebooks"]["formats"]["other"] += 1
-
-                        analysis["ebooks"]["total"] += 1
-                        analysis["total_files"] += 1
-
-                    # Comic formats (excluding PDF which is handled above)
-                    elif file_ext in [f".{fmt}" for fmt in COMIC_FORMATS if fmt != "pdf"]:
-                        if file_ext == ".cbr":
-                            analysis["comics"]["formats"]["cbr"] += 1
-                        elif file_ext == ".cbz":
-                            analysis["comics"]["formats"]["cbz"] += 1
-                        elif file_ext == ".cb7":
-                            analysis["comics"]["formats"]["cb7"] += 1
-                        elif file_ext == ".cbt":
-                            analysis["comics"]["formats"]["cbt"] += 1
-
-                        analysis["comics"]["total"] += 1
-                        analysis["total_files"] += 1
-
-                    # Audiobook formats
-                    elif file_ext in [f".{fmt}" for fmt in AUDIOBOOK_FORMATS]:
-                        if file_ext == ".mp3":
-                            analysis["audiobooks"]["formats"]["mp3"] += 1
-                        elif file_ext in [".m4a", ".m4b"]:
-                            analysis["audiobooks"]["formats"]["m4a"] += 1
-                        elif file_ext == ".aac":
-                            analysis["audiobooks"]["formats"]["aac"] += 1
-                        elif file_ext == ".flac":
-                            analysis["audiobooks"]["formats"]["flac"] += 1
-                        else:  # ogg, wav, etc.
-                            analysis["audiobooks"]["formats"]["other"] += 1
-
-                        analysis["audiobooks"]["total"] += 1
-                        analysis["total_files"] += 1
-
-                    # Increased limit and only count relevant files
-                    if analysis["total_files"] >= 2000:  # Increased from 200 to 2000
-                        break
-
-        except (PermissionError, OSError):
-            pass
-
-        # Suggest content type based on analysis
-        if analysis["comics"]["total"] > analysis["ebooks"]["total"] and analysis["comics"]["total"] > analysis["audiobooks"]["total"]:
-            analysis["suggested_type"] = "comics"
-        elif analysis["audiobooks"]["total"] > analysis["ebooks"]["total"]:
-            analysis["suggested_type"] = "audiobooks"
-        elif "comic" in folder_path.lower() or "manga" in folder_path.lower():
-            analysis["suggested_type"] = "comics"
-        elif "audio" in folder_path.lower() or "audiobook" in folder_path.lower():
-            analysis["suggested_type"] = "audiobooks"
-        else:
-            analysis["suggested_type"] = "ebooks"
-
-        return analysis
+        """Analyze folder content to suggest content type, reusing the analysis from the folders step."""
+        return get_folder_analyzer().analyze(folder_path)
 
 
 class WizardScrapersView(SetupWizardView):
@@ -623,9 +504,19 @@ class WizardCompleteView(SetupWizardView):
 
 
 # AJAX endpoints for wizard
+def _analysis_response(folder_path, analysis):
+    return {
+        "valid": True,
+        "name": os.path.basename(folder_path) or folder_path,
+        "file_count": format_file_count(analysis),
+        "complete": analysis["complete"],
+        "analysis": analysis,
+    }
+
+
 @login_required
 def wizard_validate_folder(request):
-    """AJAX endpoint to validate a folder path with optimized performance."""
+    """AJAX endpoint to validate a folder path and start its background analysis."""
     if request.method == "POST":
         folder_path = request.POST.get("path", "").strip()
 
@@ -638,53 +529,33 @@ def wizard_validate_folder(request):
         if not os.path.isdir(folder_path):
             return JsonResponse({"valid": False, "error": "Path is not a directory"})
 
-        # Fast validation with early termination for performance
         try:
-            file_count = 0
-            files_checked = 0
-            max_files_to_check = 500  # Limit total files checked for performance
-            max_depth = 4  # Reduced depth for faster scanning
-            early_termination_count = 20  # Stop after finding this many media files for quick validation
-
-            # Use centralized extension list
-            extensions = get_all_media_extensions()
-
-            for root, dirs, files in os.walk(folder_path):
-                depth = root[len(folder_path) :].count(os.sep)
-                if depth >= max_depth:
-                    dirs[:] = []
-                    continue
-
-                # Limit files checked per directory for performance
-                for file in files[:50]:  # Only check first 50 files per directory
-                    files_checked += 1
-
-                    if any(file.lower().endswith(ext) for ext in extensions):
-                        file_count += 1
-
-                        # Early termination for quick validation
-                        if file_count >= early_termination_count:
-                            return JsonResponse({"valid": True, "file_count": f"{file_count}+", "name": os.path.basename(folder_path) or folder_path})
-
-                    # Overall limit to prevent long scans
-                    if files_checked >= max_files_to_check:
-                        break
-
-                if files_checked >= max_files_to_check:
-                    break
-
-            # Return result even with limited scan
-            if file_count > 0:
-                return JsonResponse({"valid": True, "file_count": file_count, "name": os.path.basename(folder_path) or folder_path})
-            else:
-                # No media files found in limited scan - still valid folder
-                return JsonResponse({"valid": True, "file_count": 0, "name": os.path.basename(folder_path) or folder_path})
-
+            analysis = get_folder_analyzer().start(folder_path, wait=ANALYSIS_WAIT)
         except (PermissionError, OSError) as e:
             return JsonResponse({"valid": False, "error": f"Cannot access folder: {str(e)}"})
         except Exception as e:
             return JsonResponse({"valid": False, "error": f"Error validating folder: {str(e)}"})
 
+        return JsonResponse(_analysis_response(folder_path, analysis))
+
+    return JsonResponse({"valid": False, "error": "Invalid request"})
+
+
+@login_required
+def wizard_folder_analysis(request):
+    """AJAX endpoint polled for the partial and final analysis of a folder."""
+    if request.method == "POST":
+        folder_path = request.POST.get("path", "").strip()
+        if not folder_path or not os.path.isdir(folder_path):
+            return JsonResponse({"valid": False, "error": "Path is not a directory"})
+
+        try:
+            analysis = get_folder_analyzer().start(folder_path)
+        except OSError as e:
+            return JsonResponse({"valid": False, "error": f"Cannot access folder: {str(e)}"})
+
+        return JsonResponse(_analysis_response(folder_path, analysis))
+
     return JsonResponse({"valid": False, "error": "Invalid request"})
 
 
@@ -35,10 +35,8 @@ def scan_dashboard(request):
     for api_name, status in api_status.items():
         api_info[api_name] = {**status, "healthy": api_health.get(api_name, False)}
 
-    # Get recent scan folders with book count annotation
-    from django.db.models import Count
-
-    recent_folders = ScanFolder.objects.annotate(book_count=Count("book")).order_by("-created_at")[:10]
+    # Recent scan folders; book counts are stored on the folder
+    recent_folders = ScanFolder.objects.order_by("-created_at")[:10]
 
     context = {"active_scans": active_scans, "api_status": api_info, "recent_folders": recent_folders, "page_title": "Scanning Dashboard"}
 
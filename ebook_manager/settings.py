@@ -34,8 +34,8 @@ if "USE_SQLITE_TEMPORARILY" in env_file_values:
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-# Testing mode flag
-TESTING = False
+# Testing mode flag: running under manage.py test or pytest
+TESTING = "test" in sys.argv or "pytest" in sys.modules
 
 
 # Quick-start development settings - unsuitable for production
@@ -136,7 +136,7 @@ else:
     }
 
 # Keep SQLite as backup for testing
-if "test" in sys.argv or "pytest" in sys.modules:
+if TESTING:
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
@@ -208,6 +208,58 @@ COMICVINE_API_KEY = os.getenv("COMICVINE_API_KEY")
 # Apify API Token for Goodreads scraping (optional)
 APIFY_API_TOKEN = os.getenv("APIFY_API_TOKEN")
 
+# Background download of remote cover URLs into MEDIA_ROOT/cover_cache
+# Disabled under tests so template renders never start real downloads
+COVER_PREFETCH_ENABLED = os.getenv("COVER_PREFETCH_ENABLED", "True").lower() in ("true", "1", "t") and not TESTING
+COVER_PREFETCH_WORKERS = int(os.getenv("COVER_PREFETCH_WORKERS", "4"))
+# Seconds a failed cover download is remembered before the URL is tried again
+COVER_PREFETCH_FAILURE_TTL = int(os.getenv("COVER_PREFETCH_FAILURE_TTL", str(6 * 3600)))
+
+# Scan folder progress counters: folders whose file count is missing or older than
+# FOLDER_COUNTS_MAX_AGE seconds are recounted in a background thread when their progress
+# is requested (see books.utils.folder_counts and the reconcile_folder_counts command)
+FOLDER_COUNTS_RECONCILE_ENABLED = os.getenv("FOLDER_COUNTS_RECONCILE_ENABLED", "True").lower() in ("true", "1", "t") and not TESTING
+FOLDER_COUNTS_MAX_AGE = int(os.getenv("FOLDER_COUNTS_MAX_AGE", str(24 * 3600)))
+
+# Setup wizard folder analysis (see books.utils.folder_analysis): each folder is sampled for at most
+# FOLDER_ANALYSIS_TIME_BUDGET seconds and FOLDER_ANALYSIS_ENTRY_BUDGET directory entries.
+# Runs synchronously under tests so responses are deterministic
+FOLDER_ANALYSIS_BACKGROUND = os.getenv("FOLDER_ANALYSIS_BACKGROUND", "True").lower() in ("true", "1", "t") and not TESTING
+FOLDER_ANALYSIS_TIME_BUDGET = float(os.getenv("FOLDER_ANALYSIS_TIME_BUDGET", "2"))
+FOLDER_ANALYSIS_ENTRY_BUDGET = int(os.getenv("FOLDER_ANALYSIS_ENTRY_BUDGET", "20000"))
+FOLDER_ANALYSIS_CACHE_TIMEOUT = int(os.getenv("FOLDER_ANALYSIS_CACHE_TIMEOUT", "3600"))
+
+# Near-duplicate index (see books.utils.duplicate_index): book pages keep using the last index while a
+# background thread rebuilds a stale one, at most every DUPLICATE_INDEX_REBUILD_INTERVAL seconds.
+# Rebuilt synchronously under tests so responses are deterministic
+DUPLICATE_INDEX_BACKGROUND = os.getenv("DUPLICATE_INDEX_BACKGROUND", "True").lower() in ("true", "1", "t") and not TESTING
+DUPLICATE_INDEX_REBUILD_INTERVAL = int(os.getenv("DUPLICATE_INDEX_REBUILD_INTERVAL", "60"))
+
+# Scan log persistence: ScanLog rows at or above SCAN_LOG_LEVEL are written in batches
+# (see books.scanner.logging_helpers) and pruned with the prune_scan_logs command
+SCAN_LOG_LEVEL = os.getenv("SCAN_LOG_LEVEL", "WARNING").upper()
+SCAN_LOG_BATCH_SIZE = int(os.getenv("SCAN_LOG_BATCH_SIZE", "100"))
+SCAN_LOG_FLUSH_INTERVAL = float(os.getenv("SCAN_LOG_FLUSH_INTERVAL", "5"))
+# Write the shared buffer from its own thread on the flush interval instead of from whichever thread logs
+SCAN_LOG_BACKGROUND_FLUSH = os.getenv("SCAN_LOG_BACKGROUND_FLUSH", "True").lower() in ("true", "1", "t") and not TESTING
+SCAN_LOG_RETENTION_DAYS = int(os.getenv("SCAN_LOG_RETENTION_DAYS", "30"))
+SCAN_LOG_MAX_PER_FOLDER = int(os.getenv("SCAN_LOG_MAX_PER_FOLDER", "10000"))
+# Scanner log records are persisted outside tests only, so test query counts stay deterministic
+SCAN_LOG_HANDLER_ENABLED = not TESTING
+
+# Progress event stream (see books.scanner.events): the last SCAN_EVENTS_BUFFER_SIZE events are kept
+# for reconnecting clients, and a stream is closed after SCAN_EVENTS_STREAM_SECONDS (the browser reconnects
+# with its Last-Event-ID). Under tests a stream returns the buffered events and closes
+SCAN_EVENTS_BUFFER_SIZE = int(os.getenv("SCAN_EVENTS_BUFFER_SIZE", "1000"))
+SCAN_EVENTS_STREAM_SECONDS = 0 if TESTING else int(os.getenv("SCAN_EVENTS_STREAM_SECONDS", "300"))
+SCAN_EVENTS_HEARTBEAT_SECONDS = int(os.getenv("SCAN_EVENTS_HEARTBEAT_SECONDS", "15"))
+SCAN_EVENTS_FOLDER_INTERVAL = float(os.getenv("SCAN_EVENTS_FOLDER_INTERVAL", "1"))
+# Each open stream holds a worker thread; clients beyond SCAN_EVENTS_MAX_STREAMS per process poll instead.
+# Scans run by the management commands publish in their own process; streams pick those up from the
+# database every SCAN_EVENTS_SYNC_SECONDS (0 disables it)
+SCAN_EVENTS_MAX_STREAMS = int(os.getenv("SCAN_EVENTS_MAX_STREAMS", "8"))
+SCAN_EVENTS_SYNC_SECONDS = float(os.getenv("SCAN_EVENTS_SYNC_SECONDS", "5"))
+
 # Logging configuration
 LOGGING = {
     "version": 1,
@@ -222,10 +274,14 @@ LOGGING = {
             "level": "DEBUG",
             "class": "logging.StreamHandler",
         },
+        "scan_log": {
+            "level": SCAN_LOG_LEVEL,
+            "class": "books.scanner.logging_helpers.ScanLogHandler",
+        },
     },
     "loggers": {
         "books.scanner": {
-            "handlers": ["file", "console"],
+            "handlers": ["file", "console"] + (["scan_log"] if SCAN_LOG_HANDLER_ENABLED else []),
             "level": "DEBUG",
             "propagate": True,
         },
@@ -15,6 +15,8 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
@@ -22,3 +24,6 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     path("", include("books.urls", namespace="books")),  # Include the URLs from the books app
 ]
+
+# Serve cached covers (MEDIA_ROOT/cover_cache) during development; production serves MEDIA_URL directly
+urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)